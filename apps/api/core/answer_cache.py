@@ -0,0 +1,285 @@
+"""
+Full-answer cache for deterministic ask runs.
+
+Why:
+- For the `baseline` engine and for middleware runs without an LLM (deterministic mode),
+  the FinalResponse is a pure function of (question, mode, language, corpus/graph state),
+  yet every repeat of a sample question re-ran entity resolution, retrieval and the graph
+  walk.
+
+Key: (corpus `graph_key`, normalized question, mode, engine, language, reranker override)
+plus the trace flag and the process-local bumps (`local_key`: in-process ingestion and
+miners) for the in-memory tier. `graph_key` changes with completed ingestion runs and the
+durable graph watermark (row counts + latest timestamps of reference and mechanism
+edges, spans and feedback loops), so entries are never served
+across a corpus or graph change; stale ones simply age out of the LRU. The Postgres tier
+uses the durable key only: it is shared between processes that each count their own bumps.
+
+Tiers:
+- In-memory LRU of whole ask results (ANSWER_CACHE_MAX_ENTRIES).
+- Optional Postgres tier (ANSWER_CACHE_PG): reuses `ask_run`; rows carry the key in
+  `debug_summary.answer_cache_key`, so results survive restarts and are shared between
+  workers. It only stores the FinalResponse, so it serves callers that need no trace or
+  middleware artifacts.
+
+not_found results are not cached: they may come from a transient retrieval failure.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from apps.api.core.corpus_version import get_corpus_version
+from apps.api.core.schemas import FinalResponse
+from apps.api.llm.gpt5_client_azure import ProviderConfig
+from apps.api.retrieve.normalize_ar import normalize_for_matching
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HIT = "hit"
+MISS = "miss"
+BYPASS = "bypass"
+
+
+def answer_cache_enabled() -> bool:
+    return os.getenv("ANSWER_CACHE", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def answer_cache_pg_enabled() -> bool:
+    return os.getenv("ANSWER_CACHE_PG", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def answer_cache_max_entries() -> int:
+    try:
+        return max(1, int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256") or 256))
+    except Exception:
+        return 256
+
+
+def answer_key(
+    *,
+    corpus_key: str,
+    question_norm: str,
+    mode: str,
+    engine: str,
+    language: str,
+    reranker_enabled: Optional[bool],
+) -> str:
+    """Stable key shared by both tiers (the memory tier adds the trace flag)."""
+    parts = [corpus_key, question_norm, mode, engine, language, str(reranker_enabled)]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def is_deterministic_request(request: Any) -> bool:
+    """True for the baseline engine and for middleware runs that would get no LLM client."""
+    if request.engine == "baseline":
+        return True
+    try:
+        cfg = ProviderConfig.from_env()
+        if request.model_deployment:
+            cfg = dataclasses.replace(cfg, deployment_name=request.model_deployment)
+        return not cfg.is_configured()
+    except Exception:
+        return False
+
+
+async def answer_cache_key_for_request(session: Any, request: Any) -> Optional[tuple[str, str, str]]:
+    """(answer key, corpus key, local key) for a cacheable AskRequest, else None."""
+    if not answer_cache_enabled() or not is_deterministic_request(request):
+        return None
+    try:
+        version = await get_corpus_version(session)
+    except Exception:
+        # Reason: without a corpus version freshness cannot be proven; run uncached.
+        try:
+            await session.rollback()
+        except Exception:
+            pass
+        return None
+    corpus_key = version.graph_key
+    key = answer_key(
+        corpus_key=corpus_key,
+        question_norm=normalize_for_matching(request.question or ""),
+        mode=request.mode,
+        engine=request.engine,
+        language=request.language,
+        reranker_enabled=request.reranker_enabled,
+    )
+    return key, corpus_key, version.local_key
+
+
+@dataclass(frozen=True)
+class AnswerCacheOutcome:
+    """How the current ask call was served (see `last_answer_cache_outcome`)."""
+
+    status: str = BYPASS
+    key: Optional[str] = None
+    tier: Optional[str] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.status == HIT
+
+
+_outcome: contextvars.ContextVar[AnswerCacheOutcome] = contextvars.ContextVar(
+    "answer_cache_outcome", default=AnswerCacheOutcome()
+)
+
+
+def set_answer_cache_outcome(outcome: AnswerCacheOutcome) -> None:
+    _outcome.set(outcome)
+
+
+def last_answer_cache_outcome() -> AnswerCacheOutcome:
+    """Outcome of the latest ask call awaited in this task (routes read it for the hit flag)."""
+    return _outcome.get()
+
+
+class AnswerCache(Generic[T]):
+    """Thread-safe LRU of ask results; values are cloned on the way in and out."""
+
+    def __init__(self, max_entries: int = 256, clone: Optional[Callable[[T], T]] = None):
+        self.max_entries = max(1, int(max_entries))
+        self._clone = clone or (lambda v: v)
+        self._data: OrderedDict[tuple, T] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.pg_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[T]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return self._clone(value)
+
+    def put(self, key: tuple, value: T) -> None:
+        value = self._clone(value)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self.stores += 1
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": answer_cache_enabled(),
+            "pg_tier": answer_cache_pg_enabled(),
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "pg_hits": self.pg_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+async def load_cached_answer(session: Any, key: str) -> Optional[FinalResponse]:
+    """Postgres tier: latest ask_run FinalResponse stamped with `key` (fail-soft)."""
+    try:
+        row = (
+            await session.execute(
+                text(
+                    """
+                    SELECT final_response
+                    FROM ask_run
+                    WHERE debug_summary->>'answer_cache_key' = :key
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                    """
+                ),
+                {"key": key},
+            )
+        ).fetchone()
+        if not row or not row.final_response:
+            return None
+        payload = row.final_response
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        final = FinalResponse(**payload)
+        return None if final.not_found else final
+    except Exception as e:
+        logger.warning("Answer cache Postgres read failed: %s", e)
+        try:
+            await session.rollback()
+        except Exception:
+            pass
+        return None
+
+
+async def store_cached_answer(
+    session: Any,
+    key: str,
+    *,
+    corpus_key: str,
+    question: str,
+    language: str,
+    mode: str,
+    engine: str,
+    final: FinalResponse,
+) -> None:
+    """Postgres tier: append a minimal ask_run row carrying the cache key (fail-soft)."""
+    try:
+        await session.execute(
+            text(
+                """
+                INSERT INTO ask_run (
+                  request_id, question, language, mode, engine,
+                  final_response, graph_trace, citations_spans, debug_summary
+                )
+                VALUES (
+                  CAST(:rid AS uuid), :question, :language, :mode, :engine,
+                  CAST(:final_response AS jsonb), '{}'::jsonb, '[]'::jsonb, CAST(:debug_summary AS jsonb)
+                )
+                ON CONFLICT (request_id) DO NOTHING
+                """
+            ),
+            {
+                "rid": str(uuid4()),
+                "question": question,
+                "language": language,
+                "mode": mode,
+                "engine": engine,
+                "final_response": json.dumps(final.model_dump(), ensure_ascii=False),
+                "debug_summary": json.dumps(
+                    {"answer_cache_key": key, "corpus_version": corpus_key}, ensure_ascii=False
+                ),
+            },
+        )
+    except Exception as e:
+        logger.warning("Answer cache Postgres write failed: %s", e)
+        try:
+            await session.rollback()
+        except Exception:
+            pass
@@ -0,0 +1,156 @@
+"""
+Corpus version stamp for process-level caches.
+
+Why:
+- Several runtime indexes (entity resolver, retrieval indexes) are built once per process.
+- They must be swapped when ingestion changes the corpus, without re-reading the DB
+  on every request.
+
+The version combines:
+- `ingestion_run` state in Postgres (count + latest completion), which also covers
+  ingestion done by other processes (CLI scripts), checked at most every
+  CORPUS_VERSION_CHECK_SECONDS.
+- A process-local counter bumped by in-process ingestion (`bump_corpus_version`), which
+  forces an immediate re-check.
+- A durable graph watermark (row count + latest created/updated timestamp of the
+  reference graph `edge` / `edge_justification_span` and the mechanism graph
+  `mechanism_edge` / `mechanism_edge_span` / `feedback_loop`, which deep-mode loops,
+  plans and simulations read) plus a process-local counter bumped by in-process miners
+  (`bump_edge_version`). These only feed the graph keys: entity indexes depend on
+  ingestion, answers also depend on mined edges.
+
+`graph_key` is built from durable DB state only, so it can stamp rows shared between
+processes and restarts (the Postgres answer-cache tier); `local_key` carries the
+process-local counters for in-memory caches.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# (table, change timestamp) pairs behind `graph_key`.
+GRAPH_TABLES: tuple[tuple[str, str], ...] = (
+    ("edge", "COALESCE(updated_at, created_at)"),
+    ("edge_justification_span", "created_at"),
+    ("mechanism_edge", "created_at"),
+    ("mechanism_edge_span", "created_at"),
+    ("feedback_loop", "created_at"),
+)
+
+
+@dataclass(frozen=True)
+class CorpusVersion:
+    """Immutable corpus version stamp."""
+
+    ingestion_runs: int = 0
+    last_ingestion_at: Optional[str] = None
+    local_bumps: int = 0
+    graph_watermark: tuple[str, ...] = ()  # "count@latest" per GRAPH_TABLES entry
+    edge_bumps: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"ir{self.ingestion_runs}@{self.last_ingestion_at or '-'}#{self.local_bumps}"
+
+    @property
+    def graph_key(self) -> str:
+        """Durable corpus + graph state (ingestion and mined edges); no process-local bumps."""
+        return f"ir{self.ingestion_runs}@{self.last_ingestion_at or '-'}/g" + "/".join(self.graph_watermark)
+
+    @property
+    def local_key(self) -> str:
+        """Process-local bumps (ingestion, edges); only meaningful inside this process."""
+        return f"{self.local_bumps}.{self.edge_bumps}"
+
+
+_local_bumps = 0
+_edge_bumps = 0
+_cached: Optional[CorpusVersion] = None
+_cached_at = 0.0
+
+
+def _check_interval_seconds() -> float:
+    try:
+        return float(os.getenv("CORPUS_VERSION_CHECK_SECONDS", "5") or 5)
+    except Exception:
+        return 5.0
+
+
+def bump_corpus_version(reason: str = "") -> None:
+    """Mark the corpus as changed by this process (ingestion, mining)."""
+    global _local_bumps
+    _local_bumps += 1
+    logger.debug("Corpus version bumped (%s): local=%s", reason or "unspecified", _local_bumps)
+
+
+def bump_edge_version(reason: str = "") -> None:
+    """Mark the edge tables as changed by this process (miners, edge loaders)."""
+    global _edge_bumps
+    _edge_bumps += 1
+    logger.debug("Edge version bumped (%s): local=%s", reason or "unspecified", _edge_bumps)
+
+
+def reset_corpus_version_cache() -> None:
+    """Forget the cached version (tests)."""
+    global _cached, _cached_at
+    _cached = None
+    _cached_at = 0.0
+
+
+async def get_corpus_version(session: Any) -> CorpusVersion:
+    """
+    Return the current corpus version.
+
+    Cheap: hits the DB at most once per check interval unless a local bump happened.
+    """
+    global _cached, _cached_at
+    cached = _cached
+    if (
+        cached is not None
+        and cached.local_bumps == _local_bumps
+        and cached.edge_bumps == _edge_bumps
+        and (time.monotonic() - _cached_at) < _check_interval_seconds()
+    ):
+        return cached
+
+    graph_columns = ",\n".join(
+        f"(SELECT COUNT(*) FROM {table}) AS {table}_n, (SELECT MAX({stamp}) FROM {table}) AS {table}_at"
+        for table, stamp in GRAPH_TABLES
+    )
+    row = (
+        await session.execute(
+            text(
+                f"""
+                SELECT
+                  COUNT(*) AS n,
+                  MAX(COALESCE(completed_at, created_at)) AS last_at,
+                  {graph_columns}
+                FROM ingestion_run
+                WHERE status = 'completed'
+                """
+            )
+        )
+    ).fetchone()
+    watermark: list[str] = []
+    for table, _ in GRAPH_TABLES:
+        count = int(getattr(row, f"{table}_n", 0) or 0) if row else 0
+        latest = getattr(row, f"{table}_at", None) if row else None
+        watermark.append(f"{count}@{latest if latest is not None else '-'}")
+    version = CorpusVersion(
+        ingestion_runs=int(getattr(row, "n", 0) or 0) if row else 0,
+        last_ingestion_at=str(row.last_at) if row and row.last_at is not None else None,
+        local_bumps=_local_bumps,
+        graph_watermark=tuple(watermark),
+        edge_bumps=_edge_bumps,
+    )
+    _cached = version
+    _cached_at = time.monotonic()
+    return version
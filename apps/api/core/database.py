@@ -17,6 +17,8 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import NullPool
 
+from apps.api.core.db_accounting import instrument_engine
+
 
 def _db_url_from_env() -> str:
     """Compute DB URL from current environment."""
@@ -32,6 +34,36 @@ def _db_url_from_env() -> str:
     return url
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def _engine_kwargs(url: str, use_null_pool: bool) -> dict:
+    """
+    Pool sizing + statement timeout from env.
+
+    - DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT_S / DB_POOL_RECYCLE_S (queue pool only)
+    - DB_STATEMENT_TIMEOUT_MS: server-side statement_timeout per connection (0 = off)
+    """
+    kwargs: dict = {}
+    if use_null_pool:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs["pool_size"] = max(1, _env_int("DB_POOL_SIZE", 5))
+        kwargs["max_overflow"] = max(0, _env_int("DB_MAX_OVERFLOW", 10))
+        kwargs["pool_timeout"] = max(1, _env_int("DB_POOL_TIMEOUT_S", 30))
+        recycle = _env_int("DB_POOL_RECYCLE_S", -1)
+        if recycle > 0:
+            kwargs["pool_recycle"] = recycle
+    statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout_ms > 0 and "+asyncpg" in url:
+        kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+    return kwargs
+
+
 _engine = None
 _engine_url: str | None = None
 _session_maker = None
@@ -49,8 +81,10 @@ def _get_engine():
             url,
             echo=os.getenv("DEBUG", "").lower() == "true",
             pool_pre_ping=True,
-            poolclass=NullPool if use_null_pool else None,
+            **_engine_kwargs(url, use_null_pool),
         )
+        # Per-request / per-state query counters (see core/db_accounting.py).
+        instrument_engine(_engine)
         _engine_url = url
         _session_maker = async_sessionmaker(
             _engine,
@@ -0,0 +1,84 @@
+"""
+Per-request / per-state DB query accounting.
+
+Why:
+- The Muḥāsibī states share one session and the engine had no statement
+  instrumentation, so there was no way to tell which state issued how many queries.
+
+`instrument_engine` hooks SQLAlchemy cursor events on an engine; every statement is
+counted and timed into all accumulators active in the current context. Accumulators are
+pushed with `track_db_queries()` (a ContextVar, so tasks spawned inside a state - e.g.
+parallel retrieval sources - still report to that state, and overlapped pipeline branches
+keep separate counts).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from sqlalchemy import event
+
+
+@dataclass
+class DbQueryStats:
+    """Mutable counter for one request or state."""
+
+    queries: int = 0
+    time_s: float = 0.0
+
+    @property
+    def time_ms(self) -> float:
+        return round(self.time_s * 1000.0, 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"db_queries": self.queries, "db_time_ms": self.time_ms}
+
+
+_active: contextvars.ContextVar[tuple[DbQueryStats, ...]] = contextvars.ContextVar("db_query_stats", default=())
+
+
+@contextmanager
+def track_db_queries() -> Iterator[DbQueryStats]:
+    """Count statements executed in this context (nested trackers all see them)."""
+    stats = DbQueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("_query_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("_query_t0")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for stats in _active.get():
+        stats.queries += 1
+        stats.time_s += elapsed
+
+
+def _handle_error(exception_context) -> None:
+    # Reason: failed statements never reach after_cursor_execute; keep the start stack aligned.
+    conn = exception_context.connection
+    starts = conn.info.get("_query_t0") if conn is not None else None
+    if starts:
+        _after_cursor_execute(conn, None, None, None, None, False)
+
+
+def instrument_engine(engine: Any) -> None:
+    """Attach the counters to an (async or sync) engine; idempotent."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
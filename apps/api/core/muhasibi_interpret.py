@@ -312,7 +312,10 @@ async def run_interpret(self, ctx) -> None:
             mode=ctx.mode,
             used_edges=used_edges_for_prompt,
             argument_chains=[],
+            packet_scores=getattr(ctx, "retrieval_scores", None) or None,
         )
+        pack_stats = getattr(self.llm_client, "last_evidence_pack", None)
+        ctx.evidence_pack = pack_stats if isinstance(pack_stats, dict) else None
         if result:
             ctx.answer_ar = result.answer_ar
             ctx.not_found = bool(result.not_found)
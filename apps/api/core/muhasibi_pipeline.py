@@ -0,0 +1,84 @@
+"""
+Muḥāsibī state loop (sequential or pipelined).
+
+Why:
+- PURPOSE is an LLM round trip (up to 90s) while RETRIEVE only needs LISTEN's entities and
+  intent, so running them one after another adds the LLM latency to every request.
+- Pipelined mode (MUHASIBI_PIPELINED=true) starts RETRIEVE (incl. seed floor) right after
+  LISTEN and runs it while PURPOSE/PATH is in flight; both join before ACCOUNT.
+
+The two branches write disjoint StateContext fields (purpose/path/difficulty vs evidence),
+so the final response is identical to sequential mode. Trace entries and state timings are
+re-ordered into canonical state order after the join.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any
+
+
+def pipelined_enabled() -> bool:
+    return os.getenv("MUHASIBI_PIPELINED", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+async def _run_chain(middleware: Any, ctx: Any, start: Any, stop: frozenset) -> Any:
+    """Run states from `start` until FINALIZE/FAILED or a state in `stop` (not executed)."""
+    from apps.api.core.muhasibi_state_machine import MuhasibiState
+
+    state = start
+    while state not in (MuhasibiState.FINALIZE, MuhasibiState.FAILED) and state not in stop:
+        try:
+            state = await middleware._execute_state(state, ctx)
+        except Exception as e:
+            ctx.error = str(e)
+            if ctx.retry_count < ctx.max_retries:
+                ctx.retry_count += 1
+                continue
+            state = MuhasibiState.FAILED
+    return state
+
+
+def _reorder_observability(ctx: Any, trace_start: int) -> None:
+    """Put trace entries / state timings added by the overlapped branches in state order."""
+    from apps.api.core.muhasibi_state_machine import MuhasibiState
+
+    order = {s.name: s.value for s in MuhasibiState}
+    if len(ctx.trace) > trace_start:
+        tail = sorted(ctx.trace[trace_start:], key=lambda t: order.get(str(t.get("state")), 0))
+        ctx.trace[trace_start:] = tail
+    timings = sorted(ctx.state_timings.items(), key=lambda kv: order.get(kv[0], 0))
+    ctx.state_timings.clear()
+    ctx.state_timings.update(timings)
+    db = sorted(ctx.state_db.items(), key=lambda kv: order.get(kv[0], 0))
+    ctx.state_db.clear()
+    ctx.state_db.update(db)
+
+
+async def run_state_loop(middleware: Any, ctx: Any, pipelined: bool = False) -> Any:
+    """
+    Drive the state machine to FINALIZE/FAILED and return the terminal state.
+
+    Sequential mode preserves the original loop exactly. Pipelined mode overlaps the
+    PURPOSE→(PATH) branch with RETRIEVE and resumes sequentially at ACCOUNT.
+    """
+    from apps.api.core.muhasibi_state_machine import MuhasibiState
+
+    if not pipelined:
+        return await _run_chain(middleware, ctx, MuhasibiState.LISTEN, frozenset())
+
+    state = await _run_chain(middleware, ctx, MuhasibiState.LISTEN, frozenset({MuhasibiState.PURPOSE}))
+    if state != MuhasibiState.PURPOSE:
+        return state
+
+    trace_start = len(ctx.trace)
+    purpose_end, retrieve_end = await asyncio.gather(
+        _run_chain(middleware, ctx, MuhasibiState.PURPOSE, frozenset({MuhasibiState.RETRIEVE})),
+        _run_chain(middleware, ctx, MuhasibiState.RETRIEVE, frozenset({MuhasibiState.ACCOUNT})),
+    )
+    _reorder_observability(ctx, trace_start)
+    if purpose_end != MuhasibiState.RETRIEVE or retrieve_end != MuhasibiState.ACCOUNT:
+        return MuhasibiState.FAILED
+
+    return await _run_chain(middleware, ctx, MuhasibiState.ACCOUNT, frozenset())
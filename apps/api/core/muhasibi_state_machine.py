@@ -15,7 +15,7 @@ Implements a deterministic state machine orchestrator that runs:
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, auto
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from apps.api.core.schemas import (
     EntityType,
@@ -28,10 +28,14 @@ from apps.api.core.schemas import (
 )
 from apps.api.retrieve.normalize_ar import normalize_for_matching, extract_arabic_words
 from apps.api.retrieve.hybrid_retriever import HybridRetriever, RetrievalInputs
+from apps.api.retrieve.request_memo import RequestRetrievalMemo, use_retrieval_memo
 from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
+from apps.api.llm.deadline import use_deadline
+from apps.api.core.db_accounting import track_db_queries
 from apps.api.core.muhasibi_interpret import run_interpret, run_reflect, build_final_response
 from apps.api.core.contract_gate import apply_runtime_contract_gate
 from apps.api.core.muhasibi_trace import summarize_state
+from apps.api.core.muhasibi_pipeline import pipelined_enabled, run_state_loop
 from apps.api.core.muhasibi_account import apply_question_evidence_relevance_gate
 from apps.api.core.muhasibi_listen import run_listen
 from apps.api.core.muhasibi_reasoning import ChainStage, build_reasoning_trace
@@ -82,6 +86,12 @@ class StateContext:
     # Retrieval debug info (for diagnosing abstentions)
     reranker_used: bool = False
     reranker_reason: str = ""
+    retrieval_mode: str = ""
+    retrieval_timings_ms: dict[str, float] = field(default_factory=dict)
+    # Merge scores by chunk_id (from MergeResult.ranked_chunks); used by the evidence packer.
+    retrieval_scores: dict[str, float] = field(default_factory=dict)
+    # Request-scoped chunk/neighbor/span memo shared by every stage of this request.
+    retrieval_memo: RequestRetrievalMemo = field(default_factory=RequestRetrievalMemo)
     seed_floor_applied: bool = False
     seed_floor_packets_count: int = 0
     bypass_relevance_gate: bool = False
@@ -98,6 +108,8 @@ class StateContext:
     entities: list[EntityRef] = field(default_factory=list)
     not_found: bool = False
     confidence: Confidence = Confidence.LOW
+    # Evidence packing report of the INTERPRET LLM call (token savings + citation impact).
+    evidence_pack: Optional[dict[str, Any]] = None
 
     # REFLECT outputs
     reflection_added: bool = False
@@ -110,6 +122,8 @@ class StateContext:
     # Timing
     started_at: datetime = field(default_factory=datetime.utcnow)
     state_timings: dict[str, float] = field(default_factory=dict)
+    # Per-state DB accounting: {"db_queries": n, "db_time_ms": ms} (see core/db_accounting.py).
+    state_db: dict[str, dict[str, Any]] = field(default_factory=dict)
     trace_enabled: bool = False
     trace: list[dict[str, Any]] = field(default_factory=list)
 
@@ -134,6 +148,7 @@ class MuhasibiMiddleware:
         retriever=None,
         llm_client=None,
         guardrails=None,
+        pipelined: Optional[bool] = None,
     ):
         """
         Initialize the middleware.
@@ -143,11 +158,15 @@ class MuhasibiMiddleware:
             retriever: Retrieval pipeline for evidence.
             llm_client: LLM client for PURPOSE/PATH/INTERPRET/REFLECT.
             guardrails: Guardrails for citation validation.
+            pipelined: Overlap PURPOSE/PATH with RETRIEVE (default: MUHASIBI_PIPELINED).
         """
         self.entity_resolver = entity_resolver
         self.retriever: Optional[HybridRetriever] = retriever
         self.llm_client: Optional[MuhasibiLLMClient] = llm_client
         self.guardrails = guardrails
+        self.pipelined = pipelined_enabled() if pipelined is None else bool(pipelined)
+        # Optional ("state", snapshot) callback used by streaming endpoints.
+        self.event_sink: Optional[Callable[[str, dict[str, Any]], None]] = None
 
     async def process(self, question: str, language: str = "ar", mode: str = "answer") -> FinalResponse:
         """
@@ -163,17 +182,7 @@ class MuhasibiMiddleware:
         ctx = StateContext(question=question, language=language, mode=mode)
 
         # State machine execution
-        current_state = MuhasibiState.LISTEN
-
-        while current_state not in (MuhasibiState.FINALIZE, MuhasibiState.FAILED):
-            try:
-                current_state = await self._execute_state(current_state, ctx)
-            except Exception as e:
-                ctx.error = str(e)
-                if ctx.retry_count < ctx.max_retries:
-                    ctx.retry_count += 1
-                    continue
-                current_state = MuhasibiState.FAILED
+        await run_state_loop(self, ctx, pipelined=self.pipelined)
 
         return self._build_response(ctx)
 
@@ -188,16 +197,7 @@ class MuhasibiMiddleware:
         """
         ctx = StateContext(question=question, language=language, mode=mode, trace_enabled=True)
 
-        current_state = MuhasibiState.LISTEN
-        while current_state not in (MuhasibiState.FINALIZE, MuhasibiState.FAILED):
-            try:
-                current_state = await self._execute_state(current_state, ctx)
-            except Exception as e:
-                ctx.error = str(e)
-                if ctx.retry_count < ctx.max_retries:
-                    ctx.retry_count += 1
-                    continue
-                current_state = MuhasibiState.FAILED
+        await run_state_loop(self, ctx, pipelined=self.pipelined)
 
         return self._build_response(ctx), ctx.trace
 
@@ -252,7 +252,9 @@ class MuhasibiMiddleware:
         timeout_s = float(timeouts.get(state, 120.0))
         logger.info(f"[MUHASIBI] qid={qid} state_start={state.name} timeout_s={timeout_s}")
         try:
-            next_state = await asyncio.wait_for(_run_state(), timeout=timeout_s)
+            # Reason: providers clamp their own timeouts to this state's deadline.
+            with use_retrieval_memo(ctx.retrieval_memo), use_deadline(timeout_s), track_db_queries() as db_stats:
+                next_state = await asyncio.wait_for(_run_state(), timeout=timeout_s)
         except asyncio.TimeoutError:
             ctx.error = f"Timeout in state {state.name} after {timeout_s:.0f}s"
             logger.error(f"[MUHASIBI] qid={qid} state_timeout={state.name} after_s={timeout_s}")
@@ -265,12 +267,24 @@ class MuhasibiMiddleware:
         # Record timing
         elapsed = (datetime.utcnow() - start).total_seconds()
         ctx.state_timings[state.name] = elapsed
-        if getattr(ctx, "trace_enabled", False):
+        ctx.state_db[state.name] = db_stats.as_dict()
+        event_sink = getattr(self, "event_sink", None)
+        if getattr(ctx, "trace_enabled", False) or event_sink is not None:
             snap = summarize_state(state.name, ctx)
             snap["elapsed_s"] = elapsed
-            ctx.trace.append(snap)
+            snap.update(ctx.state_db[state.name])
+            if getattr(ctx, "trace_enabled", False):
+                ctx.trace.append(snap)
+            if event_sink is not None:
+                try:
+                    event_sink("state", dict(snap))
+                except Exception:
+                    pass
 
-        logger.info(f"[MUHASIBI] qid={qid} state_done={state.name} elapsed_s={elapsed:.3f}")
+        logger.info(
+            f"[MUHASIBI] qid={qid} state_done={state.name} elapsed_s={elapsed:.3f} "
+            f"db_queries={db_stats.queries} db_time_ms={db_stats.time_ms}"
+        )
         return next_state
 
     async def _state_listen(self, ctx: StateContext) -> MuhasibiState:
@@ -341,6 +355,39 @@ class MuhasibiMiddleware:
 
         return MuhasibiState.RETRIEVE
 
+    async def _extra_retrievals(
+        self,
+        session: Any,
+        queries: list[str],
+        ctx: StateContext,
+        intent_type: Optional[str],
+    ) -> list[dict[str, Any]]:
+        """
+        Run extra retrievals (rewrites / chain-stage hints) and return their packets in query order.
+
+        Uses `retrieve_many` when available: query-independent branches are shared across
+        calls, and calls run concurrently in parallel retrieval mode. Failed calls are skipped.
+        """
+        inputs = [
+            RetrievalInputs(query=q, resolved_entities=ctx.detected_entities, intent=intent_type, mode=ctx.mode)
+            for q in queries
+        ]
+        retrieve_many = getattr(self.retriever, "retrieve_many", None)
+        if callable(retrieve_many):
+            merges = await retrieve_many(session, inputs)
+        else:
+            merges = []
+            for inp in inputs:
+                try:
+                    merges.append(await self.retriever.retrieve(session, inp))
+                except Exception:
+                    merges.append(None)
+        extra_packets: list[dict[str, Any]] = []
+        for merge in merges:
+            if merge is not None:
+                extra_packets.extend(merge.evidence_packets)
+        return extra_packets
+
     async def _state_retrieve(self, ctx: StateContext) -> MuhasibiState:
         """
         RETRIEVE state: Get evidence packets.
@@ -372,6 +419,12 @@ class MuhasibiMiddleware:
                     # Track reranker decision for observability
                     ctx.reranker_used = getattr(merge, "reranker_used", False)
                     ctx.reranker_reason = getattr(merge, "reranker_decision", "")
+                    ctx.retrieval_mode = str(getattr(merge, "retrieval_mode", "") or "")
+                    ctx.retrieval_timings_ms = dict(getattr(merge, "source_timings_ms", {}) or {})
+                    ctx.retrieval_scores = {
+                        str(rc.get("chunk_id") or ""): float(rc.get("score") or 0.0)
+                        for rc in (getattr(merge, "ranked_chunks", None) or [])
+                    }
                     ctx.evidence_packets = merge.evidence_packets
                     ctx.has_definition = merge.has_definition
                     ctx.has_evidence = merge.has_evidence
@@ -397,20 +450,11 @@ class MuhasibiMiddleware:
                 )
                 if trace.chain_stage in {ChainStage.ACTION, ChainStage.HABIT, ChainStage.FIXED_INTENTION}:
                     session = self.retriever._session
-                    extra_packets: list[dict[str, Any]] = []
                     names = [str(e.get("name_ar") or "") for e in (ctx.detected_entities or []) if e.get("name_ar")]
                     hint_queries: list[str] = []
                     for n in names[:2]:
                         hint_queries.extend([f"{n} إجرائي", f"{n} خطوات", f"كيفية تطبيق {n}"])
-                    for q in hint_queries[:4]:
-                        try:
-                            merge2 = await self.retriever.retrieve(
-                                session,
-                                RetrievalInputs(query=q, resolved_entities=ctx.detected_entities, intent=intent_type, mode=ctx.mode),
-                            )
-                            extra_packets.extend(merge2.evidence_packets)
-                        except Exception:
-                            continue
+                    extra_packets = await self._extra_retrievals(session, hint_queries[:4], ctx, intent_type)
 
                     # Merge deterministically: keep existing first, then add unique chunk_ids.
                     if extra_packets:
@@ -435,21 +479,9 @@ class MuhasibiMiddleware:
                 )
                 if rewrites and self.retriever and hasattr(self.retriever, "_session") and self.retriever._session:
                     session = self.retriever._session
-                    extra_packets: list[dict[str, Any]] = []
-                    for q in list(rewrites.get("rewrites_ar", []))[:3]:
-                        try:
-                            merge = await self.retriever.retrieve(
-                                session,
-                                RetrievalInputs(
-                                    query=str(q),
-                                    resolved_entities=ctx.detected_entities,
-                                    intent=intent_type,
-                                    mode=ctx.mode,
-                                ),
-                            )
-                            extra_packets.extend(merge.evidence_packets)
-                        except Exception:
-                            continue
+                    extra_packets = await self._extra_retrievals(
+                        session, [str(q) for q in list(rewrites.get("rewrites_ar", []))[:3]], ctx, intent_type
+                    )
 
                     # Merge deterministically: keep existing first, then add new unique chunk_ids.
                     seen = {p.get("chunk_id") for p in ctx.evidence_packets if p.get("chunk_id")}
@@ -674,6 +706,7 @@ def create_middleware(
     retriever=None,
     llm_client=None,
     guardrails=None,
+    pipelined: Optional[bool] = None,
 ) -> MuhasibiMiddleware:
     """
     Create a configured Muḥāsibī middleware instance.
@@ -683,6 +716,7 @@ def create_middleware(
         retriever: Optional retrieval pipeline.
         llm_client: Optional LLM client.
         guardrails: Optional guardrails.
+        pipelined: Overlap PURPOSE/PATH with RETRIEVE (default: MUHASIBI_PIPELINED).
 
     Returns:
         Configured MuhasibiMiddleware.
@@ -692,5 +726,6 @@ def create_middleware(
         retriever=retriever,
         llm_client=llm_client,
         guardrails=guardrails,
+        pipelined=pipelined,
     )
 
@@ -10,6 +10,12 @@ from __future__ import annotations
 from typing import Any
 
 
+def _memo_stats(ctx) -> dict[str, Any]:
+    """Cumulative request retrieval-memo hit/miss counters (empty when absent)."""
+    memo = getattr(ctx, "retrieval_memo", None)
+    return memo.stats() if memo is not None else {}
+
+
 def summarize_state(state_name: str, ctx) -> dict[str, Any]:
     """
     Build a safe trace snapshot for a given state.
@@ -44,6 +50,9 @@ def summarize_state(state_name: str, ctx) -> dict[str, Any]:
                 "evidence_packets_count": len(getattr(ctx, "evidence_packets", []) or []),
                 "has_definition": bool(getattr(ctx, "has_definition", False)),
                 "has_evidence": bool(getattr(ctx, "has_evidence", False)),
+                "retrieval_mode": getattr(ctx, "retrieval_mode", "") or "",
+                "retrieval_timings_ms": dict(getattr(ctx, "retrieval_timings_ms", {}) or {}),
+                "retrieval_memo": _memo_stats(ctx),
             }
         )
     elif state_name == "ACCOUNT":
@@ -59,6 +68,8 @@ def summarize_state(state_name: str, ctx) -> dict[str, Any]:
                 "not_found": bool(getattr(ctx, "not_found", False)),
                 "confidence": str(getattr(ctx, "confidence", "")),
                 "citations_count": len(getattr(ctx, "citations", []) or []),
+                "retrieval_memo": _memo_stats(ctx),
+                "evidence_pack": getattr(ctx, "evidence_pack", None),
             }
         )
     elif state_name == "REFLECT":
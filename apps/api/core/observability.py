@@ -130,6 +130,11 @@ class RequestObservability:
     detected_entities_count: int = 0
     evidence_packets_count: int = 0
     
+    # DB accounting (see core/db_accounting.py)
+    db_queries: int = 0
+    db_time_ms: float = 0.0
+    db_by_stage: dict[str, dict[str, Any]] = field(default_factory=dict)
+    
     def start_stage(self, stage: str) -> None:
         """Start timing a pipeline stage."""
         self.latency.start_stage(stage)
@@ -138,6 +143,12 @@ class RequestObservability:
         """End timing the current pipeline stage."""
         self.latency.end_stage()
     
+    def record_db(self, stage: str, *, db_queries: int, db_time_ms: float) -> None:
+        """Record DB queries/time issued by one pipeline stage."""
+        self.db_by_stage[stage] = {"db_queries": int(db_queries), "db_time_ms": round(float(db_time_ms), 2)}
+        self.db_queries = sum(int(v["db_queries"]) for v in self.db_by_stage.values())
+        self.db_time_ms = round(sum(float(v["db_time_ms"]) for v in self.db_by_stage.values()), 2)
+    
     def finalize(self) -> None:
         """Finalize the observability record."""
         self.latency.end_stage()  # End any ongoing stage
@@ -163,6 +174,9 @@ class RequestObservability:
             "unsupported_must_cite": self.unsupported_must_cite,
             "detected_entities_count": self.detected_entities_count,
             "evidence_packets_count": self.evidence_packets_count,
+            "db_queries": self.db_queries,
+            "db_time_ms": self.db_time_ms,
+            "db_by_stage": dict(self.db_by_stage),
         }
     
     def log_summary(self) -> None:
@@ -172,6 +186,7 @@ class RequestObservability:
             f"intent={self.intent} "
             f"outcome={self.contract_outcome} "
             f"latency={self.total_latency_ms}ms "
+            f"db={self.db_queries}q/{self.db_time_ms}ms "
             f"loops={self.world_model_metrics.loops_used}/{self.world_model_metrics.loops_detected} "
             f"edges={self.world_model_metrics.mechanism_edges_used} "
             f"pillars={self.world_model_metrics.pillars_covered}/5"
@@ -274,6 +289,16 @@ def create_observability_context(
     )
 
 
+def update_db_metrics(obs: RequestObservability, state_db: dict[str, dict[str, Any]]) -> None:
+    """Copy per-state DB accounting (`StateContext.state_db`) into the observability context."""
+    for stage, stats in (state_db or {}).items():
+        obs.record_db(
+            stage,
+            db_queries=int(stats.get("db_queries", 0) or 0),
+            db_time_ms=float(stats.get("db_time_ms", 0.0) or 0.0),
+        )
+
+
 def update_world_model_metrics(
     obs: RequestObservability,
     *,
@@ -44,7 +44,11 @@ from apps.api.core.integrity_validator import validate_evidence_packets, get_int
 from apps.api.core.edge_selection import apply_edge_selection_and_log, select_top_k_edges
 from apps.api.retrieve.graph_retriever import get_entity_neighbors
 from apps.api.retrieve.hybrid_retriever import HybridRetriever, RetrievalInputs
-from apps.api.retrieve.sql_retriever import get_chunks_with_refs, search_entities_by_name
+from apps.api.retrieve.sql_retriever import (
+    get_chunks_with_refs,
+    get_chunks_with_refs_bulk,
+    search_entities_by_name,
+)
 
 # Breakthrough imports (optional, for enhanced reasoning)
 import os
@@ -1127,19 +1131,22 @@ class ScholarReasoner:
         per_neighbor_notes = 2
         per_neighbor_other = 2 if extra else 1
 
+        from apps.api.core.schemas import EntityType
+
+        requests: list[tuple[EntityType, str, int]] = []
         for e in semantic_edges[: self.targets.max_edges]:
             n_type = str(e.get("neighbor_type") or "")
             n_id = str(e.get("neighbor_id") or "")
             if not n_type or not n_id:
                 continue
             try:
-                from apps.api.core.schemas import EntityType
-
                 et = EntityType(n_type)
             except Exception:
                 continue
+            requests.append((et, n_id, 12))
 
-            more = await get_chunks_with_refs(self.session, et, n_id, limit=12)
+        # Reason: one batched fetch instead of 1 + #chunks queries per neighbor.
+        for more in await get_chunks_with_refs_bulk(self.session, requests):
             notes = [p for p in more if str(p.get("chunk_id") or "").startswith("SN_")]
             other = [p for p in more if not str(p.get("chunk_id") or "").startswith("SN_")]
             chosen = notes[:per_neighbor_notes] + other[:per_neighbor_other]
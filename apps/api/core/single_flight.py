@@ -0,0 +1,74 @@
+"""
+Single-flight coalescing for identical concurrent async computations.
+
+Why:
+- During demos and load spikes many users submit the same (sample) question at once; each
+  ran the full Muḥāsibī pipeline with its own LLM calls and DB queries.
+
+`SingleFlight.do(key, fn)` runs `fn()` once per key while it is in flight; concurrent
+callers with the same key await that result (optionally through a per-caller `clone`) instead
+of starting their own run. Errors are shared too. If the leading caller is cancelled (e.g.
+its client disconnected) waiting followers do not inherit the cancellation: one of them
+re-runs `fn` as the new leader.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Per-key in-flight de-duplication (one event loop per key)."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        clone: Optional[Callable[[T], T]] = None,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        fut = self._inflight.get(key)
+        if fut is not None and fut.get_loop() is loop:
+            self.coalesced += 1
+            try:
+                ok, value = await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if fut.cancelled() and not (task is not None and task.cancelling()):
+                    # Reason: the leader was cancelled, not us; take over the computation.
+                    return await self.do(key, fn, clone)
+                raise
+            if not ok:
+                raise value
+            return clone(value) if clone is not None else value
+
+        fut = loop.create_future()
+        self._inflight[key] = fut
+        self.leaders += 1
+        try:
+            result = await fn()
+        except Exception as e:
+            # Reason: deliver errors as values so an unobserved future never logs a warning.
+            fut.set_result((False, e))
+            raise
+        except BaseException:
+            # Cancellation (or interpreter exit): followers re-run instead of hanging.
+            fut.cancel()
+            raise
+        else:
+            fut.set_result((True, result))
+            return result
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def stats(self) -> dict[str, Any]:
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
@@ -190,6 +190,8 @@ class MuhasibiTraceEvent(BaseModel):
     citations_count: Optional[int] = None
     reflection_added: Optional[bool] = None
     done: Optional[bool] = None
+    db_queries: Optional[int] = None
+    db_time_ms: Optional[float] = None
 
 
 class AskUiResponse(BaseModel):
@@ -224,3 +226,6 @@ class AskUiResponse(BaseModel):
 
     final: FinalResponse
 
+    # True when `final` was served from the answer cache (deterministic runs only).
+    cache_hit: bool = False
+
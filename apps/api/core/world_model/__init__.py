@@ -41,6 +41,8 @@ from apps.api.core.world_model.loop_reasoner import (
 
 from apps.api.core.world_model.intervention_planner import (
     compute_intervention_plan,
+    compute_intervention_plans_batch,
+    InterventionGoal,
     validate_intervention_plan,
 )
 
@@ -79,6 +81,8 @@ __all__ = [
     "compute_loop_relevance_score",
     # Intervention planner
     "compute_intervention_plan",
+    "compute_intervention_plans_batch",
+    "InterventionGoal",
     "validate_intervention_plan",
     # Simulator
     "simulate_change",
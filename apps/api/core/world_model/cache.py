@@ -5,6 +5,7 @@ This module provides:
 - Mechanism graph stats caching
 - TTL-based cache invalidation
 - Cache invalidation on edge insert
+- Graph stats derived from the shared MechanismGraphContext (graph_context.py)
 
 Target: p95 < 10s for deep synthesis.
 """
@@ -174,6 +175,10 @@ class WorldModelCache:
         async with self._lock:
             self._stats_cache = None
     
+    def drop_stats(self) -> None:
+        """Invalidate stats cache from sync code (transaction hooks)."""
+        self._stats_cache = None
+    
     async def invalidate_all(self) -> None:
         """Invalidate all caches."""
         async with self._lock:
@@ -223,7 +228,8 @@ async def get_cached_loops(session: AsyncSession) -> list[Any]:
     
     # Load persisted loops (fast path).
     # Reason: runtime must not run full cycle detection on every request.
-    # Loops are mined offline and stored in `feedback_loop`.
+    # Loops are mined offline and stored in `feedback_loop`; upsert_mechanism_edges also
+    # indexes the loops closed by new edges right away.
     from apps.api.core.world_model.loop_reasoner import load_persisted_loops
     loops = await load_persisted_loops(session, max_loops=20)
     
@@ -259,7 +265,10 @@ async def get_cached_stats(session: AsyncSession) -> MechanismGraphStats:
 
 
 async def _compute_graph_stats(session: AsyncSession) -> MechanismGraphStats:
-    """Compute mechanism graph statistics from database.
+    """Compute mechanism graph statistics.
+    
+    Counts come from the shared MechanismGraphContext (topology only); span coverage
+    and the loop count (feedback_loop) are read from the database.
     
     Args:
         session: Database session
@@ -267,32 +276,27 @@ async def _compute_graph_stats(session: AsyncSession) -> MechanismGraphStats:
     Returns:
         Computed statistics
     """
+    from apps.api.core.world_model.graph_context import get_mechanism_graph_context
+
+    graph = await get_mechanism_graph_context(session)
     stats = MechanismGraphStats()
-    
-    # Count nodes
-    result = await session.execute(
-        text("SELECT COUNT(*) AS cnt FROM mechanism_node")
-    )
-    row = result.fetchone()
-    stats.total_nodes = int(row.cnt) if row else 0
-    
-    # Count edges
-    result = await session.execute(
-        text("SELECT COUNT(*) AS cnt FROM mechanism_edge")
-    )
-    row = result.fetchone()
-    stats.total_edges = int(row.cnt) if row else 0
-    
-    # Edges by relation type
-    result = await session.execute(
-        text("""
-            SELECT relation_type, COUNT(*) AS cnt
-            FROM mechanism_edge
-            GROUP BY relation_type
-        """)
-    )
-    for row in result.fetchall():
-        stats.edges_by_relation[str(row.relation_type)] = int(row.cnt)
+    stats.total_nodes = len(graph.nodes_by_id)
+    stats.total_edges = len(graph.edges)
+    
+    confidences: list[float] = []
+    for edge in graph.edges:
+        stats.edges_by_relation[edge.relation_type] = stats.edges_by_relation.get(edge.relation_type, 0) + 1
+        confidences.append(edge.confidence)
+        # Edges by pillar: an edge counts once per pillar it touches
+        pillars = {
+            node.ref_id
+            for node in (graph.nodes_by_id.get(edge.from_node), graph.nodes_by_id.get(edge.to_node))
+            if node is not None and node.ref_kind == "pillar"
+        }
+        for pillar in pillars:
+            stats.edges_by_pillar[pillar] = stats.edges_by_pillar.get(pillar, 0) + 1
+    if confidences:
+        stats.avg_confidence = round(sum(confidences) / len(confidences), 3)
     
     # Edges with spans
     result = await session.execute(
@@ -304,14 +308,6 @@ async def _compute_graph_stats(session: AsyncSession) -> MechanismGraphStats:
     row = result.fetchone()
     stats.edges_with_spans = int(row.cnt) if row else 0
     
-    # Average confidence
-    result = await session.execute(
-        text("SELECT AVG(confidence) AS avg_conf FROM mechanism_edge")
-    )
-    row = result.fetchone()
-    if row and row.avg_conf is not None:
-        stats.avg_confidence = round(float(row.avg_conf), 3)
-    
     # Count loops
     result = await session.execute(
         text("SELECT COUNT(*) AS cnt FROM feedback_loop")
@@ -319,19 +315,6 @@ async def _compute_graph_stats(session: AsyncSession) -> MechanismGraphStats:
     row = result.fetchone()
     stats.loops_count = int(row.cnt) if row else 0
     
-    # Edges by pillar (from mechanism_node)
-    result = await session.execute(
-        text("""
-            SELECT n.ref_id, COUNT(DISTINCT e.id) AS cnt
-            FROM mechanism_edge e
-            JOIN mechanism_node n ON (e.from_node = n.id OR e.to_node = n.id)
-            WHERE n.ref_kind = 'pillar'
-            GROUP BY n.ref_id
-        """)
-    )
-    for row in result.fetchall():
-        stats.edges_by_pillar[str(row.ref_id)] = int(row.cnt)
-    
     return stats
 
 
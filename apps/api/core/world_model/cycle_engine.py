@@ -0,0 +1,364 @@
+"""Elementary-cycle enumeration for the mechanism graph.
+
+Why:
+- The old loop finder restarted a path-copying DFS from every node, re-checked every
+  candidate against a list of all cycles found so far, and stopped at `max_cycles` in
+  arbitrary DFS order; runtime loop detection was abandoned because of it.
+
+Algorithm:
+- Tarjan SCC decomposition (iterative); only non-trivial components can hold cycles.
+- Every cycle is rooted at its smallest node `s`. Unbounded: Johnson's blocked-set
+  search per component, then `s` is removed and the rest decomposed again. Bounded
+  (`max_length`): the Gupta–Suzumura lock-distance variant, seeded with a reverse BFS
+  from `s` so only nodes that can return to `s` within the bound are ever entered.
+  Every elementary cycle is produced exactly once, so no "seen" list is needed.
+- The mechanism graph is a multigraph (several relation types between the same nodes):
+  node cycles are enumerated on the simple graph and expanded lazily into edge cycles.
+
+Everything is a generator: callers can stop after N cycles or bound the length without
+paying for the full enumeration. `cycle_key` is the canonical hashed identity of an edge
+cycle (order/rotation independent), shared with persisted loops.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+from collections import defaultdict
+from typing import Hashable, Iterable, Iterator, Optional, Protocol, Sequence, TypeVar
+
+N = TypeVar("N", bound=Hashable)
+
+
+class EdgeLike(Protocol):
+    id: str
+    from_node: str
+    to_node: str
+
+
+E = TypeVar("E", bound=EdgeLike)
+
+
+def cycle_key(edge_ids: Iterable[str]) -> str:
+    """Canonical hashed key of an elementary edge cycle (independent of rotation).
+
+    md5 of the sorted ids joined by "|", so Postgres can compute the same key
+    (`feedback_loop.loop_key`).
+    """
+    return hashlib.md5("|".join(sorted(str(e) for e in edge_ids)).encode("utf-8")).hexdigest()
+
+
+def strongly_connected_components(succ: dict[N, list[N]]) -> list[list[N]]:
+    """Tarjan's SCCs (iterative, deterministic for sorted successor lists)."""
+    index: dict[N, int] = {}
+    low: dict[N, int] = {}
+    on_stack: set[N] = set()
+    stack: list[N] = []
+    out: list[list[N]] = []
+    counter = 0
+    for root in succ:
+        if root in index:
+            continue
+        work: list[tuple[N, Iterator[N]]] = [(root, iter(succ.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            v, it = work[-1]
+            advanced = False
+            for w in it:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ.get(w, ()))))
+                    advanced = True
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            if advanced:
+                continue
+            work.pop()
+            if work and low[v] < low[work[-1][0]]:
+                low[work[-1][0]] = low[v]
+            if low[v] == index[v]:
+                comp: list[N] = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp.append(w)
+                    if w == v:
+                        break
+                out.append(comp)
+    return out
+
+
+def _johnson_from(succ: dict[N, list[N]], start: N) -> Iterator[list[N]]:
+    """All elementary cycles through `start` (Johnson's blocked sets)."""
+    path = [start]
+    blocked = {start}
+    b_sets: dict[N, set[N]] = defaultdict(set)
+    stack = [iter(succ[start])]
+    closed = [False]
+    while stack:
+        for w in stack[-1]:
+            if w == start:
+                yield list(path)
+                closed[-1] = True
+            elif w not in blocked:
+                path.append(w)
+                blocked.add(w)
+                closed.append(False)
+                stack.append(iter(succ[w]))
+                break
+        else:
+            stack.pop()
+            v = path.pop()
+            if closed.pop():
+                if closed:
+                    closed[-1] = True
+                pending = [v]
+                while pending:
+                    u = pending.pop()
+                    if u in blocked:
+                        blocked.discard(u)
+                        pending.extend(b_sets[u])
+                        b_sets[u].clear()
+            else:
+                for w in succ[v]:
+                    b_sets[w].add(v)
+
+
+def _distances_to(preds: dict[N, list[N]], start: N, max_depth: int, allowed) -> dict[N, int]:
+    """Edges needed to get back to `start` (reverse BFS over allowed nodes, depth-bounded)."""
+    dist: dict[N, int] = {start: 0}
+    frontier = [start]
+    for d in range(1, max_depth + 1):
+        nxt: list[N] = []
+        for v in frontier:
+            for u in preds.get(v, ()):
+                if u not in dist and allowed(u):
+                    dist[u] = d
+                    nxt.append(u)
+        if not nxt:
+            break
+        frontier = nxt
+    return dist
+
+
+def _bounded_from(
+    succ: dict[N, list[N]],
+    start: N,
+    max_length: int,
+    dist: dict[N, int],
+) -> Iterator[list[N]]:
+    """Elementary cycles through `start` with at most `max_length` edges (Gupta–Suzumura).
+
+    Only nodes in `dist` (those that can get back to `start` in time) are entered, and their
+    locks start at the depth bound implied by that distance.
+    """
+    path = [start]
+    lock: dict[N, int] = {v: max_length - d + 1 for v, d in dist.items()}
+    lock[start] = 0
+    b_sets: dict[N, set[N]] = defaultdict(set)
+    stack = [iter(succ[start])]
+    blen = [max_length]
+    while stack:
+        for w in stack[-1]:
+            if w == start:
+                yield list(path)
+                blen[-1] = 1
+            elif len(path) < lock.get(w, 0):
+                lock[w] = len(path)
+                path.append(w)
+                blen.append(max_length)
+                stack.append(iter(succ[w]))
+                break
+        else:
+            stack.pop()
+            v = path.pop()
+            bl = blen.pop()
+            if blen:
+                blen[-1] = min(blen[-1], bl)
+            if bl < max_length:
+                # Reason: v closes a cycle within bl more edges; relax locks so it is re-entered
+                # from shallow enough depths.
+                relax = [(bl, v)]
+                on_path = set(path)
+                while relax:
+                    d, u = relax.pop()
+                    if u in dist and lock.get(u, 0) < max_length - d + 1:
+                        lock[u] = max_length - d + 1
+                        relax.extend((d + 1, x) for x in b_sets[u] if x not in on_path)
+            else:
+                for w in succ[v]:
+                    b_sets[w].add(v)
+
+
+def iter_node_cycles(succ: dict[N, list[N]], max_length: Optional[int] = None) -> Iterator[list[N]]:
+    """
+    Yield every elementary cycle (as a node list starting at its smallest node).
+
+    `succ` must have sorted, duplicate-free successor lists; self-loops are allowed.
+    """
+    if max_length is not None and max_length < 1:
+        return
+    for v in sorted(succ):
+        if v in succ[v]:
+            yield [v]
+    # Simple graph without self-loops; sorted for deterministic output.
+    graph = {v: [w for w in succ[v] if w != v] for v in sorted(succ)}
+    components = [sorted(c) for c in strongly_connected_components(graph) if len(c) > 1]
+    if max_length is None:
+        pending = sorted(components, reverse=True)
+        while pending:
+            comp = pending.pop()
+            members = set(comp)
+            sub = {v: [w for w in graph[v] if w in members] for v in comp}
+            start = comp[0]
+            yield from _johnson_from(sub, start)
+            del sub[start]
+            rest = {v: [w for w in ws if w != start] for v, ws in sub.items()}
+            more = [sorted(c) for c in strongly_connected_components(rest) if len(c) > 1]
+            pending.extend(sorted(more, reverse=True))
+        return
+    if max_length < 2:
+        return
+    # Bounded: root each cycle at its smallest node; later roots only see larger nodes of
+    # the same component, so no subgraph rebuild / SCC recomputation per root is needed.
+    comp_of = {v: i for i, comp in enumerate(components) for v in comp}
+    preds: dict[N, list[N]] = defaultdict(list)
+    for v, ws in graph.items():
+        for w in ws:
+            if comp_of.get(v) is not None and comp_of.get(v) == comp_of.get(w):
+                preds[w].append(v)
+    for start in sorted(comp_of):
+        cid = comp_of[start]
+        dist = _distances_to(preds, start, max_length - 1, lambda u: u > start and comp_of[u] == cid)
+        if len(dist) > 1:
+            yield from _bounded_from(graph, start, max_length, dist)
+
+
+def successor_map(edges: Sequence[E]) -> tuple[dict[str, list[str]], dict[tuple[str, str], list[E]]]:
+    """Simple-graph successors plus the parallel edges behind each (u, v) pair."""
+    parallel: dict[tuple[str, str], list[E]] = defaultdict(list)
+    for e in edges:
+        parallel[(e.from_node, e.to_node)].append(e)
+    succ: dict[str, set[str]] = defaultdict(set)
+    for u, v in parallel:
+        succ[u].add(v)
+        succ.setdefault(v, set())
+    for pair in parallel:
+        parallel[pair].sort(key=lambda e: e.id)
+    return {u: sorted(vs) for u, vs in succ.items()}, dict(parallel)
+
+
+def _expand(node_cycles: Iterable[list[str]], parallel: dict[tuple[str, str], list[E]]) -> Iterator[list[E]]:
+    for nodes in node_cycles:
+        hops = [parallel[(u, nodes[(i + 1) % len(nodes)])] for i, u in enumerate(nodes)]
+        for combo in itertools.product(*hops):
+            yield list(combo)
+
+
+def iter_edge_cycles(edges: Sequence[E], max_length: Optional[int] = 8) -> Iterator[list[E]]:
+    """Yield elementary edge cycles (each parallel-edge choice is its own cycle)."""
+    succ, parallel = successor_map(edges)
+    yield from _expand(iter_node_cycles(succ, max_length=max_length), parallel)
+
+
+def _paths_between(
+    succ: dict[str, list[str]],
+    preds: dict[str, list[str]],
+    source: str,
+    target: str,
+    max_edges: int,
+) -> Iterator[list[str]]:
+    """Simple node paths source -> target with at most `max_edges` edges."""
+    dist = _distances_to(preds, target, max_edges, lambda _: True)
+    if source not in dist or dist[source] > max_edges:
+        return
+    path = [source]
+    on_path = {source}
+    stack = [iter(succ.get(source, ()))]
+    while stack:
+        for w in stack[-1]:
+            depth = len(path)  # edges once w is appended
+            if w == target:
+                yield path + [w]
+            elif w not in on_path and w in dist and depth + dist[w] <= max_edges:
+                path.append(w)
+                on_path.add(w)
+                stack.append(iter(succ.get(w, ())))
+                break
+        else:
+            stack.pop()
+            on_path.discard(path.pop())
+
+
+def cycles_through_edges(
+    edges: Sequence[E],
+    new_edges: Sequence[E],
+    max_length: int = 8,
+    max_per_edge: int = 1000,
+) -> list[list[E]]:
+    """
+    Elementary edge cycles that use at least one of `new_edges` (already part of `edges`).
+
+    A cycle through u->v is the edge itself plus a simple path v -> ... -> u of at most
+    `max_length - 1` edges, so only the neighbourhood of each new edge is searched.
+    Cycles through several new edges are returned once (deduplicated by `cycle_key`).
+    """
+    succ, parallel = successor_map(edges)
+    preds: dict[str, list[str]] = defaultdict(list)
+    for u, vs in succ.items():
+        for v in vs:
+            preds[v].append(u)
+    seen: set[str] = set()
+    out: list[list[E]] = []
+    for edge in new_edges:
+        u, v = edge.from_node, edge.to_node
+        if u == v:
+            node_paths: Iterable[list[str]] = [[v]]
+        else:
+            node_paths = _paths_between(succ, preds, v, u, max_length - 1)
+        found = 0
+        for nodes in node_paths:
+            hops = [parallel[(a, b)] for a, b in zip(nodes, nodes[1:])]
+            for combo in itertools.product(*hops):
+                cycle = [edge, *combo]
+                key = cycle_key(e.id for e in cycle)
+                if key in seen:
+                    continue
+                seen.add(key)
+                out.append(cycle)
+                found += 1
+            if found >= max_per_edge:
+                break
+    return out
+
+
+def shortest_edge_cycles(
+    edges: Sequence[E],
+    k: int,
+    max_length: int = 8,
+    scan_limit: int = 200_000,
+) -> list[list[E]]:
+    """
+    The `k` shortest elementary edge cycles, ties broken by `cycle_key`.
+
+    Iterative deepening on the length bound: stops at the first bound that yields `k`
+    cycles, so dense graphs never enumerate their (exponentially many) long cycles.
+    `scan_limit` caps the work per bound; past it the result is best-effort.
+    """
+    if k <= 0 or not edges:
+        return []
+    succ, parallel = successor_map(edges)
+    found: list[list[E]] = []
+    for bound in range(1, max(1, int(max_length)) + 1):
+        found = list(itertools.islice(_expand(iter_node_cycles(succ, max_length=bound), parallel), scan_limit))
+        if len(found) >= k or len(found) >= scan_limit:
+            break
+    found.sort(key=lambda c: (len(c), cycle_key(e.id for e in c)))
+    return found[:k]
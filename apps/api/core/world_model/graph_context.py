@@ -0,0 +1,371 @@
+"""Long-lived, versioned mechanism-graph context for the World Model.
+
+Why:
+- The planner, simulator, loop reasoner and graph stats each called
+  `load_mechanism_graph` and rebuilt node maps and incoming/outgoing edge maps per
+  request; `WorldModelCache` only kept loops and stats behind a TTL.
+
+`MechanismGraphContext` holds nodes, edges and adjacency (topology only, as the
+consumers loaded it before), once per process. Evidence spans are never bulk-loaded:
+`spans_for()` fetches them for just the edges a consumer needs (e.g. the selected loops)
+and memoizes them per edge.
+
+Mining in this process (`upsert_mechanism_edges`) stages its inserts on the session
+(`stage_mechanism_delta`); they are applied as a delta only when the outermost
+transaction commits, so a rolled-back batch never reaches the shared graph. Every change
+bumps `version`, and per-version derived artifacts (e.g. the simulator's compiled weight
+matrix) are rebuilt lazily via `derived()`.
+
+Changes made by other processes (offline mining scripts) are picked up by a watermark
+(row counts + latest created_at of nodes, edges and spans), checked at most every
+WORLD_MODEL_CONTEXT_CHECK_SECONDS; a mismatch triggers a full reload. Counts alone would
+miss a re-mine that deletes and re-inserts as many rows under new ids.
+
+Consumers must treat the maps as read-only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.core.world_model.loop_reasoner import (
+    GraphEdge,
+    GraphNode,
+    _load_edge_spans,
+    load_mechanism_graph,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def graph_context_enabled() -> bool:
+    return os.getenv("WORLD_MODEL_GRAPH_CONTEXT", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _check_interval_seconds() -> float:
+    try:
+        return float(os.getenv("WORLD_MODEL_CONTEXT_CHECK_SECONDS", "30") or 30)
+    except Exception:
+        return 30.0
+
+
+@dataclass
+class MechanismGraphContext:
+    """In-memory mechanism graph (topology) with adjacency, updated in place by deltas."""
+
+    nodes_by_id: dict[str, GraphNode] = field(default_factory=dict)
+    nodes_by_ref: dict[str, GraphNode] = field(default_factory=dict)  # ref_kind:ref_id -> node
+    edges: list[GraphEdge] = field(default_factory=list)
+    edges_by_id: dict[str, GraphEdge] = field(default_factory=dict)
+    incoming_edges: dict[str, list[GraphEdge]] = field(default_factory=dict)
+    outgoing_edges: dict[str, list[GraphEdge]] = field(default_factory=dict)
+    span_count: int = 0  # mechanism_edge_span rows this context accounts for
+    version: int = 0
+    watermark: Optional[tuple[Any, ...]] = None  # DB watermark at load time
+    rebaseline: bool = False  # in-process deltas applied since `watermark` was read
+    loaded_at: float = field(default_factory=time.monotonic)
+    checked_at: float = field(default_factory=time.monotonic)
+    _spans: dict[str, list[dict[str, Any]]] = field(default_factory=dict, repr=False)  # edge_id -> spans
+    _derived: dict[str, tuple[int, Any]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_graph(cls, nodes_by_id: dict[str, GraphNode], edges: Iterable[GraphEdge]) -> "MechanismGraphContext":
+        """Build from loaded rows; edges that already carry spans seed the span memo."""
+        ctx = cls()
+        for node in nodes_by_id.values():
+            ctx._add_node(node)
+        for edge in edges:
+            if ctx._add_edge(edge) and edge.spans:
+                ctx._spans[edge.id] = list(edge.spans)
+                ctx.span_count += len(edge.spans)
+        return ctx
+
+    @property
+    def fingerprint(self) -> tuple[int, int, int]:
+        """(nodes, edges, spans) row counts this context represents."""
+        return (len(self.nodes_by_id), len(self.edges), self.span_count)
+
+    def _add_node(self, node: GraphNode) -> bool:
+        existing = self.nodes_by_id.get(node.id)
+        if existing is not None:
+            if existing.label_ar == node.label_ar:
+                return False
+            existing.label_ar = node.label_ar
+            return True
+        self.nodes_by_id[node.id] = node
+        self.nodes_by_ref[f"{node.ref_kind}:{node.ref_id}"] = node
+        return True
+
+    def _add_edge(self, edge: GraphEdge) -> bool:
+        if edge.id in self.edges_by_id:
+            return False
+        self.edges.append(edge)
+        self.edges_by_id[edge.id] = edge
+        self.incoming_edges.setdefault(edge.to_node, []).append(edge)
+        self.outgoing_edges.setdefault(edge.from_node, []).append(edge)
+        return True
+
+    def _add_span(self, edge_id: str, span: dict[str, Any]) -> bool:
+        if edge_id not in self.edges_by_id:
+            return False
+        # Reason: spans go to the memo only; edges stay span-less so edge weights and
+        # planner output do not depend on which spans happen to be loaded.
+        memo = self._spans.get(edge_id)
+        if memo is not None:
+            key = (span.get("chunk_id"), span.get("span_start"), span.get("span_end"))
+            if any((s.get("chunk_id"), s.get("span_start"), s.get("span_end")) == key for s in memo):
+                return False
+            memo.append(span)
+        self.span_count += 1
+        return True
+
+    def apply_delta(
+        self,
+        *,
+        nodes: Iterable[GraphNode] = (),
+        edges: Iterable[GraphEdge] = (),
+        spans: Iterable[tuple[str, dict[str, Any]]] = (),
+    ) -> bool:
+        """Apply inserted nodes / edges / (edge_id, span) pairs; bumps `version` on change."""
+        changed = False
+        for node in nodes:
+            changed = self._add_node(node) or changed
+        for edge in edges:
+            if self._add_edge(edge):
+                # A new edge has exactly the spans that arrive with this delta.
+                self._spans.setdefault(edge.id, [])
+                changed = True
+        for edge_id, span in spans:
+            changed = self._add_span(edge_id, span) or changed
+        if changed:
+            self.version += 1
+            self.rebaseline = True
+        return changed
+
+    async def spans_for(self, session: AsyncSession, edge_ids: Iterable[str]) -> dict[str, list[dict[str, Any]]]:
+        """Evidence spans for `edge_ids`, loading only the edges not memoized yet."""
+        wanted = list(dict.fromkeys(edge_ids))
+        missing = [eid for eid in wanted if eid not in self._spans]
+        if missing:
+            loaded = await _load_edge_spans(session, edge_ids=missing)
+            for eid in missing:
+                self._spans.setdefault(eid, loaded.get(eid, []))
+        return {eid: self._spans.get(eid, []) for eid in wanted}
+
+    def derived(self, name: str, build: Callable[["MechanismGraphContext"], T]) -> T:
+        """Per-version memo for artifacts computed from the graph."""
+        hit = self._derived.get(name)
+        if hit is not None and hit[0] == self.version:
+            return hit[1]
+        value = build(self)
+        self._derived[name] = (self.version, value)
+        return value
+
+
+_context: Optional[MechanismGraphContext] = None
+_lock: Optional[asyncio.Lock] = None
+_stats = {"loads": 0, "reloads": 0, "deltas": 0, "discarded_deltas": 0}
+
+_PENDING_KEY = "mechanism_graph_delta"
+_LISTENING_KEY = "mechanism_graph_delta_listening"
+
+
+def reset_mechanism_graph_context() -> None:
+    """Drop the process context (tests, explicit invalidation)."""
+    global _context, _lock
+    _context = None
+    _lock = None
+
+
+def get_loaded_mechanism_graph_context() -> Optional[MechanismGraphContext]:
+    return _context
+
+
+def get_graph_context_stats() -> dict[str, Any]:
+    ctx = _context
+    out: dict[str, Any] = {"enabled": graph_context_enabled(), **_stats}
+    if ctx is not None:
+        out.update(
+            {
+                "version": ctx.version,
+                "nodes": len(ctx.nodes_by_id),
+                "edges": len(ctx.edges),
+                "spans": ctx.span_count,
+                "spans_loaded": len(ctx._spans),
+            }
+        )
+    return out
+
+
+async def load_mechanism_graph_context(
+    session: AsyncSession,
+    watermark: Optional[tuple[Any, ...]] = None,
+) -> MechanismGraphContext:
+    """Fresh topology-only context straight from the DB (spans load lazily)."""
+    nodes_by_id, edges = await load_mechanism_graph(session, include_spans=False)
+    ctx = MechanismGraphContext.from_graph(nodes_by_id, edges)
+    if watermark is not None:
+        ctx.watermark = watermark
+        ctx.span_count = int(watermark[2])
+    return ctx
+
+
+async def _db_watermark(session: AsyncSession) -> Optional[tuple[Any, ...]]:
+    """(nodes, edges, spans, latest node / edge / span created_at)."""
+    try:
+        row = (
+            await session.execute(
+                text(
+                    """
+                    SELECT
+                      (SELECT COUNT(*) FROM mechanism_node) AS nodes,
+                      (SELECT COUNT(*) FROM mechanism_edge) AS edges,
+                      (SELECT COUNT(*) FROM mechanism_edge_span) AS spans,
+                      (SELECT MAX(created_at) FROM mechanism_node) AS nodes_at,
+                      (SELECT MAX(created_at) FROM mechanism_edge) AS edges_at,
+                      (SELECT MAX(created_at) FROM mechanism_edge_span) AS spans_at
+                    """
+                )
+            )
+        ).fetchone()
+    except Exception:
+        try:
+            await session.rollback()
+        except Exception:
+            pass
+        return None
+    if row is None:
+        return None
+    return (
+        int(row.nodes or 0),
+        int(row.edges or 0),
+        int(row.spans or 0),
+        row.nodes_at,
+        row.edges_at,
+        row.spans_at,
+    )
+
+
+async def get_mechanism_graph_context(session: AsyncSession) -> MechanismGraphContext:
+    """
+    Shared process context; loads on first use and reloads when the DB drifted.
+
+    With WORLD_MODEL_GRAPH_CONTEXT=false every call loads a private context.
+    """
+    global _context, _lock
+    if not graph_context_enabled():
+        return await load_mechanism_graph_context(session)
+
+    ctx = _context
+    if ctx is not None and (time.monotonic() - ctx.checked_at) < _check_interval_seconds():
+        return ctx
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        ctx = _context
+        if ctx is not None and (time.monotonic() - ctx.checked_at) < _check_interval_seconds():
+            return ctx
+        watermark = await _db_watermark(session)
+        if ctx is not None:
+            # Reason: keep serving the current graph if the check itself fails.
+            if watermark is None or watermark == ctx.watermark:
+                ctx.checked_at = time.monotonic()
+                return ctx
+            # Own committed deltas moved the watermark: adopt it if the counts agree.
+            if ctx.rebaseline and tuple(watermark[:3]) == ctx.fingerprint:
+                ctx.watermark, ctx.rebaseline = watermark, False
+                ctx.checked_at = time.monotonic()
+                return ctx
+            logger.info("Mechanism graph drifted (%s -> %s); reloading", ctx.watermark, watermark)
+            _stats["reloads"] += 1
+        fresh = await load_mechanism_graph_context(session, watermark)
+        if ctx is not None:
+            fresh.version = ctx.version + 1
+        _stats["loads"] += 1
+        _context = fresh
+        return fresh
+
+
+def apply_mechanism_delta(
+    *,
+    nodes: Iterable[GraphNode] = (),
+    edges: Iterable[GraphEdge] = (),
+    spans: Iterable[tuple[str, dict[str, Any]]] = (),
+) -> bool:
+    """Apply in-process graph inserts to the shared context (no-op if none is loaded)."""
+    ctx = _context
+    if ctx is None:
+        return False
+    changed = ctx.apply_delta(nodes=nodes, edges=edges, spans=spans)
+    if changed:
+        _stats["deltas"] += 1
+    return changed
+
+
+def stage_mechanism_delta(
+    session: Any,
+    *,
+    nodes: Iterable[GraphNode] = (),
+    edges: Iterable[GraphEdge] = (),
+    spans: Iterable[tuple[str, dict[str, Any]]] = (),
+    on_applied: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    Apply in-process inserts to the shared context once `session` commits.
+
+    The delta waits for the outermost COMMIT (savepoint releases do not count) and is
+    dropped on ROLLBACK. Sessions without transaction events apply it immediately.
+    `on_applied` runs after every committed non-empty delta, loaded context or not.
+    """
+    pending_delta = (list(nodes), list(edges), list(spans), on_applied)
+    sync_session = getattr(session, "sync_session", None)
+    if sync_session is None:
+        _apply_staged([pending_delta])
+        return
+    sync_session.info.setdefault(_PENDING_KEY, []).append(pending_delta)
+    if not sync_session.info.get(_LISTENING_KEY):
+        event.listen(sync_session, "after_commit", _on_commit)
+        event.listen(sync_session, "after_soft_rollback", _on_rollback)
+        sync_session.info[_LISTENING_KEY] = True
+
+
+def _apply_staged(pending: list[tuple[list, list, list, Optional[Callable[[], None]]]]) -> None:
+    for nodes, edges, spans, on_applied in pending:
+        try:
+            apply_mechanism_delta(nodes=nodes, edges=edges, spans=spans)
+        except Exception as e:
+            # Reason: the rows are committed; a skipped delta is caught by the next watermark check.
+            logger.warning("Applying mechanism graph delta failed: %s", e)
+        # Reason: the rows are committed either way; caches keyed on them are stale.
+        if on_applied is not None and (nodes or edges or spans):
+            try:
+                on_applied()
+            except Exception as e:
+                logger.warning("Mechanism graph delta callback failed: %s", e)
+
+
+def _on_commit(sync_session: Any) -> None:
+    if sync_session.in_nested_transaction():
+        return
+    pending = sync_session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _apply_staged(pending)
+
+
+def _on_rollback(sync_session: Any, previous_transaction: Any) -> None:
+    if previous_transaction.parent is not None:
+        return
+    pending = sync_session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _stats["discarded_deltas"] += len(pending)
@@ -12,11 +12,13 @@ Algorithm:
 3. For each step, require evidence citation
 4. Check for INHIBITS/TENSION edges that indicate risk
 5. Leading indicators: only include if explicitly defined in framework
+
+Leverage points and risk sets come from the per-graph-version LeverageIndex
+(leverage_index.py); `compute_intervention_plans_batch` plans many goals against it.
 """
 
 from __future__ import annotations
 
-from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -33,8 +35,10 @@ from apps.api.core.world_model.loop_reasoner import (
     DetectedLoop,
     GraphEdge,
     GraphNode,
-    load_mechanism_graph,
+    retrieve_relevant_loops,
 )
+from apps.api.core.world_model.graph_context import MechanismGraphContext, get_mechanism_graph_context
+from apps.api.core.world_model.leverage_index import LeverageIndex, get_leverage_index_async
 
 
 @dataclass
@@ -48,7 +52,10 @@ class PlannerContext:
 
 
 async def build_planner_context(session: AsyncSession) -> PlannerContext:
-    """Build context for intervention planning from database.
+    """Build context for intervention planning.
+    
+    Views the shared MechanismGraphContext (loaded once per process), so node/ref maps
+    and incoming/outgoing edge maps are not rebuilt per request.
     
     Args:
         session: Database session
@@ -56,28 +63,16 @@ async def build_planner_context(session: AsyncSession) -> PlannerContext:
     Returns:
         PlannerContext with loaded graph data
     """
-    nodes_by_id, edges = await load_mechanism_graph(session)
-    
-    # Build ref -> node mapping
-    nodes_by_ref: dict[str, GraphNode] = {}
-    for node in nodes_by_id.values():
-        ref_key = f"{node.ref_kind}:{node.ref_id}"
-        nodes_by_ref[ref_key] = node
-    
-    # Build incoming/outgoing edge maps
-    incoming: dict[str, list[GraphEdge]] = defaultdict(list)
-    outgoing: dict[str, list[GraphEdge]] = defaultdict(list)
-    
-    for edge in edges:
-        incoming[edge.to_node].append(edge)
-        outgoing[edge.from_node].append(edge)
-    
+    return _planner_view(await get_mechanism_graph_context(session))
+
+
+def _planner_view(graph: MechanismGraphContext) -> PlannerContext:
     return PlannerContext(
-        nodes_by_id=nodes_by_id,
-        nodes_by_ref=nodes_by_ref,
-        edges=edges,
-        incoming_edges=dict(incoming),
-        outgoing_edges=dict(outgoing),
+        nodes_by_id=graph.nodes_by_id,
+        nodes_by_ref=graph.nodes_by_ref,
+        edges=graph.edges,
+        incoming_edges=graph.incoming_edges,
+        outgoing_edges=graph.outgoing_edges,
     )
 
 
@@ -117,101 +112,6 @@ def _find_node_for_goal(
     return None
 
 
-def _trace_backward_for_leverage(
-    ctx: PlannerContext,
-    goal_node: GraphNode,
-    max_depth: int = 4,
-) -> list[tuple[GraphNode, GraphEdge, int]]:
-    """Trace backward through edges to find leverage points.
-    
-    Returns nodes that can influence the goal, with their connecting edge
-    and distance from goal.
-    
-    Args:
-        ctx: Planner context
-        goal_node: The goal node to trace from
-        max_depth: Maximum backward trace depth
-        
-    Returns:
-        List of (node, edge, depth) tuples
-    """
-    results: list[tuple[GraphNode, GraphEdge, int]] = []
-    visited: set[str] = {goal_node.id}
-    
-    current_level = [goal_node.id]
-    
-    for depth in range(1, max_depth + 1):
-        next_level: list[str] = []
-        
-        for node_id in current_level:
-            # Get incoming edges (edges that point TO this node)
-            incoming = ctx.incoming_edges.get(node_id, [])
-            
-            for edge in incoming:
-                from_node = ctx.nodes_by_id.get(edge.from_node)
-                if not from_node:
-                    continue
-                
-                if from_node.id in visited:
-                    continue
-                
-                visited.add(from_node.id)
-                results.append((from_node, edge, depth))
-                next_level.append(from_node.id)
-        
-        current_level = next_level
-        if not current_level:
-            break
-    
-    return results
-
-
-def _find_risks(
-    ctx: PlannerContext,
-    target_nodes: list[GraphNode],
-) -> list[dict[str, Any]]:
-    """Find risks from INHIBITS/TENSION_WITH edges.
-    
-    Args:
-        ctx: Planner context
-        target_nodes: Nodes being targeted in the intervention
-        
-    Returns:
-        List of risk dictionaries
-    """
-    risks: list[dict[str, Any]] = []
-    target_ids = {n.id for n in target_nodes}
-    
-    for edge in ctx.edges:
-        # Only consider negative polarity edges
-        if edge.polarity >= 0:
-            continue
-        
-        if edge.relation_type not in ("INHIBITS", "TENSION_WITH"):
-            continue
-        
-        # Check if edge involves any target node
-        if edge.from_node in target_ids or edge.to_node in target_ids:
-            from_node = ctx.nodes_by_id.get(edge.from_node)
-            to_node = ctx.nodes_by_id.get(edge.to_node)
-            
-            if from_node and to_node:
-                # Extract pillar from affected node
-                affected_pillar = ""
-                if to_node.ref_kind == "pillar":
-                    affected_pillar = to_node.ref_id
-                elif from_node.ref_kind == "pillar":
-                    affected_pillar = from_node.ref_id
-                
-                risks.append({
-                    "risk_ar": f"{edge.relation_type}: {from_node.label_ar} → {to_node.label_ar}",
-                    "affected_pillar": affected_pillar,
-                    "evidence": edge.spans[:2] if edge.spans else [],
-                })
-    
-    return risks
-
-
 def _get_downstream_impacts(
     ctx: PlannerContext,
     node: GraphNode,
@@ -311,12 +211,23 @@ async def compute_intervention_plan(
     Returns:
         InterventionPlan with evidence-bound steps
     """
-    # Build context
-    ctx = await build_planner_context(session)
-    
-    # Find goal node
+    graph = await get_mechanism_graph_context(session)
+    index = await get_leverage_index_async(graph)
+    # Reason: after the await so the view and the index see the same graph version.
+    ctx = _planner_view(graph)
     goal_node = _find_node_for_goal(ctx, goal_ar, detected_entities)
-    
+    return _plan_for_goal(ctx, index, goal_ar, goal_node, loops, max_steps)
+
+
+def _plan_for_goal(
+    ctx: PlannerContext,
+    index: LeverageIndex,
+    goal_ar: str,
+    goal_node: GraphNode | None,
+    loops: list[DetectedLoop],
+    max_steps: int,
+) -> InterventionPlan:
+    """Plan for one resolved goal using the precomputed leverage/risk index."""
     if not goal_node:
         # Cannot find goal in framework - return minimal plan
         return InterventionPlan(
@@ -329,8 +240,8 @@ async def compute_intervention_plan(
             risk_of_imbalance=[],
         )
     
-    # Trace backward for leverage points
-    leverage_points = _trace_backward_for_leverage(ctx, goal_node, max_depth=4)
+    # Leverage points: precomputed backward BFS (copy; the index is shared)
+    leverage_points = list(index.upstream(goal_node.id).leverage)
     
     # Build intervention steps
     steps: list[InterventionStep] = []
@@ -408,8 +319,8 @@ async def compute_intervention_plan(
     # Get leading indicators
     leading_indicators = _extract_leading_indicators(ctx, goal_node)
     
-    # Find risks
-    risks = _find_risks(ctx, target_nodes)
+    # Risks: INHIBITS/TENSION_WITH edges touching any target (indexed per node)
+    risks = index.risks_for({n.id for n in target_nodes})
     
     return InterventionPlan(
         goal_ar=goal_ar,
@@ -419,6 +330,67 @@ async def compute_intervention_plan(
     )
 
 
+@dataclass
+class InterventionGoal:
+    """One goal of a batch: a framework node ref, or free Arabic goal text."""
+    goal_ar: str = ""
+    ref_kind: str = ""
+    ref_id: str = ""
+
+
+@dataclass
+class GoalPlan:
+    """Batch planning result for one goal."""
+    goal: InterventionGoal
+    goal_node: GraphNode | None
+    plan: InterventionPlan
+    leverage: list[dict[str, Any]] = field(default_factory=list)
+
+
+async def compute_intervention_plans_batch(
+    session: AsyncSession,
+    goals: list[InterventionGoal],
+    *,
+    loops: list[DetectedLoop] | None = None,
+    max_steps: int = 7,
+    top_leverage: int = 5,
+) -> tuple[int, list[GoalPlan]]:
+    """Plan interventions for many goals against one graph version.
+    
+    The graph context and leverage index are fetched once; each goal then costs only
+    index lookups (no edge scans).
+    
+    Args:
+        session: Database session
+        goals: Goals to plan (ref goals resolve directly; text goals match labels)
+        loops: Candidate loops (e.g. persisted loops); the relevant ones are picked per goal
+        max_steps: Maximum intervention steps per plan
+        top_leverage: Number of ranked leverage points reported per goal
+        
+    Returns:
+        (graph version, one GoalPlan per goal in input order)
+    """
+    graph = await get_mechanism_graph_context(session)
+    index = await get_leverage_index_async(graph)
+    # Reason: after the await so the view and the index see the same graph version.
+    ctx = _planner_view(graph)
+    out: list[GoalPlan] = []
+    for goal in goals:
+        entities: list[dict[str, Any]] = []
+        goal_node: GraphNode | None = None
+        if goal.ref_kind and goal.ref_id:
+            entities = [{"entity_type": goal.ref_kind, "entity_id": goal.ref_id}]
+            goal_node = ctx.nodes_by_ref.get(f"{goal.ref_kind}:{goal.ref_id}")
+        elif goal.goal_ar.strip():
+            goal_node = _find_node_for_goal(ctx, goal.goal_ar, [])
+        goal_ar = goal.goal_ar or (goal_node.label_ar if goal_node else f"{goal.ref_kind}:{goal.ref_id}")
+        relevant = retrieve_relevant_loops(loops, entities, [], top_k=5) if loops else []
+        plan = _plan_for_goal(ctx, index, goal_ar, goal_node, relevant, max_steps)
+        leverage = index.top_leverage(goal_node.id, top_leverage) if goal_node else []
+        out.append(GoalPlan(goal=goal, goal_node=goal_node, plan=plan, leverage=leverage))
+    return index.version, out
+
+
 def validate_intervention_plan(plan: InterventionPlan) -> list[str]:
     """Validate an intervention plan for safety and completeness.
     
@@ -0,0 +1,248 @@
+"""Leverage / risk index for intervention planning.
+
+Why:
+- `compute_intervention_plan` walked incoming edges backward, scanned every edge for
+  INHIBITS/TENSION_WITH risks and collected downstream impacts per goal, one goal at a
+  time; planning many goals (e.g. all sub-values of a pillar) repeated all of it.
+
+`LeverageIndex` is derived once per MechanismGraphContext version
+(`get_leverage_index`):
+- risk sets: negative INHIBITS/TENSION_WITH edges touching each node (edge order kept,
+  so plans are identical to the full scan)
+- upstream leverage: the backward BFS (node, via edge, depth) per goal, as the planner
+  uses it, plus a k-hop signed leverage score per upstream node:
+  sum over walks u -> ... -> goal of length d <= k of prod(polarity * confidence) * decay^(d-1)
+
+On graphs up to EAGER_MAX_NODES (the framework graph) the scores for all goals come from
+one dense NumPy pass, S = sum_d decay^(d-1) * W^d; larger graphs compute each goal's
+scores by sparse backward propagation on first use. Per-goal entries are kept for the
+version either way.
+
+Request handlers use `get_leverage_index_async`: the index is rebuilt after every mining
+delta, so the dense matmuls run in a worker thread instead of on the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from apps.api.core.world_model.graph_context import MechanismGraphContext
+from apps.api.core.world_model.loop_reasoner import GraphEdge, GraphNode
+from apps.api.core.world_model.simulator import DAMPING_FACTOR
+
+RISK_RELATIONS = ("INHIBITS", "TENSION_WITH")
+
+# Graphs up to this many nodes get the dense all-goals score matrix (a few hundred nodes:
+# the framework graph; cost grows with n^3 per hop).
+EAGER_MAX_NODES = 500
+
+# Dense passes tried by `get_leverage_index_async` before settling for sparse scores.
+_DENSE_ATTEMPTS = 3
+
+
+def trace_upstream(
+    incoming_edges: dict[str, list[GraphEdge]],
+    nodes_by_id: dict[str, GraphNode],
+    goal_id: str,
+    max_depth: int,
+) -> list[tuple[GraphNode, GraphEdge, int]]:
+    """Backward BFS from `goal_id`: each upstream node once, with its first edge and depth."""
+    results: list[tuple[GraphNode, GraphEdge, int]] = []
+    visited: set[str] = {goal_id}
+    current_level = [goal_id]
+    for depth in range(1, max_depth + 1):
+        next_level: list[str] = []
+        for node_id in current_level:
+            for edge in incoming_edges.get(node_id, []):
+                from_node = nodes_by_id.get(edge.from_node)
+                if not from_node or from_node.id in visited:
+                    continue
+                visited.add(from_node.id)
+                results.append((from_node, edge, depth))
+                next_level.append(from_node.id)
+        current_level = next_level
+        if not current_level:
+            break
+    return results
+
+
+def _leverage_scores(
+    incoming_edges: dict[str, list[GraphEdge]],
+    nodes_by_id: dict[str, GraphNode],
+    goal_id: str,
+    max_depth: int,
+    decay: float,
+) -> dict[str, float]:
+    """Signed k-hop walk sums into `goal_id` (backward sparse propagation)."""
+    scores: dict[str, float] = defaultdict(float)
+    frontier: dict[str, float] = {goal_id: 1.0}
+    for depth in range(1, max_depth + 1):
+        nxt: dict[str, float] = defaultdict(float)
+        for node_id, value in frontier.items():
+            for edge in incoming_edges.get(node_id, []):
+                if edge.from_node in nodes_by_id:
+                    nxt[edge.from_node] += value * edge.polarity * edge.confidence
+        weight = decay ** (depth - 1)
+        for node_id, value in nxt.items():
+            if node_id != goal_id:
+                scores[node_id] += weight * value
+        frontier = nxt
+        if not frontier:
+            break
+    return {k: round(v, 6) for k, v in scores.items()}
+
+
+def _weight_matrix(graph: MechanismGraphContext, index: dict[str, int]) -> np.ndarray:
+    """Dense W[u, v] = sum of polarity * confidence over edges u -> v."""
+    n = len(index)
+    weights = np.zeros((n, n), dtype=np.float64)
+    for edge in graph.edges:
+        u, v = index.get(edge.from_node), index.get(edge.to_node)
+        if u is not None and v is not None:
+            weights[u, v] += edge.polarity * edge.confidence
+    return weights
+
+
+def _walk_scores(weights: np.ndarray, max_depth: int, decay: float) -> np.ndarray:
+    """Dense S[u, g]: the `_leverage_scores` of u for every goal g at once."""
+    n = weights.shape[0]
+    scores = np.zeros((n, n), dtype=np.float64)
+    walks = np.eye(n)
+    for depth in range(1, max_depth + 1):
+        walks = weights @ walks
+        scores += decay ** (depth - 1) * walks
+    np.fill_diagonal(scores, 0.0)
+    return scores
+
+
+@dataclass
+class UpstreamEntry:
+    """Precomputed backward view of one goal node."""
+
+    leverage: list[tuple[GraphNode, GraphEdge, int]]
+    scores: dict[str, float]
+
+
+@dataclass
+class LeverageIndex:
+    """Per-version planning index over a MechanismGraphContext."""
+
+    graph: MechanismGraphContext
+    max_depth: int
+    version: int = 0  # graph version the index was built for
+    decay: float = DAMPING_FACTOR
+    risk_positions: dict[str, list[int]] = field(default_factory=dict)  # node -> edge positions
+    scores: Optional[np.ndarray] = field(default=None, repr=False)  # dense S[u, goal], eager mode
+    positions: dict[str, int] = field(default_factory=dict, repr=False)  # node -> row/column of `scores`
+    _upstream: dict[str, UpstreamEntry] = field(default_factory=dict, repr=False)
+
+    def upstream(self, goal_id: str) -> UpstreamEntry:
+        entry = self._upstream.get(goal_id)
+        if entry is None:
+            g = self.graph
+            leverage = trace_upstream(g.incoming_edges, g.nodes_by_id, goal_id, self.max_depth)
+            # Reason: a node added after the dense pass has no row; score it sparsely.
+            dense = self.scores is not None and goal_id in self.positions and all(
+                node.id in self.positions for node, _, _ in leverage
+            )
+            if dense:
+                rows = [self.positions[node.id] for node, _, _ in leverage]
+                column = np.round(self.scores[rows, self.positions[goal_id]], 6).tolist()
+                scores = {node.id: value for (node, _, _), value in zip(leverage, column)}
+            else:
+                scores = _leverage_scores(g.incoming_edges, g.nodes_by_id, goal_id, self.max_depth, self.decay)
+            entry = UpstreamEntry(leverage=leverage, scores=scores)
+            self._upstream[goal_id] = entry
+        return entry
+
+    def top_leverage(self, goal_id: str, k: int = 5) -> list[dict[str, Any]]:
+        """Upstream nodes ranked by |score| (ties: depth, ref)."""
+        entry = self.upstream(goal_id)
+        ranked = heapq.nsmallest(
+            max(0, k),
+            entry.leverage,
+            key=lambda item: (-abs(entry.scores.get(item[0].id, 0.0)), item[2], item[0].ref_kind, item[0].ref_id),
+        )
+        return [
+            {
+                "ref_kind": node.ref_kind,
+                "ref_id": node.ref_id,
+                "label_ar": node.label_ar,
+                "depth": depth,
+                "score": entry.scores.get(node.id, 0.0),
+            }
+            for node, _, depth in ranked
+        ]
+
+    def risks_for(self, target_ids: set[str]) -> list[dict[str, Any]]:
+        """Risk dicts for edges touching any target, in graph edge order."""
+        positions = sorted({p for node_id in target_ids for p in self.risk_positions.get(node_id, ())})
+        risks: list[dict[str, Any]] = []
+        for p in positions:
+            edge = self.graph.edges[p]
+            from_node = self.graph.nodes_by_id[edge.from_node]
+            to_node = self.graph.nodes_by_id[edge.to_node]
+            affected_pillar = ""
+            if to_node.ref_kind == "pillar":
+                affected_pillar = to_node.ref_id
+            elif from_node.ref_kind == "pillar":
+                affected_pillar = from_node.ref_id
+            risks.append({
+                "risk_ar": f"{edge.relation_type}: {from_node.label_ar} → {to_node.label_ar}",
+                "affected_pillar": affected_pillar,
+                "evidence": edge.spans[:2] if edge.spans else [],
+            })
+        return risks
+
+
+def build_leverage_index(
+    graph: MechanismGraphContext,
+    max_depth: int = 4,
+    eager: Optional[bool] = None,
+) -> LeverageIndex:
+    index = LeverageIndex(graph=graph, max_depth=max_depth, version=graph.version)
+    risk_positions: dict[str, list[int]] = defaultdict(list)
+    for position, edge in enumerate(graph.edges):
+        if edge.polarity >= 0 or edge.relation_type not in RISK_RELATIONS:
+            continue
+        if edge.from_node not in graph.nodes_by_id or edge.to_node not in graph.nodes_by_id:
+            continue
+        for node_id in {edge.from_node, edge.to_node}:
+            risk_positions[node_id].append(position)
+    index.risk_positions = dict(risk_positions)
+    if eager if eager is not None else len(graph.nodes_by_id) <= EAGER_MAX_NODES:
+        index.positions = {nid: i for i, nid in enumerate(graph.nodes_by_id)}
+        index.scores = _walk_scores(_weight_matrix(graph, index.positions), max_depth, index.decay)
+    return index
+
+
+def get_leverage_index(graph: MechanismGraphContext, max_depth: int = 4) -> LeverageIndex:
+    """Leverage index for the graph's current version (built once per version)."""
+    return graph.derived(f"leverage_index:{max_depth}", lambda g: build_leverage_index(g, max_depth))
+
+
+async def get_leverage_index_async(graph: MechanismGraphContext, max_depth: int = 4) -> LeverageIndex:
+    """`get_leverage_index` for the event loop: the dense score pass runs in a worker thread."""
+    name = f"leverage_index:{max_depth}"
+    for _ in range(_DENSE_ATTEMPTS):
+        index = graph.derived(name, lambda g: build_leverage_index(g, max_depth, eager=False))
+        if index.scores is not None or len(graph.nodes_by_id) > EAGER_MAX_NODES:
+            return index
+        # Reason: snapshot W on the loop; deltas mutate the graph between awaits.
+        positions = {nid: i for i, nid in enumerate(graph.nodes_by_id)}
+        weights = _weight_matrix(graph, positions)
+        scores = await asyncio.to_thread(_walk_scores, weights, max_depth, index.decay)
+        if graph.version != index.version:
+            # A delta landed during the pass: the scores belong to an older graph.
+            continue
+        if index.scores is None:
+            index.positions, index.scores = positions, scores
+        return index
+    # Graph keeps changing under the pass: serve the (sparse) index of the current version.
+    return graph.derived(name, lambda g: build_leverage_index(g, max_depth, eager=False))
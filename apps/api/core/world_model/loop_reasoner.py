@@ -1,19 +1,21 @@
 """Causal loop detection and reasoning for World Model.
 
 This module provides:
-- Deterministic graph cycle detection using DFS
+- Deterministic elementary-cycle detection (SCC + Johnson, see cycle_engine.py)
 - Loop classification (reinforcing/balancing) via polarity product
 - Relevance ranking based on entity/pillar overlap
+- Incremental loop indexing for newly inserted edges (feedback_loop)
 - On-the-fly summary generation from edge spans
 
 Key algorithms:
-- DFS-based cycle detection (Johnson's algorithm simplified)
+- Johnson / Gupta–Suzumura bounded cycle enumeration over SCCs (streaming)
 - Polarity product: +1 = reinforcing, -1 = balancing
 - Relevance score = (matched_nodes / total_nodes) * evidence_density
 """
 
 from __future__ import annotations
 
+import itertools
 from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any
@@ -22,6 +24,12 @@ from uuid import uuid4
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.core.world_model.cycle_engine import (
+    cycle_key,
+    cycles_through_edges,
+    iter_edge_cycles,
+    shortest_edge_cycles,
+)
 from apps.api.core.world_model.schemas import (
     DetectedLoop,
     compute_loop_type,
@@ -73,7 +81,7 @@ async def _load_edge_spans(
                 span_end,
                 quote
             FROM mechanism_edge_span
-            WHERE edge_id::text = ANY(:edge_ids)
+            WHERE edge_id = ANY(CAST(:edge_ids AS uuid[]))
             ORDER BY edge_id, chunk_id, span_start
             """
         ),
@@ -179,12 +187,10 @@ def _find_cycles_dfs(
     max_cycles: int = 50,
     max_cycle_length: int = 8,
 ) -> list[list[GraphEdge]]:
-    """Find cycles in graph using DFS.
+    """Find up to `max_cycles` elementary cycles (each exactly once).
     
-    Uses a simplified version of cycle detection:
-    1. For each node, do DFS looking for back edges
-    2. When we find a cycle, record the edge path
-    3. Stop after max_cycles found
+    Kept for callers holding an adjacency list; enumeration is done by
+    `cycle_engine.iter_edge_cycles` (SCC decomposition + Johnson-style search).
     
     Args:
         adj: Adjacency list
@@ -194,68 +200,19 @@ def _find_cycles_dfs(
     Returns:
         List of cycles, each cycle is a list of edges
     """
-    cycles: list[list[GraphEdge]] = []
-    all_nodes = list(adj.keys())
-    
-    # Add nodes that only appear as targets
-    for neighbors in adj.values():
-        for neighbor_id, _ in neighbors:
-            if neighbor_id not in all_nodes:
-                all_nodes.append(neighbor_id)
-    
-    # For each starting node, try to find cycles
-    for start in sorted(all_nodes):  # Sorted for determinism
-        if len(cycles) >= max_cycles:
-            break
-        
-        # DFS with path tracking
-        stack: list[tuple[str, list[GraphEdge]]] = [(start, [])]
-        visited_in_path: set[str] = set()
-        
-        while stack and len(cycles) < max_cycles:
-            current, path = stack.pop()
-            
-            if len(path) > max_cycle_length:
-                continue
-            
-            # Check if we've completed a cycle back to start
-            if current == start and path:
-                # Found a cycle! Make sure it's not a duplicate
-                edge_ids = tuple(sorted(e.id for e in path))
-                existing_ids = [tuple(sorted(e.id for e in c)) for c in cycles]
-                if edge_ids not in existing_ids:
-                    cycles.append(list(path))
-                continue
-            
-            # Don't revisit nodes in current path (except for closing the cycle)
-            if current in visited_in_path and current != start:
-                continue
-            
-            visited_in_path.add(current)
-            
-            # Explore neighbors
-            for neighbor_id, edge in adj.get(current, []):
-                new_path = path + [edge]
-                
-                # If neighbor is start and we have a path, we might have a cycle
-                if neighbor_id == start and new_path:
-                    edge_ids = tuple(sorted(e.id for e in new_path))
-                    existing_ids = [tuple(sorted(e.id for e in c)) for c in cycles]
-                    if edge_ids not in existing_ids:
-                        cycles.append(list(new_path))
-                elif neighbor_id not in visited_in_path:
-                    stack.append((neighbor_id, new_path))
-            
-            visited_in_path.discard(current)
-    
-    return cycles
+    edges = [edge for neighbors in adj.values() for _, edge in neighbors]
+    return list(itertools.islice(iter_edge_cycles(edges, max_length=max_cycle_length), max_cycles))
 
 
 def _cycle_to_detected_loop(
     cycle_edges: list[GraphEdge],
     nodes_by_id: dict[str, GraphNode],
+    spans_by_edge: dict[str, list[dict[str, Any]]] | None = None,
 ) -> DetectedLoop:
-    """Convert a cycle (list of edges) to a DetectedLoop."""
+    """Convert a cycle (list of edges) to a DetectedLoop.
+    
+    Evidence comes from `spans_by_edge` when given, else from the edges' own spans.
+    """
     
     # Extract ordered nodes
     node_ids: list[str] = []
@@ -281,7 +238,8 @@ def _cycle_to_detected_loop(
     # Collect all evidence spans
     evidence_spans: list[dict[str, Any]] = []
     for edge in cycle_edges:
-        for span in edge.spans[:2]:  # Limit spans per edge
+        spans = spans_by_edge.get(edge.id, []) if spans_by_edge is not None else edge.spans
+        for span in spans[:2]:  # Limit spans per edge
             evidence_spans.append(span)
     
     return DetectedLoop(
@@ -298,50 +256,51 @@ def _cycle_to_detected_loop(
 async def detect_loops(
     session: AsyncSession,
     max_loops: int = 20,
+    max_cycle_length: int = 8,
 ) -> list[DetectedLoop]:
     """Detect causal loops in mechanism graph.
     
     Algorithm:
-    1. Build adjacency list from mechanism_edge
-    2. DFS-based cycle detection
+    1. Take the mechanism graph from the shared MechanismGraphContext
+    2. Shortest elementary cycles (SCC + bounded Johnson, iterative deepening on length)
     3. For each cycle, compute polarity product
-    4. Fetch evidence spans for all edges in cycle
+    4. Fetch evidence spans for the edges in selected cycles only (memoized per edge)
     5. Return sorted by cycle length (shorter = more actionable)
     
     Args:
         session: Database session
         max_loops: Maximum number of loops to return
+        max_cycle_length: Longest cycle (in edges) considered
         
     Returns:
         List of detected loops, sorted by length
     """
-    # Load graph topology only (no spans) for performance.
-    nodes_by_id, edges = await load_mechanism_graph(session, include_spans=False)
+    # Shared graph context (topology only, loaded once per process).
+    from apps.api.core.world_model.graph_context import get_mechanism_graph_context
+
+    graph_ctx = await get_mechanism_graph_context(session)
+    nodes_by_id, edges = graph_ctx.nodes_by_id, graph_ctx.edges
     
     if not edges:
         return []
     
-    # Build adjacency list
-    adj = _build_adjacency_list(edges)
-    
-    # Find cycles
-    cycles = _find_cycles_dfs(adj, max_cycles=max_loops * 2, max_cycle_length=8)
-    
-    # Fetch evidence spans only for edges that appear in selected cycles.
-    selected_cycles = cycles[:max_loops]
-    needed_edge_ids = sorted({e.id for cyc in selected_cycles for e in cyc})
-    spans_by_edge = await _load_edge_spans(session, edge_ids=needed_edge_ids)
+    # Shortest cycles first; deterministic (length, canonical key) order.
+    # Memoized per graph version.
+    selected_cycles = graph_ctx.derived(
+        f"shortest_cycles:{max_loops}:{max_cycle_length}",
+        lambda c: shortest_edge_cycles(c.edges, k=max_loops, max_length=max_cycle_length),
+    )
 
-    # Attach spans for relevant edges (others remain empty).
-    for edge in edges:
-        if edge.id in spans_by_edge:
-            edge.spans = spans_by_edge.get(edge.id, [])
+    # Reason: loading spans for *all* edges is expensive; fetch only the edges that
+    # appear in the selected cycles (the context memoizes them per edge).
+    needed_edge_ids = sorted({e.id for cyc in selected_cycles for e in cyc})
+    spans_by_edge = await graph_ctx.spans_for(session, needed_edge_ids)
 
     # Convert to DetectedLoop objects
     loops: list[DetectedLoop] = []
     for cycle_edges in selected_cycles:
         try:
-            loop = _cycle_to_detected_loop(cycle_edges, nodes_by_id)
+            loop = _cycle_to_detected_loop(cycle_edges, nodes_by_id, spans_by_edge)
             loops.append(loop)
         except Exception:
             continue
@@ -448,7 +407,10 @@ async def persist_detected_loops(
     session: AsyncSession,
     loops: list[DetectedLoop],
 ) -> int:
-    """Persist detected loops to database.
+    """Persist detected loops to database in one bulk upsert.
+    
+    Loops are keyed by `cycle_key` (feedback_loop.loop_key), so re-persisting an
+    already known cycle is a no-op.
     
     Args:
         session: Database session
@@ -457,30 +419,70 @@ async def persist_detected_loops(
     Returns:
         Number of loops inserted
     """
-    inserted = 0
-    
+    by_key: dict[str, DetectedLoop] = {}
     for loop in loops:
-        if not loop.edge_ids:
-            continue
-        
-        try:
-            await session.execute(
-                text("""
-                    INSERT INTO feedback_loop (loop_id, edge_ids, loop_type)
-                    VALUES (CAST(:loop_id AS uuid), CAST(:edge_ids AS uuid[]), :loop_type)
-                    ON CONFLICT DO NOTHING
-                """),
-                {
-                    "loop_id": loop.loop_id,
-                    "edge_ids": list(loop.edge_ids),
-                    "loop_type": loop.loop_type,
-                }
-            )
-            inserted += 1
-        except Exception:
-            continue
+        if loop.edge_ids:
+            by_key.setdefault(cycle_key(loop.edge_ids), loop)
+    if not by_key:
+        return 0
     
-    return inserted
+    result = await session.execute(
+        text("""
+            INSERT INTO feedback_loop (loop_id, edge_ids, loop_type, loop_key)
+            SELECT
+                CAST(t.loop_id AS uuid),
+                CAST(string_to_array(t.edge_ids, ',') AS uuid[]),
+                t.loop_type,
+                t.loop_key
+            FROM unnest(
+                CAST(:loop_ids AS text[]),
+                CAST(:edge_ids AS text[]),
+                CAST(:loop_types AS text[]),
+                CAST(:loop_keys AS text[])
+            ) AS t(loop_id, edge_ids, loop_type, loop_key)
+            ON CONFLICT DO NOTHING
+            RETURNING loop_id
+        """),
+        {
+            "loop_ids": [loop.loop_id for loop in by_key.values()],
+            "edge_ids": [",".join(loop.edge_ids) for loop in by_key.values()],
+            "loop_types": [loop.loop_type for loop in by_key.values()],
+            "loop_keys": list(by_key),
+        },
+    )
+    return len(result.fetchall())
+
+
+async def index_loops_for_new_edges(
+    session: AsyncSession,
+    new_edges: list[GraphEdge],
+    *,
+    nodes_by_id: dict[str, GraphNode] | None = None,
+    edges: list[GraphEdge] | None = None,
+    max_cycle_length: int = 8,
+) -> int:
+    """Incrementally persist the loops closed by newly inserted edges.
+    
+    Only cycles through the new edges are enumerated (paths v -> ... -> u for each new
+    u -> v), classified by polarity product and bulk-upserted into feedback_loop.
+    
+    Args:
+        session: Database session (the same transaction that inserted the edges)
+        new_edges: Newly inserted edges
+        nodes_by_id / edges: Current graph including `new_edges`; loaded (topology
+            only) when omitted
+        max_cycle_length: Longest cycle (in edges) indexed
+        
+    Returns:
+        Number of loops inserted
+    """
+    if not new_edges:
+        return 0
+    if nodes_by_id is None or edges is None:
+        nodes_by_id, edges = await load_mechanism_graph(session, include_spans=False)
+    cycles = cycles_through_edges(edges, new_edges, max_length=max_cycle_length)
+    loops = [_cycle_to_detected_loop(cycle, nodes_by_id) for cycle in cycles]
+    return await persist_detected_loops(session, loops)
 
 
 async def load_persisted_loops(
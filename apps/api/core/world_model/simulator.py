@@ -2,7 +2,7 @@
 
 This module provides deterministic propagation simulation:
 - Weights derived from evidence density (span count + diversity)
-- BFS-based propagation with damping
+- BFS-based propagation with damping (vectorized, see propagation_engine.py)
 - Explanatory output labeled as approximate
 
 Key principle: This is for explanation, not numeric truth.
@@ -11,7 +11,6 @@ All outputs are labeled as "محاكاة تقريبية وفق روابط الإ
 
 from __future__ import annotations
 
-from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -24,7 +23,15 @@ from apps.api.core.world_model.schemas import (
 from apps.api.core.world_model.loop_reasoner import (
     GraphEdge,
     GraphNode,
-    load_mechanism_graph,
+)
+from apps.api.core.world_model.graph_context import (
+    MechanismGraphContext,
+    get_mechanism_graph_context,
+)
+from apps.api.core.world_model.propagation_engine import (
+    CompiledMechanismGraph,
+    compile_mechanism_graph,
+    run_propagation,
 )
 
 
@@ -78,12 +85,83 @@ def compute_edge_weight(edge: GraphEdge) -> float:
     return weight
 
 
+def compile_simulation_graph(
+    nodes_by_id: dict[str, GraphNode],
+    edges: list[GraphEdge],
+) -> CompiledMechanismGraph:
+    """Compile the mechanism graph into the simulator's signed weight matrix (once per graph)."""
+    return compile_mechanism_graph(nodes_by_id, edges, compute_edge_weight)
+
+
+def _compiled_for(graph_ctx: MechanismGraphContext) -> CompiledMechanismGraph:
+    return graph_ctx.derived(
+        "simulation_graph",
+        lambda c: compile_simulation_graph(c.nodes_by_id, c.edges),
+    )
+
+
+def _run_batch(
+    graph: CompiledMechanismGraph,
+    seeds: list[tuple[int, float]],
+    max_steps: int,
+) -> list[SimulationResult]:
+    """Simulate every seed in one batched run and shape each column as a SimulationResult."""
+    columns = run_propagation(
+        graph,
+        seeds,
+        max_steps=max_steps,
+        damping=DAMPING_FACTOR,
+        min_delta=MIN_DELTA_THRESHOLD,
+        initial_value=DEFAULT_NODE_VALUE,
+    )
+    initial_state = {node_id: round(DEFAULT_NODE_VALUE, 4) for node_id in graph.node_ids}
+    results: list[SimulationResult] = []
+    for column in columns:
+        propagation_steps = [
+            PropagationStep(
+                step_number=step_number,
+                node_id=graph.node_ids[target],
+                node_label_ar=graph.node_labels[target],
+                delta=round(delta, 4),
+                new_value=round(new_value, 4),
+                via_edge_id=graph.edge_ids[edge],
+                via_relation=graph.edge_relations[edge],
+            )
+            for step_number, target, edge, delta, new_value in column.steps
+        ]
+        # Final state: only nodes that changed
+        final_state = {
+            graph.node_ids[i]: round(float(value), 4)
+            for i, value in enumerate(column.values.tolist())
+            if abs(value - DEFAULT_NODE_VALUE) > MIN_DELTA_THRESHOLD
+        }
+        results.append(SimulationResult(
+            initial_state=dict(initial_state),
+            final_state=final_state,
+            propagation_steps=[
+                {
+                    "step": ps.step_number,
+                    "node": ps.node_id,
+                    "node_label_ar": ps.node_label_ar,
+                    "delta": ps.delta,
+                    "new_value": ps.new_value,
+                    "via_edge": ps.via_edge_id,
+                    "via_relation": ps.via_relation,
+                }
+                for ps in propagation_steps
+            ],
+            label_ar="محاكاة تقريبية وفق روابط الإطار",
+        ))
+    return results
+
+
 def propagate_change(
     nodes_by_id: dict[str, GraphNode],
     edges: list[GraphEdge],
     changed_node_id: str,
     change_magnitude: float,
     max_steps: int = 5,
+    graph: CompiledMechanismGraph | None = None,
 ) -> SimulationResult:
     """Deterministic propagation using BFS with damping.
     
@@ -93,118 +171,31 @@ def propagate_change(
     3. Accumulate deltas (don't double-count)
     4. Stop when deltas < threshold or max_steps reached
     
+    The graph is compiled to a sparse weight matrix (see propagation_engine); pass a
+    precompiled `graph` to skip that when simulating repeatedly.
+    
     Args:
         nodes_by_id: Map of node IDs to GraphNode
         edges: List of all edges
         changed_node_id: ID of the node being changed
         change_magnitude: Amount of change (+/- value)
         max_steps: Maximum propagation steps
+        graph: Optional precompiled graph for the same nodes/edges
         
     Returns:
         SimulationResult with propagation trace
     """
-    # Initialize state
-    initial_state: dict[str, float] = {}
-    current_state: dict[str, float] = {}
-    
-    for node_id in nodes_by_id:
-        initial_state[node_id] = DEFAULT_NODE_VALUE
-        current_state[node_id] = DEFAULT_NODE_VALUE
-    
-    # Apply initial change
-    if changed_node_id in current_state:
-        current_state[changed_node_id] = min(1.0, max(0.0, 
-            current_state[changed_node_id] + change_magnitude
-        ))
-    
-    # Build adjacency for outgoing edges
-    outgoing: dict[str, list[GraphEdge]] = defaultdict(list)
-    for edge in edges:
-        outgoing[edge.from_node].append(edge)
-    
-    # Track propagation steps
-    propagation_steps: list[PropagationStep] = []
-    
-    # BFS propagation
-    affected_nodes = {changed_node_id}
-    step_number = 0
-    
-    for _ in range(max_steps):
-        step_number += 1
-        next_affected: set[str] = set()
-        deltas_this_step: dict[str, float] = {}
-        
-        for source_id in affected_nodes:
-            source_value = current_state.get(source_id, DEFAULT_NODE_VALUE)
-            
-            for edge in outgoing.get(source_id, []):
-                target_id = edge.to_node
-                if target_id not in nodes_by_id:
-                    continue
-                
-                # Compute delta
-                weight = compute_edge_weight(edge)
-                delta = source_value * weight * DAMPING_FACTOR
-                
-                # Skip negligible changes
-                if abs(delta) < MIN_DELTA_THRESHOLD:
-                    continue
-                
-                # Accumulate delta (don't double-count same target)
-                if target_id in deltas_this_step:
-                    deltas_this_step[target_id] += delta
-                else:
-                    deltas_this_step[target_id] = delta
-                
-                # Record propagation step
-                target_node = nodes_by_id[target_id]
-                propagation_steps.append(PropagationStep(
-                    step_number=step_number,
-                    node_id=target_id,
-                    node_label_ar=target_node.label_ar,
-                    delta=round(delta, 4),
-                    new_value=round(current_state[target_id] + delta, 4),
-                    via_edge_id=edge.id,
-                    via_relation=edge.relation_type,
-                ))
-                
-                next_affected.add(target_id)
-        
-        # Apply deltas
-        for target_id, delta in deltas_this_step.items():
-            current_state[target_id] = min(1.0, max(0.0, 
-                current_state[target_id] + delta
-            ))
-        
-        # Check if we should continue
-        if not next_affected:
-            break
-        
-        affected_nodes = next_affected
-    
-    # Build final state (only nodes that changed)
-    final_state: dict[str, float] = {}
-    for node_id, value in current_state.items():
-        if abs(value - initial_state[node_id]) > MIN_DELTA_THRESHOLD:
-            final_state[node_id] = round(value, 4)
-    
-    return SimulationResult(
-        initial_state={k: round(v, 4) for k, v in initial_state.items()},
-        final_state=final_state,
-        propagation_steps=[
-            {
-                "step": ps.step_number,
-                "node": ps.node_id,
-                "node_label_ar": ps.node_label_ar,
-                "delta": ps.delta,
-                "new_value": ps.new_value,
-                "via_edge": ps.via_edge_id,
-                "via_relation": ps.via_relation,
-            }
-            for ps in propagation_steps
-        ],
-        label_ar="محاكاة تقريبية وفق روابط الإطار",
-    )
+    graph = graph or compile_simulation_graph(nodes_by_id, edges)
+    node = graph.index.get(changed_node_id)
+    if node is None:
+        # Unknown node: nothing to perturb, report the untouched state.
+        return SimulationResult(
+            initial_state={node_id: round(DEFAULT_NODE_VALUE, 4) for node_id in graph.node_ids},
+            final_state={},
+            propagation_steps=[],
+            label_ar="محاكاة تقريبية وفق روابط الإطار",
+        )
+    return _run_batch(graph, [(node, change_magnitude)], max_steps)[0]
 
 
 async def simulate_change(
@@ -224,10 +215,10 @@ async def simulate_change(
     Returns:
         SimulationResult with propagation trace
     """
-    # Load graph
-    nodes_by_id, edges = await load_mechanism_graph(session)
+    # Shared graph context; the weight matrix is compiled once per graph version
+    graph_ctx = await get_mechanism_graph_context(session)
     
-    if not nodes_by_id or not edges:
+    if not graph_ctx.nodes_by_id or not graph_ctx.edges:
         return SimulationResult(
             initial_state={},
             final_state={},
@@ -235,14 +226,10 @@ async def simulate_change(
             label_ar="محاكاة تقريبية وفق روابط الإطار - لا توجد بيانات كافية",
         )
     
-    # Find the changed node
-    changed_node_id = None
-    for node in nodes_by_id.values():
-        if f"{node.ref_kind}:{node.ref_id}" == changed_node_ref:
-            changed_node_id = node.id
-            break
+    graph = _compiled_for(graph_ctx)
+    node = graph.node_for_ref(changed_node_ref)
     
-    if not changed_node_id:
+    if node is None:
         return SimulationResult(
             initial_state={},
             final_state={},
@@ -251,13 +238,7 @@ async def simulate_change(
         )
     
     # Run simulation
-    return propagate_change(
-        nodes_by_id=nodes_by_id,
-        edges=edges,
-        changed_node_id=changed_node_id,
-        change_magnitude=change_magnitude,
-        max_steps=max_steps,
-    )
+    return _run_batch(graph, [(node, change_magnitude)], max_steps)[0]
 
 
 async def simulate_what_if(
@@ -277,10 +258,9 @@ async def simulate_what_if(
     Returns:
         Dictionary with scenario results
     """
-    # Load graph once
-    nodes_by_id, edges = await load_mechanism_graph(session)
+    graph_ctx = await get_mechanism_graph_context(session)
     
-    if not nodes_by_id or not edges:
+    if not graph_ctx.nodes_by_id or not graph_ctx.edges:
         return {
             "scenario_ar": scenario_ar,
             "results": [],
@@ -288,29 +268,19 @@ async def simulate_what_if(
             "label_ar": "محاكاة تقريبية وفق روابط الإطار - لا توجد بيانات كافية",
         }
     
+    # Compiled once per graph version; all pillar changes run as one batched simulation
+    graph = _compiled_for(graph_ctx)
+    changes = [
+        (pillar_id, magnitude, graph.node_for_ref(f"pillar:{pillar_id}"))
+        for pillar_id, magnitude in pillar_changes.items()
+    ]
+    changes = [(pillar_id, magnitude, node) for pillar_id, magnitude, node in changes if node is not None]
+    sim_results = _run_batch(graph, [(node, magnitude) for _, magnitude, node in changes], max_steps)
+    
     results: list[dict[str, Any]] = []
     combined_impacts: dict[str, float] = {}
     
-    for pillar_id, magnitude in pillar_changes.items():
-        # Find pillar node
-        pillar_node_id = None
-        for node in nodes_by_id.values():
-            if node.ref_kind == "pillar" and node.ref_id == pillar_id:
-                pillar_node_id = node.id
-                break
-        
-        if not pillar_node_id:
-            continue
-        
-        # Simulate this change
-        sim_result = propagate_change(
-            nodes_by_id=nodes_by_id,
-            edges=edges,
-            changed_node_id=pillar_node_id,
-            change_magnitude=magnitude,
-            max_steps=max_steps,
-        )
-        
+    for (pillar_id, magnitude, _), sim_result in zip(changes, sim_results):
         results.append({
             "pillar_id": pillar_id,
             "change_magnitude": magnitude,
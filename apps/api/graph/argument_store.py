@@ -17,6 +17,8 @@ from typing import Any, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
+
 
 @dataclass(frozen=True)
 class ArgumentClaim:
@@ -162,6 +164,7 @@ async def link_claim_supported_by_span(
         },
     )
 
+    invalidate_graph_snapshot("argument_store")
     return edge_id
 
 
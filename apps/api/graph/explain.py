@@ -13,6 +13,9 @@ from typing import Any, Iterable, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.graph.graph_snapshot import GraphSnapshot, get_graph_snapshot_or_none
+from apps.api.retrieve.edge_spans import fetch_justification_spans
+
 
 AllowedRel = tuple[str, ...]
 
@@ -94,6 +97,65 @@ async def _neighbors(
     return out
 
 
+async def _spans_for_edges(session: AsyncSession, edge_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+    """Justification spans for path edges (best-effort, request-memoized)."""
+    return await fetch_justification_spans(session, edge_ids)
+
+
+def _path_response(
+    path_nodes: list[tuple[str, str, Optional[dict[str, Any]]]],
+    spans_by_edge: dict[str, list[dict[str, Any]]],
+) -> dict[str, Any]:
+    return {
+        "found": True,
+        "path": [
+            {
+                "type": t,
+                "id": i,
+                "via_rel": (meta.get("rel_type") if meta else None),
+                "edge_id": (meta.get("edge_id") if meta else None),
+                "relation_type": (meta.get("relation_type") if meta else None),
+                "justification_spans": (
+                    spans_by_edge.get(str(meta.get("edge_id")), []) if meta and meta.get("edge_id") else []
+                ),
+            }
+            for t, i, meta in path_nodes
+        ],
+    }
+
+
+async def _shortest_path_in_snapshot(
+    session: AsyncSession,
+    snap: GraphSnapshot,
+    start: tuple[str, str],
+    target: tuple[str, str],
+    max_depth: int,
+    rel_types: Optional[list[str]],
+    require_grounded_semantic: bool,
+) -> dict[str, Any]:
+    found = snap.shortest_path(
+        start,
+        target,
+        max_depth=max_depth,
+        rel_types=rel_types,
+        require_grounded_semantic=require_grounded_semantic,
+    )
+    if not found:
+        return {"found": False, "path": []}
+    path_nodes: list[tuple[str, str, Optional[dict[str, Any]]]] = []
+    for (t, i), e in found:
+        meta = None
+        if e is not None:
+            meta = {
+                "edge_id": snap.edge_ids[e],
+                "rel_type": snap.rel_names[snap.edge_rel[e]],
+                "relation_type": snap.relation_type(e) or "",
+            }
+        path_nodes.append((t, i, meta))
+    spans_by_edge = await _spans_for_edges(session, [m["edge_id"] for _, _, m in path_nodes if m])
+    return _path_response(path_nodes, spans_by_edge)
+
+
 async def shortest_path(
     session: AsyncSession,
     start_type: str,
@@ -115,6 +177,13 @@ async def shortest_path(
     if start == target:
         return {"found": True, "path": [{"type": start_type, "id": start_id, "via_rel": None}]}
 
+    # Reason: BFS runs on the in-memory CSR snapshot; per-node SQL is the fallback.
+    snap = await get_graph_snapshot_or_none(session)
+    if snap is not None:
+        return await _shortest_path_in_snapshot(
+            session, snap, start, target, max_depth, rel_types, require_grounded_semantic
+        )
+
     q: deque[tuple[str, str]] = deque([start])
     # prev[next] = (prev_node, edge_meta)
     prev: dict[tuple[str, str], tuple[tuple[str, str], dict[str, Any]]] = {}
@@ -149,55 +218,11 @@ async def shortest_path(
                     path_nodes.append((start[0], start[1], None))
                     path_nodes.reverse()
 
-                    # Attach justification spans for edges (best-effort).
-                    edge_ids = []
-                    for _, _, meta in path_nodes:
-                        if meta and meta.get("edge_id"):
-                            edge_ids.append(str(meta.get("edge_id")))
-                    spans_by_edge: dict[str, list[dict[str, Any]]] = {}
-                    try:
-                        if edge_ids:
-                            span_rows = (
-                                await session.execute(
-                                    text(
-                                        """
-                                        SELECT edge_id::text AS edge_id, chunk_id, span_start, span_end, quote
-                                        FROM edge_justification_span
-                                        WHERE edge_id::text = ANY(:eids)
-                                        ORDER BY edge_id, chunk_id, span_start
-                                        """
-                                    ),
-                                    {"eids": edge_ids},
-                                )
-                            ).fetchall()
-                            for r in span_rows:
-                                spans_by_edge.setdefault(str(r.edge_id), []).append(
-                                    {
-                                        "chunk_id": str(r.chunk_id),
-                                        "span_start": int(r.span_start),
-                                        "span_end": int(r.span_end),
-                                        "quote": str(r.quote),
-                                    }
-                                )
-                    except Exception:
-                        spans_by_edge = {}
-
-                    return {
-                        "found": True,
-                        "path": [
-                            {
-                                "type": t,
-                                "id": i,
-                                "via_rel": (meta.get("rel_type") if meta else None),
-                                "edge_id": (meta.get("edge_id") if meta else None),
-                                "relation_type": (meta.get("relation_type") if meta else None),
-                                "justification_spans": (
-                                    spans_by_edge.get(str(meta.get("edge_id")), []) if meta and meta.get("edge_id") else []
-                                ),
-                            }
-                            for t, i, meta in path_nodes
-                        ],
-                    }
+                    spans_by_edge = await _spans_for_edges(
+                        session, [str(meta["edge_id"]) for _, _, meta in path_nodes if meta and meta.get("edge_id")]
+                    )
+
+                    return _path_response(path_nodes, spans_by_edge)
                 q.append(nxt)
         depth += 1
 
@@ -24,6 +24,7 @@ from typing import Iterable, Sequence
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
 from apps.api.ingest.sentence_spans import sentence_spans, span_text
 from apps.api.retrieve.normalize_ar import normalize_for_matching
 
@@ -574,5 +575,6 @@ async def upsert_mined_edges(
             )
             inserted_spans += 1
 
+    invalidate_graph_snapshot("framework_edge_miner")
     return {"inserted_edges": inserted_edges, "inserted_edge_spans": inserted_spans}
 
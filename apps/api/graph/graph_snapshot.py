@@ -0,0 +1,476 @@
+"""
+In-memory CSR snapshot of the approved graph.
+
+Why:
+- The approved `edge` table fits comfortably in RAM, but shortest paths, impact
+  propagation, retrieval expansion and the UI explorer used to issue one SQL query per
+  visited node.
+- Here approved edges are loaded once into a compressed-sparse-row adjacency with
+  integer-interned nodes / rel types / relation types and a grounded flag per edge, so
+  those traversals run entirely in memory.
+
+Freshness:
+- A cheap watermark (approved edge count, latest edge update, span count) is checked at
+  most every GRAPH_SNAPSHOT_CHECK_SECONDS; the snapshot is rebuilt only when it changes.
+- In-process writers (ingestion, miners) call `invalidate_graph_snapshot` to force the
+  watermark check on the next access.
+
+Adjacency order per node is outgoing edges then incoming edges, each in edge-id order,
+which matches the per-node SQL traversals (outgoing query UNION ALL incoming query).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from array import array
+from typing import Any, Iterable, Iterator, Optional
+
+from sqlalchemy import text
+
+from apps.api.core.corpus_version import bump_edge_version
+
+logger = logging.getLogger(__name__)
+
+NodeKey = tuple[str, str]
+
+
+class GraphSnapshot:
+    """Immutable CSR view over approved edges (both directions)."""
+
+    def __init__(self, rows: Iterable[Any], version: int = 0, watermark: Any = None) -> None:
+        self.version = version
+        self.watermark = watermark
+        self.loaded_at = time.time()
+
+        self.node_keys: list[NodeKey] = []
+        self._node_index: dict[NodeKey, int] = {}
+        self.rel_names: list[str] = []
+        self._rel_index: dict[str, int] = {}
+        # Index 0 is reserved for "no semantic relation_type" (structural edge).
+        self.relation_names: list[Optional[str]] = [None]
+        self._relation_index: dict[str, int] = {}
+
+        self.edge_ids: list[str] = []
+        self.edge_src = array("I")
+        self.edge_dst = array("I")
+        self.edge_rel = array("H")
+        self.edge_relation = array("H")
+        self.edge_has_spans = bytearray()
+        # (created_method, score, strength_score) kept for retrieval payload parity.
+        self.edge_meta: list[tuple[Any, Any, Any]] = []
+
+        for r in rows:
+            self.edge_ids.append(str(r.edge_id))
+            self.edge_src.append(self._intern_node(str(r.from_type), str(r.from_id)))
+            self.edge_dst.append(self._intern_node(str(r.to_type), str(r.to_id)))
+            self.edge_rel.append(self._intern(self.rel_names, self._rel_index, str(r.rel_type)))
+            relation = getattr(r, "relation_type", None)
+            self.edge_relation.append(
+                self._intern(self.relation_names, self._relation_index, str(relation)) if relation else 0
+            )
+            self.edge_has_spans.append(1 if getattr(r, "has_evidence", False) else 0)
+            self.edge_meta.append(
+                (getattr(r, "created_method", None), getattr(r, "score", None), getattr(r, "strength_score", None))
+            )
+
+        self._build_csr()
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _intern(names: list, index: dict[str, int], value: str) -> int:
+        idx = index.get(value)
+        if idx is None:
+            idx = len(names)
+            index[value] = idx
+            names.append(sys.intern(value))
+        return idx
+
+    def _intern_node(self, node_type: str, node_id: str) -> int:
+        key = (node_type, node_id)
+        idx = self._node_index.get(key)
+        if idx is None:
+            idx = len(self.node_keys)
+            self._node_index[key] = idx
+            self.node_keys.append((sys.intern(node_type), node_id))
+        return idx
+
+    def _build_csr(self) -> None:
+        n_nodes = len(self.node_keys)
+        n_edges = len(self.edge_ids)
+        deg = [0] * (n_nodes + 1)
+        for e in range(n_edges):
+            deg[self.edge_src[e] + 1] += 1
+            deg[self.edge_dst[e] + 1] += 1
+        for i in range(n_nodes):
+            deg[i + 1] += deg[i]
+        self.indptr = array("I", deg)
+
+        pos = list(deg[:n_nodes])
+        self.adj_nbr = array("I", bytes(4 * 2 * n_edges))
+        self.adj_edge = array("I", bytes(4 * 2 * n_edges))
+        self.adj_out = bytearray(2 * n_edges)
+        # Pass 1 fills outgoing slots, pass 2 incoming: per node, outgoing come first.
+        for e in range(n_edges):
+            s = self.edge_src[e]
+            p = pos[s]
+            self.adj_nbr[p], self.adj_edge[p], self.adj_out[p] = self.edge_dst[e], e, 1
+            pos[s] = p + 1
+        for e in range(n_edges):
+            d = self.edge_dst[e]
+            p = pos[d]
+            self.adj_nbr[p], self.adj_edge[p], self.adj_out[p] = self.edge_src[e], e, 0
+            pos[d] = p + 1
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_keys)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_ids)
+
+    def node(self, node_type: str, node_id: str) -> Optional[int]:
+        return self._node_index.get((str(node_type), str(node_id)))
+
+    def rel_filter(self, rel_types: Optional[Iterable[str]]) -> Optional[frozenset[int]]:
+        """Interned rel-type ids for a filter (None = no filter)."""
+        if not rel_types:
+            return None
+        return frozenset(self._rel_index[str(r)] for r in rel_types if str(r) in self._rel_index)
+
+    def relation_filter(self, relation_types: Optional[Iterable[str]]) -> Optional[frozenset[int]]:
+        if not relation_types:
+            return None
+        return frozenset(self._relation_index[str(r)] for r in relation_types if str(r) in self._relation_index)
+
+    def is_grounded(self, e: int) -> bool:
+        """Structural edges are always grounded; semantic edges need justification spans."""
+        return self.edge_relation[e] == 0 or bool(self.edge_has_spans[e])
+
+    def incident(
+        self,
+        u: int,
+        rel_ids: Optional[frozenset[int]] = None,
+        grounded_only: bool = False,
+        relation_ids: Optional[frozenset[int]] = None,
+    ) -> Iterator[tuple[int, int, bool]]:
+        """Yield (neighbor, edge, is_outgoing) for edges touching node u."""
+        for p in range(self.indptr[u], self.indptr[u + 1]):
+            e = self.adj_edge[p]
+            if rel_ids is not None and self.edge_rel[e] not in rel_ids:
+                continue
+            if relation_ids is not None and self.edge_relation[e] not in relation_ids:
+                continue
+            if grounded_only and not self.is_grounded(e):
+                continue
+            yield self.adj_nbr[p], e, bool(self.adj_out[p])
+
+    def relation_type(self, e: int) -> Optional[str]:
+        return self.relation_names[self.edge_relation[e]]
+
+    def edge_record(self, e: int) -> dict[str, Any]:
+        """Edge endpoints and types (graph UI payload)."""
+        from_type, from_id = self.node_keys[self.edge_src[e]]
+        to_type, to_id = self.node_keys[self.edge_dst[e]]
+        return {
+            "edge_id": self.edge_ids[e],
+            "from_type": from_type,
+            "from_id": from_id,
+            "to_type": to_type,
+            "to_id": to_id,
+            "rel_type": self.rel_names[self.edge_rel[e]],
+            "relation_type": self.relation_type(e),
+            "has_evidence": bool(self.edge_has_spans[e]),
+        }
+
+    def neighbor_record(self, nbr: int, e: int, outgoing: bool) -> dict[str, Any]:
+        """Neighbor payload in the `get_entity_neighbors` shape (without spans)."""
+        created_method, score, strength_score = self.edge_meta[e]
+        n_type, n_id = self.node_keys[nbr]
+        return {
+            "edge_id": self.edge_ids[e],
+            "rel_type": self.rel_names[self.edge_rel[e]],
+            "relation_type": self.relation_type(e),
+            "neighbor_type": n_type,
+            "neighbor_id": n_id,
+            "direction": "outgoing" if outgoing else "incoming",
+            "created_method": created_method,
+            "score": score,
+            "strength_score": strength_score,
+        }
+
+    # ------------------------------------------------------------------
+    # Algorithms
+    # ------------------------------------------------------------------
+
+    def expand(
+        self,
+        start: NodeKey,
+        depth: int,
+        relationship_types: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """BFS expansion with `expand_graph` semantics (first visit wins, depth-tagged)."""
+        s = self.node(*start)
+        if s is None:
+            return []
+        rel_ids = self.rel_filter(relationship_types)
+        visited = {s}
+        out: list[dict[str, Any]] = []
+        level_nodes = [s]
+        for level in range(depth):
+            nxt: list[int] = []
+            for u in level_nodes:
+                for v, e, outgoing in self.incident(u, rel_ids):
+                    if v in visited:
+                        continue
+                    visited.add(v)
+                    rec = self.neighbor_record(v, e, outgoing)
+                    rec["depth"] = level + 1
+                    out.append(rec)
+                    nxt.append(v)
+            level_nodes = nxt
+            if not level_nodes:
+                break
+        return out
+
+    def shortest_path(
+        self,
+        start: NodeKey,
+        target: NodeKey,
+        max_depth: int = 4,
+        rel_types: Optional[list[str]] = None,
+        require_grounded_semantic: bool = True,
+    ) -> Optional[list[tuple[NodeKey, Optional[int]]]]:
+        """
+        BFS shortest path.
+
+        Returns [(node_key, via_edge)] from start to target (via_edge None for start),
+        or None when no path exists within max_depth hops.
+        """
+        s = self.node(*start)
+        t = self.node(*target)
+        if s is None or t is None:
+            return None
+        rel_ids = self.rel_filter(rel_types)
+        prev: dict[int, tuple[int, int]] = {}
+        visited = {s}
+        frontier = [s]
+        for _ in range(max_depth):
+            nxt: list[int] = []
+            for u in frontier:
+                for v, e, _ in self.incident(u, rel_ids, grounded_only=require_grounded_semantic):
+                    if v in visited:
+                        continue
+                    visited.add(v)
+                    prev[v] = (u, e)
+                    if v == t:
+                        path: list[tuple[NodeKey, Optional[int]]] = []
+                        node = t
+                        while node != s:
+                            pnode, pe = prev[node]
+                            path.append((self.node_keys[node], pe))
+                            node = pnode
+                        path.append((self.node_keys[s], None))
+                        path.reverse()
+                        return path
+                    nxt.append(v)
+            frontier = nxt
+            if not frontier:
+                break
+        return None
+
+    def bfs_distances(
+        self,
+        start: NodeKey,
+        max_depth: int,
+        rel_types: Optional[list[str]] = None,
+    ) -> dict[NodeKey, int]:
+        """Hop distance from start to every node within max_depth (undirected)."""
+        dist: dict[NodeKey, int] = {start: 0}
+        s = self.node(*start)
+        if s is None:
+            return dist
+        rel_ids = self.rel_filter(rel_types)
+        seen = {s}
+        frontier = [s]
+        for d in range(1, max_depth + 1):
+            nxt: list[int] = []
+            for u in frontier:
+                for v, _, _ in self.incident(u, rel_ids):
+                    if v not in seen:
+                        seen.add(v)
+                        dist[self.node_keys[v]] = d
+                        nxt.append(v)
+            frontier = nxt
+            if not frontier:
+                break
+        return dist
+
+    def approx_memory_bytes(self) -> int:
+        arrays = (self.edge_src, self.edge_dst, self.edge_rel, self.edge_relation, self.indptr, self.adj_nbr, self.adj_edge)
+        total = sum(a.itemsize * len(a) for a in arrays) + len(self.edge_has_spans) + len(self.adj_out)
+        total += sum(sys.getsizeof(x) for x in self.edge_ids)
+        total += sys.getsizeof(self._node_index) + sum(sys.getsizeof(k[1]) for k in self.node_keys)
+        return int(total)
+
+
+_snapshot: Optional[GraphSnapshot] = None
+_snapshot_lock = asyncio.Lock()
+_checked_at = 0.0
+_generation = 0
+_seen_generation = 0
+_rebuilds = 0
+
+
+def graph_snapshot_enabled() -> bool:
+    return os.getenv("GRAPH_SNAPSHOT", "on").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _check_interval_seconds() -> float:
+    try:
+        return float(os.getenv("GRAPH_SNAPSHOT_CHECK_SECONDS", "30") or 30)
+    except Exception:
+        return 30.0
+
+
+def invalidate_graph_snapshot(reason: str = "") -> None:
+    """Mark approved edges as changed by this process (forces a watermark check)."""
+    global _generation
+    _generation += 1
+    # Reason: answers depend on edges too; let the answer cache see in-process mining at once.
+    bump_edge_version(reason)
+    logger.debug("Graph snapshot invalidated (%s): generation=%s", reason or "unspecified", _generation)
+
+
+def reset_graph_snapshot() -> None:
+    """Drop the process snapshot (tests)."""
+    global _snapshot, _checked_at, _seen_generation, _rebuilds
+    _snapshot = None
+    _checked_at = 0.0
+    _seen_generation = _generation
+    _rebuilds = 0
+
+
+async def _fetch_watermark(session: Any) -> tuple[Any, ...]:
+    row = (
+        await session.execute(
+            text(
+                """
+                SELECT
+                  (SELECT COUNT(*) FROM edge WHERE status='approved') AS n_edges,
+                  (SELECT MAX(updated_at) FROM edge) AS max_updated,
+                  (SELECT COUNT(*) FROM edge_justification_span) AS n_spans
+                """
+            )
+        )
+    ).fetchone()
+    if not row:
+        return (0, None, 0)
+    return (int(row.n_edges or 0), str(row.max_updated) if row.max_updated is not None else None, int(row.n_spans or 0))
+
+
+async def _load_snapshot(session: Any, version: int, watermark: Any) -> GraphSnapshot:
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT
+                  e.id::text AS edge_id,
+                  e.from_type, e.from_id,
+                  e.to_type, e.to_id,
+                  e.rel_type,
+                  e.relation_type,
+                  e.created_method,
+                  e.score,
+                  e.strength_score,
+                  EXISTS (SELECT 1 FROM edge_justification_span s WHERE s.edge_id=e.id) AS has_evidence
+                FROM edge e
+                WHERE e.status='approved'
+                ORDER BY e.id::text
+                """
+            )
+        )
+    ).fetchall()
+    return GraphSnapshot(rows, version=version, watermark=watermark)
+
+
+async def get_graph_snapshot(session: Any) -> GraphSnapshot:
+    """Return the process snapshot, rebuilding it when the edge watermark changed."""
+    global _snapshot, _checked_at, _seen_generation, _rebuilds
+    snap = _snapshot
+    if (
+        snap is not None
+        and _seen_generation == _generation
+        and (time.monotonic() - _checked_at) < _check_interval_seconds()
+    ):
+        return snap
+
+    async with _snapshot_lock:
+        snap = _snapshot
+        generation = _generation
+        if snap is not None and _seen_generation == generation and (time.monotonic() - _checked_at) < _check_interval_seconds():
+            return snap
+        watermark = await _fetch_watermark(session)
+        if snap is None or snap.watermark != watermark:
+            t0 = time.perf_counter()
+            snap = await _load_snapshot(session, version=(snap.version + 1 if snap else 1), watermark=watermark)
+            _rebuilds += 1
+            logger.info(
+                "Graph snapshot v%s built: nodes=%s edges=%s in %.1fms",
+                snap.version,
+                snap.n_nodes,
+                snap.n_edges,
+                (time.perf_counter() - t0) * 1000.0,
+            )
+            _snapshot = snap
+        _checked_at = time.monotonic()
+        _seen_generation = generation
+        return snap
+
+
+async def get_graph_snapshot_or_none(session: Any) -> Optional[GraphSnapshot]:
+    """
+    Fail-soft accessor: returns None when disabled or when loading fails.
+
+    Callers fall back to their SQL traversal on None.
+    """
+    if not graph_snapshot_enabled():
+        return None
+    try:
+        return await get_graph_snapshot(session)
+    except Exception as e:
+        logger.warning("Graph snapshot unavailable, using SQL traversal: %s", e)
+        try:
+            await session.rollback()
+        except Exception:
+            pass
+        return None
+
+
+def get_graph_snapshot_stats() -> dict[str, Any]:
+    """Observability for /health."""
+    snap = _snapshot
+    if snap is None:
+        return {"loaded": False, "enabled": graph_snapshot_enabled(), "rebuilds": _rebuilds}
+    return {
+        "loaded": True,
+        "enabled": graph_snapshot_enabled(),
+        "version": snap.version,
+        "nodes": snap.n_nodes,
+        "edges": snap.n_edges,
+        "rel_types": len(snap.rel_names),
+        "rebuilds": _rebuilds,
+        "loaded_at": snap.loaded_at,
+        "approx_memory_bytes": snap.approx_memory_bytes(),
+    }
@@ -16,6 +16,8 @@ from typing import Any, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.graph.graph_snapshot import GraphSnapshot, get_graph_snapshot_or_none
+
 
 async def impact_propagation(
     session: AsyncSession,
@@ -33,6 +35,12 @@ async def impact_propagation(
           "items": [{"entity_type","entity_id","score","reasons":[...]}]
         }
     """
+    # Reason: all four steps are plain adjacency lookups on the in-memory CSR snapshot;
+    # the SQL path below is the fallback when the snapshot is disabled/unavailable.
+    snap = await get_graph_snapshot_or_none(session)
+    if snap is not None:
+        return _impact_from_snapshot(snap, entity_type, entity_id, max_depth, top_k)
+
     # 1) Collect seed ref nodes
     seed_refs = (
         await session.execute(
@@ -145,6 +153,64 @@ async def impact_propagation(
                 dist[nxt] = d + 1
                 q.append(nxt)
 
+    return _rank_items(entity_type, entity_id, shared_counts, shared_refs, same_name_bonus, dist, max_depth, top_k)
+
+
+def _impact_from_snapshot(
+    snap: GraphSnapshot,
+    entity_type: str,
+    entity_id: str,
+    max_depth: int,
+    top_k: int,
+) -> dict[str, Any]:
+    seed = (entity_type, entity_id)
+    shared_counts: dict[tuple[str, str], int] = defaultdict(int)
+    shared_refs: dict[tuple[str, str], set[str]] = defaultdict(set)
+    same_name_bonus: dict[tuple[str, str], int] = defaultdict(int)
+
+    u = snap.node(entity_type, entity_id)
+    mentions = snap.rel_filter(["MENTIONS_REF"])
+    if u is not None:
+        # 1) + 2) seed ref nodes, then every entity mentioning them
+        seed_ref_nodes = sorted(
+            {v for v, _, outgoing in snap.incident(u, mentions) if outgoing and snap.node_keys[v][0] == "ref"}
+        )
+        for r in seed_ref_nodes:
+            ref_node_id = snap.node_keys[r][1]
+            for w, _, outgoing in snap.incident(r, mentions):
+                if outgoing:
+                    continue
+                key = snap.node_keys[w]
+                if key == seed:
+                    continue
+                shared_counts[key] += 1
+                shared_refs[key].add(ref_node_id)
+
+        # 3) SAME_NAME bonus for sub_value only
+        if entity_type == "sub_value":
+            seen_edges: set[int] = set()
+            for v, e, _ in snap.incident(u, snap.rel_filter(["SAME_NAME"])):
+                if e in seen_edges:
+                    continue
+                seen_edges.add(e)
+                same_name_bonus[("sub_value", snap.node_keys[v][1])] = 2
+
+    # 4) Distance penalty
+    rels = ["CONTAINS", "SUPPORTED_BY", "MENTIONS_REF", "REFERS_TO", "SHARES_REF", "SAME_NAME"]
+    dist = snap.bfs_distances(seed, max_depth=max_depth, rel_types=rels)
+    return _rank_items(entity_type, entity_id, shared_counts, shared_refs, same_name_bonus, dist, max_depth, top_k)
+
+
+def _rank_items(
+    entity_type: str,
+    entity_id: str,
+    shared_counts: dict[tuple[str, str], int],
+    shared_refs: dict[tuple[str, str], set[str]],
+    same_name_bonus: dict[tuple[str, str], int],
+    dist: dict[tuple[str, str], int],
+    max_depth: int,
+    top_k: int,
+) -> dict[str, Any]:
     items = []
     for key, cnt in shared_counts.items():
         # Score: shared refs (strong) + same-name bonus + distance discount
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import logging
+import os
+
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.core.corpus_version import bump_edge_version
+from apps.api.core.world_model.cache import get_world_model_cache
+from apps.api.core.world_model.graph_context import (
+    get_loaded_mechanism_graph_context,
+    stage_mechanism_delta,
+)
+from apps.api.core.world_model.loop_reasoner import GraphEdge, GraphNode, index_loops_for_new_edges
 from apps.api.core.world_model.schemas import compute_edge_confidence
 
 from apps.api.graph.mechanism_miner_types import MinedMechanismEdge
 
+logger = logging.getLogger(__name__)
+
 
 async def get_or_create_mechanism_node(
     session: AsyncSession,
@@ -59,9 +71,17 @@ async def upsert_mechanism_edges(
     source_id: str | None = None,
     pillar_labels: dict[str, str] | None = None,
 ) -> dict[str, int]:
-    """Insert mined mechanism edges + spans (idempotent)."""
+    """Insert mined mechanism edges + spans (idempotent).
+
+    Inserted rows are staged as a delta for the in-process MechanismGraphContext (applied
+    when the caller commits), and the feedback loops closed by new edges are indexed right
+    away in the same transaction (no offline re-mining).
+    """
     inserted_edges = 0
     inserted_spans = 0
+    delta_nodes: list[GraphNode] = []
+    delta_edges: list[GraphEdge] = []
+    delta_spans: list[tuple[str, dict]] = []
 
     labels = pillar_labels or {
         "P001": "الركيزة الروحية",
@@ -87,6 +107,8 @@ async def upsert_mechanism_edges(
 
         if not from_node_id or not to_node_id:
             continue
+        delta_nodes.append(GraphNode(id=from_node_id, ref_kind=e.from_ref_kind, ref_id=e.from_ref_id, label_ar=from_label))
+        delta_nodes.append(GraphNode(id=to_node_id, ref_kind=e.to_ref_kind, ref_id=e.to_ref_id, label_ar=to_label))
 
         span_count = len(e.spans)
         chunk_diversity = len(set(sp.chunk_id for sp in e.spans))
@@ -134,6 +156,15 @@ async def upsert_mechanism_edges(
             edge_id = str(row.id) if row else None
             if edge_id:
                 inserted_edges += 1
+                delta_edges.append(GraphEdge(
+                    id=edge_id,
+                    from_node=from_node_id,
+                    to_node=to_node_id,
+                    relation_type=e.relation_type,
+                    polarity=int(e.polarity),
+                    confidence=float(confidence),
+                    spans=[],
+                ))
 
         if not edge_id:
             continue
@@ -160,6 +191,64 @@ async def upsert_mechanism_edges(
             )
             if span_res.fetchone():
                 inserted_spans += 1
+                delta_spans.append((edge_id, {
+                    "chunk_id": str(sp.chunk_id),
+                    "span_start": int(sp.span_start),
+                    "span_end": int(sp.span_end),
+                    "quote": str(sp.quote),
+                }))
+
+    # Reason: keep the shared graph context current without a full reload, but only
+    # once these rows are committed (a rolled-back batch must not leave phantom edges).
+    stage_mechanism_delta(
+        session,
+        nodes=delta_nodes,
+        edges=delta_edges,
+        spans=delta_spans,
+        on_applied=_after_mechanism_commit,
+    )
+
+    inserted_loops = await _index_new_loops(session, delta_nodes, delta_edges)
+    return {"inserted_edges": inserted_edges, "inserted_spans": inserted_spans, "inserted_loops": inserted_loops}
+
 
-    return {"inserted_edges": inserted_edges, "inserted_spans": inserted_spans}
+def _after_mechanism_commit() -> None:
+    """Committed mechanism rows: drop world-model stats and move this process's edge version."""
+    get_world_model_cache().drop_stats()
+    bump_edge_version("mechanism_miner")
+
+
+def incremental_loops_enabled() -> bool:
+    return os.getenv("WORLD_MODEL_INCREMENTAL_LOOPS", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+async def _index_new_loops(
+    session: AsyncSession,
+    new_nodes: list[GraphNode],
+    new_edges: list[GraphEdge],
+) -> int:
+    """Persist the feedback loops closed by `new_edges` (fail-soft, savepoint-scoped)."""
+    if not new_edges or not incremental_loops_enabled():
+        return 0
+    graph = get_loaded_mechanism_graph_context()
+    nodes_by_id = edges = None
+    if graph is not None:
+        # The staged delta is not in the shared context yet (applied on commit).
+        nodes_by_id = {**graph.nodes_by_id, **{n.id: n for n in new_nodes if n.id not in graph.nodes_by_id}}
+        edges = graph.edges + [e for e in new_edges if e.id not in graph.edges_by_id]
+    try:
+        # Reason: a loop-index failure must not roll back the mined edges.
+        async with session.begin_nested():
+            inserted = await index_loops_for_new_edges(
+                session,
+                new_edges,
+                nodes_by_id=nodes_by_id,
+                edges=edges,
+            )
+    except Exception as e:
+        logger.warning("Incremental loop indexing failed: %s", e)
+        return 0
+    if inserted:
+        await get_world_model_cache().invalidate_loops()
+    return inserted
 
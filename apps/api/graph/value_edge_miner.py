@@ -26,6 +26,7 @@ from typing import Any, Sequence
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
 from apps.api.graph.mechanism_miner_patterns import (
     CONDITIONAL_MARKERS,
     ENABLING_MARKERS,
@@ -722,6 +723,7 @@ async def upsert_value_edges(
             )
             inserted_spans += 1
 
+    invalidate_graph_snapshot("value_edge_miner")
     return {"inserted_edges": inserted_edges, "inserted_spans": inserted_spans}
 
 
@@ -22,6 +22,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from apps.api.ingest.external_sources_manifest import ExternalSourceManifestRow, sha256_file_bytes
 from apps.api.ingest.loader_chunks import embed_all_chunks_for_source
 from apps.api.ingest.loader_meta import complete_ingestion_run, create_ingestion_run, create_source_document
+from apps.api.retrieve.bm25_index import mark_chunks_dirty
 
 
 @dataclass(frozen=True)
@@ -105,6 +106,7 @@ async def ingest_external_source(
     chunk_texts = _chunk_text(paras)
 
     chunks_inserted = 0
+    written_chunk_ids: list[str] = []
     for i, ct in enumerate(chunk_texts):
         chunk_id = _stable_chunk_id(source_id=row.source_id, idx=i, text=ct)
         # Store as evidence chunks. Entity is the external source itself.
@@ -135,6 +137,9 @@ async def ingest_external_source(
             },
         )
         chunks_inserted += 1
+        written_chunk_ids.append(chunk_id)
+
+    mark_chunks_dirty(written_chunk_ids)
 
     embeddings = 0
     if embed:
@@ -20,6 +20,7 @@ from apps.api.retrieve.azure_search_indexer import (
     is_configured as azure_search_is_configured,
     upsert_documents as azure_search_upsert_documents,
 )
+from apps.api.retrieve.bm25_index import mark_chunks_dirty
 from apps.api.retrieve.vector_retriever import store_embedding
 
 
@@ -36,6 +37,7 @@ async def load_chunks_jsonl(
         return 0
 
     count = 0
+    written: list[str] = []
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
@@ -81,7 +83,10 @@ async def load_chunks_jsonl(
                     ),
                     {"chunk_id": row["chunk_id"], "ref_type": r.get("type", ""), "ref": r.get("ref", "")},
                 )
+            written.append(str(row["chunk_id"]))
             count += 1
+    # Keep the in-process BM25 index fresh without a full rebuild.
+    mark_chunks_dirty(written)
     return count
 
 
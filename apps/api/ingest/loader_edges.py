@@ -8,6 +8,8 @@ from __future__ import annotations
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
+
 
 async def build_edges_for_source(session: AsyncSession, source_doc_id: str) -> None:
     """Build minimal graph edges in Postgres for a given source_doc_id."""
@@ -195,3 +197,4 @@ async def build_edges_for_source(session: AsyncSession, source_doc_id: str) -> N
         {"source_doc_id": source_doc_id},
     )
 
+    invalidate_graph_snapshot("loader_edges")
@@ -14,6 +14,9 @@ from typing import Any, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.core.corpus_version import bump_corpus_version
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
+
 
 async def _scalar_one_or_none(session: AsyncSession, sql: str, params: dict[str, Any]) -> Optional[str]:
     """Best-effort scalar fetch helper."""
@@ -98,4 +101,7 @@ async def complete_ingestion_run(
             "completed_at": datetime.utcnow(),
         },
     )
+    # Process-wide indexes (entity resolver, ...) are keyed by corpus version.
+    bump_corpus_version(f"ingestion_run:{status}")
+    invalidate_graph_snapshot(f"ingestion_run:{status}")
 
@@ -33,6 +33,8 @@ from apps.api.ingest.scholar_notes_schema import (
     primary_entity_for_note,
 )
 from apps.api.ingest.source_inventory import SourceInventory, build_source_inventory
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
+from apps.api.retrieve.bm25_index import mark_chunks_dirty
 
 
 def _sha256_file(path: Path) -> str:
@@ -215,6 +217,7 @@ async def ingest_scholar_notes_jsonl(
     inventory = await build_source_inventory(session)
 
     inserted_chunks = 0
+    written_chunk_ids: list[str] = []
     inserted_edges = 0
     inserted_edge_spans = 0
 
@@ -287,6 +290,7 @@ async def ingest_scholar_notes_jsonl(
                     },
                 )
                 inserted_chunks += 1
+                written_chunk_ids.append(cid)
 
             # Insert semantic edges (if any).
             for link in r.cross_pillar_links or []:
@@ -407,6 +411,9 @@ async def ingest_scholar_notes_jsonl(
                 if not row_cnt or int(getattr(row_cnt, "c", 0) or 0) <= 0:
                     raise ValueError(f"Hard gate failed: edge has no justification spans (edge_id={edge_id})")
 
+        mark_chunks_dirty(written_chunk_ids)
+        invalidate_graph_snapshot("scholar_notes")
+
         # Populate deterministic sentence spans for all inserted note chunks (for eval + binding).
         inserted_chunk_spans = await populate_chunk_spans_for_source(session, source_doc_id)
 
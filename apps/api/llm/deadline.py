@@ -0,0 +1,59 @@
+"""
+Request deadlines propagated from Muḥāsibī states down to LLM providers.
+
+Why:
+- `_execute_state` bounds each state with `asyncio.wait_for`, but providers used their own
+  LLM_TIMEOUT (180s). A provider call started late in INTERPRET could not finish in time
+  and was cancelled from outside, leaving no room for the deterministic fallback.
+
+`use_deadline(seconds)` stores an absolute monotonic deadline in a ContextVar (nested
+scopes only ever tighten it). Providers call `effective_timeout(default)` to clamp their
+own timeout to the time left, minus a small margin so they return a clean timeout response
+before the state itself is cancelled.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Reason: leave the caller a moment to fall back after a provider-side timeout.
+DEADLINE_MARGIN_S = 1.0
+
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+def current_deadline() -> Optional[float]:
+    """Absolute `time.monotonic()` deadline for the current task, if any."""
+    return _deadline.get()
+
+
+def remaining_s() -> Optional[float]:
+    """Seconds left before the current deadline (may be negative), or None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def use_deadline(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Bound the enclosed work to `seconds` from now (never extends an outer deadline)."""
+    outer = _deadline.get()
+    deadline = outer
+    if seconds is not None:
+        candidate = time.monotonic() + max(0.0, float(seconds))
+        deadline = candidate if outer is None else min(outer, candidate)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def effective_timeout(default_s: float, margin_s: float = DEADLINE_MARGIN_S) -> float:
+    """`default_s` clamped to the remaining deadline; <= 0 means no time is left."""
+    left = remaining_s()
+    if left is None:
+        return float(default_s)
+    return min(float(default_s), left - margin_s)
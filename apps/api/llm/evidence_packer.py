@@ -0,0 +1,268 @@
+"""
+Token-budgeted evidence packing for the INTERPRET prompt.
+
+Why:
+- `MuhasibiLLMClient.interpret` used to serialize every evidence packet, used edge and
+  argument chain verbatim; long scholar chunks and repeated passages inflated prompt
+  tokens (and LLM latency) on deep / natural_chat questions.
+
+Packing (deterministic, pure Python):
+1. Rank packets by merge score (MergeResult.ranked_chunks; retrieval order when absent)
+   plus coverage of the detected entities.
+2. Drop near-duplicate texts (word-shingle Jaccard on Arabic-normalized text).
+3. Trim long packets to their most relevant sentence spans. Spans come from
+   `sentence_spans`, the same splitter that populates `chunk_span`, so kept offsets
+   match the stored citation spans.
+4. Greedily fit packets, then edges/chains, into EVIDENCE_TOKEN_BUDGET.
+
+Packets are copied; the caller's evidence list (used by guardrails) is never mutated.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from apps.api.ingest.sentence_spans import sentence_spans
+from apps.api.llm.json_codec import dumps
+from apps.api.retrieve.normalize_ar import normalize_for_matching
+
+# Reason: share of the budget held back for used_edges/argument_chains when present.
+_EDGE_SHARE = 0.25
+_COVERAGE_WEIGHT = 0.5
+_DUP_JACCARD = 0.85
+_WORD = re.compile(r"\w+")
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap tokenizer-free estimate (~4 UTF-8 bytes per token; Arabic ≈ 2 chars/token)."""
+    if not text:
+        return 0
+    return int(math.ceil(len(text.encode("utf-8")) / 4.0))
+
+
+def _json_tokens(obj: Any) -> int:
+    return approx_tokens(dumps(obj))
+
+
+def evidence_packing_enabled() -> bool:
+    return os.getenv("EVIDENCE_PACKING", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def evidence_budget_tokens() -> int:
+    return max(0, _env_int("EVIDENCE_TOKEN_BUDGET", 6000))
+
+
+def packet_max_tokens() -> int:
+    return max(0, _env_int("EVIDENCE_PACKET_MAX_TOKENS", 400))
+
+
+@dataclass
+class PackReport:
+    """Per-request packing outcome (logged and attached to the INTERPRET trace)."""
+
+    budget_tokens: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    packets_in: int = 0
+    packets_kept: int = 0
+    duplicates_dropped: int = 0
+    packets_trimmed: int = 0
+    edges_in: int = 0
+    edges_kept: int = 0
+    kept_chunk_ids: list[str] = field(default_factory=list)
+    dropped_chunk_ids: list[str] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+    def as_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        out["saved_tokens"] = self.saved_tokens
+        return out
+
+
+@dataclass
+class PackedEvidence:
+    evidence_packets: list[dict[str, Any]]
+    used_edges: list[dict[str, Any]]
+    argument_chains: list[dict[str, Any]]
+    report: PackReport
+
+
+def _words(norm_text: str) -> list[str]:
+    return _WORD.findall(norm_text or "")
+
+
+def _terms(text: str) -> set[str]:
+    return {w for w in _words(normalize_for_matching(text or "")) if len(w) >= 3}
+
+
+def _shingles(norm_text: str, k: int = 3) -> set[tuple[str, ...]]:
+    words = _words(norm_text)
+    if len(words) <= k:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + k]) for i in range(len(words) - k + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / float(len(a | b))
+
+
+def _entity_coverage(packet: dict[str, Any], norm_text: str, entities: list[dict[str, Any]]) -> float:
+    if not entities:
+        return 0.0
+    hit = 0
+    for ent in entities:
+        if str(ent.get("id") or "") and str(ent.get("id")) == str(packet.get("entity_id") or ""):
+            hit += 1
+            continue
+        name = normalize_for_matching(str(ent.get("name_ar") or ""))
+        if name and name in norm_text:
+            hit += 1
+    return hit / float(len(entities))
+
+
+def _trim_to_spans(text: str, query_terms: set[str], max_tokens: int) -> Optional[str]:
+    """Keep the most query-relevant sentences (in document order) within max_tokens."""
+    spans = sentence_spans(text, max_spans=64)
+    if len(spans) <= 1:
+        return None
+    scored = []
+    for idx, sp in enumerate(spans):
+        sent = text[sp.start : sp.end]
+        scored.append((len(_terms(sent) & query_terms), -idx, idx, sent))
+    scored.sort(reverse=True)
+    chosen: list[int] = []
+    used = 0
+    for _, _, idx, sent in scored:
+        cost = approx_tokens(sent) + 1
+        if chosen and used + cost > max_tokens:
+            continue
+        chosen.append(idx)
+        used += cost
+    if len(chosen) == len(spans):
+        return None
+    return " ".join(text[spans[i].start : spans[i].end] for i in sorted(chosen))
+
+
+def pack_evidence(
+    *,
+    question: str,
+    evidence_packets: list[dict[str, Any]],
+    detected_entities: Optional[list[dict[str, Any]]] = None,
+    used_edges: Optional[list[dict[str, Any]]] = None,
+    argument_chains: Optional[list[dict[str, Any]]] = None,
+    budget_tokens: Optional[int] = None,
+    max_packet_tokens: Optional[int] = None,
+    scores: Optional[dict[str, float]] = None,
+) -> PackedEvidence:
+    """Rank, dedup, trim and budget the interpreter evidence (packets are shallow-copied)."""
+    packets = list(evidence_packets or [])
+    edges = list(used_edges or [])
+    chains = list(argument_chains or [])
+    entities = list(detected_entities or [])
+    budget = evidence_budget_tokens() if budget_tokens is None else max(0, int(budget_tokens))
+    per_packet = packet_max_tokens() if max_packet_tokens is None else max(0, int(max_packet_tokens))
+    scores = scores or {}
+
+    report = PackReport(
+        budget_tokens=budget,
+        tokens_before=_json_tokens(packets) + _json_tokens(edges) + _json_tokens(chains),
+        packets_in=len(packets),
+        edges_in=len(edges) + len(chains),
+    )
+
+    query_terms = _terms(question)
+    for ent in entities:
+        query_terms |= _terms(str(ent.get("name_ar") or ""))
+
+    n = len(packets)
+    ranked: list[tuple[float, int, dict[str, Any], str]] = []
+    for idx, p in enumerate(packets):
+        norm = normalize_for_matching(str(p.get("text_ar") or ""))
+        cid = str(p.get("chunk_id") or "")
+        base = float(scores[cid]) if cid in scores else 1.0 - idx / float(max(1, n))
+        ranked.append((base + _COVERAGE_WEIGHT * _entity_coverage(p, norm, entities), idx, p, norm))
+    ranked.sort(key=lambda r: (-r[0], r[1]))
+
+    side_cost = _json_tokens(edges) + _json_tokens(chains)
+    packet_budget = budget - min(side_cost, int(budget * _EDGE_SHARE)) if budget else 0
+
+    kept: list[dict[str, Any]] = []
+    kept_shingles: list[set] = []
+    used = 2  # "[]"
+    for _, _, p, norm in ranked:
+        cid = str(p.get("chunk_id") or "")
+        sh = _shingles(norm)
+        if any(_jaccard(sh, other) >= _DUP_JACCARD for other in kept_shingles):
+            report.duplicates_dropped += 1
+            report.dropped_chunk_ids.append(cid)
+            continue
+        packed = dict(p)
+        text = str(p.get("text_ar") or "")
+        if per_packet and approx_tokens(text) > per_packet:
+            trimmed = _trim_to_spans(text, query_terms, per_packet)
+            if trimmed is not None:
+                packed["text_ar"] = trimmed
+                report.packets_trimmed += 1
+        cost = _json_tokens(packed) + 1
+        # Reason: never send an empty evidence list; the top packet always fits.
+        if budget and kept and used + cost > packet_budget:
+            report.dropped_chunk_ids.append(cid)
+            continue
+        kept.append(packed)
+        kept_shingles.append(sh)
+        used += cost
+
+    def _fit(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        nonlocal used
+        out = []
+        for it in items:
+            cost = _json_tokens(it) + 1
+            if budget and used + cost > budget:
+                continue
+            out.append(it)
+            used += cost
+        return out
+
+    kept_edges = _fit(edges)
+    kept_chains = _fit(chains)
+
+    report.packets_kept = len(kept)
+    report.edges_kept = len(kept_edges) + len(kept_chains)
+    report.kept_chunk_ids = [str(p.get("chunk_id") or "") for p in kept]
+    report.tokens_after = _json_tokens(kept) + _json_tokens(kept_edges) + _json_tokens(kept_chains)
+    return PackedEvidence(evidence_packets=kept, used_edges=kept_edges, argument_chains=kept_chains, report=report)
+
+
+def citation_impact(citations: list[dict[str, Any]], report: PackReport) -> dict[str, int]:
+    """How the model's citations relate to the packed vs. dropped chunk ids."""
+    kept = set(report.kept_chunk_ids)
+    dropped = set(report.dropped_chunk_ids)
+    out = {"cited": 0, "cited_kept": 0, "cited_dropped": 0, "cited_unknown": 0}
+    for c in citations or []:
+        cid = str((c or {}).get("chunk_id") or "")
+        if not cid:
+            continue
+        out["cited"] += 1
+        if cid in kept:
+            out["cited_kept"] += 1
+        elif cid in dropped:
+            out["cited_dropped"] += 1
+        else:
+            out["cited_unknown"] += 1
+    return out
@@ -0,0 +1,68 @@
+"""
+Local fake-latency LLM provider.
+
+A MockProvider that sleeps according to a latency schedule before answering, so hedging,
+deadline propagation and timeout handling can be exercised without Azure. It honours the
+request deadline (`effective_timeout`) the same way the Azure providers do.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional, Sequence, Union
+
+from apps.api.llm.deadline import effective_timeout
+from apps.api.llm.gpt5_client_azure import (
+    LLMRequest,
+    LLMResponse,
+    MockProvider,
+    ProviderConfig,
+    ProviderType,
+    deadline_exceeded_response,
+    timed_out_response,
+)
+
+
+class FakeLatencyProvider(MockProvider):
+    """MockProvider with per-call latency (cycled through `latencies_s`)."""
+
+    def __init__(
+        self,
+        latencies_s: Union[float, Sequence[float]] = 0.0,
+        default_response: str = "Mock response",
+        default_json: Optional[dict] = None,
+        deployment_name: str = "fake",
+        timeout: int = 180,
+    ):
+        super().__init__(default_response=default_response, default_json=default_json)
+        if isinstance(latencies_s, (int, float)):
+            latencies_s = [float(latencies_s)]
+        self.latencies_s = [float(x) for x in latencies_s] or [0.0]
+        self.config = ProviderConfig(
+            provider_type=ProviderType.MOCK,
+            endpoint="",
+            api_key="",
+            api_version="",
+            deployment_name=deployment_name,
+            timeout=timeout,
+        )
+        self.calls = 0
+        self.cancelled = 0
+        self.timed_out = 0
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        latency = self.latencies_s[self.calls % len(self.latencies_s)]
+        self.calls += 1
+        budget = effective_timeout(self.config.timeout)
+        if budget <= 0:
+            self.timed_out += 1
+            return deadline_exceeded_response()
+        try:
+            await asyncio.sleep(min(latency, budget))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if latency > budget:
+            self.timed_out += 1
+            return timed_out_response(budget)
+        return await super().complete(request)
@@ -17,6 +17,9 @@ from pathlib import Path
 from typing import Any, Optional
 
 from apps.api.llm.azure_env_fallback import load_azure_normalized_config_from_env
+from apps.api.llm.deadline import effective_timeout
+from apps.api.llm.token_params import LEGACY as LEGACY_TOKEN_PARAM
+from apps.api.llm.token_params import remember_token_param, token_param_for, token_param_unsupported
 
 class ProviderType(str, Enum):
     """Supported provider types."""
@@ -105,6 +108,7 @@ class LLMRequest:
     response_format: Optional[dict] = None  # JSON schema for structured output
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
+    cache: bool = False  # opt-in to the response cache (deterministic sub-calls only)
 
 
 @dataclass
@@ -119,6 +123,30 @@ class LLMResponse:
     error: Optional[str] = None
 
 
+def timed_out_response(timeout_s: float) -> LLMResponse:
+    return LLMResponse(content="", error=f"LLM call timed out after {timeout_s:.0f}s", finish_reason="timeout")
+
+
+def deadline_exceeded_response() -> LLMResponse:
+    return LLMResponse(content="", error="LLM call skipped: request deadline exceeded", finish_reason="timeout")
+
+
+def _build_azure_client(config: ProviderConfig, http_client: Any = None):
+    """AsyncAzureOpenAI client; `http_client` lets callers share a keep-alive pool."""
+    from openai import AsyncAzureOpenAI
+
+    kwargs: dict[str, Any] = {}
+    if http_client is not None:
+        kwargs["http_client"] = http_client
+    return AsyncAzureOpenAI(
+        azure_endpoint=config.endpoint,
+        api_key=config.api_key,
+        api_version=config.api_version,
+        timeout=float(config.timeout),
+        **kwargs,
+    )
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
@@ -148,22 +176,16 @@ class AzureResponsesProvider(LLMProvider):
     This is the preferred provider per Microsoft guidance.
     """
 
-    def __init__(self, config: ProviderConfig):
-        """Initialize with configuration."""
+    def __init__(self, config: ProviderConfig, http_client: Any = None):
+        """Initialize with configuration (optionally sharing a pooled httpx.AsyncClient)."""
         self.config = config
+        self._http_client = http_client
         self._client = None
 
     async def _get_client(self):
         """Get or create the OpenAI client."""
         if self._client is None:
-            from openai import AsyncAzureOpenAI
-
-            self._client = AsyncAzureOpenAI(
-                azure_endpoint=self.config.endpoint,
-                api_key=self.config.api_key,
-                api_version=self.config.api_version,
-                timeout=float(self.config.timeout),
-            )
+            self._client = _build_azure_client(self.config, self._http_client)
         return self._client
 
     async def complete(self, request: LLMRequest) -> LLMResponse:
@@ -190,7 +212,15 @@ class AzureResponsesProvider(LLMProvider):
                     "json_schema": request.response_format,
                 }
 
-            response = await client.responses.create(**params)
+            import asyncio
+
+            llm_timeout = effective_timeout(self.config.timeout or 120)
+            if llm_timeout <= 0:
+                return deadline_exceeded_response()
+            try:
+                response = await asyncio.wait_for(client.responses.create(**params), timeout=llm_timeout)
+            except asyncio.TimeoutError:
+                return timed_out_response(llm_timeout)
 
             # Extract content (SDK provides output_text; fallback to parsing output blocks)
             content = getattr(response, "output_text", "") or ""
@@ -249,22 +279,16 @@ class AzureChatProvider(LLMProvider):
     This is the fallback provider for compatibility.
     """
 
-    def __init__(self, config: ProviderConfig):
-        """Initialize with configuration."""
+    def __init__(self, config: ProviderConfig, http_client: Any = None):
+        """Initialize with configuration (optionally sharing a pooled httpx.AsyncClient)."""
         self.config = config
+        self._http_client = http_client
         self._client = None
 
     async def _get_client(self):
         """Get or create the OpenAI client."""
         if self._client is None:
-            from openai import AsyncAzureOpenAI
-
-            self._client = AsyncAzureOpenAI(
-                azure_endpoint=self.config.endpoint,
-                api_key=self.config.api_key,
-                api_version=self.config.api_version,
-                timeout=float(self.config.timeout),
-            )
+            self._client = _build_azure_client(self.config, self._http_client)
         return self._client
 
     async def complete(self, request: LLMRequest) -> LLMResponse:
@@ -279,8 +303,8 @@ class AzureChatProvider(LLMProvider):
 
             # NOTE:
             # Some Azure deployments (e.g., GPT-5.1 in certain API versions) reject `max_tokens`
-            # and require `max_completion_tokens`. We prefer max_completion_tokens and retry once
-            # with max_tokens for backward compatibility.
+            # and require `max_completion_tokens`. We prefer max_completion_tokens, retry once
+            # with max_tokens, and remember the working name per deployment (token_params).
             token_limit = request.max_tokens or self.config.max_tokens
 
             base_params: dict[str, Any] = {
@@ -303,37 +327,28 @@ class AzureChatProvider(LLMProvider):
                 params[param_name] = token_limit
                 return await client.chat.completions.create(**params)
 
-            # Use explicit asyncio timeout to prevent hanging
-            llm_timeout = self.config.timeout or 120
+            # Use explicit asyncio timeout to prevent hanging; clamp to the state deadline.
+            token_param = token_param_for(self.config)
+            llm_timeout = effective_timeout(self.config.timeout or 120)
+            if llm_timeout <= 0:
+                return deadline_exceeded_response()
             
             try:
-                response = await asyncio.wait_for(
-                    _call_with("max_completion_tokens"),
-                    timeout=llm_timeout
-                )
+                response = await asyncio.wait_for(_call_with(token_param), timeout=llm_timeout)
             except asyncio.TimeoutError:
-                return LLMResponse(
-                    content="",
-                    error=f"LLM call timed out after {llm_timeout}s",
-                    finish_reason="timeout"
-                )
+                return timed_out_response(llm_timeout)
             except Exception as e:
-                msg = str(e)
-                # If server doesn't support max_completion_tokens, retry with max_tokens.
-                if "max_completion_tokens" in msg and "Unsupported parameter" in msg:
-                    try:
-                        response = await asyncio.wait_for(
-                            _call_with("max_tokens"),
-                            timeout=llm_timeout
-                        )
-                    except asyncio.TimeoutError:
-                        return LLMResponse(
-                            content="",
-                            error=f"LLM call timed out after {llm_timeout}s",
-                            finish_reason="timeout"
-                        )
-                else:
+                # If server (or the pinned SDK) doesn't support max_completion_tokens, retry with max_tokens.
+                if token_param == LEGACY_TOKEN_PARAM or not token_param_unsupported(str(e)):
                     raise
+                remember_token_param(self.config, LEGACY_TOKEN_PARAM)
+                llm_timeout = effective_timeout(self.config.timeout or 120)
+                if llm_timeout <= 0:
+                    return deadline_exceeded_response()
+                try:
+                    response = await asyncio.wait_for(_call_with(LEGACY_TOKEN_PARAM), timeout=llm_timeout)
+                except asyncio.TimeoutError:
+                    return timed_out_response(llm_timeout)
 
             # Some SDK/model combinations may return non-string message content.
             # Best-effort extraction without assuming a fixed schema.
@@ -440,12 +455,13 @@ class MockProvider(LLMProvider):
         return True
 
 
-def create_provider(config: Optional[ProviderConfig] = None) -> LLMProvider:
+def create_provider(config: Optional[ProviderConfig] = None, http_client: Any = None) -> LLMProvider:
     """
     Create an LLM provider from configuration.
 
     Args:
         config: Provider configuration. If None, loads from environment.
+        http_client: Optional shared httpx.AsyncClient (connection pool) for Azure providers.
 
     Returns:
         Configured LLMProvider instance.
@@ -454,14 +470,14 @@ def create_provider(config: Optional[ProviderConfig] = None) -> LLMProvider:
         config = ProviderConfig.from_env()
 
     if config.provider_type == ProviderType.AZURE_RESPONSES:
-        return AzureResponsesProvider(config)
+        return AzureResponsesProvider(config, http_client=http_client)
     elif config.provider_type == ProviderType.AZURE_CHAT:
-        return AzureChatProvider(config)
+        return AzureChatProvider(config, http_client=http_client)
     elif config.provider_type == ProviderType.MOCK:
         return MockProvider()
     else:
         # Default to Azure Responses
-        return AzureResponsesProvider(config)
+        return AzureResponsesProvider(config, http_client=http_client)
 
 
 # Singleton provider instance
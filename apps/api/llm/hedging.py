@@ -0,0 +1,170 @@
+"""
+Hedged LLM requests (tail-latency control).
+
+Why:
+- A slow primary completion held the whole request for up to the state timeout even when a
+  second deployment could answer in a fraction of the time.
+
+`HedgedProvider` sends the request to the primary deployment; if it has not produced a
+valid response after the hedge delay (p90 of recent primary latencies, LLM_HEDGE_DELAY_S
+until enough samples exist), the same request goes to the alternate deployment and the first
+valid result wins (structured requests must parse as JSON). A provider that raises counts
+as an invalid response, so the other request keeps running; the call only raises when both
+do. The loser is cancelled. Hedges are never fired when the remaining request deadline is
+shorter than the delay.
+
+Streaming (`complete_stream`) is not hedged: interleaving tokens from two drafts would
+break the stream contract, so it goes to the primary only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from apps.api.llm.deadline import remaining_s
+from apps.api.llm.gpt5_client_azure import LLMProvider, LLMRequest, LLMResponse
+from apps.api.llm.streaming import stream_complete
+
+
+class LatencyWindow:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=max(1, int(size)))
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(float(seconds))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self._samples)
+        if not data:
+            return None
+        idx = min(len(data) - 1, max(0, int(round(q * (len(data) - 1)))))
+        return data[idx]
+
+
+def _valid(request: LLMRequest, response: Optional[LLMResponse]) -> bool:
+    if response is None or response.error is not None:
+        return False
+    if request.response_format:
+        return isinstance(response.parsed_json, dict)
+    return bool(response.content)
+
+
+def _outcome(task: asyncio.Future) -> LLMResponse:
+    """Result of a finished call; an exception becomes an invalid (error) response."""
+    exc = task.exception()
+    if exc is not None:
+        return LLMResponse(content="", error=str(exc) or type(exc).__name__)
+    return task.result()
+
+
+class HedgedProvider(LLMProvider):
+    """Primary provider with a delayed backup request to an alternate deployment."""
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        alternate: LLMProvider,
+        *,
+        initial_delay_s: float = 8.0,
+        quantile: float = 0.9,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.primary = primary
+        self.alternate = alternate
+        self.config = getattr(primary, "config", None)
+        self.initial_delay_s = float(initial_delay_s)
+        self.quantile = float(quantile)
+        self.min_samples = max(1, int(min_samples))
+        self.latencies = LatencyWindow(window)
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+
+    def hedge_delay_s(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay_s
+        q = self.latencies.quantile(self.quantile)
+        return self.initial_delay_s if q is None else q
+
+    async def _timed_primary(self, request: LLMRequest) -> LLMResponse:
+        t0 = time.perf_counter()
+        try:
+            response = await self.primary.complete(request)
+        except asyncio.CancelledError:
+            # Reason: record the (censored) latency of a hedged-away call, or the window would
+            # only keep fast samples and the p90 delay would drift down.
+            self.latencies.add(time.perf_counter() - t0)
+            raise
+        if _valid(request, response):
+            self.latencies.add(time.perf_counter() - t0)
+        return response
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        delay = self.hedge_delay_s()
+        primary = asyncio.ensure_future(self._timed_primary(request))
+        backup: Optional[asyncio.Future] = None
+        try:
+            left = remaining_s()
+            if left is not None and left <= delay:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done and _valid(request, _outcome(primary)):
+                return primary.result()
+
+            self.hedges_fired += 1
+            backup = asyncio.ensure_future(self.alternate.complete(request))
+            pending: set[asyncio.Future] = {primary, backup}
+            results: dict[asyncio.Future, LLMResponse] = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[task] = _outcome(task)
+                    if _valid(request, results[task]):
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return results[task]
+            # Neither response is valid: raise only if both calls raised, otherwise surface
+            # the primary's response (or the backup's, if only the primary raised).
+            if primary.exception() is not None:
+                if backup.exception() is not None:
+                    raise primary.exception()
+                return results[backup]
+            return results[primary]
+        finally:
+            # Reason: cancel the loser (or both, if the caller itself was cancelled).
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def complete_stream(self, request: LLMRequest, on_delta: Callable[[str], None]) -> LLMResponse:
+        return await stream_complete(self.primary, request, on_delta)
+
+    async def health_check(self) -> bool:
+        return await self.primary.health_check()
+
+    def stats(self) -> dict[str, Any]:
+        p = self.latencies.quantile(self.quantile)
+        return {
+            "alternate": str(getattr(getattr(self.alternate, "config", None), "deployment_name", "") or ""),
+            "calls": self.calls,
+            "hedges_fired": self.hedges_fired,
+            "hedge_wins": self.hedge_wins,
+            "delay_s": round(self.hedge_delay_s(), 3),
+            "primary_latency_q": round(p, 3) if p is not None else None,
+            "samples": len(self.latencies),
+        }
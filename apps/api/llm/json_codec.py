@@ -0,0 +1,50 @@
+"""
+Fast JSON serialization for LLM prompt payloads.
+
+Why:
+- Prompt payloads (evidence packets, edges, entities) were first copied by a recursive
+  `_sanitize_for_json` walk and then encoded with `json.dumps`; both ran per LLM call.
+
+`dumps` encodes in one pass with orjson when installed (UUID/datetime/dataclass/enum are
+native; other objects fall back to `vars(obj)` like the old sanitizer) and otherwise uses
+the stdlib encoder with the same default hook. Output is compact UTF-8 text (no ASCII
+escaping), which is also what the model sees.
+"""
+
+from __future__ import annotations
+
+import json
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Fallback hook for types neither encoder handles natively."""
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to compact JSON text (non-ASCII kept as-is)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except (TypeError, orjson.JSONEncodeError):
+            # Reason: e.g. ints beyond 64 bits or recursion limits; the stdlib encoder copes.
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
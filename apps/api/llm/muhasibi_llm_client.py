@@ -13,38 +13,26 @@ Hard constraints:
 from __future__ import annotations
 
 import json
+import logging
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Optional
-from uuid import UUID
+from typing import Any, Callable, Optional
 
-from apps.api.llm.gpt5_client_azure import LLMProvider, LLMRequest
+from apps.api.llm.evidence_packer import PackReport, citation_impact, evidence_packing_enabled, pack_evidence
+from apps.api.llm.gpt5_client_azure import LLMProvider, LLMRequest, LLMResponse
+from apps.api.llm.json_codec import dumps as _dumps_json
+from apps.api.llm.prompt_store import frozen_schema, get_prompt_store
+from apps.api.llm.streaming import AnswerFieldExtractor, stream_complete
 
+logger = logging.getLogger(__name__)
 
-def _sanitize_for_json(obj: Any) -> Any:
-    """
-    Convert non-JSON-serializable objects to strings.
-    
-    This handles UUIDs and other types that can't be directly serialized.
-    """
-    if isinstance(obj, dict):
-        return {k: _sanitize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_sanitize_for_json(item) for item in obj]
-    elif isinstance(obj, UUID):
-        return str(obj)
-    elif hasattr(obj, "__dict__"):
-        return _sanitize_for_json(vars(obj))
-    return obj
-
-
-_PROMPTS_DIR = Path(__file__).parent / "prompts"
+StreamSink = Callable[[str, dict[str, Any]], None]
 
 
 def _read_prompt(name: str) -> str:
-    return (_PROMPTS_DIR / name).read_text(encoding="utf-8")
+    return get_prompt_store().text(name)
 
 
+@frozen_schema
 def _json_schema_for_purpose_path() -> dict[str, Any]:
     return {
         "name": "purpose_path",
@@ -73,6 +61,7 @@ def _json_schema_for_purpose_path() -> dict[str, Any]:
     }
 
 
+@frozen_schema
 def _json_schema_for_interpreter() -> dict[str, Any]:
     return {
         "name": "interpreter_output",
@@ -115,6 +104,7 @@ def _json_schema_for_interpreter() -> dict[str, Any]:
     }
 
 
+@frozen_schema
 def _json_schema_for_query_rewrite_ar() -> dict[str, Any]:
     return {
         "name": "query_rewrite_ar",
@@ -141,6 +131,7 @@ def _json_schema_for_query_rewrite_ar() -> dict[str, Any]:
     }
 
 
+@frozen_schema
 def _json_schema_for_intent_classifier_ar() -> dict[str, Any]:
     return {
         "name": "intent_classifier_ar",
@@ -207,8 +198,26 @@ class InterpretResult:
 class MuhasibiLLMClient:
     """High-level Muḥāsibī LLM client."""
 
-    def __init__(self, provider: LLMProvider):
+    def __init__(self, provider: LLMProvider, stream_sink: Optional[StreamSink] = None):
         self.provider = provider
+        # Streaming endpoints receive ("draft_reset", {}) then ("token", {"text": ...}) per interpret call.
+        self.stream_sink = stream_sink
+        # Last interpret() evidence-packing report (+ citation impact); None when packing is off.
+        self.last_evidence_pack: Optional[dict[str, Any]] = None
+
+    async def _complete_interpret(self, req: LLMRequest) -> LLMResponse:
+        if self.stream_sink is None:
+            return await self.provider.complete(req)
+        sink = self.stream_sink
+        extractor = AnswerFieldExtractor("answer_ar")
+
+        def _on_delta(delta: str) -> None:
+            text = extractor.feed(delta)
+            if text:
+                sink("token", {"text": text})
+
+        sink("draft_reset", {})
+        return await stream_complete(self.provider, req, _on_delta)
 
     async def purpose_path(self, question: str) -> Optional[PurposePathResult]:
         system_prompt = _read_prompt("purpose_path.md")
@@ -218,6 +227,7 @@ class MuhasibiLLMClient:
             response_format=_json_schema_for_purpose_path(),
             temperature=0.2,
             max_tokens=800,
+            cache=True,
         )
         resp = await self.provider.complete(req)
         if resp.error:
@@ -249,6 +259,7 @@ class MuhasibiLLMClient:
         used_edges: Optional[list[dict[str, Any]]] = None,
         argument_chains: Optional[list[dict[str, Any]]] = None,
         fallback_context: Optional[dict[str, Any]] = None,
+        packet_scores: Optional[dict[str, float]] = None,
     ) -> Optional[InterpretResult]:
         prompt_name = "interpreter.md"
         if mode == "debate":
@@ -261,25 +272,45 @@ class MuhasibiLLMClient:
             prompt_name = "interpreter_natural_chat_ar.md"
 
         system_prompt = _read_prompt(prompt_name)
+        packets_json = list(evidence_packets or [])
+        edges_json = list(used_edges or [])
+        chains_json = list(argument_chains or [])
+        self.last_evidence_pack = None
+        pack = None
+        if evidence_packing_enabled():
+            try:
+                pack = pack_evidence(
+                    question=question,
+                    evidence_packets=packets_json,
+                    detected_entities=detected_entities,
+                    used_edges=edges_json,
+                    argument_chains=chains_json,
+                    scores=packet_scores,
+                )
+                packets_json, edges_json, chains_json = pack.evidence_packets, pack.used_edges, pack.argument_chains
+            except Exception as e:
+                # Fail open: send the unpacked evidence.
+                logger.warning(f"[EVIDENCE_PACK] packing failed: {e}")
+                pack = None
         user_payload = {
             "question": question,
-            "evidence_packets": _sanitize_for_json(evidence_packets),
-            "detected_entities": _sanitize_for_json(detected_entities),
+            "evidence_packets": packets_json,
+            "detected_entities": detected_entities,
             "mode": mode,
-            "used_edges": _sanitize_for_json(used_edges or []),
-            "argument_chains": _sanitize_for_json(argument_chains or []),
-            "fallback_context": _sanitize_for_json(fallback_context or {}),
+            "used_edges": edges_json,
+            "argument_chains": chains_json,
+            "fallback_context": fallback_context or {},
         }
         # Natural chat needs more tokens for flowing scholarly prose
         tokens = 2000 if mode == "natural_chat" else 1200
         req = LLMRequest(
             system_prompt=system_prompt,
-            user_message=json.dumps(user_payload, ensure_ascii=False),
+            user_message=_dumps_json(user_payload),
             response_format=_json_schema_for_interpreter(),
             temperature=0.3 if mode == "natural_chat" else 0.2,
             max_tokens=tokens,
         )
-        resp = await self.provider.complete(req)
+        resp = await self._complete_interpret(req)
         if resp.error:
             return None
         data = resp.parsed_json
@@ -289,7 +320,7 @@ class MuhasibiLLMClient:
             except Exception:
                 return None
         try:
-            return InterpretResult(
+            result = InterpretResult(
                 answer_ar=str(data["answer_ar"]),
                 citations=list(data["citations"]),
                 entities=list(data["entities"]),
@@ -298,6 +329,22 @@ class MuhasibiLLMClient:
             )
         except Exception:
             return None
+        if pack is not None:
+            self._record_evidence_pack(pack.report, result.citations, resp)
+        return result
+
+    def _record_evidence_pack(self, report: PackReport, citations: list[dict[str, Any]], resp: LLMResponse) -> None:
+        stats = report.as_dict()
+        stats["citations"] = citation_impact(citations, report)
+        stats["prompt_tokens"] = int((resp.usage or {}).get("prompt_tokens") or 0)
+        self.last_evidence_pack = stats
+        logger.info(
+            f"[EVIDENCE_PACK] packets={stats['packets_kept']}/{stats['packets_in']} "
+            f"dups={stats['duplicates_dropped']} trimmed={stats['packets_trimmed']} "
+            f"edges={stats['edges_kept']}/{stats['edges_in']} "
+            f"est_tokens={stats['tokens_before']}->{stats['tokens_after']} saved={stats['saved_tokens']} "
+            f"prompt_tokens={stats['prompt_tokens']} citations={stats['citations']}"
+        )
 
     async def query_rewrite_ar(
         self,
@@ -323,10 +370,11 @@ class MuhasibiLLMClient:
         }
         req = LLMRequest(
             system_prompt=system_prompt,
-            user_message=json.dumps(user_payload, ensure_ascii=False),
+            user_message=_dumps_json(user_payload),
             response_format=_json_schema_for_query_rewrite_ar(),
             temperature=0.2,
             max_tokens=500,
+            cache=True,
         )
         resp = await self.provider.complete(req)
         if resp.error:
@@ -363,15 +411,16 @@ class MuhasibiLLMClient:
         system_prompt = _read_prompt("intent_classifier_ar.md")
         user_payload = {
             "question": question,
-            "detected_entities": _sanitize_for_json(detected_entities),
-            "keywords": _sanitize_for_json(keywords),
+            "detected_entities": detected_entities,
+            "keywords": keywords,
         }
         req = LLMRequest(
             system_prompt=system_prompt,
-            user_message=json.dumps(user_payload, ensure_ascii=False),
+            user_message=_dumps_json(user_payload),
             response_format=_json_schema_for_intent_classifier_ar(),
             temperature=0.0,
             max_tokens=400,
+            cache=True,
         )
         resp = await self.provider.complete(req)
         if resp.error:
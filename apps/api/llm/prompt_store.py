@@ -0,0 +1,143 @@
+"""
+Prompt templates and structured-output schemas loaded once per process.
+
+Why:
+- `_read_prompt` hit the filesystem on every LLM call and the `_json_schema_for_*`
+  helpers rebuilt their dicts each time.
+
+`PromptStore.load()` reads and hashes every `*.md` in `apps/api/llm/prompts/` (the app
+lifespan calls `warm_prompt_store()`); later lookups are dict hits. Schemas are built at
+import and deep-frozen (`freeze`) so the shared instances cannot be mutated by a caller.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    text: str
+    sha1: str
+
+
+class PromptStore:
+    """In-memory prompt cache keyed by file name (e.g. "interpreter.md")."""
+
+    def __init__(self, prompts_dir: Path = PROMPTS_DIR):
+        self.prompts_dir = Path(prompts_dir)
+        self._prompts: dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self.disk_reads = 0
+
+    def _read(self, name: str) -> PromptTemplate:
+        text = (self.prompts_dir / name).read_text(encoding="utf-8")
+        self.disk_reads += 1
+        return PromptTemplate(name=name, text=text, sha1=hashlib.sha1(text.encode("utf-8")).hexdigest())
+
+    def load(self) -> int:
+        """(Re)load every prompt file; returns the number of templates."""
+        loaded = {p.name: self._read(p.name) for p in sorted(self.prompts_dir.glob("*.md"))}
+        with self._lock:
+            self._prompts = loaded
+        return len(loaded)
+
+    def get(self, name: str) -> PromptTemplate:
+        tpl = self._prompts.get(name)
+        if tpl is None:
+            # Reason: prompts added after startup (or a store that was never warmed) still work.
+            tpl = self._read(name)
+            with self._lock:
+                self._prompts[name] = tpl
+        return tpl
+
+    def text(self, name: str) -> str:
+        return self.get(name).text
+
+    def hashes(self) -> dict[str, str]:
+        return {name: tpl.sha1 for name, tpl in sorted(self._prompts.items())}
+
+
+_store: Optional[PromptStore] = None
+_store_lock = threading.Lock()
+
+
+def get_prompt_store() -> PromptStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PromptStore()
+        return _store
+
+
+def warm_prompt_store() -> dict[str, str]:
+    """Startup phase: load and hash all prompts; returns {name: sha1}."""
+    store = get_prompt_store()
+    store.load()
+    return store.hashes()
+
+
+class FrozenDict(dict):
+    """dict that rejects mutation; still a dict for json/orjson/openai serialization."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("frozen schema is read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly  # type: ignore[assignment]
+    __ior__ = _readonly  # type: ignore[assignment]
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """list that rejects mutation (compares equal to the equivalent list)."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("frozen schema is read-only")
+
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = sort = reverse = _readonly  # type: ignore[assignment]
+    __iadd__ = __imul__ = _readonly  # type: ignore[assignment]
+
+    def __copy__(self) -> "FrozenList":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenList":
+        return self
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(obj: Any) -> Any:
+    """Recursively convert dicts/lists into FrozenDict/FrozenList."""
+    if isinstance(obj, dict):
+        return FrozenDict({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
+
+
+def frozen_schema(build: Callable[[], dict[str, Any]]) -> Callable[[], dict[str, Any]]:
+    """Decorator: build the schema once at import and always return that frozen instance."""
+    schema = freeze(build())
+
+    def get() -> dict[str, Any]:
+        return schema
+
+    get.__name__ = build.__name__
+    get.__doc__ = build.__doc__
+    return get
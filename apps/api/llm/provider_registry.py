@@ -0,0 +1,250 @@
+"""
+Process-level LLM provider registry.
+
+Why:
+- /ask used to call `create_provider()` per request, building a new AsyncAzureOpenAI client
+  (own HTTP pool, fresh TLS handshakes) every time.
+- The registry keeps one provider per deployment, backed by one keep-alive
+  `httpx.AsyncClient`, and bounds in-flight completions per deployment
+  (LLM_MAX_CONCURRENCY_PER_DEPLOYMENT). Pools are closed from the FastAPI lifespan.
+- Optional hedging (LLM_HEDGE_DEPLOYMENT) sends slow requests to a second deployment.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Optional
+
+from apps.api.llm.gpt5_client_azure import (
+    LLMProvider,
+    LLMRequest,
+    LLMResponse,
+    ProviderConfig,
+    ProviderType,
+    create_provider,
+)
+from apps.api.llm.hedging import HedgedProvider
+from apps.api.llm.response_cache import CachingProvider, LLMResponseCache, get_llm_response_cache
+from apps.api.llm.streaming import stream_complete
+
+logger = logging.getLogger(__name__)
+
+RegistryKey = tuple[str, str, str, str]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+class PooledProvider(LLMProvider):
+    """Shared provider for one deployment with a per-deployment concurrency limit."""
+
+    def __init__(self, inner: LLMProvider, max_concurrency: int, http_client: Any = None):
+        self.inner = inner
+        self.config = getattr(inner, "config", None)
+        self.max_concurrency = int(max_concurrency)
+        self.http_client = http_client
+        self.in_flight = 0
+        self.completed = 0
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._sem_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Reason: asyncio primitives bind to the loop that first waits on them.
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._sem_loop = loop
+        return self._sem
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        async with self._semaphore():
+            self.in_flight += 1
+            try:
+                return await self.inner.complete(request)
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+
+    async def complete_stream(self, request: LLMRequest, on_delta: Callable[[str], None]) -> LLMResponse:
+        async with self._semaphore():
+            self.in_flight += 1
+            try:
+                return await stream_complete(self.inner, request, on_delta)
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
+
+    async def aclose(self) -> None:
+        if self.http_client is not None:
+            await self.http_client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "pooled_http": self.http_client is not None,
+        }
+
+
+class ProviderRegistry:
+    """Providers keyed by (provider_type, endpoint, api_version, deployment)."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        keepalive_expiry_s: Optional[float] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        hedge_deployment: Optional[str] = None,
+        hedge_delay_s: Optional[float] = None,
+        hedge_quantile: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency or _env_int("LLM_MAX_CONCURRENCY_PER_DEPLOYMENT", 8)
+        self.max_connections = max_connections or _env_int("LLM_HTTP_MAX_CONNECTIONS", self.max_concurrency)
+        self.keepalive_expiry_s = (
+            keepalive_expiry_s if keepalive_expiry_s is not None else _env_float("LLM_HTTP_KEEPALIVE_EXPIRY_S", 30.0)
+        )
+        self.response_cache = response_cache
+        self.hedge_deployment = (
+            hedge_deployment if hedge_deployment is not None else (os.getenv("LLM_HEDGE_DEPLOYMENT", "") or "").strip()
+        )
+        self.hedge_delay_s = hedge_delay_s if hedge_delay_s is not None else _env_float("LLM_HEDGE_DELAY_S", 8.0)
+        self.hedge_quantile = hedge_quantile if hedge_quantile is not None else _env_float("LLM_HEDGE_QUANTILE", 0.9)
+        self._pooled: dict[RegistryKey, PooledProvider] = {}
+        self._hedged: dict[RegistryKey, HedgedProvider] = {}
+        self._providers: dict[RegistryKey, LLMProvider] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(config: ProviderConfig) -> RegistryKey:
+        return (config.provider_type.value, config.endpoint, config.api_version, config.deployment_name)
+
+    def _http_client(self, config: ProviderConfig) -> Any:
+        if config.provider_type == ProviderType.MOCK:
+            return None
+        import httpx
+
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry_s,
+            ),
+            timeout=httpx.Timeout(float(config.timeout)),
+            follow_redirects=True,
+        )
+
+    def _pooled_for(self, config: ProviderConfig) -> PooledProvider:
+        # Caller holds self._lock.
+        key = self.key_for(config)
+        pooled = self._pooled.get(key)
+        if pooled is None:
+            http_client = self._http_client(config)
+            pooled = PooledProvider(
+                create_provider(config, http_client=http_client),
+                max_concurrency=self.max_concurrency,
+                http_client=http_client,
+            )
+            self._pooled[key] = pooled
+        return pooled
+
+    def _hedge_enabled(self, config: ProviderConfig) -> bool:
+        return bool(
+            self.hedge_deployment
+            and self.hedge_deployment != config.deployment_name
+            and config.provider_type != ProviderType.MOCK
+        )
+
+    def get(self, config: ProviderConfig) -> LLMProvider:
+        """
+        Return the shared provider for this deployment, creating it on first use.
+
+        With LLM_HEDGE_DEPLOYMENT set, the pooled provider is wrapped in a HedgedProvider
+        whose backup requests go to that deployment's pool. With a response cache, the
+        result is wrapped so cache hits never wait for a concurrency slot.
+        """
+        key = self.key_for(config)
+        with self._lock:
+            provider = self._providers.get(key)
+            if provider is None:
+                provider = self._pooled_for(config)
+                if self._hedge_enabled(config):
+                    alternate = self._pooled_for(replace(config, deployment_name=self.hedge_deployment))
+                    hedged = HedgedProvider(
+                        provider,
+                        alternate,
+                        initial_delay_s=self.hedge_delay_s,
+                        quantile=self.hedge_quantile,
+                    )
+                    self._hedged[key] = hedged
+                    provider = hedged
+                if self.response_cache is not None:
+                    provider = CachingProvider(provider, self.response_cache, namespace=config.deployment_name)
+                self._providers[key] = provider
+            return provider
+
+    async def aclose(self) -> None:
+        """Close every pooled HTTP client (idempotent)."""
+        with self._lock:
+            providers = list(self._pooled.values())
+            self._pooled.clear()
+            self._hedged.clear()
+            self._providers.clear()
+        for provider in providers:
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning(f"LLM provider close failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out = {key[3] or key[0]: p.stats() for key, p in self._pooled.items()}
+            for key, h in self._hedged.items():
+                out[key[3] or key[0]]["hedge"] = h.stats()
+            return out
+
+
+_registry: Optional[ProviderRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_registry() -> ProviderRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ProviderRegistry(response_cache=get_llm_response_cache())
+        return _registry
+
+
+async def shutdown_provider_registry() -> None:
+    """Close pooled connections; a later request lazily builds a fresh registry."""
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        await registry.aclose()
+
+
+def get_provider_registry_stats() -> dict[str, Any]:
+    with _registry_lock:
+        registry = _registry
+    return registry.stats() if registry is not None else {}
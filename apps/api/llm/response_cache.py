@@ -0,0 +1,261 @@
+"""
+LLM response cache at the `LLMProvider.complete` boundary.
+
+Why:
+- purpose_path / classify_intent_ar / query_rewrite_ar are low-temperature calls whose output
+  depends only on the prompt file and the (question-derived) user message; repeated and
+  near-duplicate questions (eval replays, /ask/ui) paid full LLM latency every time.
+
+Only requests marked `LLMRequest.cache=True` are cached. Key:
+(deployment, system prompt hash, normalized user message, schema hash), where the schema
+hash also covers temperature/max_tokens and the user message is Arabic-normalized
+(diacritics, alef/yeh/hamza forms, whitespace) so trivially different spellings share an
+entry. Entries live in an in-memory TTL/LRU, optionally backed by SQLite
+(LLM_CACHE_SQLITE_PATH) so they survive restarts and are shared between workers.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, Optional
+
+from apps.api.llm.gpt5_client_azure import LLMProvider, LLMRequest, LLMResponse
+from apps.api.llm.streaming import stream_complete
+from apps.api.retrieve.normalize_ar import normalize_for_matching
+
+logger = logging.getLogger(__name__)
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(namespace: str, request: LLMRequest) -> str:
+    """Stable key for a cacheable request."""
+    schema = json.dumps(
+        {
+            "response_format": request.response_format,
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    parts = [
+        namespace or "",
+        _sha1(request.system_prompt or ""),
+        normalize_for_matching(request.user_message or ""),
+        _sha1(schema),
+    ]
+    return _sha1("\x1f".join(parts))
+
+
+class _SQLiteStore:
+    """Tiny key/value store (key, JSON value, expires_at) for the on-disk tier."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_response_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str, now: float) -> Optional[tuple[float, dict[str, Any]]]:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if float(row[1]) <= now:
+            self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+            return None
+        return float(row[1]), json.loads(row[0])
+
+    def put(self, key: str, value: dict[str, Any], expires_at: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), expires_at),
+        )
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM llm_response_cache")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class LLMResponseCache:
+    """Thread-safe TTL/LRU cache of LLMResponse objects with an optional SQLite tier."""
+
+    def __init__(self, max_entries: int = 2048, ttl_s: float = 3600.0, sqlite_path: Optional[str] = None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._data: OrderedDict[str, tuple[float, LLMResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = _SQLiteStore(sqlite_path) if sqlite_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, expires_at: float, response: LLMResponse) -> None:
+        self._data[key] = (expires_at, response)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._data[key]
+                entry = None
+            if entry is None and self._store is not None:
+                try:
+                    stored = self._store.get(key, now)
+                except Exception as e:
+                    logger.warning(f"LLM cache disk read failed: {e}")
+                    stored = None
+                if stored is not None:
+                    entry = (stored[0], LLMResponse(**stored[1]))
+                    self._remember(key, entry[0], entry[1])
+                    self.disk_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        expires_at = time.time() + self.ttl_s
+        value = copy.deepcopy(response)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self.stores += 1
+            if self._store is not None:
+                try:
+                    self._store.put(key, asdict(value), expires_at)
+                except Exception as e:
+                    logger.warning(f"LLM cache disk write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            if self._store is not None:
+                self._store.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "sqlite": self._store.path if self._store is not None else None,
+            }
+
+
+def _cacheable(request: LLMRequest, response: LLMResponse) -> bool:
+    # Reason: never pin failures (errors/timeouts/truncation), empty completions or
+    # structured replies that did not parse (same rule as hedging._valid).
+    if response.error is not None or response.finish_reason in ("timeout", "length"):
+        return False
+    if request.response_format:
+        return isinstance(response.parsed_json, dict)
+    return bool(response.content or response.parsed_json)
+
+
+class CachingProvider(LLMProvider):
+    """Serves `cache=True` requests from an LLMResponseCache; everything else passes through."""
+
+    def __init__(self, inner: LLMProvider, cache: LLMResponseCache, namespace: Optional[str] = None):
+        self.inner = inner
+        self.cache = cache
+        self.config = getattr(inner, "config", None)
+        self.namespace = namespace if namespace is not None else str(getattr(self.config, "deployment_name", "") or "")
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        if not request.cache:
+            return await self.inner.complete(request)
+        key = cache_key(self.namespace, request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.inner.complete(request)
+        if _cacheable(request, response):
+            self.cache.put(key, response)
+        return response
+
+    async def complete_stream(self, request: LLMRequest, on_delta: Callable[[str], None]) -> LLMResponse:
+        """Streaming variant: cache hits are delivered as a single delta."""
+        if not request.cache:
+            return await stream_complete(self.inner, request, on_delta)
+        key = cache_key(self.namespace, request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if cached.content:
+                on_delta(cached.content)
+            return cached
+        response = await stream_complete(self.inner, request, on_delta)
+        if _cacheable(request, response):
+            self.cache.put(key, response)
+        return response
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
+
+
+def llm_cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache configured from env, or None when LLM_CACHE is off."""
+    global _cache
+    if not llm_cache_enabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048") or 2048)
+                ttl_s = float(os.getenv("LLM_CACHE_TTL_S", "3600") or 3600)
+            except Exception:
+                max_entries, ttl_s = 2048, 3600.0
+            sqlite_path = (os.getenv("LLM_CACHE_SQLITE_PATH", "") or "").strip() or None
+            try:
+                _cache = LLMResponseCache(max_entries=max_entries, ttl_s=ttl_s, sqlite_path=sqlite_path)
+            except Exception as e:
+                logger.warning(f"LLM cache disk tier unavailable ({e}); using memory only")
+                _cache = LLMResponseCache(max_entries=max_entries, ttl_s=ttl_s)
+        return _cache
+
+
+def get_llm_response_cache_stats() -> dict[str, Any]:
+    with _cache_lock:
+        cache = _cache
+    return cache.stats() if cache is not None else {"enabled": llm_cache_enabled()}
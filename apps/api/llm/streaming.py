@@ -0,0 +1,251 @@
+"""
+Incremental LLM completions for streaming endpoints.
+
+Why:
+- INTERPRET can take minutes; /ask/stream forwards interpreter tokens as they arrive.
+- The interpreter answers in structured JSON, so `AnswerFieldExtractor` pulls the decoded
+  text of one string field (answer_ar) out of the partial JSON stream.
+
+`stream_complete` returns the same LLMResponse `complete` would (content, parsed_json,
+usage), so callers keep their parsing/validation. Providers without native streaming
+fall back to one `complete` call whose content is delivered as a single delta.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from typing import Any, Callable, Optional
+
+from apps.api.llm.gpt5_client_azure import (
+    AzureChatProvider,
+    AzureResponsesProvider,
+    LLMProvider,
+    LLMRequest,
+    LLMResponse,
+    deadline_exceeded_response,
+    timed_out_response,
+)
+from apps.api.llm.deadline import effective_timeout
+from apps.api.llm.token_params import LEGACY, remember_token_param, token_param_for, token_param_unsupported
+
+OnDelta = Callable[[str], None]
+
+
+def _parse_json(request: LLMRequest, content: str) -> Optional[dict]:
+    if not (request.response_format and content):
+        return None
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return None
+
+
+async def _stream_azure_chat(provider: AzureChatProvider, request: LLMRequest, on_delta: OnDelta) -> LLMResponse:
+    client = await provider._get_client()
+    cfg = provider.config
+    params: dict[str, Any] = {
+        "model": cfg.deployment_name,
+        "messages": [
+            {"role": "system", "content": request.system_prompt},
+            {"role": "user", "content": request.user_message},
+        ],
+        "temperature": request.temperature or cfg.temperature,
+        "stream": True,
+        # Reason: without this the stream carries no token usage (final chunk, empty choices).
+        # Sent via extra_body because the pinned SDK predates the stream_options kwarg.
+        "extra_body": {"stream_options": {"include_usage": True}},
+    }
+    if request.response_format:
+        params["response_format"] = {"type": "json_schema", "json_schema": request.response_format}
+    token_limit = request.max_tokens or cfg.max_tokens
+
+    async def _create(token_param: str):
+        try:
+            return await client.chat.completions.create(**params, **{token_param: token_limit})
+        except Exception as e:
+            # Older API versions reject stream_options; stream without usage then.
+            if "stream_options" not in str(e) or "extra_body" not in params:
+                raise
+            params.pop("extra_body")
+            return await client.chat.completions.create(**params, **{token_param: token_limit})
+
+    async def _run() -> LLMResponse:
+        token_param = token_param_for(cfg)
+        try:
+            stream = await _create(token_param)
+        except Exception as e:
+            if token_param == LEGACY or not token_param_unsupported(str(e)):
+                raise
+            remember_token_param(cfg, LEGACY)
+            stream = await _create(LEGACY)
+        parts: list[str] = []
+        model = ""
+        finish_reason = ""
+        usage: dict[str, int] = {}
+        async for chunk in stream:
+            model = getattr(chunk, "model", "") or model
+            u = getattr(chunk, "usage", None)
+            if u is not None:
+                # Older SDKs keep the unknown field as a plain dict.
+                get = u.get if isinstance(u, dict) else lambda k: getattr(u, k, 0)
+                usage = {k: get(k) or 0 for k in ("prompt_tokens", "completion_tokens", "total_tokens")}
+            for choice in getattr(chunk, "choices", None) or []:
+                delta = getattr(getattr(choice, "delta", None), "content", None)
+                if isinstance(delta, str) and delta:
+                    parts.append(delta)
+                    on_delta(delta)
+                finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+        content = "".join(parts)
+        return LLMResponse(
+            content=content,
+            parsed_json=_parse_json(request, content),
+            model=model,
+            usage=usage,
+            finish_reason=finish_reason,
+        )
+
+    timeout = effective_timeout(cfg.timeout or 120)
+    if timeout <= 0:
+        return deadline_exceeded_response()
+    try:
+        return await asyncio.wait_for(_run(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return timed_out_response(timeout)
+    except Exception as e:
+        return LLMResponse(content="", error=str(e))
+
+
+async def _stream_azure_responses(
+    provider: AzureResponsesProvider, request: LLMRequest, on_delta: OnDelta
+) -> LLMResponse:
+    client = await provider._get_client()
+    cfg = provider.config
+    params: dict[str, Any] = {
+        "model": cfg.deployment_name,
+        "input": [
+            {"role": "system", "content": request.system_prompt},
+            {"role": "user", "content": request.user_message},
+        ],
+        "temperature": request.temperature or cfg.temperature,
+        "max_output_tokens": request.max_tokens or cfg.max_tokens,
+        "stream": True,
+    }
+    if request.response_format:
+        params["response_format"] = {"type": "json_schema", "json_schema": request.response_format}
+
+    async def _run() -> LLMResponse:
+        parts: list[str] = []
+        model = ""
+        usage: dict[str, int] = {}
+        async for event in await client.responses.create(**params):
+            etype = getattr(event, "type", "")
+            if etype == "response.output_text.delta":
+                delta = getattr(event, "delta", "") or ""
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+            elif etype == "response.completed":
+                resp = getattr(event, "response", None)
+                model = getattr(resp, "model", "") or model
+                u = getattr(resp, "usage", None)
+                usage = {
+                    "prompt_tokens": getattr(u, "input_tokens", 0) or 0,
+                    "completion_tokens": getattr(u, "output_tokens", 0) or 0,
+                    "total_tokens": getattr(u, "total_tokens", 0) or 0,
+                }
+        content = "".join(parts)
+        return LLMResponse(
+            content=content,
+            parsed_json=_parse_json(request, content),
+            model=model,
+            usage=usage,
+            finish_reason="stop",
+        )
+
+    timeout = effective_timeout(cfg.timeout or 120)
+    if timeout <= 0:
+        return deadline_exceeded_response()
+    try:
+        return await asyncio.wait_for(_run(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return timed_out_response(timeout)
+    except Exception as e:
+        return LLMResponse(content="", error=str(e))
+
+
+async def stream_complete(provider: LLMProvider, request: LLMRequest, on_delta: OnDelta) -> LLMResponse:
+    """Complete `request`, calling `on_delta` with each content fragment as it arrives."""
+    custom = getattr(provider, "complete_stream", None)
+    if callable(custom):
+        return await custom(request, on_delta)
+    if isinstance(provider, AzureChatProvider):
+        return await _stream_azure_chat(provider, request, on_delta)
+    if isinstance(provider, AzureResponsesProvider):
+        return await _stream_azure_responses(provider, request, on_delta)
+    resp = await provider.complete(request)
+    if resp.error is None and resp.content:
+        on_delta(resp.content)
+    return resp
+
+
+class AnswerFieldExtractor:
+    """
+    Incrementally decode one top-level JSON string field from a streamed JSON document.
+
+    `feed(chunk)` returns the newly decoded text of the field (possibly ""). Escape
+    sequences split across chunks (incl. surrogate pairs) are held until complete.
+    """
+
+    def __init__(self, field: str = "answer_ar"):
+        self._start = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buf = ""
+        self._in_value = False
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done or not chunk:
+            return ""
+        self._buf += chunk
+        if not self._in_value:
+            m = self._start.search(self._buf)
+            if m is None:
+                # Keep a tail long enough to complete a split key.
+                self._buf = self._buf[-64:]
+                return ""
+            self._in_value = True
+            self._buf = self._buf[m.end():]
+
+        raw = self._buf
+        i = 0
+        n = len(raw)
+        while i < n:
+            ch = raw[i]
+            if ch == '"':
+                self.done = True
+                break
+            if ch != "\\":
+                i += 1
+                continue
+            if i + 1 >= n:
+                break
+            if raw[i + 1] != "u":
+                i += 2
+                continue
+            if i + 6 > n:
+                break
+            code = int(raw[i + 2 : i + 6], 16) if re.fullmatch(r"[0-9a-fA-F]{4}", raw[i + 2 : i + 6]) else 0
+            if 0xD800 <= code <= 0xDBFF:
+                if i + 12 > n:
+                    break
+                i += 12
+            else:
+                i += 6
+        segment, self._buf = raw[:i], raw[i:]
+        if not segment:
+            return ""
+        try:
+            return json.loads('"' + segment + '"')
+        except json.JSONDecodeError:
+            return ""
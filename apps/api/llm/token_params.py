@@ -0,0 +1,53 @@
+"""
+Per-deployment cache of the chat-completions token-limit parameter name.
+
+Why:
+- Newer deployments require `max_completion_tokens`; older ones (and the pinned SDK) reject
+  it. Providers tried `max_completion_tokens` first and retried with `max_tokens` on every
+  call, paying the failed round trip each time. The working name is remembered per
+  (endpoint, api_version, deployment) so the fallback happens at most once per process.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+PREFERRED = "max_completion_tokens"
+LEGACY = "max_tokens"
+
+_by_deployment: dict[tuple[str, str, str], str] = {}
+_lock = threading.Lock()
+
+
+def _key(config: Any) -> tuple[str, str, str]:
+    return (
+        str(getattr(config, "endpoint", "") or ""),
+        str(getattr(config, "api_version", "") or ""),
+        str(getattr(config, "deployment_name", "") or ""),
+    )
+
+
+def token_param_for(config: Any) -> str:
+    with _lock:
+        return _by_deployment.get(_key(config), PREFERRED)
+
+
+def remember_token_param(config: Any, name: str) -> None:
+    with _lock:
+        _by_deployment[_key(config)] = name
+
+
+def token_param_unsupported(msg: str) -> bool:
+    """True when an error says `max_completion_tokens` is not accepted (server or SDK)."""
+    return PREFERRED in msg and ("Unsupported parameter" in msg or "unexpected keyword argument" in msg)
+
+
+def token_param_stats() -> dict[str, str]:
+    with _lock:
+        return {deployment or endpoint: name for (endpoint, _, deployment), name in _by_deployment.items()}
+
+
+def reset_token_params() -> None:
+    with _lock:
+        _by_deployment.clear()
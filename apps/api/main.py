@@ -4,22 +4,51 @@ Wellbeing Data Foundation API
 A zero-hallucination, evidence-only Arabic wellbeing assistant.
 """
 
+import logging
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from apps.api.routes import ingest, ask, graph, graph_ui, resolve, ui, ui_runs
+from apps.api.routes import ingest, ask, ask_stream, graph, graph_ui, resolve, ui, ui_runs, world_model
 from apps.api.llm.gpt5_client_azure import ProviderConfig
 
 # Load local .env (does not override real env vars by default)
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm process-wide runtime indexes at startup; close pooled LLM clients at shutdown."""
+    try:
+        from apps.api.llm.prompt_store import warm_prompt_store
+
+        prompts = warm_prompt_store()
+        logging.getLogger(__name__).info(f"Loaded {len(prompts)} LLM prompt templates: {prompts}")
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Prompt warm-up skipped: {e}")
+    try:
+        from apps.api.core.database import get_session
+        from apps.api.retrieve.entity_resolver import get_shared_resolver
+
+        async with get_session() as session:
+            await get_shared_resolver(session)
+    except Exception as e:
+        # DB may be unavailable in dev; indexes are built lazily on first request.
+        logging.getLogger(__name__).warning(f"Startup warm-up skipped: {e}")
+    yield
+    from apps.api.llm.provider_registry import shutdown_provider_registry
+
+    await shutdown_provider_registry()
+
+
 app = FastAPI(
     title="Wellbeing Data Foundation API",
     description="Evidence-only Arabic wellbeing assistant with Muḥāsibī reasoning middleware",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -34,11 +63,13 @@ app.add_middleware(
 # Include routers
 app.include_router(ingest.router, prefix="/ingest", tags=["ingestion"])
 app.include_router(ask.router, tags=["query"])
+app.include_router(ask_stream.router, tags=["query"])
 app.include_router(graph.router, tags=["graph"])
 app.include_router(graph_ui.router, tags=["graph"])
 app.include_router(resolve.router, tags=["resolver"])
 app.include_router(ui.router, tags=["ui"])
 app.include_router(ui_runs.router, tags=["ui"])
+app.include_router(world_model.router, tags=["world_model"])
 
 
 @app.get("/health")
@@ -55,7 +86,16 @@ async def health_check():
         edge_trace_info["scoring_intents"] = list(EDGE_SCORING_INTENTS)
     except Exception as e:
         edge_trace_info = {"error": str(e)}
-    
+
+    from apps.api.graph.graph_snapshot import get_graph_snapshot_stats
+    from apps.api.core.world_model.graph_context import get_graph_context_stats
+    from apps.api.llm.provider_registry import get_provider_registry_stats
+    from apps.api.llm.response_cache import get_llm_response_cache_stats
+    from apps.api.llm.token_params import token_param_stats
+    from apps.api.routes.ask import get_answer_cache_stats, get_ask_coalescing_stats
+    from apps.api.retrieve.entity_resolver import get_resolver_index_stats
+    from apps.api.retrieve.reranker import get_reranker_score_cache
+
     return {
         "status": "healthy",
         "version": "0.1.0",
@@ -65,8 +105,17 @@ async def health_check():
             "deployment_name_set": bool(cfg.deployment_name),
             "endpoint_set": bool(cfg.endpoint),
             "api_version": cfg.api_version,
+            "pooled_providers": get_provider_registry_stats(),
+            "response_cache": get_llm_response_cache_stats(),
+            "token_params": token_param_stats(),
         },
+        "ask_coalescing": get_ask_coalescing_stats(),
+        "answer_cache": get_answer_cache_stats(),
         "edge_trace": edge_trace_info,
+        "resolver_index": get_resolver_index_stats(),
+        "graph_snapshot": get_graph_snapshot_stats(),
+        "world_model_graph": get_graph_context_stats(),
+        "reranker_cache": get_reranker_score_cache().stats(),
     }
 
 
@@ -0,0 +1,436 @@
+"""
+Process-level BM25 inverted index for the local vector backend.
+
+Why:
+- `bm25_search` used to pull every chunk (+ every chunk_ref) and tokenize the whole
+  corpus on every query, so BM25 cost was O(corpus) per request.
+- The index is built once from Postgres and then refreshed incrementally, so a query
+  only touches the postings lists of its own terms.
+
+Design:
+- Documents are interned into integer slots (chunk_id order at full build).
+- Postings are compact `array('I')` pairs (slots, term frequencies) per term.
+- Corpus statistics (doc count, total length) are kept per (entity_type, chunk_type)
+  group so filtered searches use exactly the same n_docs/avg_len as the old SQL scan.
+- Updated chunks are tombstoned and re-appended; tombstones are compacted in-memory.
+
+Scores are computed with `_bm25_score`, summed in the same term order as the legacy
+scan, so results are identical to the previous implementation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh_interval_seconds() -> float:
+    try:
+        return float(os.getenv("BM25_INDEX_REFRESH_SECONDS", "30") or 30)
+    except Exception:
+        return 30.0
+
+
+def bm25_index_enabled() -> bool:
+    """Whether `bm25_search` should use the in-memory index (default: on)."""
+    return os.getenv("BM25_INDEX", "on").lower() not in {"0", "false", "no", "off"}
+
+
+def bm25_doc_text(text_ar: str, refs: Iterable[str]) -> str:
+    """Text that BM25 tokenizes for one chunk (chunk text + its refs)."""
+    ref_text = " ".join(str(r or "") for r in refs)
+    return f"{str(text_ar or '')} {ref_text}".strip()
+
+
+@dataclass
+class _DbWatermark:
+    """What the index has already seen from the DB (for incremental refresh)."""
+
+    chunk_count: int = 0
+    empty_text_count: int = 0
+    chunk_created_at: Any = None
+    ref_created_at: Any = None
+
+
+class Bm25Index:
+    """
+    Array-backed BM25 inverted index.
+
+    Not coroutine-aware by itself; `get_bm25_index` serializes refreshes.
+    """
+
+    # Compact when more than this fraction of slots are tombstones.
+    _COMPACT_RATIO = 0.25
+
+    def __init__(self) -> None:
+        self._slot_by_chunk: dict[str, int] = {}
+        self._chunk_ids: list[str] = []
+        self._entity_types: list[str] = []
+        self._chunk_types: list[str] = []
+        self._doc_len = array("I")
+        self._alive = bytearray()
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._group_stats: dict[tuple[str, str], list[int]] = {}
+        self._dead = 0
+        self.version = 0
+        self.watermark = _DbWatermark()
+        self.checked_at = 0.0
+
+    # ---------------------------------------------------------------------
+    # Mutation
+    # ---------------------------------------------------------------------
+
+    @property
+    def n_docs(self) -> int:
+        return len(self._slot_by_chunk)
+
+    def __contains__(self, chunk_id: object) -> bool:
+        return chunk_id in self._slot_by_chunk
+
+    def upsert(self, *, chunk_id: str, entity_type: str, chunk_type: str, doc_text: str) -> None:
+        """Insert or replace one document (chunks with empty text_ar must be removed instead)."""
+        from apps.api.retrieve.vector_retriever_bm25 import _tokens_for_bm25
+
+        self.remove(chunk_id)
+
+        toks = _tokens_for_bm25(doc_text)
+        slot = len(self._chunk_ids)
+        self._slot_by_chunk[chunk_id] = slot
+        self._chunk_ids.append(chunk_id)
+        self._entity_types.append(sys.intern(str(entity_type)))
+        self._chunk_types.append(sys.intern(str(chunk_type)))
+        self._doc_len.append(len(toks))
+        self._alive.append(1)
+
+        for term, tf in Counter(toks).items():
+            post = self._postings.get(term)
+            if post is None:
+                post = (array("I"), array("I"))
+                self._postings[term] = post
+            post[0].append(slot)
+            post[1].append(tf)
+
+        stats = self._group_stats.setdefault((self._entity_types[slot], self._chunk_types[slot]), [0, 0])
+        stats[0] += 1
+        stats[1] += len(toks)
+        self.version += 1
+
+    def remove(self, chunk_id: str) -> None:
+        """Tombstone a document (postings are cleaned on compaction)."""
+        slot = self._slot_by_chunk.pop(chunk_id, None)
+        if slot is None:
+            return
+        self._alive[slot] = 0
+        self._dead += 1
+        stats = self._group_stats.get((self._entity_types[slot], self._chunk_types[slot]))
+        if stats is not None:
+            stats[0] -= 1
+            stats[1] -= self._doc_len[slot]
+        self.version += 1
+        if self._dead > max(64, int(len(self._chunk_ids) * self._COMPACT_RATIO)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop tombstoned slots and renumber the remaining documents (order preserved)."""
+        if not self._dead:
+            return
+        remap: dict[int, int] = {}
+        chunk_ids: list[str] = []
+        entity_types: list[str] = []
+        chunk_types: list[str] = []
+        doc_len = array("I")
+        for old, alive in enumerate(self._alive):
+            if not alive:
+                continue
+            remap[old] = len(chunk_ids)
+            chunk_ids.append(self._chunk_ids[old])
+            entity_types.append(self._entity_types[old])
+            chunk_types.append(self._chunk_types[old])
+            doc_len.append(self._doc_len[old])
+
+        postings: dict[str, tuple[array, array]] = {}
+        for term, (slots, tfs) in self._postings.items():
+            new_slots = array("I")
+            new_tfs = array("I")
+            for s, tf in zip(slots, tfs):
+                ns = remap.get(s)
+                if ns is not None:
+                    new_slots.append(ns)
+                    new_tfs.append(tf)
+            if new_slots:
+                postings[term] = (new_slots, new_tfs)
+
+        self._chunk_ids = chunk_ids
+        self._entity_types = entity_types
+        self._chunk_types = chunk_types
+        self._doc_len = doc_len
+        self._alive = bytearray(b"\x01" * len(chunk_ids))
+        self._postings = postings
+        self._slot_by_chunk = {cid: i for i, cid in enumerate(chunk_ids)}
+        self._dead = 0
+
+    # ---------------------------------------------------------------------
+    # Query
+    # ---------------------------------------------------------------------
+
+    def idf(self, term: str) -> float:
+        """Unfiltered IDF for a term (diagnostics)."""
+        from apps.api.retrieve.vector_retriever_bm25 import _bm25_idf
+
+        post = self._postings.get(term)
+        df = sum(1 for s in post[0] if self._alive[s]) if post else 0
+        return _bm25_idf(self.n_docs, df)
+
+    def _corpus_stats(
+        self, entity_types: Optional[list[str]], chunk_types: Optional[list[str]]
+    ) -> tuple[int, int]:
+        n_docs = 0
+        total_len = 0
+        for (et, ct), (n, tl) in self._group_stats.items():
+            if entity_types and et not in entity_types:
+                continue
+            if chunk_types and ct not in chunk_types:
+                continue
+            n_docs += n
+            total_len += tl
+        return n_docs, total_len
+
+    def search(
+        self,
+        q_tokens: list[str],
+        top_k: int = 10,
+        entity_types: Optional[list[str]] = None,
+        chunk_types: Optional[list[str]] = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Score documents for query tokens.
+
+        Returns:
+            [(chunk_id, score)] sorted by score desc (ties: index order), length <= top_k.
+        """
+        from apps.api.retrieve.vector_retriever_bm25 import _bm25_score
+
+        if not q_tokens:
+            return []
+        n_docs, total_len = self._corpus_stats(entity_types, chunk_types)
+        if n_docs <= 0:
+            return []
+        avg_len = total_len / max(n_docs, 1)
+
+        et_filter = set(entity_types) if entity_types else None
+        ct_filter = set(chunk_types) if chunk_types else None
+
+        scores: dict[int, float] = {}
+        # Reason: iterate the same set the legacy scan iterated, so float sums match exactly.
+        for term in set(q_tokens):
+            post = self._postings.get(term)
+            if post is None:
+                continue
+            hits: list[tuple[int, int]] = []
+            for slot, tf in zip(post[0], post[1]):
+                if not self._alive[slot]:
+                    continue
+                if et_filter is not None and self._entity_types[slot] not in et_filter:
+                    continue
+                if ct_filter is not None and self._chunk_types[slot] not in ct_filter:
+                    continue
+                hits.append((slot, tf))
+            df = len(hits)
+            for slot, tf in hits:
+                scores[slot] = scores.get(slot, 0.0) + _bm25_score(
+                    tf=tf,
+                    df=df,
+                    doc_len=self._doc_len[slot],
+                    avg_doc_len=avg_len,
+                    n_docs=n_docs,
+                )
+
+        ranked = sorted(((s, slot) for slot, s in scores.items() if s > 0.0), key=lambda x: (-x[0], x[1]))
+        return [(self._chunk_ids[slot], score) for score, slot in ranked[: max(1, int(top_k or 10))]]
+
+
+# -------------------------------------------------------------------------
+# Process-level instance + DB sync
+# -------------------------------------------------------------------------
+
+_INDEX: Optional[Bm25Index] = None
+_LOCK: Optional[asyncio.Lock] = None
+_DIRTY_CHUNK_IDS: set[str] = set()
+
+
+def mark_chunks_dirty(chunk_ids: Iterable[str]) -> None:
+    """
+    Tell the index that ingestion wrote (or rewrote) these chunks.
+
+    The next search re-reads them from the DB instead of waiting for the refresh interval.
+    """
+    for cid in chunk_ids:
+        if cid:
+            _DIRTY_CHUNK_IDS.add(str(cid))
+
+
+def reset_bm25_index() -> None:
+    """Drop the process-level index (tests / full re-ingestion)."""
+    global _INDEX
+    _INDEX = None
+    _DIRTY_CHUNK_IDS.clear()
+
+
+async def _fetch_watermark(session: AsyncSession) -> _DbWatermark:
+    row = (
+        await session.execute(
+            text(
+                """
+                SELECT
+                  (SELECT COUNT(*) FROM chunk) AS chunk_count,
+                  (SELECT COUNT(*) FROM chunk WHERE text_ar IS NULL OR text_ar = '') AS empty_text_count,
+                  (SELECT MAX(created_at) FROM chunk) AS chunk_created_at,
+                  (SELECT MAX(created_at) FROM chunk_ref) AS ref_created_at
+                """
+            )
+        )
+    ).fetchone()
+    if not row:
+        return _DbWatermark()
+    return _DbWatermark(
+        chunk_count=int(row.chunk_count or 0),
+        empty_text_count=int(row.empty_text_count or 0),
+        chunk_created_at=row.chunk_created_at,
+        ref_created_at=row.ref_created_at,
+    )
+
+
+async def _load_docs(session: AsyncSession, chunk_ids: Optional[list[str]]) -> list[tuple[Any, list[str]]]:
+    """Load chunk rows + ref strings (all chunks when chunk_ids is None)."""
+    if chunk_ids is None:
+        chunk_sql = "SELECT chunk_id, entity_type, chunk_type, text_ar FROM chunk ORDER BY chunk_id"
+        ref_sql = "SELECT chunk_id, ref FROM chunk_ref"
+        params: dict[str, Any] = {}
+    else:
+        chunk_sql = (
+            "SELECT chunk_id, entity_type, chunk_type, text_ar FROM chunk "
+            "WHERE chunk_id = ANY(:chunk_ids) ORDER BY chunk_id"
+        )
+        ref_sql = "SELECT chunk_id, ref FROM chunk_ref WHERE chunk_id = ANY(:chunk_ids)"
+        params = {"chunk_ids": chunk_ids}
+
+    rows = (await session.execute(text(chunk_sql), params)).fetchall()
+    refs_by_chunk: dict[str, list[str]] = {}
+    for rr in (await session.execute(text(ref_sql), params)).fetchall():
+        refs_by_chunk.setdefault(str(rr.chunk_id), []).append(str(rr.ref or ""))
+    return [(r, refs_by_chunk.get(str(r.chunk_id), [])) for r in rows]
+
+
+def _apply_row(idx: Bm25Index, r: Any, refs: list[str]) -> None:
+    cid = str(r.chunk_id)
+    # Mirror the legacy scan's SQL filter (text_ar IS NOT NULL AND text_ar <> '').
+    if not r.text_ar:
+        idx.remove(cid)
+        return
+    idx.upsert(
+        chunk_id=cid,
+        entity_type=str(r.entity_type),
+        chunk_type=str(r.chunk_type),
+        doc_text=bm25_doc_text(str(r.text_ar), refs),
+    )
+
+
+async def _build_full(session: AsyncSession) -> Bm25Index:
+    t0 = time.perf_counter()
+    wm = await _fetch_watermark(session)
+    idx = Bm25Index()
+    for r, refs in await _load_docs(session, None):
+        _apply_row(idx, r, refs)
+    idx.watermark = wm
+    idx.checked_at = time.monotonic()
+    logger.info(
+        "BM25 index built: docs=%s terms=%s in %.1fms",
+        idx.n_docs,
+        len(idx._postings),
+        (time.perf_counter() - t0) * 1000.0,
+    )
+    return idx
+
+
+async def _refresh_incremental(session: AsyncSession, idx: Bm25Index) -> Bm25Index:
+    """
+    Apply new/changed chunks to the index.
+
+    Falls back to a full rebuild when the chunk count shows deletions (e.g. purge).
+    """
+    wm = await _fetch_watermark(session)
+    changed: set[str] = set(_DIRTY_CHUNK_IDS)
+    _DIRTY_CHUNK_IDS.clear()
+
+    if wm.chunk_created_at is not None and wm.chunk_created_at != idx.watermark.chunk_created_at:
+        q = "SELECT chunk_id FROM chunk"
+        params: dict[str, Any] = {}
+        if idx.watermark.chunk_created_at is not None:
+            q += " WHERE created_at > :ts"
+            params["ts"] = idx.watermark.chunk_created_at
+        changed.update(str(r.chunk_id) for r in (await session.execute(text(q), params)).fetchall())
+    if wm.ref_created_at is not None and wm.ref_created_at != idx.watermark.ref_created_at:
+        q = "SELECT DISTINCT chunk_id FROM chunk_ref"
+        params = {}
+        if idx.watermark.ref_created_at is not None:
+            q += " WHERE created_at > :ts"
+            params["ts"] = idx.watermark.ref_created_at
+        changed.update(str(r.chunk_id) for r in (await session.execute(text(q), params)).fetchall())
+
+    if changed:
+        ids = sorted(changed)
+        found: set[str] = set()
+        for r, refs in await _load_docs(session, ids):
+            found.add(str(r.chunk_id))
+            _apply_row(idx, r, refs)
+        for cid in changed - found:
+            idx.remove(cid)
+
+    idx.watermark = wm
+    idx.checked_at = time.monotonic()
+
+    # Deletions are invisible to created_at watermarks; the count exposes them.
+    if idx.n_docs + wm.empty_text_count != wm.chunk_count:
+        logger.info("BM25 index out of sync with chunk table; rebuilding")
+        return await _build_full(session)
+    if changed:
+        logger.debug("BM25 index refreshed incrementally: %s chunks", len(changed))
+    return idx
+
+
+async def get_bm25_index(session: AsyncSession) -> Bm25Index:
+    """
+    Return the process-level BM25 index, building or refreshing it as needed.
+
+    Refresh checks run at most every BM25_INDEX_REFRESH_SECONDS, or immediately after
+    `mark_chunks_dirty` was called by ingestion in this process.
+    """
+    global _INDEX, _LOCK
+    idx = _INDEX
+    if idx is not None and not _DIRTY_CHUNK_IDS:
+        if (time.monotonic() - idx.checked_at) < _refresh_interval_seconds():
+            return idx
+
+    if _LOCK is None:
+        _LOCK = asyncio.Lock()
+    async with _LOCK:
+        idx = _INDEX
+        if idx is None:
+            _DIRTY_CHUNK_IDS.clear()
+            idx = await _build_full(session)
+        elif _DIRTY_CHUNK_IDS or (time.monotonic() - idx.checked_at) >= _refresh_interval_seconds():
+            idx = await _refresh_incremental(session, idx)
+        _INDEX = idx
+        return idx
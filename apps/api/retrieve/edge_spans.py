@@ -0,0 +1,68 @@
+"""
+Edge justification spans.
+
+Shared by graph retrieval and explainable paths; lookups go through the request-scoped
+retrieval memo when one is active.
+"""
+
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.retrieve.request_memo import current_retrieval_memo
+
+
+async def fetch_justification_spans(session: AsyncSession, edge_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+    """
+    Justification spans by edge_id in one query (request-memoized).
+
+    Best-effort: the table may not exist in older DBs; failures yield no spans.
+    """
+    edge_ids = list(dict.fromkeys(str(eid) for eid in edge_ids if eid and str(eid)))
+    if not edge_ids:
+        return {}
+    memo = current_retrieval_memo()
+    spans_by_edge: dict[str, list[dict[str, Any]]] = {}
+    missing = edge_ids
+    if memo is not None:
+        spans_by_edge, missing = memo.split_spans(edge_ids)
+        if not missing:
+            return spans_by_edge
+    try:
+        span_rows = (
+            await session.execute(
+                text(
+                    """
+                    SELECT edge_id::text AS edge_id, chunk_id, span_start, span_end, quote
+                    FROM edge_justification_span
+                    WHERE edge_id::text = ANY(:eids)
+                    ORDER BY edge_id, chunk_id, span_start
+                    """
+                ),
+                {"eids": missing},
+            )
+        ).fetchall()
+    except Exception:
+        return spans_by_edge
+    fetched: dict[str, list[dict[str, Any]]] = {}
+    for r in span_rows:
+        fetched.setdefault(str(r.edge_id), []).append(
+            {
+                "chunk_id": str(r.chunk_id),
+                "span_start": int(r.span_start),
+                "span_end": int(r.span_end),
+                "quote": str(r.quote),
+            }
+        )
+    if memo is not None:
+        memo.put_spans(missing, fetched)
+    spans_by_edge.update(fetched)
+    return spans_by_edge
+
+
+async def _attach_justification_spans(session: AsyncSession, neighbors: list[dict[str, Any]]) -> None:
+    """Attach edge-level justification spans to neighbor dicts (best-effort)."""
+    spans_by_edge = await fetch_justification_spans(session, [n.get("edge_id") for n in neighbors])
+    for n in neighbors:
+        n["justification_spans"] = spans_by_edge.get(str(n.get("edge_id") or ""), [])
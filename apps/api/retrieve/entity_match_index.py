@@ -0,0 +1,157 @@
+"""
+Compiled multi-pattern matcher for EntityResolver.
+
+Why:
+- `EntityResolver.resolve` used to test every normalized name/variant/alias against the
+  query (substring + word-set checks), i.e. O(#variants × query length) per request.
+- Here all variants are compiled once into:
+  - an Aho–Corasick automaton (finds every exact substring mention in one pass), and
+  - a word -> pattern inverted index (finds every pattern sharing a word with the query
+    or its morphological expansions).
+
+A pattern can only produce a match (exact/normalized/fuzzy/morph) if it is a substring
+of the query or shares at least one word with it, so the resolver runs its original
+`_match`/`_match_terms` checks on these candidates only. Confidence semantics and
+dedupe order are therefore unchanged.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+# Categories in resolver priority order (pillars > core values > sub-values > aliases).
+CATEGORIES: tuple[str, ...] = ("pillar", "core_value", "sub_value", "alias")
+
+
+class AhoCorasick:
+    """Character-level Aho–Corasick automaton over string patterns."""
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern_id)
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links; outputs are merged along the failure chain."""
+        queue: deque[int] = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+
+    def find_all(self, text: str) -> set[int]:
+        """Return ids of all patterns occurring in text (single pass)."""
+        if not self._built:
+            self.build()
+        found: set[int] = set()
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    @property
+    def n_states(self) -> int:
+        return len(self._goto)
+
+
+class EntityMatchIndex:
+    """
+    Candidate generator compiled from the resolver's name dictionaries.
+
+    `entries[category]` keeps each dictionary's items in insertion order so the resolver
+    can evaluate candidates in exactly the order it used to iterate the dictionaries.
+    """
+
+    def __init__(self, tables: dict[str, dict[str, str]]) -> None:
+        self.entries: dict[str, list[tuple[str, str]]] = {c: list(tables.get(c, {}).items()) for c in CATEGORIES}
+        self.entity_ids: dict[str, frozenset[str]] = {
+            c: frozenset(eid for _, eid in self.entries[c]) for c in CATEGORIES
+        }
+
+        # pattern id -> (category, position)
+        self._patterns: list[tuple[str, int]] = []
+        self._automaton = AhoCorasick()
+        self._by_word: dict[str, list[int]] = {}
+        self._always: list[int] = []
+
+        pid_by_name: dict[str, list[int]] = {}
+        for category in CATEGORIES:
+            for pos, (name, _) in enumerate(self.entries[category]):
+                pid = len(self._patterns)
+                self._patterns.append((category, pos))
+                if not name:
+                    # "" is a substring of every query (legacy behavior).
+                    self._always.append(pid)
+                    continue
+                pid_by_name.setdefault(name, []).append(pid)
+                for w in set(name.split()):
+                    self._by_word.setdefault(w, []).append(pid)
+
+        # One automaton state per distinct name; ids map back to all its patterns.
+        self._name_pids: list[list[int]] = []
+        for name, pids in pid_by_name.items():
+            self._automaton.add(name, len(self._name_pids))
+            self._name_pids.append(pids)
+        self._automaton.build()
+
+    @property
+    def n_patterns(self) -> int:
+        return len(self._patterns)
+
+    def candidates(self, normalized_query: str, words: Iterable[str]) -> dict[str, list[int]]:
+        """
+        Return candidate positions per category, sorted by dictionary order.
+
+        Args:
+            normalized_query: `normalize_for_matching(query)`.
+            words: query words plus expanded morphological terms.
+        """
+        pids: set[int] = set(self._always)
+        for name_id in self._automaton.find_all(normalized_query):
+            pids.update(self._name_pids[name_id])
+        for w in words:
+            hits = self._by_word.get(w)
+            if hits:
+                pids.update(hits)
+
+        out: dict[str, list[int]] = {c: [] for c in CATEGORIES}
+        for pid in pids:
+            category, pos = self._patterns[pid]
+            out[category].append(pos)
+        for positions in out.values():
+            positions.sort()
+        return out
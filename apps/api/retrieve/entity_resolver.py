@@ -6,13 +6,20 @@ and fuzzy matching with Arabic normalization.
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
+import asyncio
 import json
+import logging
+import sys
+import time
 from pathlib import Path
 
 from apps.api.core.schemas import EntityType
 from apps.api.retrieve.normalize_ar import normalize_for_matching
 from apps.api.retrieve.arabic_morph import expand_query_terms, phrase_variants
+from apps.api.retrieve.entity_match_index import EntityMatchIndex
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -52,6 +59,9 @@ class EntityResolver:
         # Keep original pillar list for "structure intent" (list all pillars)
         self._pillar_items: list[dict[str, str]] = []
 
+        # Compiled multi-pattern matcher (built lazily / after load_entities)
+        self._match_index: Optional[EntityMatchIndex] = None
+
     def load_entities(
         self,
         pillars: list[dict],
@@ -73,6 +83,7 @@ class EntityResolver:
         self._names = {}
         self._aliases = {}
         self._pillar_items = []
+        self._match_index = None
 
         for p in pillars:
             normalized = normalize_for_matching(p["name_ar"])
@@ -100,16 +111,88 @@ class EntityResolver:
         if aliases_path:
             self._load_aliases(aliases_path)
 
+        self._compile_match_index()
+
+    def _compile_match_index(self) -> EntityMatchIndex:
+        """Compile all names/variants/aliases into the multi-pattern matcher."""
+        self._match_index = EntityMatchIndex(
+            {
+                "pillar": self._pillars,
+                "core_value": self._core_values,
+                "sub_value": self._sub_values,
+                "alias": self._aliases,
+            }
+        )
+        return self._match_index
+
     def resolve(self, query: str) -> list[ResolvedEntity]:
         """
         Resolve entities mentioned in a query.
 
+        Candidates come from the compiled matcher (one pass over the normalized query);
+        each candidate is then scored with the same `_match`/`_match_terms` rules.
+
         Args:
             query: The user's query text.
 
         Returns:
             List of resolved entities, sorted by confidence.
         """
+        index = self._match_index or self._compile_match_index()
+        resolved = []
+        normalized_query = normalize_for_matching(query)
+        expanded_terms = expand_query_terms(query)
+        cands = index.candidates(normalized_query, set(normalized_query.split()) | expanded_terms)
+
+        # Priority: pillars > core values > sub-values (then aliases)
+        typed = (
+            ("pillar", EntityType.PILLAR),
+            ("core_value", EntityType.CORE_VALUE),
+            ("sub_value", EntityType.SUB_VALUE),
+        )
+        for category, entity_type in typed:
+            entries = index.entries[category]
+            for pos in cands[category]:
+                name, entity_id = entries[pos]
+                match_result = self._match(name, normalized_query)
+                if not match_result and expanded_terms:
+                    match_result = self._match_terms(name, expanded_terms)
+                if match_result:
+                    resolved.append(ResolvedEntity(
+                        entity_type=entity_type,
+                        entity_id=entity_id,
+                        name_ar=self._names[entity_id],
+                        match_type=match_result[0],
+                        confidence=match_result[1],
+                    ))
+
+        # Alias matches (all entity types, but low priority)
+        alias_entries = index.entries["alias"]
+        for pos in cands["alias"]:
+            alias, entity_id = alias_entries[pos]
+            match_result = self._match(alias, normalized_query) or self._match_terms(alias, expanded_terms)
+            if match_result:
+                et = self._infer_entity_type(entity_id)
+                if not et:
+                    continue
+                resolved.append(
+                    ResolvedEntity(
+                        entity_type=et,
+                        entity_id=entity_id,
+                        name_ar=self._names.get(entity_id, alias),
+                        match_type="alias_" + match_result[0],
+                        confidence=min(match_result[1], 0.85),
+                    )
+                )
+
+        return self._dedupe_best(resolved)
+
+    def resolve_linear(self, query: str) -> list[ResolvedEntity]:
+        """
+        Reference implementation: scan every name/variant (O(#variants × query length)).
+
+        Kept for equivalence tests and `scripts/benchmark_entity_resolver.py`.
+        """
         resolved = []
         normalized_query = normalize_for_matching(query)
         expanded_terms = expand_query_terms(query)
@@ -173,7 +256,11 @@ class EntityResolver:
                     )
                 )
 
-        # Deduplicate by (type,id) while keeping the best confidence.
+        return self._dedupe_best(resolved)
+
+    @staticmethod
+    def _dedupe_best(resolved: list[ResolvedEntity]) -> list[ResolvedEntity]:
+        """Deduplicate by (type,id) while keeping the best confidence."""
         best: dict[tuple[str, str], ResolvedEntity] = {}
         for r in resolved:
             key = (r.entity_type.value, r.entity_id)
@@ -242,11 +329,12 @@ class EntityResolver:
         """
         Best-effort inference for alias targets based on loaded name map.
         """
-        if entity_id in self._pillars.values():
+        ids = (self._match_index or self._compile_match_index()).entity_ids
+        if entity_id in ids["pillar"]:
             return EntityType.PILLAR
-        if entity_id in self._core_values.values():
+        if entity_id in ids["core_value"]:
             return EntityType.CORE_VALUE
-        if entity_id in self._sub_values.values():
+        if entity_id in ids["sub_value"]:
             return EntityType.SUB_VALUE
         return None
 
@@ -295,3 +383,144 @@ def get_resolver() -> EntityResolver:
         _resolver = EntityResolver()
     return _resolver
 
+
+# =============================================================================
+# Shared (process-wide) resolver with versioned hot reload
+# =============================================================================
+
+DEFAULT_ALIASES_PATH = "data/static/aliases_ar.json"
+
+
+@dataclass
+class ResolverIndexStats:
+    """Rebuild metrics for the shared resolver index."""
+
+    corpus_version: Optional[str] = None
+    rebuilds: int = 0
+    last_rebuild_ms: float = 0.0
+    last_rebuild_memory_bytes: int = 0
+    patterns: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "corpus_version": self.corpus_version,
+            "rebuilds": self.rebuilds,
+            "last_rebuild_ms": round(self.last_rebuild_ms, 2),
+            "last_rebuild_memory_bytes": self.last_rebuild_memory_bytes,
+            "patterns": self.patterns,
+        }
+
+
+# (corpus_version_key, resolver). Replaced as one tuple so readers never see a half-built index.
+_shared: Optional[tuple[str, EntityResolver]] = None
+_shared_lock: Optional[asyncio.Lock] = None
+_shared_stats = ResolverIndexStats()
+
+
+def approx_resolver_memory_bytes(resolver: EntityResolver) -> int:
+    """Approximate memory held by the resolver index (containers + strings)."""
+    total = 0
+    for container in (
+        resolver._pillars,
+        resolver._core_values,
+        resolver._sub_values,
+        resolver._names,
+        resolver._aliases,
+    ):
+        total += sys.getsizeof(container)
+        for k, v in container.items():
+            total += sys.getsizeof(k) + sys.getsizeof(v)
+    total += sys.getsizeof(resolver._pillar_items)
+    for item in resolver._pillar_items:
+        total += sys.getsizeof(item) + sum(sys.getsizeof(v) for v in item.values())
+    return total
+
+
+async def load_entity_resolver(session: Any, aliases_path: Optional[str | Path] = DEFAULT_ALIASES_PATH) -> EntityResolver:
+    """Build a fresh resolver from pillar/core_value/sub_value tables (raises on DB errors)."""
+    from sqlalchemy import text
+
+    pillars = (await session.execute(text("SELECT id, name_ar FROM pillar"))).fetchall()
+    core_values = (await session.execute(text("SELECT id, name_ar FROM core_value"))).fetchall()
+    sub_values = (await session.execute(text("SELECT id, name_ar FROM sub_value"))).fetchall()
+    resolver = EntityResolver()
+    resolver.load_entities(
+        pillars=[{"id": str(r.id), "name_ar": r.name_ar} for r in pillars],
+        core_values=[{"id": str(r.id), "name_ar": r.name_ar} for r in core_values],
+        sub_values=[{"id": str(r.id), "name_ar": r.name_ar} for r in sub_values],
+        aliases_path=aliases_path,
+    )
+    return resolver
+
+
+async def _rollback_quietly(session: Any) -> None:
+    # Reason: Postgres aborts the transaction after an error; the request reuses this session.
+    try:
+        await session.rollback()
+    except Exception:
+        pass
+
+
+async def get_shared_resolver(session: Any) -> EntityResolver:
+    """
+    Return the process-wide resolver, rebuilding it only when the corpus version changes.
+
+    Fail-soft: if the DB is unavailable, returns an empty (uncached) resolver, matching the
+    previous per-request behavior in dev contexts.
+    """
+    from apps.api.core.corpus_version import get_corpus_version
+
+    global _shared, _shared_lock
+    try:
+        version = (await get_corpus_version(session)).key
+    except Exception:
+        await _rollback_quietly(session)
+        return _shared[1] if _shared is not None else EntityResolver()
+
+    current = _shared
+    if current is not None and current[0] == version:
+        return current[1]
+
+    if _shared_lock is None:
+        _shared_lock = asyncio.Lock()
+    async with _shared_lock:
+        current = _shared
+        if current is not None and current[0] == version:
+            return current[1]
+
+        t0 = time.perf_counter()
+        try:
+            resolver = await load_entity_resolver(session)
+        except Exception:
+            await _rollback_quietly(session)
+            return current[1] if current is not None else EntityResolver()
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        _shared = (version, resolver)
+        _shared_stats.corpus_version = version
+        _shared_stats.rebuilds += 1
+        _shared_stats.last_rebuild_ms = elapsed_ms
+        _shared_stats.last_rebuild_memory_bytes = approx_resolver_memory_bytes(resolver)
+        _shared_stats.patterns = (
+            len(resolver._pillars) + len(resolver._core_values) + len(resolver._sub_values) + len(resolver._aliases)
+        )
+        logger.info(
+            "[RESOLVER] rebuilt index version=%s patterns=%s in %.1fms (~%s bytes)",
+            version,
+            _shared_stats.patterns,
+            elapsed_ms,
+            _shared_stats.last_rebuild_memory_bytes,
+        )
+        return resolver
+
+
+def get_resolver_index_stats() -> dict[str, Any]:
+    """Rebuild metrics for /health and observability."""
+    return _shared_stats.to_dict()
+
+
+def reset_shared_resolver() -> None:
+    """Drop the shared resolver (tests)."""
+    global _shared
+    _shared = None
+
@@ -4,12 +4,16 @@ Graph Retriever Module
 Retrieves evidence packets by traversing the knowledge graph edges.
 """
 
+import os
 from typing import Any, Optional
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.core.schemas import EntityType
+from apps.api.graph.graph_snapshot import get_graph_snapshot_or_none
+from apps.api.retrieve.edge_spans import _attach_justification_spans
+from apps.api.retrieve.request_memo import current_retrieval_memo
 
 
 async def get_entity_neighbors(
@@ -34,8 +38,21 @@ async def get_entity_neighbors(
     Returns:
         List of neighboring entities with edge information.
     """
-    neighbors = []
     et_value = entity_type.value if isinstance(entity_type, EntityType) else str(entity_type)
+    memo = current_retrieval_memo()
+    memo_key = (
+        et_value,
+        str(entity_id),
+        tuple(sorted(str(x) for x in relationship_types)) if relationship_types else None,
+        direction,
+        status,
+    )
+    if memo is not None:
+        cached = memo.get_neighbors(memo_key)
+        if cached is not None:
+            return cached
+
+    neighbors = []
 
     # Build queries based on direction
     if direction in ("outgoing", "both"):
@@ -122,67 +139,145 @@ async def get_entity_neighbors(
         allowed = set([str(x) for x in relationship_types if str(x)])
         neighbors = [n for n in neighbors if str(n.get("rel_type") or "") in allowed]
 
-    # Attach edge-level justification spans (best-effort; table may not exist in older DBs).
-    try:
-        edge_ids = [n.get("edge_id") for n in neighbors if n.get("edge_id")]
-        edge_ids = [str(eid) for eid in edge_ids if str(eid)]
-        if edge_ids:
-            span_rows = (
-                await session.execute(
-                    text(
-                        """
-                        SELECT edge_id::text AS edge_id, chunk_id, span_start, span_end, quote
-                        FROM edge_justification_span
-                        WHERE edge_id::text = ANY(:eids)
-                        ORDER BY edge_id, chunk_id, span_start
-                        """
-                    ),
-                    {"eids": edge_ids},
-                )
-            ).fetchall()
-            spans_by_edge: dict[str, list[dict[str, Any]]] = {}
-            for r in span_rows:
-                spans_by_edge.setdefault(str(r.edge_id), []).append(
-                    {
-                        "chunk_id": str(r.chunk_id),
-                        "span_start": int(r.span_start),
-                        "span_end": int(r.span_end),
-                        "quote": str(r.quote),
-                    }
-                )
-            for n in neighbors:
-                eid = str(n.get("edge_id") or "")
-                n["justification_spans"] = spans_by_edge.get(eid, [])
-        else:
-            for n in neighbors:
-                n["justification_spans"] = []
-    except Exception:
-        for n in neighbors:
-            n["justification_spans"] = []
-
+    await _attach_justification_spans(session, neighbors)
+    if memo is not None:
+        memo.put_neighbors(memo_key, neighbors)
     return neighbors
 
 
+def _batched_expansion_enabled() -> bool:
+    return os.getenv("GRAPH_EXPAND_BATCHED", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+async def _fetch_frontier_edges(
+    session: AsyncSession,
+    frontier: list[tuple[str, str]],
+    relationship_types: Optional[list[str]],
+    status: str,
+) -> list[Any]:
+    """
+    Fetch all edges touching a BFS frontier in one query.
+
+    Rows come back grouped per frontier node (in frontier order), outgoing before incoming,
+    which is the order the per-node expansion visited them in.
+    """
+    filters = ""
+    params: dict[str, Any] = {
+        "frontier_types": [t for t, _ in frontier],
+        "frontier_ids": [i for _, i in frontier],
+    }
+    if status != "all":
+        filters += " AND e.status = :status"
+        params["status"] = status
+    if relationship_types:
+        filters += " AND e.rel_type = ANY(CAST(:rel_types AS varchar[]))"
+        params["rel_types"] = [str(x) for x in relationship_types if str(x)]
+
+    frontier_sql = """
+        unnest(CAST(:frontier_types AS varchar[]), CAST(:frontier_ids AS varchar[]))
+            WITH ORDINALITY AS k(entity_type, entity_id, ord)
+    """
+    columns = "e.id AS edge_id, e.rel_type, e.relation_type, e.created_method, e.score, e.strength_score"
+    query = f"""
+        SELECT k.ord, 0 AS dir_rank, 'outgoing' AS direction, {columns},
+               e.to_type AS neighbor_type, e.to_id AS neighbor_id
+        FROM edge e
+        JOIN {frontier_sql} ON e.from_type = k.entity_type AND e.from_id = k.entity_id
+        WHERE TRUE {filters}
+        UNION ALL
+        SELECT k.ord, 1 AS dir_rank, 'incoming' AS direction, {columns},
+               e.from_type AS neighbor_type, e.from_id AS neighbor_id
+        FROM edge e
+        JOIN {frontier_sql} ON e.to_type = k.entity_type AND e.to_id = k.entity_id
+        WHERE TRUE {filters}
+        ORDER BY ord, dir_rank
+    """
+    return (await session.execute(text(query), params)).fetchall()
+
+
 async def expand_graph(
     session: AsyncSession,
     entity_type: EntityType | str,
     entity_id: str,
     depth: int = 2,
     relationship_types: Optional[list[str]] = None,
+    status: str = "approved",
 ) -> list[dict[str, Any]]:
     """
     Expand the graph from an entity to a given depth.
 
+    Approved-edge expansions run on the process graph snapshot (GRAPH_SNAPSHOT). Otherwise
+    each BFS level is fetched with one set-based query (rel-type and status filters in SQL).
+    Justification spans are loaded once for the final edge set. Set
+    GRAPH_EXPAND_BATCHED=false to use the per-node traversal.
+
     Args:
         session: Database session.
         entity_type: Type of the starting entity.
         entity_id: ID of the starting entity.
         depth: How many hops to traverse.
         relationship_types: Filter for relationship types.
+        status: Edge status filter (approved, candidate, all).
 
     Returns:
         List of all entities reached.
     """
+    start_type = entity_type.value if isinstance(entity_type, EntityType) else str(entity_type)
+    if status == "approved":
+        # Reason: the in-memory CSR snapshot holds exactly the approved edges.
+        snap = await get_graph_snapshot_or_none(session)
+        if snap is not None:
+            entities = snap.expand((start_type, str(entity_id)), depth, relationship_types)
+            await _attach_justification_spans(session, entities)
+            return entities
+
+    if not _batched_expansion_enabled():
+        return await _expand_graph_per_node(session, entity_type, entity_id, depth, relationship_types, status)
+
+    visited: set[tuple[str, str]] = {(start_type, entity_id)}
+    entities: list[dict[str, Any]] = []
+    current_level: list[tuple[str, str]] = [(start_type, entity_id)]
+
+    for level in range(depth):
+        next_level: list[tuple[str, str]] = []
+        for row in await _fetch_frontier_edges(session, current_level, relationship_types, status):
+            key = (row.neighbor_type, row.neighbor_id)
+            if key in visited:
+                continue
+            visited.add(key)
+            entities.append(
+                {
+                    "edge_id": str(row.edge_id),
+                    "rel_type": row.rel_type,
+                    "relation_type": row.relation_type,
+                    "neighbor_type": row.neighbor_type,
+                    "neighbor_id": row.neighbor_id,
+                    "direction": row.direction,
+                    "created_method": row.created_method,
+                    "score": row.score,
+                    "strength_score": row.strength_score,
+                    "depth": level + 1,
+                }
+            )
+            next_level.append(key)
+
+        current_level = next_level
+        if not current_level:
+            break
+
+    await _attach_justification_spans(session, entities)
+    return entities
+
+
+async def _expand_graph_per_node(
+    session: AsyncSession,
+    entity_type: EntityType | str,
+    entity_id: str,
+    depth: int = 2,
+    relationship_types: Optional[list[str]] = None,
+    status: str = "approved",
+) -> list[dict[str, Any]]:
+    """Legacy BFS: one `get_entity_neighbors` call (2-3 queries) per frontier node."""
     visited: set[tuple[str, str]] = set()
     entities: list[dict[str, Any]] = []
 
@@ -200,6 +295,7 @@ async def expand_graph(
                 current_type,
                 current_id,
                 relationship_types=relationship_types,
+                status=status,
             )
 
             for neighbor in neighbors:
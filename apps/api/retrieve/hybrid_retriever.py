@@ -11,7 +11,9 @@ Returns Evidence Packets (contract) via MergeRanker.
 
 from __future__ import annotations
 
-import os
+import asyncio
+import time
+from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -19,11 +21,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.core.schemas import EntityType
 from apps.api.retrieve.merge_rank import MergeRanker, MergeResult
-from apps.api.retrieve.sql_retriever import get_chunks_with_refs
+from apps.api.retrieve.sql_retriever import get_chunks_with_refs_bulk
 from apps.api.retrieve.graph_retriever import expand_graph
 from apps.api.retrieve.vector_retriever import VectorRetriever
+from apps.api.retrieve.retrieval_fanout import (
+    BranchMemo,
+    SessionFactory,
+    default_session_factory,
+    retrieval_max_concurrency,
+    retrieval_parallel_enabled,
+    run_branches,
+)
 from apps.api.retrieve.reranker import Reranker, create_reranker_from_env
-from apps.api.retrieve.reranker_policy import should_use_reranker, get_reranker_decision_reason
+from apps.api.retrieve.rerank_pass import apply_reranker_pass
+
+
+_active_memo: ContextVar[Optional[BranchMemo]] = ContextVar("hybrid_retrieval_memo", default=None)
+
+
+def _copy_packets(packets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Shallow-copy memoized packets so per-call tagging never leaks across calls."""
+    return [dict(p) for p in packets]
 
 
 @dataclass
@@ -48,12 +66,17 @@ class HybridRetriever:
         reranker: Optional[Reranker] = None,
         enable_vector: bool = True,
         enable_graph: bool = True,
+        parallel: Optional[bool] = None,
+        session_factory: Optional[SessionFactory] = None,
     ):
         self.merge_ranker = merge_ranker or MergeRanker(max_packets=25)
         self.vector_retriever = vector_retriever or VectorRetriever()
         self.reranker: Reranker = reranker or create_reranker_from_env()
         self.enable_vector = enable_vector
         self.enable_graph = enable_graph
+        # None = follow RETRIEVAL_PARALLEL; session_factory defaults to the app session pool.
+        self.parallel = parallel
+        self.session_factory = session_factory
 
     def _collect_ref_node_ids(self, packets: list[dict[str, Any]], max_refs: int = 12) -> list[str]:
         """
@@ -86,6 +109,25 @@ class HybridRetriever:
                     return ref_ids
         return ref_ids
 
+    @staticmethod
+    def _neighbor_chunk_requests(
+        neighbors: list[dict[str, Any]], limit: int
+    ) -> list[tuple[EntityType, str, int, int]]:
+        """Map graph neighbors to (entity_type, entity_id, limit, depth) chunk requests."""
+        out: list[tuple[EntityType, str, int, int]] = []
+        for n in neighbors:
+            n_type = n.get("neighbor_type")
+            n_id = n.get("neighbor_id")
+            if not n_type or not n_id:
+                continue
+            # Only fetch chunks for well-defined entities
+            try:
+                n_et = EntityType(n_type)
+            except Exception:
+                continue
+            out.append((n_et, n_id, limit, n.get("depth", 1)))
+        return out
+
     async def _expand_via_refs(
         self,
         session: AsyncSession,
@@ -100,7 +142,8 @@ class HybridRetriever:
         - entity ─MENTIONS_REF→ ref
         - evidence ─REFERS_TO→ ref
         """
-        graph_packets: list[dict[str, Any]] = []
+        # (entity_type, entity_id, limit, depth, via_ref); chunks fetched in one batch below.
+        requests: list[tuple[EntityType, str, int, int, str]] = []
         for rid in ref_node_ids:
             neighbors = await expand_graph(
                 session,
@@ -108,50 +151,47 @@ class HybridRetriever:
                 entity_id=rid,
                 depth=depth,
                     relationship_types=[
-                        "MENTIONS_REF",
-                        "REFERS_TO",
-                        "SHARES_REF",
-                        "SAME_NAME",
-                        "CONTAINS",
-                        "SUPPORTED_BY",
-                        "SCHOLAR_LINK",
-                    ],
+                    "MENTIONS_REF",
+                    "REFERS_TO",
+                    "SHARES_REF",
+                    "SAME_NAME",
+                    "CONTAINS",
+                    "SUPPORTED_BY",
+                    "SCHOLAR_LINK",
+                ],
             )
-            for n in neighbors:
-                n_type = n.get("neighbor_type")
-                n_id = n.get("neighbor_id")
-                if not n_type or not n_id:
-                    continue
-                # Only fetch chunks for well-defined entities
-                try:
-                    n_et = EntityType(n_type)
-                except Exception:
-                    continue
-                packets = await get_chunks_with_refs(session, n_et, n_id, limit=per_entity_limit)
-                for p in packets:
-                    p["depth"] = n.get("depth", 1)
-                    p["via_ref"] = rid
-                graph_packets.extend(packets)
-        return graph_packets
+            for n_et, n_id, limit, n_depth in self._neighbor_chunk_requests(neighbors, per_entity_limit):
+                requests.append((n_et, n_id, limit, n_depth, rid))
 
-    async def retrieve(
-        self,
-        session: AsyncSession,
-        inputs: RetrievalInputs,
-        reranker_override: Optional[bool] = None,
-    ) -> MergeResult:
-        """
-        Retrieve evidence packets using all enabled sources.
+        graph_packets: list[dict[str, Any]] = []
+        batches = await get_chunks_with_refs_bulk(session, [r[:3] for r in requests])
+        for (_, _, _, n_depth, rid), packets in zip(requests, batches):
+            for p in packets:
+                p["depth"] = n_depth
+                p["via_ref"] = rid
+            graph_packets.extend(packets)
+        return graph_packets
 
-        Notes:
-        - Vector retrieval is best-effort; if embeddings are not configured it may return none.
-        - Graph expansion only uses approved edges (graph_retriever default).
-        """
+    _GRAPH_RELS = [
+        "CONTAINS",
+        "SUPPORTED_BY",
+        "SHARES_REF",
+        "MENTIONS_REF",
+        "REFERS_TO",
+        "SAME_NAME",
+        "SCHOLAR_LINK",
+    ]
+
+    async def _entity_branch(
+        self, session: AsyncSession, inputs: RetrievalInputs
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Entity-first SQL chunks + graph-neighbor chunks for resolved entities."""
         sql_results: list[dict[str, Any]] = []
         graph_results: list[dict[str, Any]] = []
-        vector_results: list[dict[str, Any]] = []
-
-        inferred_entities: list[dict[str, Any]] = []
+        # Reason: chunk fetches are collected and executed as one batch per stage
+        # (get_chunks_with_refs_bulk) instead of 1 + #chunks queries per entity.
+        entity_requests: list[tuple[EntityType, str, int]] = []
+        neighbor_requests: list[tuple[EntityType, str, int, int]] = []
 
         # 1) Entity-first SQL retrieval
         for ent in inputs.resolved_entities:
@@ -164,9 +204,7 @@ class HybridRetriever:
             if not entity_id:
                 continue
 
-            sql_results.extend(
-                await get_chunks_with_refs(session, et, entity_id, limit=20)
-            )
+            entity_requests.append((et, entity_id, 20))
 
             # 2) Graph expansion (neighbors -> their chunks)
             if self.enable_graph:
@@ -175,189 +213,256 @@ class HybridRetriever:
                     et,
                     entity_id,
                     depth=inputs.graph_depth,
-                    relationship_types=[
-                        "CONTAINS",
-                        "SUPPORTED_BY",
-                        "SHARES_REF",
-                        "MENTIONS_REF",
-                        "REFERS_TO",
-                        "SAME_NAME",
-                        "SCHOLAR_LINK",
-                    ],
+                    relationship_types=self._GRAPH_RELS,
                 )
-                for n in neighbors:
-                    n_type = n.get("neighbor_type")
-                    n_id = n.get("neighbor_id")
-                    if not n_type or not n_id:
-                        continue
-                    try:
-                        n_et = EntityType(n_type)
-                    except Exception:
-                        continue
-                    packets = await get_chunks_with_refs(session, n_et, n_id, limit=10)
-                    # Tag depth so MergeRanker can down-weight if desired
-                    for p in packets:
-                        p["depth"] = n.get("depth", 1)
-                    graph_results.extend(packets)
-
-        # 3) Vector retrieval (best-effort)
-        if self.enable_vector:
+                neighbor_requests.extend(self._neighbor_chunk_requests(neighbors, 10))
+
+        if entity_requests or neighbor_requests:
+            batches = await get_chunks_with_refs_bulk(
+                session, entity_requests + [r[:3] for r in neighbor_requests]
+            )
+            for packets in batches[: len(entity_requests)]:
+                sql_results.extend(packets)
+            for (_, _, _, n_depth), packets in zip(neighbor_requests, batches[len(entity_requests) :]):
+                # Tag depth so MergeRanker can down-weight if desired
+                for p in packets:
+                    p["depth"] = n_depth
+                graph_results.extend(packets)
+        return sql_results, graph_results
+
+    async def _vector_branch(self, session: AsyncSession, inputs: RetrievalInputs) -> list[dict[str, Any]]:
+        """Vector retrieval (best-effort)."""
+        if not self.enable_vector:
+            return []
+        try:
+            return await self.vector_retriever.search(
+                session,
+                inputs.query,
+                top_k=inputs.top_k,
+            )
+        except Exception:
+            return []
+
+    @staticmethod
+    def _infer_entities(
+        inputs: RetrievalInputs, vector_results: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Infer entities from vector hits when explicit entity resolution fails.
+
+        Reason: Arabic users often ask via concepts not matching canonical names.
+        We can still "anchor" to the framework by using the entity_id/type in
+        the highest scoring chunks, then expand via graph.
+        """
+        inferred_entities: list[dict[str, Any]] = []
+        if inputs.resolved_entities or not vector_results:
+            return inferred_entities
+        seen: set[tuple[str, str]] = set()
+        for p in vector_results[: min(8, len(vector_results))]:
+            et = p.get("entity_type")
+            eid = p.get("entity_id")
+            if not et or not eid:
+                continue
+            key = (str(et), str(eid))
+            if key in seen:
+                continue
+            seen.add(key)
+            inferred_entities.append(
+                {
+                    "type": str(et),
+                    "id": str(eid),
+                    "name_ar": None,
+                    "confidence": 0.45,
+                    "match_type": "vector_inferred",
+                }
+            )
+        return inferred_entities
+
+    async def _inferred_branch(
+        self,
+        session: AsyncSession,
+        inputs: RetrievalInputs,
+        inferred_entities: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Graph-neighbor chunks for entities inferred from vector hits."""
+        graph_results: list[dict[str, Any]] = []
+        inferred_requests: list[tuple[EntityType, str, int, int, str]] = []
+        for ent in inferred_entities:
             try:
-                vector_results = await self.vector_retriever.search(
-                    session,
-                    inputs.query,
-                    top_k=inputs.top_k,
-                )
+                et = EntityType(ent["type"])
             except Exception:
-                vector_results = []
-
-        # 3b) Infer entities from vector hits when explicit entity resolution fails.
-        # Reason: Arabic users often ask via concepts not matching canonical names.
-        # We can still "anchor" to the framework by using the entity_id/type in
-        # the highest scoring chunks, then expand via graph.
-        if not inputs.resolved_entities and vector_results:
-            seen: set[tuple[str, str]] = set()
-            for p in vector_results[: min(8, len(vector_results))]:
-                et = p.get("entity_type")
-                eid = p.get("entity_id")
-                if not et or not eid:
-                    continue
-                key = (str(et), str(eid))
-                if key in seen:
-                    continue
-                seen.add(key)
-                inferred_entities.append(
-                    {
-                        "type": str(et),
-                        "id": str(eid),
-                        "name_ar": None,
-                        "confidence": 0.45,
-                        "match_type": "vector_inferred",
-                    }
-                )
+                continue
+            neighbors = await expand_graph(
+                session,
+                et,
+                ent["id"],
+                depth=inputs.graph_depth,
+                relationship_types=self._GRAPH_RELS,
+            )
+            for n_et, n_id, limit, n_depth in self._neighbor_chunk_requests(neighbors, 6):
+                inferred_requests.append((n_et, n_id, limit, n_depth, ent["id"]))
+
+        if inferred_requests:
+            batches = await get_chunks_with_refs_bulk(session, [r[:3] for r in inferred_requests])
+            for (_, _, _, n_depth, via_entity), packets in zip(inferred_requests, batches):
+                for p in packets:
+                    p["depth"] = n_depth
+                    p["via_entity"] = via_entity
+                graph_results.extend(packets)
+        return graph_results
+
+    async def retrieve_many(
+        self,
+        session: AsyncSession,
+        inputs_list: list[RetrievalInputs],
+        reranker_override: Optional[bool] = None,
+    ) -> list[Optional[MergeResult]]:
+        """
+        Run several retrievals for one request (query rewrites, chain-stage hints).
+
+        - Branch results that do not depend on the query text (entity chunks, graph
+          neighbors, ref / inferred expansions) are computed once and shared via BranchMemo.
+        - In parallel mode the calls run concurrently (bounded by RETRIEVAL_MAX_CONCURRENCY),
+          each extra call on its own pooled session.
+        - Results are returned in input order; a failed call yields None.
+        """
+        parallel = self.parallel if self.parallel is not None else retrieval_parallel_enabled()
+        session_factory = self.session_factory or (default_session_factory() if parallel else None)
+        kwargs = {} if reranker_override is None else {"reranker_override": reranker_override}
+
+        async def _one(i: int, inp: RetrievalInputs) -> Optional[MergeResult]:
+            try:
+                if i == 0 or session_factory is None:
+                    return await self.retrieve(session, inp, **kwargs)
+                async with session_factory() as branch_session:
+                    return await self.retrieve(branch_session, inp, **kwargs)
+            except Exception:
+                return None
+
+        # Reason: the memo travels via a contextvar (copied into gathered tasks) so
+        # `retrieve` keeps its public signature for callers and test doubles.
+        token = _active_memo.set(BranchMemo())
+        try:
+            if not parallel or session_factory is None:
+                return [await _one(i, inp) for i, inp in enumerate(inputs_list)]
+
+            sem = asyncio.Semaphore(retrieval_max_concurrency())
+
+            async def _bounded(i: int, inp: RetrievalInputs) -> Optional[MergeResult]:
+                async with sem:
+                    return await _one(i, inp)
+
+            return list(await asyncio.gather(*(_bounded(i, inp) for i, inp in enumerate(inputs_list))))
+        finally:
+            _active_memo.reset(token)
+
+    async def retrieve(
+        self,
+        session: AsyncSession,
+        inputs: RetrievalInputs,
+        reranker_override: Optional[bool] = None,
+        memo: Optional[BranchMemo] = None,
+    ) -> MergeResult:
+        """
+        Retrieve evidence packets using all enabled sources.
 
-        # 4) Ref-driven graph expansion (enterprise cross-pillar discovery)
-        # Collect refs from what we already retrieved (SQL + vector) and traverse from 'ref' nodes.
+        Notes:
+        - Vector retrieval is best-effort; if embeddings are not configured it may return none.
+        - Graph expansion only uses approved edges (graph_retriever default).
+        - In parallel mode, independent sources run concurrently on separate pooled sessions
+          (stage 1: entity/graph || vector; stage 2: ref expansion || inferred expansion).
+          Results are merged in the same fixed order as sequential mode.
+        """
+        t_start = time.perf_counter()
+        if memo is None:
+            memo = _active_memo.get()
+        timings: dict[str, float] = {}
+        parallel = self.parallel if self.parallel is not None else retrieval_parallel_enabled()
+        session_factory = self.session_factory or (default_session_factory() if parallel else None)
+
+        entity_key = tuple(
+            (str(e.get("type")), str(e.get("id") or e.get("entity_id") or "")) for e in inputs.resolved_entities
+        )
+
+        async def _entity(s: AsyncSession) -> Any:
+            if memo is None:
+                return await self._entity_branch(s, inputs)
+            sql_p, graph_p = await memo.get_or_run(
+                ("entity_graph", entity_key, inputs.graph_depth, self.enable_graph),
+                lambda: self._entity_branch(s, inputs),
+            )
+            return _copy_packets(sql_p), _copy_packets(graph_p)
+
+        async def _vector(s: AsyncSession) -> Any:
+            if memo is None:
+                return await self._vector_branch(s, inputs)
+            return _copy_packets(
+                await memo.get_or_run(("vector", inputs.query, inputs.top_k), lambda: self._vector_branch(s, inputs))
+            )
+
+        # Stage 1: sources that only depend on the inputs.
+        (sql_results, graph_results), vector_results = await run_branches(
+            session,
+            [("entity_graph", _entity), ("vector", _vector)],
+            parallel=parallel,
+            timings=timings,
+            session_factory=session_factory,
+        )
+
+        # Stage 2: expansions seeded by stage 1 (ref-driven enterprise cross-pillar discovery,
+        # and entities inferred from vector hits).
+        inferred_entities = self._infer_entities(inputs, vector_results)
         if self.enable_graph:
             ref_node_ids = self._collect_ref_node_ids(sql_results + vector_results)
-            if ref_node_ids:
-                graph_results.extend(await self._expand_via_refs(session, ref_node_ids, depth=2))
+            stage2: list = []
+
+            async def _refs(s: AsyncSession) -> Any:
+                if memo is None:
+                    return await self._expand_via_refs(s, ref_node_ids, depth=2)
+                return _copy_packets(
+                    await memo.get_or_run(
+                        ("ref_expansion", tuple(ref_node_ids)),
+                        lambda: self._expand_via_refs(s, ref_node_ids, depth=2),
+                    )
+                )
 
-            # If we inferred entities from vector, expand from them too.
-            for ent in inferred_entities:
-                try:
-                    et = EntityType(ent["type"])
-                except Exception:
-                    continue
-                neighbors = await expand_graph(
-                    session,
-                    et,
-                    ent["id"],
-                    depth=inputs.graph_depth,
-                    relationship_types=[
-                        "CONTAINS",
-                        "SUPPORTED_BY",
-                        "SHARES_REF",
-                        "MENTIONS_REF",
-                        "REFERS_TO",
-                        "SAME_NAME",
-                        "SCHOLAR_LINK",
-                    ],
+            async def _inferred(s: AsyncSession) -> Any:
+                if memo is None:
+                    return await self._inferred_branch(s, inputs, inferred_entities)
+                key = tuple((e["type"], e["id"]) for e in inferred_entities)
+                return _copy_packets(
+                    await memo.get_or_run(
+                        ("inferred_expansion", key, inputs.graph_depth),
+                        lambda: self._inferred_branch(s, inputs, inferred_entities),
+                    )
                 )
-                for n in neighbors:
-                    n_type = n.get("neighbor_type")
-                    n_id = n.get("neighbor_id")
-                    if not n_type or not n_id:
-                        continue
-                    try:
-                        n_et = EntityType(n_type)
-                    except Exception:
-                        continue
-                    packets = await get_chunks_with_refs(session, n_et, n_id, limit=6)
-                    for p in packets:
-                        p["depth"] = n.get("depth", 1)
-                        p["via_entity"] = ent["id"]
-                    graph_results.extend(packets)
 
+            if ref_node_ids:
+                stage2.append(("ref_expansion", _refs))
+            if inferred_entities:
+                stage2.append(("inferred_expansion", _inferred))
+            for packets in await run_branches(
+                session, stage2, parallel=parallel, timings=timings, session_factory=session_factory
+            ):
+                graph_results.extend(packets)
+
+        t_merge = time.perf_counter()
         merged = self.merge_ranker.merge(
             sql_results=sql_results,
             vector_results=vector_results,
             graph_results=graph_results,
             resolved_entities=inputs.resolved_entities,
         )
+        timings["merge"] = round((time.perf_counter() - t_merge) * 1000.0, 2)
+
+        apply_reranker_pass(merged, self.reranker, inputs, reranker_override, timings)
 
-        # Optional reranker pass (top-N reordering).
-        # Policy: Use per-intent gating based on A/B test results
-        # - Global reranker hurts overall (-3.7% PASS_FULL)
-        # - Reranker helps synthesis (synth-006: 30% → 100%)
-        try:
-            # Extract retrieval quality metrics for conditional decisions
-            retrieval_scores = [float(rc.get("score") or 0.0) for rc in (merged.ranked_chunks or [])]
-            retrieval_sources = [str(rc.get("backend") or "") for rc in (merged.ranked_chunks or [])]
-            
-            # Determine if reranker should be used
-            # Supports three modes:
-            # 1. reranker_override=True/False: Explicit A/B test control
-            # 2. RERANKER_ENABLED=true: Always use policy (model loaded)
-            # 3. RERANKER_SELECTIVE_MODE=true: Use policy (model loaded)
-            # 4. Neither enabled: No reranker
-            reranker_reason = "not_loaded"
-            if reranker_override is not None:
-                # Explicit override (for A/B testing)
-                use_reranker = reranker_override
-                reranker_reason = "override_on" if reranker_override else "override_off"
-            elif not self.reranker or not self.reranker.is_enabled():
-                # Reranker model not loaded
-                use_reranker = False
-                reranker_reason = "not_loaded"
-            else:
-                # Reranker model available - use policy-based decision
-                use_reranker, reranker_reason = should_use_reranker(
-                    intent=inputs.intent,
-                    retrieval_scores=retrieval_scores,
-                    retrieval_sources=retrieval_sources,
-                    mode=inputs.mode,
-                )
-            
-            # Store decision reason for observability
-            merged.reranker_decision = reranker_reason
-            merged.reranker_used = use_reranker
-            
-            if self.reranker and use_reranker and merged.evidence_packets:
-                alpha = float(os.getenv("RERANKER_ALPHA", "0.25") or 0.25)
-                alpha = max(0.0, min(alpha, 1.0))
-                # Build lookup from chunk_id -> base score/backends.
-                base_by_id = {str(rc.get("chunk_id") or ""): float(rc.get("score") or 0.0) for rc in (merged.ranked_chunks or [])}
-                sources_by_id = {str(rc.get("chunk_id") or ""): list(rc.get("sources") or []) for rc in (merged.ranked_chunks or [])}
-                backend_by_id = {str(rc.get("chunk_id") or ""): str(rc.get("backend") or "") for rc in (merged.ranked_chunks or [])}
-                scored = []
-                for p in merged.evidence_packets:
-                    cid = str(p.get("chunk_id") or "")
-                    base = float(base_by_id.get(cid, 0.0))
-                    rr = float(self.reranker.score(inputs.query, str(p.get("text_ar") or "")))
-                    combo = (1.0 - alpha) * base + alpha * rr
-                    scored.append((combo, rr, cid, p))
-                scored.sort(key=lambda x: x[0], reverse=True)
-                merged.evidence_packets = [x[3] for x in scored]
-                # Rebuild ranked_chunks deterministically from reranked list.
-                new_ranked = []
-                for i, (combo, rr, cid, p) in enumerate(scored, start=1):
-                    new_ranked.append(
-                        {
-                            "rank": i,
-                            "chunk_id": cid,
-                            "score": float(combo),
-                            "reranker_score": float(rr),
-                            "sources": sources_by_id.get(cid, []),
-                            "backend": backend_by_id.get(cid, str(p.get("backend") or "")),
-                        }
-                    )
-                merged.ranked_chunks = new_ranked
-        except Exception:
-            pass
         # For eval/observability: store last merge result on the instance.
         # Reason: runner/scorers need deterministic retrieval traces without changing
         # the public middleware API.
+        timings["total"] = round((time.perf_counter() - t_start) * 1000.0, 2)
+        merged.source_timings_ms = timings
+        merged.retrieval_mode = "parallel" if (parallel and session_factory is not None) else "sequential"
         try:
             self.last_merge_result = merged  # type: ignore[attr-defined]
         except Exception:
@@ -34,6 +34,9 @@ class MergeResult:
     # Reranker decision info (for observability)
     reranker_used: bool = False
     reranker_decision: str = ""
+    # Per-source wall times (ms) and execution mode (sequential|parallel).
+    source_timings_ms: dict[str, float] = field(default_factory=dict)
+    retrieval_mode: str = "sequential"
 
 
 class MergeRanker:
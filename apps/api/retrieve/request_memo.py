@@ -0,0 +1,119 @@
+"""
+Request-scoped retrieval memo.
+
+Why:
+- One /ask touches the same entity chunks, neighbors and edge spans from several stages
+  (RETRIEVE + rewrites, ScholarReasoner expansion, semantic edges, seed floor, critic loop).
+- The middleware attaches one memo per request (`StateContext.retrieval_memo`) and makes it
+  current for the duration of each state; `get_chunks_with_refs_bulk`,
+  `get_entity_neighbors` and justification-span lookups consult it.
+
+Outside a request (ingestion, scripts, tests) no memo is current and lookups go straight
+to the DB. Cached values are copied on read so callers may tag packets freely.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+ChunkKey = tuple[str, str]
+
+
+class RequestRetrievalMemo:
+    """Per-request cache of chunk, neighbor and span lookups with hit/miss counters."""
+
+    KINDS = ("chunks", "neighbors", "spans")
+
+    def __init__(self) -> None:
+        # (entity_type, entity_id) -> (limit fetched with, packets)
+        self._chunks: dict[ChunkKey, tuple[int, list[dict[str, Any]]]] = {}
+        self._neighbors: dict[tuple, list[dict[str, Any]]] = {}
+        self._spans: dict[str, list[dict[str, Any]]] = {}
+        self.counters: dict[str, dict[str, int]] = {k: {"hits": 0, "misses": 0} for k in self.KINDS}
+
+    def _count(self, kind: str, hit: bool) -> None:
+        self.counters[kind]["hits" if hit else "misses"] += 1
+
+    # Chunks -----------------------------------------------------------------
+
+    def get_chunks(self, key: ChunkKey, limit: int) -> Optional[list[dict[str, Any]]]:
+        """
+        Return cached packets for key when they cover `limit`.
+
+        A cached entry covers any limit <= its own, and any limit at all when it returned
+        fewer rows than it asked for (the entity has no more chunks).
+        """
+        entry = self._chunks.get(key)
+        if entry is not None:
+            cached_limit, packets = entry
+            if limit <= cached_limit or len(packets) < cached_limit:
+                self._count("chunks", True)
+                return [_copy_packet(p) for p in packets[:limit]]
+        self._count("chunks", False)
+        return None
+
+    def put_chunks(self, key: ChunkKey, limit: int, packets: list[dict[str, Any]]) -> None:
+        entry = self._chunks.get(key)
+        if entry is None or limit > entry[0]:
+            self._chunks[key] = (limit, [_copy_packet(p) for p in packets])
+
+    # Neighbors --------------------------------------------------------------
+
+    def get_neighbors(self, key: tuple) -> Optional[list[dict[str, Any]]]:
+        cached = self._neighbors.get(key)
+        self._count("neighbors", cached is not None)
+        if cached is None:
+            return None
+        return [dict(n) for n in cached]
+
+    def put_neighbors(self, key: tuple, neighbors: list[dict[str, Any]]) -> None:
+        self._neighbors[key] = [dict(n) for n in neighbors]
+
+    # Justification spans ----------------------------------------------------
+
+    def split_spans(self, edge_ids: list[str]) -> tuple[dict[str, list[dict[str, Any]]], list[str]]:
+        """Return (cached spans by edge_id, edge_ids still to fetch)."""
+        found: dict[str, list[dict[str, Any]]] = {}
+        missing: list[str] = []
+        for eid in edge_ids:
+            spans = self._spans.get(eid)
+            if spans is None:
+                missing.append(eid)
+            else:
+                found[eid] = [dict(s) for s in spans]
+        self._count("spans", not missing)
+        return found, missing
+
+    def put_spans(self, edge_ids: list[str], spans_by_edge: dict[str, list[dict[str, Any]]]) -> None:
+        """Store fetched spans; edges without spans are cached as empty."""
+        for eid in edge_ids:
+            self._spans[eid] = [dict(s) for s in spans_by_edge.get(eid, [])]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {k: dict(v) for k, v in self.counters.items()}
+
+
+def _copy_packet(p: dict[str, Any]) -> dict[str, Any]:
+    out = dict(p)
+    if isinstance(out.get("refs"), list):
+        out["refs"] = [dict(r) for r in out["refs"]]
+    return out
+
+
+_current: ContextVar[Optional[RequestRetrievalMemo]] = ContextVar("request_retrieval_memo", default=None)
+
+
+def current_retrieval_memo() -> Optional[RequestRetrievalMemo]:
+    return _current.get()
+
+
+@contextmanager
+def use_retrieval_memo(memo: Optional[RequestRetrievalMemo]) -> Iterator[Optional[RequestRetrievalMemo]]:
+    """Make `memo` current for the enclosed block (tasks created inside inherit it)."""
+    token = _current.set(memo)
+    try:
+        yield memo
+    finally:
+        _current.reset(token)
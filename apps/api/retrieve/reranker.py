@@ -4,13 +4,19 @@ Design goals:
 - Safe default: disabled unless explicitly configured.
 - Deterministic inference.
 - No dependency impact for unit tests unless enabled by env.
+- Batched inference (`score_batch`) with a process-wide LRU score cache keyed on
+  (model, normalized query hash, chunk_id, text hash), so repeated questions and
+  rewrite retries skip inference.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Any, Optional, Protocol, Sequence
 
 
 class Reranker(Protocol):
@@ -27,6 +33,87 @@ class NullReranker:
     def score(self, query: str, doc_text: str) -> float:
         return 0.0
 
+    def score_batch(
+        self, query: str, doc_texts: Sequence[str], doc_ids: Optional[Sequence[str]] = None
+    ) -> list[float]:
+        return [0.0 for _ in doc_texts]
+
+
+def _normalize_query(query: str) -> str:
+    # Reason: whitespace-only differences tokenize identically; collapse them for cache hits.
+    return " ".join((query or "").split())
+
+
+def _sha1(s: str) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
+
+class RerankerScoreCache:
+    """Thread-safe LRU of cross-encoder scores."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max(0, int(max_entries))
+        self._data: OrderedDict[tuple[str, str, str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str, str, str]) -> Optional[float]:
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key: tuple[str, str, str, str], value: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _cache_size_from_env() -> int:
+    try:
+        return int(os.getenv("RERANKER_CACHE_SIZE", "4096") or 4096)
+    except Exception:
+        return 4096
+
+
+def _batch_size_from_env() -> int:
+    try:
+        return max(1, int(os.getenv("RERANKER_BATCH_SIZE", "16") or 16))
+    except Exception:
+        return 16
+
+
+_score_cache = RerankerScoreCache(_cache_size_from_env())
+
+
+def get_reranker_score_cache() -> RerankerScoreCache:
+    return _score_cache
+
 
 class CrossEncoderReranker:
     """
@@ -41,11 +128,13 @@ class CrossEncoderReranker:
     - Regression models (1 output) - uses raw score
     """
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, cache: Optional[RerankerScoreCache] = None):
         self._model_path = model_path
         self._model = None
         self._tokenizer = None
         self._device = None
+        self._cache = cache if cache is not None else _score_cache
+        self._load_lock = threading.Lock()
 
     def is_enabled(self) -> bool:
         return True
@@ -53,18 +142,22 @@ class CrossEncoderReranker:
     def _ensure_loaded(self) -> None:
         if self._model is not None:
             return
-        
-        # Lazy import to keep default installs lightweight.
-        import torch
-        from transformers import AutoTokenizer, AutoModelForSequenceClassification
-        
-        self._tokenizer = AutoTokenizer.from_pretrained(self._model_path)
-        self._model = AutoModelForSequenceClassification.from_pretrained(self._model_path)
-        self._model.eval()
-        
-        # Use GPU if available
-        self._device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-        self._model = self._model.to(self._device)
+        with self._load_lock:
+            if self._model is not None:
+                return
+
+            # Lazy import to keep default installs lightweight.
+            import torch
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+            tokenizer = AutoTokenizer.from_pretrained(self._model_path)
+            model = AutoModelForSequenceClassification.from_pretrained(self._model_path)
+            model.eval()
+
+            # Use GPU if available
+            self._device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+            self._tokenizer = tokenizer
+            self._model = model.to(self._device)
 
     def score(self, query: str, doc_text: str) -> float:
         self._ensure_loaded()
@@ -98,6 +191,77 @@ class CrossEncoderReranker:
                 # Regression: raw score
                 return float(logits[0, 0].item())
 
+    def _infer_batch(self, query: str, doc_texts: list[str]) -> list[float]:
+        """One padded forward pass over (query, passage) pairs."""
+        self._ensure_loaded()
+        import torch
+
+        inputs = self._tokenizer(
+            [query] * len(doc_texts),
+            doc_texts,
+            truncation=True,
+            padding=True,
+            max_length=256,
+            return_tensors="pt",
+        )
+        inputs = {k: v.to(self._device) for k, v in inputs.items()}
+        with torch.no_grad():
+            logits = self._model(**inputs).logits
+            if logits.shape[-1] == 2:
+                return [float(x) for x in torch.softmax(logits, dim=-1)[:, 1].tolist()]
+            return [float(x) for x in logits[:, 0].tolist()]
+
+    def score_batch(
+        self,
+        query: str,
+        doc_texts: Sequence[str],
+        doc_ids: Optional[Sequence[str]] = None,
+        batch_size: Optional[int] = None,
+    ) -> list[float]:
+        """
+        Score many passages for one query.
+
+        Cached scores are reused; misses are sorted by length and run in padded mini-batches
+        (less padding per batch), then written back in input order.
+        """
+        q = _normalize_query(query)
+        scores: list[Optional[float]] = [None] * len(doc_texts)
+        if not q:
+            return [0.0 for _ in doc_texts]
+
+        q_hash = _sha1(q)
+        keys: list[Optional[tuple[str, str, str, str]]] = [None] * len(doc_texts)
+        pending: list[int] = []
+        for i, raw in enumerate(doc_texts):
+            d = (raw or "").strip()
+            if not d:
+                scores[i] = 0.0
+                continue
+            doc_id = str(doc_ids[i]) if doc_ids is not None and i < len(doc_ids) else ""
+            key = (self._model_path, q_hash, doc_id, _sha1(d))
+            keys[i] = key
+            cached = self._cache.get(key)
+            if cached is not None:
+                scores[i] = cached
+            else:
+                pending.append(i)
+
+        if pending:
+            bs = batch_size or _batch_size_from_env()
+            pending.sort(key=lambda i: len(doc_texts[i] or ""))
+            for start in range(0, len(pending), bs):
+                idxs = pending[start : start + bs]
+                batch_scores = self._infer_batch(q, [(doc_texts[i] or "").strip() for i in idxs])
+                for i, sc in zip(idxs, batch_scores):
+                    scores[i] = float(sc)
+                    self._cache.put(keys[i], float(sc))  # type: ignore[arg-type]
+
+        return [float(s or 0.0) for s in scores]
+
+
+_shared_rerankers: dict[str, CrossEncoderReranker] = {}
+_shared_lock = threading.Lock()
+
 
 def create_reranker_from_env() -> Reranker:
     """
@@ -123,7 +287,12 @@ def create_reranker_from_env() -> Reranker:
         return NullReranker()
     
     try:
-        reranker = CrossEncoderReranker(model_path=model_path)
+        # Reason: one model instance per process; HybridRetriever is built per request.
+        with _shared_lock:
+            reranker = _shared_rerankers.get(model_path)
+            if reranker is None:
+                reranker = CrossEncoderReranker(model_path=model_path)
+                _shared_rerankers[model_path] = reranker
         # For selective mode, we load but don't mark globally enabled
         # The hybrid_retriever will check the policy
         return reranker
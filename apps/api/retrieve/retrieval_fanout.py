@@ -0,0 +1,119 @@
+"""
+Concurrent fan-out for independent retrieval sources.
+
+Why:
+- HybridRetriever sources (entity SQL + graph, vector/BM25, ref expansion, inferred
+  expansion) used to run one after another on one AsyncSession, so RETRIEVE latency was
+  the sum of all sources.
+- An AsyncSession cannot run concurrent queries, so in parallel mode each extra branch
+  opens its own pooled session; concurrency is bounded by RETRIEVAL_MAX_CONCURRENCY.
+
+Results are always returned in branch order (never completion order), so merging stays
+deterministic. Per-branch wall times are recorded in `timings` (milliseconds).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncContextManager, Awaitable, Callable, Optional, Sequence, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+Branch = tuple[str, Callable[[AsyncSession], Awaitable[Any]]]
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+
+
+def retrieval_parallel_enabled() -> bool:
+    return os.getenv("RETRIEVAL_PARALLEL", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def retrieval_max_concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("RETRIEVAL_MAX_CONCURRENCY", "4") or 4))
+    except Exception:
+        return 4
+
+
+def default_session_factory() -> SessionFactory:
+    """Pooled sessions from the app engine (imported lazily to keep this module light)."""
+    from apps.api.core.database import get_session
+
+    return get_session
+
+
+async def _timed(name: str, fn: Callable[[], Awaitable[T]], timings: dict[str, float]) -> T:
+    t0 = time.perf_counter()
+    try:
+        return await fn()
+    finally:
+        timings[name] = round((time.perf_counter() - t0) * 1000.0, 2)
+
+
+async def run_branches(
+    session: AsyncSession,
+    branches: Sequence[Branch],
+    *,
+    parallel: bool,
+    timings: dict[str, float],
+    session_factory: Optional[SessionFactory] = None,
+    max_concurrency: Optional[int] = None,
+) -> list[Any]:
+    """
+    Run retrieval branches and return their results in branch order.
+
+    Sequential mode runs every branch on `session`. Parallel mode runs the first branch on
+    `session` and each other branch on its own session from `session_factory`.
+    Exceptions propagate exactly as in sequential mode (first failing branch in order).
+    """
+    if not parallel or session_factory is None or len(branches) < 2:
+        results = []
+        for name, fn in branches:
+            results.append(await _timed(name, lambda fn=fn: fn(session), timings))
+        return results
+
+    sem = asyncio.Semaphore(max_concurrency or retrieval_max_concurrency())
+
+    async def _run(i: int, name: str, fn: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with sem:
+            if i == 0:
+                return await _timed(name, lambda: fn(session), timings)
+            async with session_factory() as branch_session:
+                return await _timed(name, lambda: fn(branch_session), timings)
+
+    outcomes = await asyncio.gather(
+        *(_run(i, name, fn) for i, (name, fn) in enumerate(branches)),
+        return_exceptions=True,
+    )
+    for out in outcomes:
+        if isinstance(out, BaseException):
+            raise out
+    return list(outcomes)
+
+
+class BranchMemo:
+    """
+    Shares retrieval branch results across several `retrieve` calls of one request.
+
+    Stores the task per key, so concurrent callers with the same key await one in-flight
+    computation instead of issuing duplicate queries. Callers must copy results before
+    mutating them.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_run(self, key: tuple, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+        else:
+            self.hits += 1
+        return await task
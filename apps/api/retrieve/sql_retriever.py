@@ -4,12 +4,13 @@ SQL Retriever Module
 Retrieves evidence packets from PostgreSQL using exact entity lookups.
 """
 
-from typing import Any, Optional
+from typing import Any, Optional, Sequence, Union
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.core.schemas import EntityType, ChunkType
+from apps.api.retrieve.request_memo import current_retrieval_memo
 
 
 async def get_entity_chunks(
@@ -55,7 +56,7 @@ async def get_entity_chunks(
         query += " AND c.chunk_type = ANY(:chunk_types)"
         params["chunk_types"] = [ct.value for ct in chunk_types]
 
-    query += " ORDER BY c.created_at LIMIT :limit"
+    query += " ORDER BY c.created_at, c.chunk_id LIMIT :limit"
     params["limit"] = limit
 
     result = await session.execute(text(query), params)
@@ -82,14 +83,155 @@ async def get_chunks_with_refs(
     Returns:
         List of evidence packets with refs.
     """
-    # Get chunks
-    chunks = await get_entity_chunks(session, entity_type, entity_id, limit=limit)
+    return (await get_chunks_with_refs_bulk(session, [(entity_type, entity_id, limit)]))[0]
 
-    # Get refs for each chunk
-    for chunk in chunks:
-        chunk["refs"] = await _get_chunk_refs(session, chunk["chunk_id"])
 
-    return chunks
+EntityChunkRequest = tuple[Union[EntityType, str], str, int]
+
+
+async def get_chunks_with_refs_bulk(
+    session: AsyncSession,
+    requests: Sequence[EntityChunkRequest],
+) -> list[list[dict[str, Any]]]:
+    """
+    Get chunks (with refs) for many entities using two set-based queries.
+
+    Replaces N sequential `get_chunks_with_refs` calls (each doing 1 + #chunks round trips).
+
+    Args:
+        session: Database session.
+        requests: (entity_type, entity_id, limit) tuples. Duplicates are allowed.
+
+    Returns:
+        One packet list per request, in request order. Each list has the same chunks and
+        order as `get_chunks_with_refs(entity_type, entity_id, limit)`; packets are fresh
+        dicts per request so callers may tag them independently.
+    """
+    if not requests:
+        return []
+
+    # Deduplicate keys, keeping the largest limit per entity.
+    limit_by_key: dict[tuple[str, str], int] = {}
+    for et, eid, limit in requests:
+        key = (et.value if isinstance(et, EntityType) else str(et), str(eid))
+        limit_by_key[key] = max(limit_by_key.get(key, 0), int(limit))
+
+    # Reason: within one /ask the same entities are re-fetched by several stages.
+    memo = current_retrieval_memo()
+    packets_by_key: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    to_fetch = limit_by_key
+    if memo is not None:
+        to_fetch = {}
+        for key, limit in limit_by_key.items():
+            cached = memo.get_chunks(key, limit)
+            if cached is None:
+                to_fetch[key] = limit
+            else:
+                packets_by_key[key] = cached
+
+    if to_fetch:
+        fetched = await _fetch_chunks_with_refs(session, to_fetch)
+        for key, limit in to_fetch.items():
+            packets_by_key[key] = fetched.get(key, [])
+            if memo is not None:
+                memo.put_chunks(key, limit, packets_by_key[key])
+
+    out: list[list[dict[str, Any]]] = []
+    for et, eid, limit in requests:
+        key = (et.value if isinstance(et, EntityType) else str(et), str(eid))
+        out.append(
+            [
+                {**p, "refs": [dict(r) for r in p.get("refs", [])]}
+                for p in packets_by_key.get(key, [])[: int(limit)]
+            ]
+        )
+    return out
+
+
+async def _fetch_chunks_with_refs(
+    session: AsyncSession,
+    limit_by_key: dict[tuple[str, str], int],
+) -> dict[tuple[str, str], list[dict[str, Any]]]:
+    """Fetch up to `limit` chunks (with refs) per (entity_type, entity_id) in two queries."""
+    keys = list(limit_by_key.keys())
+    result = await session.execute(
+        text("""
+            SELECT
+                ranked.chunk_id,
+                ranked.entity_type,
+                ranked.entity_id,
+                ranked.chunk_type,
+                ranked.text_ar,
+                ranked.source_doc_id,
+                ranked.source_anchor
+            FROM (
+                SELECT
+                    c.chunk_id,
+                    c.entity_type,
+                    c.entity_id,
+                    c.chunk_type,
+                    c.text_ar,
+                    c.source_doc_id,
+                    c.source_anchor,
+                    k.lim,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY c.entity_type, c.entity_id
+                        ORDER BY c.created_at, c.chunk_id
+                    ) AS rn
+                FROM chunk c
+                JOIN unnest(
+                    CAST(:entity_types AS varchar[]),
+                    CAST(:entity_ids AS varchar[]),
+                    CAST(:limits AS integer[])
+                ) AS k(entity_type, entity_id, lim)
+                  ON c.entity_type = k.entity_type AND c.entity_id = k.entity_id
+            ) ranked
+            WHERE ranked.rn <= ranked.lim
+            ORDER BY ranked.entity_type, ranked.entity_id, ranked.rn
+        """),
+        {
+            "entity_types": [k[0] for k in keys],
+            "entity_ids": [k[1] for k in keys],
+            "limits": [limit_by_key[k] for k in keys],
+        },
+    )
+    rows_by_key: dict[tuple[str, str], list[Any]] = {}
+    for row in result.fetchall():
+        rows_by_key.setdefault((str(row.entity_type), str(row.entity_id)), []).append(row)
+
+    chunk_ids = [str(r.chunk_id) for rows in rows_by_key.values() for r in rows]
+    refs_by_chunk = await _get_chunk_refs_bulk(session, chunk_ids)
+
+    out: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for key, rows in rows_by_key.items():
+        packets = []
+        for row in rows:
+            packet = _row_to_evidence_packet(row)
+            packet["refs"] = refs_by_chunk.get(str(row.chunk_id), [])
+            packets.append(packet)
+        out[key] = packets
+    return out
+
+
+async def _get_chunk_refs_bulk(
+    session: AsyncSession,
+    chunk_ids: list[str],
+) -> dict[str, list[dict[str, str]]]:
+    """Get references for many chunks in one query."""
+    if not chunk_ids:
+        return {}
+    result = await session.execute(
+        text("""
+            SELECT chunk_id, ref_type, ref
+            FROM chunk_ref
+            WHERE chunk_id = ANY(:chunk_ids)
+        """),
+        {"chunk_ids": chunk_ids},
+    )
+    out: dict[str, list[dict[str, str]]] = {}
+    for row in result.fetchall():
+        out.setdefault(str(row.chunk_id), []).append({"type": row.ref_type, "ref": row.ref})
+    return out
 
 
 async def _get_chunk_refs(
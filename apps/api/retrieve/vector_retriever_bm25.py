@@ -21,6 +21,7 @@ from typing import Any, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.retrieve.bm25_index import bm25_index_enabled, get_bm25_index
 from apps.api.retrieve.normalize_ar import get_arabic_stopwords, normalize_for_matching
 
 
@@ -86,12 +87,55 @@ async def bm25_search(
     """
     Search chunks using BM25 over Arabic tokens.
 
+    Uses the process-level inverted index (see `bm25_index.py`) unless BM25_INDEX=off,
+    in which case the legacy full-corpus scan is used. Both produce identical scores.
+
     Returns evidence packets compatible with the project's contract.
     """
     q_tokens = _tokens_for_bm25(query or "")
     if not q_tokens:
         return []
 
+    if not bm25_index_enabled():
+        return await _bm25_search_scan(
+            session=session,
+            q_tokens=q_tokens,
+            top_k=top_k,
+            entity_types=entity_types,
+            chunk_types=chunk_types,
+        )
+
+    index = await get_bm25_index(session)
+    ranked = index.search(q_tokens, top_k=top_k, entity_types=entity_types, chunk_types=chunk_types)
+    if not ranked:
+        return []
+
+    top_ids = [cid for cid, _ in ranked]
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT chunk_id, entity_type, entity_id, chunk_type, text_ar, source_doc_id, source_anchor
+                FROM chunk
+                WHERE chunk_id = ANY(:chunk_ids)
+                """
+            ),
+            {"chunk_ids": top_ids},
+        )
+    ).fetchall()
+    row_by_id = {str(r.chunk_id): r for r in rows}
+    top = [(score, row_by_id[cid]) for cid, score in ranked if cid in row_by_id]
+    return await _packets_for_top(session, top)
+
+
+async def _bm25_search_scan(
+    session: AsyncSession,
+    q_tokens: list[str],
+    top_k: int,
+    entity_types: Optional[list[str]],
+    chunk_types: Optional[list[str]],
+) -> list[dict[str, Any]]:
+    """Legacy O(corpus) BM25: tokenize every chunk on every query."""
     # Fetch candidate chunks from DB (text + metadata).
     where = ["c.text_ar IS NOT NULL", "c.text_ar <> ''"]
     params: dict[str, Any] = {}
@@ -174,7 +218,11 @@ async def bm25_search(
 
     scored.sort(key=lambda x: x[0], reverse=True)
     top = scored[: max(1, int(top_k or 10))]
+    return await _packets_for_top(session, top)
 
+
+async def _packets_for_top(session: AsyncSession, top: list[tuple[float, Any]]) -> list[dict[str, Any]]:
+    """Attach typed refs to the top-scored chunk rows and build evidence packets."""
     # Pre-fetch refs for returned chunks (typed).
     top_ids = [str(r.chunk_id) for _, r in top]
     refs_typed_by_chunk: dict[str, list[dict[str, str]]] = {cid: [] for cid in top_ids}
@@ -211,8 +259,3 @@ async def bm25_search(
             }
         )
     return out
-
-
-
-
-
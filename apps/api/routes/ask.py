@@ -2,20 +2,38 @@
 Query routes for the Ask Anything API.
 """
 
-from fastapi import APIRouter
-from pydantic import BaseModel, Field
-from typing import Optional
-
-from sqlalchemy import text
+import copy
+import os
+from types import SimpleNamespace
 
+from fastapi import APIRouter, Response
+from pydantic import BaseModel, Field
+from typing import Callable, Optional
+
+from apps.api.core.answer_cache import (
+    HIT,
+    MISS,
+    AnswerCache,
+    AnswerCacheOutcome,
+    answer_cache_max_entries,
+    answer_cache_pg_enabled,
+    answer_cache_key_for_request,
+    last_answer_cache_outcome,
+    load_cached_answer,
+    set_answer_cache_outcome,
+    store_cached_answer,
+)
 from apps.api.core.database import get_session
 from apps.api.core.muhasibi_state_machine import create_middleware
 from apps.api.core.schemas import FinalResponse
+from apps.api.core.single_flight import SingleFlight
 from apps.api.guardrails.citation_enforcer import Guardrails
-from apps.api.llm.gpt5_client_azure import ProviderConfig, create_provider
+from apps.api.llm.gpt5_client_azure import ProviderConfig
+from apps.api.llm.provider_registry import get_provider_registry
 from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
-from apps.api.retrieve.entity_resolver import EntityResolver
+from apps.api.retrieve.entity_resolver import EntityResolver, get_shared_resolver
 from apps.api.retrieve.hybrid_retriever import HybridRetriever
+from apps.api.retrieve.normalize_ar import normalize_for_matching
 
 router = APIRouter()
 
@@ -25,20 +43,9 @@ async def _build_runtime_components(session) -> tuple[EntityResolver, Guardrails
 
     Reason: /ask, /ask/trace, and /ask/ui must share the exact same runtime setup.
     """
-    resolver = EntityResolver()
-    try:
-        pillars = (await session.execute(text("SELECT id, name_ar FROM pillar"))).fetchall()
-        core_values = (await session.execute(text("SELECT id, name_ar FROM core_value"))).fetchall()
-        sub_values = (await session.execute(text("SELECT id, name_ar FROM sub_value"))).fetchall()
-        resolver.load_entities(
-            pillars=[{"id": str(r.id), "name_ar": r.name_ar} for r in pillars],
-            core_values=[{"id": str(r.id), "name_ar": r.name_ar} for r in core_values],
-            sub_values=[{"id": str(r.id), "name_ar": r.name_ar} for r in sub_values],
-            aliases_path="data/static/aliases_ar.json",
-        )
-    except Exception:
-        # DB may be unavailable in some dev contexts; proceed with empty resolver.
-        pass
+    # Shared process-wide index; rebuilt only when ingestion bumps the corpus version.
+    # DB may be unavailable in some dev contexts; the shared getter then returns an empty resolver.
+    resolver = await get_shared_resolver(session)
 
     guardrails = Guardrails()
 
@@ -80,7 +87,8 @@ def _build_llm_client_or_none(model_deployment: Optional[str] = None) -> Optiona
             f"[ASK] LLM configured: {cfg.is_configured()}, deployment: {cfg.deployment_name}, endpoint: {cfg.endpoint[:50] if cfg.endpoint else 'None'}"
         )
         if cfg.is_configured():
-            provider = create_provider(cfg)
+            # Reason: reuse one pooled provider per deployment instead of a new client per request.
+            provider = get_provider_registry().get(cfg)
             llm_client = MuhasibiLLMClient(provider)
     except Exception as e:
         import logging
@@ -90,19 +98,172 @@ def _build_llm_client_or_none(model_deployment: Optional[str] = None) -> Optiona
     return llm_client
 
 
+AskResult = tuple[FinalResponse, list[dict], Optional[object]]
+
+# Identical concurrent questions share one pipeline run (see _execute_ask_request).
+_ask_flight: SingleFlight[AskResult] = SingleFlight()
+
+
+def ask_coalescing_enabled() -> bool:
+    return os.getenv("ASK_COALESCE", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _coalesce_key(request: "AskRequest", with_trace: bool) -> tuple:
+    return (
+        normalize_for_matching(request.question or ""),
+        request.mode,
+        request.engine,
+        request.model_deployment or "",
+        request.language,
+        request.reranker_enabled,
+        bool(with_trace),
+    )
+
+
+def _clone_ask_result(result: AskResult) -> AskResult:
+    # Reason: callers may annotate their own FinalResponse/trace; never share mutable state.
+    final, trace, middleware = result
+    return final.model_copy(deep=True), copy.deepcopy(trace), middleware
+
+
+# Middleware context attributes build_ui_response reads (routes/ui.py).
+_UI_CTX_FIELDS = (
+    "normalized_question",
+    "detected_entities",
+    "mode",
+    "intent",
+    "account_issues",
+    "deep_mode",
+    "not_found_reason",
+    "reranker_used",
+    "reranker_reason",
+    "seed_floor_applied",
+    "seed_floor_packets_count",
+    "bypass_relevance_gate",
+    "contract_gate_debug",
+    "state_db",
+)
+
+
+def _snapshot_middleware(middleware: Optional[object]) -> Optional[object]:
+    """
+    Detached copy of what the UI payload reads from a middleware run.
+
+    Reason: a cached live middleware would pin its request's (closed) session, resolver
+    and evidence packets for the lifetime of the LRU entry.
+    """
+    if middleware is None:
+        return None
+    ctx = getattr(middleware, "_last_ctx", None)
+    ctx_view = None
+    if ctx is not None:
+        ctx_view = SimpleNamespace(
+            **{name: copy.deepcopy(getattr(ctx, name)) for name in _UI_CTX_FIELDS if hasattr(ctx, name)}
+        )
+    return SimpleNamespace(
+        _last_used_edges=copy.deepcopy(list(getattr(middleware, "_last_used_edges", None) or [])),
+        _last_ctx=ctx_view,
+    )
+
+
+def get_ask_coalescing_stats() -> dict:
+    return {"enabled": ask_coalescing_enabled(), **_ask_flight.stats()}
+
+
+# Deterministic runs (baseline engine, middleware without an LLM) keyed by corpus/graph version.
+# Entries hold a middleware snapshot (`_snapshot_middleware`), never the live object.
+_answer_cache: AnswerCache[AskResult] = AnswerCache(answer_cache_max_entries(), clone=_clone_ask_result)
+
+
+def get_answer_cache_stats() -> dict:
+    return _answer_cache.stats()
+
+
 async def _execute_ask_request(
     *,
     session,
     request: "AskRequest",
     with_trace: bool,
-) -> tuple[FinalResponse, list[dict], Optional[object]]:
+    event_sink: Optional[Callable[[str, dict], None]] = None,
+    persist_answer: bool = True,
+) -> AskResult:
     """
     Execute the ask pipeline using the shared runtime components.
 
     Contract:
-    - This is the single shared code path used by /ask, /ask/trace, and /ask/ui.
+    - This is the single shared code path used by /ask, /ask/trace, /ask/ui and the stream routes.
     - /ask/ui is allowed to add metadata extraction and persistence AFTER this call.
+    - `event_sink` (streaming only) receives state snapshots and provisional interpreter tokens;
+      the returned FinalResponse is still the only authoritative answer.
+    - Concurrent requests with the same (normalized question, mode, engine, model_deployment,
+      language, reranker override, trace flag) await one shared run (ASK_COALESCE). Each caller
+      gets its own copy and still mints its own request_id / ask_run record afterwards.
+      Streaming requests are not coalesced: they need live events from their own run.
+    - Deterministic runs are served from the answer cache (ANSWER_CACHE) when the corpus/graph
+      version is unchanged; `last_answer_cache_outcome()` tells the route whether it was a hit.
+      `persist_answer=False` skips the Postgres-tier write for callers that persist ask_run
+      themselves (/ask/ui stamps the key into its own row).
     """
+    set_answer_cache_outcome(AnswerCacheOutcome())
+    if event_sink is not None:
+        return await _run_ask_pipeline(session=session, request=request, with_trace=with_trace, event_sink=event_sink)
+
+    cache_key = await answer_cache_key_for_request(session, request)
+    if cache_key is None:
+        return await _run_coalesced(session=session, request=request, with_trace=with_trace)
+    key, corpus_key, local_key = cache_key
+    memory_key = (key, bool(with_trace), local_key)
+    cached = _answer_cache.get(memory_key)
+    if cached is not None:
+        set_answer_cache_outcome(AnswerCacheOutcome(HIT, key, "memory"))
+        return cached
+    # The Postgres tier only holds the FinalResponse: serve callers that need no trace/middleware.
+    use_pg = answer_cache_pg_enabled() and (not with_trace or request.engine == "baseline")
+    final = await load_cached_answer(session, key) if use_pg else None
+    if final is not None:
+        _answer_cache.pg_hits += 1
+        result: AskResult = (final, [], None)
+        _answer_cache.put(memory_key, result)
+        set_answer_cache_outcome(AnswerCacheOutcome(HIT, key, "postgres"))
+        return result
+
+    result = await _run_coalesced(session=session, request=request, with_trace=with_trace)
+    final = result[0]
+    if not final.not_found:
+        _answer_cache.put(memory_key, (final, result[1], _snapshot_middleware(result[2])))
+        if use_pg and persist_answer:
+            await store_cached_answer(
+                session,
+                key,
+                corpus_key=corpus_key,
+                question=str(request.question or ""),
+                language=str(request.language or "ar"),
+                mode=str(request.mode or ""),
+                engine=str(request.engine or ""),
+                final=final,
+            )
+    set_answer_cache_outcome(AnswerCacheOutcome(MISS, key))
+    return result
+
+
+async def _run_coalesced(*, session, request: "AskRequest", with_trace: bool) -> AskResult:
+    if not ask_coalescing_enabled():
+        return await _run_ask_pipeline(session=session, request=request, with_trace=with_trace)
+    return await _ask_flight.do(
+        _coalesce_key(request, with_trace),
+        lambda: _run_ask_pipeline(session=session, request=request, with_trace=with_trace),
+        clone=_clone_ask_result,
+    )
+
+
+async def _run_ask_pipeline(
+    *,
+    session,
+    request: "AskRequest",
+    with_trace: bool,
+    event_sink: Optional[Callable[[str, dict], None]] = None,
+) -> AskResult:
+    """Run LISTEN…FINALIZE (or the baseline engine) for one request."""
     from apps.api.core.baseline_answer import generate_baseline_answer
 
     resolver, guardrails, retriever = await _build_runtime_components(session)
@@ -126,6 +287,10 @@ async def _execute_ask_request(
         llm_client=llm_client,  # uses Azure/OpenAI if configured; else deterministic fallback
         guardrails=guardrails,
     )
+    if event_sink is not None:
+        middleware.event_sink = event_sink
+        if llm_client is not None:
+            llm_client.stream_sink = event_sink
 
     if with_trace:
         final, trace = await middleware.process_with_trace(
@@ -230,11 +395,14 @@ class TraceEvent(BaseModel):
     citations_count: Optional[int] = None
     reflection_added: Optional[bool] = None
     done: Optional[bool] = None
+    db_queries: Optional[int] = None
+    db_time_ms: Optional[float] = None
 
 
 class AskTraceResponse(BaseModel):
     final_response: FinalResponse
     trace: list[TraceEvent]
+    cache_hit: bool = False
 
 
 class Citation(BaseModel):
@@ -317,8 +485,15 @@ class SearchResponse(BaseModel):
     total_found: int
 
 
+def _set_cache_header(response: Response) -> bool:
+    # Reason: FinalResponse is a frozen contract, so /ask reports cache hits in a header.
+    outcome = last_answer_cache_outcome()
+    response.headers["X-Answer-Cache"] = outcome.status
+    return outcome.hit
+
+
 @router.post("/ask", response_model=FinalResponse)
-async def ask_question(request: AskRequest):
+async def ask_question(request: AskRequest, response: Response):
     """
     Ask a question about the wellbeing framework.
 
@@ -340,20 +515,23 @@ async def ask_question(request: AskRequest):
 
     Returns:
         AskResponse: Answer with citations, or refusal if no evidence.
+        The `X-Answer-Cache` header is hit|miss|bypass.
     """
     async with get_session() as session:
         final, _, _ = await _execute_ask_request(session=session, request=request, with_trace=False)
+        _set_cache_header(response)
         return final
 
 
 @router.post("/ask/trace", response_model=AskTraceResponse)
-async def ask_question_with_trace(request: AskRequest):
+async def ask_question_with_trace(request: AskRequest, response: Response):
     """
     Ask a question and return a safe Muḥāsibī trace (state flow + timings).
     """
     async with get_session() as session:
         final, trace, _ = await _execute_ask_request(session=session, request=request, with_trace=True)
-        return AskTraceResponse(final_response=final, trace=[TraceEvent(**t) for t in trace])
+        cache_hit = _set_cache_header(response)
+        return AskTraceResponse(final_response=final, trace=[TraceEvent(**t) for t in trace], cache_hit=cache_hit)
 
 
 @router.post("/search/vector", response_model=SearchResponse)
@@ -388,7 +566,7 @@ async def search_graph(request: GraphSearchRequest):
     """
     from apps.api.retrieve.graph_retriever import expand_graph
     from apps.api.core.schemas import EntityType
-    from apps.api.retrieve.sql_retriever import get_chunks_with_refs
+    from apps.api.retrieve.sql_retriever import get_chunks_with_refs_bulk
 
     async with get_session() as session:
         # Try to infer entity type by ID prefix (P/CV/SV)
@@ -406,7 +584,7 @@ async def search_graph(request: GraphSearchRequest):
             relationship_types=request.relationship_types,
         )
 
-        packets = []
+        requests = []
         for n in neighbors:
             n_type = n.get("neighbor_type")
             n_id = n.get("neighbor_id")
@@ -416,7 +594,11 @@ async def search_graph(request: GraphSearchRequest):
                 et = EntityType(n_type)
             except Exception:
                 continue
-            packets.extend(await get_chunks_with_refs(session, et, n_id, limit=10))
+            requests.append((et, n_id, 10))
+
+        packets = []
+        for batch in await get_chunks_with_refs_bulk(session, requests):
+            packets.extend(batch)
 
         return SearchResponse(evidence_packets=packets, total_found=len(packets))
 
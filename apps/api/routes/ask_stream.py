@@ -0,0 +1,137 @@
+"""
+Streaming ask routes (SSE): /ask/stream and /ask/ui/stream.
+
+Why:
+- INTERPRET can take up to 180s and /ask returns nothing until FINALIZE; these routes emit
+  events as the pipeline runs so clients get bytes immediately.
+
+Events (`event:` name, JSON `data:`):
+- start:        {"request_id"}
+- state:        safe state snapshot as each Muḥāsibī state completes (same shape as /ask/trace)
+- draft_reset:  a new interpreter draft starts; discard any draft text shown so far
+- token:        {"text"} provisional interpreter answer text
+- final:        authoritative payload + {"retracted": bool}
+- error:        {"message"} (followed by a retracted final with no payload)
+
+Fail-closed contract: tokens are a draft only. The final payload has passed Guardrails,
+`apply_runtime_contract_gate` and `_fail_closed_if_invalid`; `retracted=true` tells the client
+the streamed draft is not part of that validated answer and must be removed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Optional
+from uuid import uuid4
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from apps.api.core.database import get_session
+from apps.api.core.schemas import FinalResponse
+from apps.api.routes.ask import AskRequest, _execute_ask_request
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def draft_retracted(draft: str, final: Optional[FinalResponse]) -> bool:
+    """True when streamed draft text is not backed by the validated final answer."""
+    if not draft.strip():
+        return False
+    if final is None or bool(final.not_found):
+        return True
+    return draft.strip() not in str(final.answer_ar or "")
+
+
+async def stream_ask_events(request: AskRequest, *, ui: bool) -> AsyncIterator[str]:
+    """Run the shared ask pipeline in a task and yield SSE frames as events arrive."""
+    request_id = str(uuid4())
+    t0 = time.perf_counter()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def sink(kind: str, payload: dict[str, Any]) -> None:
+        queue.put_nowait((kind, payload))
+
+    async def _run() -> None:
+        try:
+            async with get_session() as session:
+                final, trace, middleware = await _execute_ask_request(
+                    session=session, request=request, with_trace=ui, event_sink=sink
+                )
+                payload: dict[str, Any] = {"final_response": final.model_dump(mode="json")}
+                if ui:
+                    from apps.api.routes.ui import build_ui_response
+
+                    resp = await build_ui_response(
+                        session=session,
+                        request=request,
+                        request_id=request_id,
+                        t0=t0,
+                        final=final,
+                        trace=trace,
+                        middleware=middleware,
+                    )
+                    payload = {"ui_response": resp.model_dump(mode="json")}
+                queue.put_nowait(("_final", {"final": final, "payload": payload}))
+        except Exception as e:
+            logger.exception(f"[ASK_STREAM] request_id={request_id} failed: {e}")
+            queue.put_nowait(("error", {"message": str(e)}))
+        finally:
+            queue.put_nowait(_DONE)
+
+    task = asyncio.create_task(_run())
+    draft = ""
+    final_sent = False
+    try:
+        yield sse_event("start", {"request_id": request_id})
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            kind, payload = item
+            if kind == "token":
+                draft += str(payload.get("text") or "")
+            elif kind == "draft_reset":
+                draft = ""
+            elif kind == "_final":
+                data = dict(payload["payload"])
+                data["retracted"] = draft_retracted(draft, payload["final"])
+                yield sse_event("final", data)
+                final_sent = True
+                continue
+            yield sse_event(kind, payload)
+        if not final_sent:
+            yield sse_event("final", {"final_response": None, "retracted": True})
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/ask/stream")
+async def ask_stream(request: AskRequest):
+    """Server-sent events version of /ask (final event carries the FinalResponse)."""
+    return _sse_response(stream_ask_events(request, ui=False))
+
+
+@router.post("/ask/ui/stream")
+async def ask_ui_stream(request: AskRequest):
+    """Server-sent events version of /ask/ui (final event carries the AskUiResponse)."""
+    return _sse_response(stream_ask_events(request, ui=True))
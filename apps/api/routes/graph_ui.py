@@ -9,6 +9,7 @@ Reason:
 from __future__ import annotations
 
 from collections import deque
+from types import SimpleNamespace
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel, Field
@@ -16,6 +17,7 @@ from sqlalchemy import text
 
 from apps.api.core.database import get_session
 from apps.api.graph.explain import shortest_path
+from apps.api.graph.graph_snapshot import GraphSnapshot, get_graph_snapshot_or_none
 
 router = APIRouter()
 
@@ -198,6 +200,75 @@ async def _hydrate_nodes(session, nodes: list[tuple[str, str]]) -> dict[tuple[st
     return out
 
 
+def _incident_rows_from_snapshot(
+    snap: GraphSnapshot,
+    node: tuple[str, str],
+    rel_ids: frozenset[int] | None,
+    relation_ids: frozenset[int] | None,
+    grounded_only: bool,
+) -> list[SimpleNamespace]:
+    """
+    Edges touching node, with the SQL query's filter semantics.
+
+    Edge indices follow the snapshot's `ORDER BY e.id::text`, so sorting them keeps the SQL order.
+    """
+    u = snap.node(*node)
+    if u is None:
+        return []
+    edges = {e for _, e, _ in snap.incident(u, rel_ids, grounded_only=grounded_only, relation_ids=relation_ids)}
+    return [SimpleNamespace(**snap.edge_record(e)) for e in sorted(edges)]
+
+
+async def _incident_rows_from_sql(
+    session,
+    node: tuple[str, str],
+    rel_types: list[str] | None,
+    relation_types: list[str] | None,
+    grounded_only: bool,
+) -> list:
+    cur_t, cur_i = node
+    params = {"t": cur_t, "i": cur_i}
+    filt = ""
+    if rel_types:
+        filt += " AND e.rel_type = ANY(:rel_types)"
+        params["rel_types"] = rel_types
+    if relation_types:
+        filt += " AND e.relation_type = ANY(:relation_types)"
+        params["relation_types"] = relation_types
+    if grounded_only:
+        filt += """
+        AND (
+          e.relation_type IS NULL
+          OR EXISTS (SELECT 1 FROM edge_justification_span s WHERE s.edge_id=e.id)
+        )
+        """
+
+    return (
+        await session.execute(
+            text(
+                f"""
+                SELECT
+                  e.id::text AS edge_id,
+                  e.from_type, e.from_id,
+                  e.to_type, e.to_id,
+                  e.rel_type,
+                  e.relation_type,
+                  EXISTS (SELECT 1 FROM edge_justification_span s WHERE s.edge_id=e.id) AS has_evidence
+                FROM edge e
+                WHERE e.status='approved'
+                  AND (
+                    (e.from_type=:t AND e.from_id=:i)
+                    OR (e.to_type=:t AND e.to_id=:i)
+                  )
+                  {filt}
+                ORDER BY e.id::text
+                """
+            ),
+            params,
+        )
+    ).fetchall()
+
+
 @router.get("/graph/expand", response_model=GraphExpandResponse)
 async def graph_expand(
     node_type: str = Query(..., description="pillar|core_value|sub_value|evidence|ref"),
@@ -226,6 +297,11 @@ async def graph_expand(
         }
         edges: dict[str, ExpandEdge] = {}
 
+        # Reason: the traversal runs on the in-memory CSR snapshot; per-node SQL is the fallback.
+        snap = await get_graph_snapshot_or_none(session)
+        rel_ids = snap.rel_filter(rel_types) if snap is not None else None
+        relation_ids = snap.relation_filter(relation_types) if snap is not None else None
+
         q: deque[tuple[tuple[str, str], int]] = deque([(seed_key, 0)])
         truncated = False
         total_edges_seen = 0
@@ -235,46 +311,14 @@ async def graph_expand(
             if d >= depth or truncated:
                 continue
 
-            params = {"t": cur_t, "i": cur_i}
-            filt = ""
-            if rel_types:
-                filt += " AND e.rel_type = ANY(:rel_types)"
-                params["rel_types"] = rel_types
-            if relation_types:
-                filt += " AND e.relation_type = ANY(:relation_types)"
-                params["relation_types"] = relation_types
-            if grounded_only:
-                filt += """
-                AND (
-                  e.relation_type IS NULL
-                  OR EXISTS (SELECT 1 FROM edge_justification_span s WHERE s.edge_id=e.id)
+            if snap is not None:
+                rows = _incident_rows_from_snapshot(
+                    snap, (cur_t, cur_i), rel_ids, relation_ids, bool(grounded_only)
                 )
-                """
-
-            rows = (
-                await session.execute(
-                    text(
-                        f"""
-                        SELECT
-                          e.id::text AS edge_id,
-                          e.from_type, e.from_id,
-                          e.to_type, e.to_id,
-                          e.rel_type,
-                          e.relation_type,
-                          EXISTS (SELECT 1 FROM edge_justification_span s WHERE s.edge_id=e.id) AS has_evidence
-                        FROM edge e
-                        WHERE e.status='approved'
-                          AND (
-                            (e.from_type=:t AND e.from_id=:i)
-                            OR (e.to_type=:t AND e.to_id=:i)
-                          )
-                          {filt}
-                        ORDER BY e.id::text
-                        """
-                    ),
-                    params,
+            else:
+                rows = await _incident_rows_from_sql(
+                    session, (cur_t, cur_i), rel_types, relation_types, bool(grounded_only)
                 )
-            ).fetchall()
 
             for r in rows:
                 total_edges_seen += 1
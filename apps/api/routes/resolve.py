@@ -10,10 +10,9 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from sqlalchemy import text
 
 from apps.api.core.database import get_session
-from apps.api.retrieve.entity_resolver import EntityResolver
+from apps.api.retrieve.entity_resolver import get_shared_resolver
 
 router = APIRouter()
 
@@ -37,16 +36,7 @@ async def resolve_entities(q: str = Query(..., description="Arabic query or conc
     Resolve entities from a query using the same resolver used in /ask LISTEN.
     """
     async with get_session() as session:
-        resolver = EntityResolver()
-        pillars = (await session.execute(text("SELECT id, name_ar FROM pillar"))).fetchall()
-        core_values = (await session.execute(text("SELECT id, name_ar FROM core_value"))).fetchall()
-        sub_values = (await session.execute(text("SELECT id, name_ar FROM sub_value"))).fetchall()
-        resolver.load_entities(
-            pillars=[{"id": r.id, "name_ar": r.name_ar} for r in pillars],
-            core_values=[{"id": r.id, "name_ar": r.name_ar} for r in core_values],
-            sub_values=[{"id": r.id, "name_ar": r.name_ar} for r in sub_values],
-            aliases_path="data/static/aliases_ar.json",
-        )
+        resolver = await get_shared_resolver(session)
         results = resolver.resolve(q)
         items = [
             ResolveItem(
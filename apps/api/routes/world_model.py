@@ -0,0 +1,129 @@
+"""
+World Model routes.
+
+Batch intervention planning: plan interventions for many goals (e.g. every sub-value
+of a pillar) against one mechanism-graph version, using the precompiled leverage index.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import text
+
+from apps.api.core.database import get_session
+from apps.api.core.world_model.cache import get_cached_loops
+from apps.api.core.world_model.intervention_planner import (
+    InterventionGoal,
+    compute_intervention_plans_batch,
+    intervention_plan_to_dict,
+)
+
+router = APIRouter()
+
+MAX_BATCH_GOALS = 200
+
+
+class InterventionGoalIn(BaseModel):
+    ref_kind: Optional[str] = Field(default=None, description="pillar|core_value|sub_value")
+    ref_id: Optional[str] = None
+    goal_ar: Optional[str] = Field(default=None, description="Free Arabic goal text (matched to node labels)")
+
+
+class BatchInterventionRequest(BaseModel):
+    """Goals to plan; `pillar_id` adds every sub-value of that pillar."""
+
+    goals: list[InterventionGoalIn] = Field(default_factory=list)
+    pillar_id: Optional[str] = None
+    max_steps: int = Field(default=7, ge=1, le=15)
+    top_leverage: int = Field(default=5, ge=0, le=50)
+
+
+class LeverageItem(BaseModel):
+    ref_kind: str
+    ref_id: str
+    label_ar: str
+    depth: int
+    score: float
+
+
+class InterventionPlanItem(BaseModel):
+    goal_ar: str
+    goal_ref: Optional[str] = None
+    found: bool
+    steps: list[dict[str, Any]]
+    leading_indicators: list[dict[str, Any]]
+    risk_of_imbalance: list[dict[str, Any]]
+    leverage: list[LeverageItem]
+
+
+class BatchInterventionResponse(BaseModel):
+    graph_version: int
+    plans: list[InterventionPlanItem]
+    elapsed_ms: int
+
+
+async def _pillar_sub_value_goals(session, pillar_id: str) -> list[InterventionGoal]:
+    rows = (
+        await session.execute(
+            text(
+                """
+                SELECT sv.id
+                FROM sub_value sv
+                JOIN core_value cv ON cv.id = sv.core_value_id
+                WHERE cv.pillar_id = :pid
+                ORDER BY sv.id
+                """
+            ),
+            {"pid": pillar_id},
+        )
+    ).fetchall()
+    return [InterventionGoal(ref_kind="sub_value", ref_id=str(r.id)) for r in rows]
+
+
+@router.post("/world-model/interventions/batch", response_model=BatchInterventionResponse)
+async def interventions_batch(req: BatchInterventionRequest):
+    """
+    Plan interventions for many goals in one call (one graph version, one leverage index).
+    """
+    t0 = time.perf_counter()
+    goals = [
+        InterventionGoal(goal_ar=g.goal_ar or "", ref_kind=g.ref_kind or "", ref_id=g.ref_id or "")
+        for g in req.goals
+    ]
+    async with get_session() as session:
+        if req.pillar_id:
+            goals.extend(await _pillar_sub_value_goals(session, req.pillar_id))
+        if not goals:
+            raise HTTPException(status_code=400, detail="No goals provided.")
+        if len(goals) > MAX_BATCH_GOALS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_GOALS} goals per batch.")
+
+        loops = await get_cached_loops(session)
+        version, results = await compute_intervention_plans_batch(
+            session,
+            goals,
+            loops=loops,
+            max_steps=req.max_steps,
+            top_leverage=req.top_leverage,
+        )
+
+    plans: list[InterventionPlanItem] = []
+    for result in results:
+        node = result.goal_node
+        plans.append(
+            InterventionPlanItem(
+                **intervention_plan_to_dict(result.plan),
+                goal_ref=f"{node.ref_kind}:{node.ref_id}" if node else None,
+                found=node is not None,
+                leverage=[LeverageItem(**item) for item in result.leverage],
+            )
+        )
+    return BatchInterventionResponse(
+        graph_version=version,
+        plans=plans,
+        elapsed_ms=int((time.perf_counter() - t0) * 1000),
+    )
@@ -332,6 +332,9 @@ ALTER TABLE ask_run ADD COLUMN IF NOT EXISTS muhasibi_trace JSONB DEFAULT '[]'::
 
 CREATE INDEX IF NOT EXISTS idx_ask_run_created_at ON ask_run(created_at);
 CREATE INDEX IF NOT EXISTS idx_ask_run_contract_outcome ON ask_run(contract_outcome);
+-- Answer cache Postgres tier (ANSWER_CACHE_PG): lookup by corpus-versioned answer key.
+CREATE INDEX IF NOT EXISTS idx_ask_run_answer_cache_key
+ON ask_run ((debug_summary->>'answer_cache_key'), created_at DESC);
 
 CREATE TABLE IF NOT EXISTS ask_feedback (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -419,6 +422,16 @@ CREATE TABLE IF NOT EXISTS feedback_loop (
 
 CREATE INDEX IF NOT EXISTS idx_feedback_loop_type ON feedback_loop(loop_type);
 
+-- Canonical cycle identity (md5 of sorted edge ids joined by '|', see cycle_engine.cycle_key)
+-- so incremental loop indexing can upsert without duplicating a cycle.
+ALTER TABLE feedback_loop ADD COLUMN IF NOT EXISTS loop_key VARCHAR(32);
+UPDATE feedback_loop
+SET loop_key = md5(array_to_string(ARRAY(SELECT x::text FROM unnest(edge_ids) AS x ORDER BY x), '|'))
+WHERE loop_key IS NULL;
+DELETE FROM feedback_loop a USING feedback_loop b
+WHERE a.loop_key = b.loop_key AND a.loop_id > b.loop_id;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_feedback_loop_key ON feedback_loop(loop_key);
+
 -- =============================================================================
 -- Views for common queries
 -- =============================================================================
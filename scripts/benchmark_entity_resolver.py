@@ -0,0 +1,108 @@
+"""
+Entity Resolver Benchmark
+
+Compares `EntityResolver.resolve` (compiled Aho–Corasick + word index) against the
+legacy linear scan (`resolve_linear`) on the eval dataset questions, and verifies
+that both return identical results.
+
+Entities are taken from the framework DOCX via the deterministic ingestion pipeline
+(no DB required).
+
+Usage:
+    python -m scripts.benchmark_entity_resolver [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from apps.api.ingest.pipeline_framework import ingest_framework_docx
+from apps.api.retrieve.entity_resolver import DEFAULT_ALIASES_PATH, EntityResolver
+
+DOCX_PATH = Path("docs/source/framework_2025-10_v1.docx")
+DATASETS_DIR = Path("eval/datasets")
+
+
+def _entities_from_docx(docx_path: Path) -> tuple[list[dict], list[dict], list[dict]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        canon_path = Path(tmp) / "canonical.json"
+        ingest_framework_docx(docx_path, canon_path, Path(tmp) / "chunks.jsonl")
+        canonical = json.loads(canon_path.read_text(encoding="utf-8"))
+
+    pillars: list[dict] = []
+    core_values: list[dict] = []
+    sub_values: list[dict] = []
+    for p in canonical.get("pillars", []):
+        pillars.append({"id": p["id"], "name_ar": p["name_ar"]})
+        for cv in p.get("core_values", []):
+            core_values.append({"id": cv["id"], "name_ar": cv["name_ar"]})
+            for sv in cv.get("sub_values", []):
+                sub_values.append({"id": sv["id"], "name_ar": sv["name_ar"]})
+    return pillars, core_values, sub_values
+
+
+def _dataset_questions(datasets_dir: Path) -> list[str]:
+    out: list[str] = []
+    for path in sorted(datasets_dir.rglob("*.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                q = json.loads(line).get("question_ar")
+                if q:
+                    out.append(str(q))
+    return out
+
+
+def _time_it(fn, questions: list[str], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q in questions:
+            fn(q)
+    return time.perf_counter() - t0
+
+
+def run_benchmark(repeat: int = 5) -> dict[str, Any]:
+    pillars, core_values, sub_values = _entities_from_docx(DOCX_PATH)
+    resolver = EntityResolver()
+    t0 = time.perf_counter()
+    resolver.load_entities(pillars, core_values, sub_values, aliases_path=DEFAULT_ALIASES_PATH)
+    load_ms = (time.perf_counter() - t0) * 1000.0
+
+    questions = _dataset_questions(DATASETS_DIR)
+    mismatches = [q for q in questions if resolver.resolve(q) != resolver.resolve_linear(q)]
+
+    linear_s = _time_it(resolver.resolve_linear, questions, repeat)
+    compiled_s = _time_it(resolver.resolve, questions, repeat)
+    n_calls = len(questions) * repeat
+    index = resolver._match_index
+    return {
+        "questions": len(questions),
+        "repeat": repeat,
+        "patterns": index.n_patterns if index else 0,
+        "load_entities_ms": round(load_ms, 2),
+        "linear_us_per_query": round(linear_s / max(n_calls, 1) * 1e6, 1),
+        "compiled_us_per_query": round(compiled_s / max(n_calls, 1) * 1e6, 1),
+        "speedup": round(linear_s / max(compiled_s, 1e-9), 2),
+        "mismatches": len(mismatches),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    report = run_benchmark(repeat=args.repeat)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if report["mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
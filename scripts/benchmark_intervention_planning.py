@@ -0,0 +1,248 @@
+"""
+Intervention Planning Benchmark (per-goal planning vs batch over the leverage index)
+
+Plans one intervention per goal node of a framework-shaped mechanism graph:
+
+- legacy: what each `compute_intervention_plan` call used to do after loading the graph:
+  rebuild the node/ref/adjacency maps, backward-trace leverage points and scan every edge
+  for INHIBITS/TENSION_WITH risks (verbatim copies of the removed helpers)
+- batch: one `LeverageIndex` build per graph version, then per-goal index lookups
+  (`_plan_for_goal`, as used by `compute_intervention_plans_batch`)
+
+Plans are checked to be identical. The legacy numbers exclude the per-call DB load of the
+graph, so they understate the old per-goal cost.
+
+The default graph is synthetic but framework-shaped (5 pillars, 15 core values, 60
+sub-values, hierarchy + cross-pillar edges with spans); `--scale` multiplies it, and
+`--from-db` benchmarks the mechanism graph stored in the database instead.
+
+Usage:
+    python -m scripts.benchmark_intervention_planning [--scale 1 10] [--repeat 5] [--from-db]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Optional
+
+from apps.api.core.world_model.graph_context import MechanismGraphContext
+from apps.api.core.world_model.intervention_planner import (
+    PlannerContext,
+    _plan_for_goal,
+    _planner_view,
+    intervention_plan_to_dict,
+)
+from apps.api.core.world_model.leverage_index import UpstreamEntry, build_leverage_index
+from apps.api.core.world_model.loop_reasoner import GraphEdge, GraphNode
+
+_CROSS_RELATIONS = [
+    ("ENABLES", 1),
+    ("REINFORCES", 1),
+    ("CONDITIONAL_ON", 1),
+    ("COMPLEMENTS", 1),
+    ("INHIBITS", -1),
+    ("TENSION_WITH", -1),
+]
+
+
+def framework_graph(scale: int = 1, seed: int = 3) -> MechanismGraphContext:
+    """5 pillars x 3 core values x 4 sub-values per `scale`, ~4 edges per node."""
+    rng = random.Random(seed)
+    nodes: dict[str, GraphNode] = {}
+    edges: list[GraphEdge] = []
+
+    def node(kind: str, ref: str) -> str:
+        nid = f"{kind}:{ref}"
+        nodes[nid] = GraphNode(nid, kind, ref, f"قيمة {ref}")
+        return nid
+
+    def edge(u: str, v: str, rel: str, pol: int) -> None:
+        spans = [
+            {"chunk_id": f"CH_{len(edges)}_{j}", "span_start": 0, "span_end": 20, "quote": f"نص {len(edges)}"}
+            for j in range(rng.randint(1, 3))
+        ]
+        edges.append(GraphEdge(f"e{len(edges):06d}", u, v, rel, pol, round(rng.uniform(0.4, 0.9), 2), spans))
+
+    sub_values: list[str] = []
+    for p in range(5 * scale):
+        pillar = node("pillar", f"P{p:03d}")
+        for c in range(3):
+            core = node("core_value", f"CV{p:03d}{c}")
+            edge(core, pillar, "ENABLES", 1)
+            for s in range(4):
+                sub = node("sub_value", f"SV{p:03d}{c}{s}")
+                edge(sub, core, "ENABLES", 1)
+                sub_values.append(sub)
+    ids = list(nodes)
+    while len(edges) < 4 * len(nodes):
+        u, v = rng.choice(sub_values), rng.choice(ids)
+        if u != v:
+            edge(u, v, *rng.choice(_CROSS_RELATIONS))
+    return MechanismGraphContext.from_graph(nodes, edges)
+
+
+def _legacy_context(graph: MechanismGraphContext) -> PlannerContext:
+    """The maps the old `build_planner_context` rebuilt on every call."""
+    ctx = PlannerContext(nodes_by_id=dict(graph.nodes_by_id), edges=list(graph.edges))
+    for node in ctx.nodes_by_id.values():
+        ctx.nodes_by_ref[f"{node.ref_kind}:{node.ref_id}"] = node
+    for edge in ctx.edges:
+        ctx.incoming_edges.setdefault(edge.to_node, []).append(edge)
+        ctx.outgoing_edges.setdefault(edge.from_node, []).append(edge)
+    return ctx
+
+
+def _legacy_trace_backward_for_leverage(ctx: PlannerContext, goal_node: GraphNode, max_depth: int = 4):
+    """Verbatim copy of the removed planner helper (for comparison only)."""
+    results: list[tuple[GraphNode, GraphEdge, int]] = []
+    visited: set[str] = {goal_node.id}
+    current_level = [goal_node.id]
+    for depth in range(1, max_depth + 1):
+        next_level: list[str] = []
+        for node_id in current_level:
+            incoming = ctx.incoming_edges.get(node_id, [])
+            for edge in incoming:
+                from_node = ctx.nodes_by_id.get(edge.from_node)
+                if not from_node:
+                    continue
+                if from_node.id in visited:
+                    continue
+                visited.add(from_node.id)
+                results.append((from_node, edge, depth))
+                next_level.append(from_node.id)
+        current_level = next_level
+        if not current_level:
+            break
+    return results
+
+
+def _legacy_find_risks(ctx: PlannerContext, target_ids: set[str]) -> list[dict[str, Any]]:
+    """Verbatim copy of the removed full-edge risk scan (for comparison only)."""
+    risks: list[dict[str, Any]] = []
+    for edge in ctx.edges:
+        if edge.polarity >= 0:
+            continue
+        if edge.relation_type not in ("INHIBITS", "TENSION_WITH"):
+            continue
+        if edge.from_node in target_ids or edge.to_node in target_ids:
+            from_node = ctx.nodes_by_id.get(edge.from_node)
+            to_node = ctx.nodes_by_id.get(edge.to_node)
+            if from_node and to_node:
+                affected_pillar = ""
+                if to_node.ref_kind == "pillar":
+                    affected_pillar = to_node.ref_id
+                elif from_node.ref_kind == "pillar":
+                    affected_pillar = from_node.ref_id
+                risks.append({
+                    "risk_ar": f"{edge.relation_type}: {from_node.label_ar} → {to_node.label_ar}",
+                    "affected_pillar": affected_pillar,
+                    "evidence": edge.spans[:2] if edge.spans else [],
+                })
+    return risks
+
+
+class _LegacyIndex:
+    """Index-shaped adapter that recomputes everything per call, like the old planner."""
+
+    def __init__(self, ctx: PlannerContext):
+        self.ctx = ctx
+
+    def upstream(self, goal_id: str) -> UpstreamEntry:
+        goal = self.ctx.nodes_by_id[goal_id]
+        return UpstreamEntry(leverage=_legacy_trace_backward_for_leverage(self.ctx, goal), scores={})
+
+    def risks_for(self, target_ids: set[str]) -> list[dict[str, Any]]:
+        return _legacy_find_risks(self.ctx, target_ids)
+
+
+def _per_second(count: int, seconds: float) -> int:
+    return int(count / max(seconds, 1e-9))
+
+
+def bench_graph(graph: MechanismGraphContext, repeat: int, label: str) -> dict[str, Any]:
+    goal_ids = list(graph.nodes_by_id)
+    out: dict[str, Any] = {
+        "graph": label,
+        "nodes": len(goal_ids),
+        "edges": len(graph.edges),
+        "goals": len(goal_ids),
+    }
+
+    legacy_plans: list[dict[str, Any]] = []
+    t0 = time.perf_counter()
+    for r in range(repeat):
+        for goal_id in goal_ids:
+            ctx = _legacy_context(graph)
+            goal = ctx.nodes_by_id[goal_id]
+            plan = _plan_for_goal(ctx, _LegacyIndex(ctx), goal.label_ar, goal, [], 7)  # type: ignore[arg-type]
+            if r == 0:
+                legacy_plans.append(intervention_plan_to_dict(plan))
+    legacy_s = (time.perf_counter() - t0) / repeat
+
+    batch_plans: list[dict[str, Any]] = []
+    build_s = 0.0
+    t0 = time.perf_counter()
+    for r in range(repeat):
+        tb = time.perf_counter()
+        index = build_leverage_index(graph)
+        build_s += time.perf_counter() - tb
+        ctx = _planner_view(graph)
+        for goal_id in goal_ids:
+            goal = ctx.nodes_by_id[goal_id]
+            plan = _plan_for_goal(ctx, index, goal.label_ar, goal, [], 7)
+            index.top_leverage(goal_id, 5)
+            if r == 0:
+                batch_plans.append(intervention_plan_to_dict(plan))
+    batch_s = (time.perf_counter() - t0) / repeat
+
+    warm_index = build_leverage_index(graph)
+    ctx = _planner_view(graph)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for goal_id in goal_ids:
+            goal = ctx.nodes_by_id[goal_id]
+            _plan_for_goal(ctx, warm_index, goal.label_ar, goal, [], 7)
+    warm_s = (time.perf_counter() - t0) / repeat
+
+    out.update(
+        {
+            "legacy_ms": round(legacy_s * 1000, 2),
+            "legacy_goals_per_s": _per_second(len(goal_ids), legacy_s),
+            "index_build_ms": round(build_s / repeat * 1000, 2),
+            "batch_ms": round(batch_s * 1000, 2),
+            "batch_goals_per_s": _per_second(len(goal_ids), batch_s),
+            "warm_index_goals_per_s": _per_second(len(goal_ids), warm_s),
+            "identical_plans": legacy_plans == batch_plans,
+        }
+    )
+    return out
+
+
+async def _load_db_graph() -> MechanismGraphContext:
+    from apps.api.core.database import get_session
+    from apps.api.core.world_model.graph_context import load_mechanism_graph_context
+
+    async with get_session() as session:
+        return await load_mechanism_graph_context(session)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--from-db", action="store_true", help="Benchmark the DB mechanism graph")
+    args = parser.parse_args(argv)
+
+    if args.from_db:
+        report = [bench_graph(asyncio.run(_load_db_graph()), args.repeat, "db")]
+    else:
+        report = [bench_graph(framework_graph(s), args.repeat, f"framework_x{s}") for s in args.scale]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
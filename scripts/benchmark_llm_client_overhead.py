@@ -0,0 +1,142 @@
+"""
+LLM Client Per-Call Overhead Benchmark
+
+Measures the client-side work `MuhasibiLLMClient.interpret` does before the network call:
+prompt load + response schema + payload serialization.
+
+- legacy: read prompt file from disk, rebuild the schema dict, recursive sanitize walk,
+  `json.dumps(..., ensure_ascii=False)` (the pre-PromptStore code path)
+- current: PromptStore lookup, frozen schema, single-pass `json_codec.dumps`
+
+Both payload encodings are checked to decode to the same JSON. Synthetic payload sized like
+a deep-mode request (12 evidence packets, 24 used edges); no DB or LLM required.
+
+Usage:
+    python -m scripts.benchmark_llm_client_overhead [--iterations 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+from apps.api.llm.json_codec import dumps
+from apps.api.llm.muhasibi_llm_client import _json_schema_for_interpreter
+from apps.api.llm.prompt_store import PROMPTS_DIR, PromptStore
+
+_SENTENCE = "الصبر حبس النفس على طاعة الله وعن معصيته، وهو من أعظم منازل السالكين. "
+
+
+def _legacy_sanitize(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _legacy_sanitize(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_legacy_sanitize(item) for item in obj]
+    elif isinstance(obj, UUID):
+        return str(obj)
+    elif hasattr(obj, "__dict__"):
+        return _legacy_sanitize(vars(obj))
+    return obj
+
+
+def _thaw(obj: Any) -> Any:
+    """Rebuild plain dicts/lists (stands in for the old per-call schema literal)."""
+    if isinstance(obj, dict):
+        return {k: _thaw(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_thaw(v) for v in obj]
+    return obj
+
+
+def _payload() -> dict[str, Any]:
+    packets = [
+        {
+            "chunk_id": f"CH_{i:04d}",
+            "entity_type": "core_value",
+            "entity_id": uuid5(NAMESPACE_URL, f"cv-{i}"),
+            "chunk_type": "evidence" if i % 2 else "definition",
+            "text_ar": _SENTENCE * 8,
+            "source_doc_id": uuid5(NAMESPACE_URL, "doc"),
+            "source_anchor": f"p{i}",
+            "refs": [{"type": "quran", "ref": f"2:{150 + i}"}, {"type": "hadith", "ref": f"bukhari:{i}"}],
+        }
+        for i in range(12)
+    ]
+    edges = [
+        {
+            "edge_id": uuid5(NAMESPACE_URL, f"edge-{i}"),
+            "from_node": f"core_value:CV{i:03d}",
+            "to_node": f"core_value:CV{i + 1:03d}",
+            "relation_type": "ENABLES",
+            "justification_spans": [
+                {"chunk_id": f"CH_{i % 12:04d}", "span_start": 0, "span_end": 60, "quote": _SENTENCE}
+            ],
+        }
+        for i in range(24)
+    ]
+    entities = [{"type": "core_value", "id": f"CV{i:03d}", "name_ar": "الصبر", "confidence": 0.9} for i in range(4)]
+    return {
+        "question": "ما علاقة الصبر بالشكر؟",
+        "evidence_packets": packets,
+        "detected_entities": entities,
+        "mode": "natural_chat",
+        "used_edges": edges,
+        "argument_chains": [],
+        "fallback_context": {},
+    }
+
+
+def _legacy_call(payload: dict[str, Any], schema: dict[str, Any]) -> tuple[str, dict[str, Any], str]:
+    prompt = (PROMPTS_DIR / "interpreter_natural_chat_ar.md").read_text(encoding="utf-8")
+    clean = {k: _legacy_sanitize(v) if isinstance(v, (dict, list)) else v for k, v in payload.items()}
+    return prompt, _thaw(schema), json.dumps(clean, ensure_ascii=False)
+
+
+def _current_call(store: PromptStore, payload: dict[str, Any]) -> tuple[str, dict[str, Any], str]:
+    return store.text("interpreter_natural_chat_ar.md"), _json_schema_for_interpreter(), dumps(payload)
+
+
+def _time_it(fn, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return time.perf_counter() - t0
+
+
+def run_benchmark(iterations: int = 2000) -> dict[str, Any]:
+    payload = _payload()
+    schema = _json_schema_for_interpreter()
+    store = PromptStore()
+    store.load()
+
+    legacy = _legacy_call(payload, schema)
+    current = _current_call(store, payload)
+    identical = legacy[0] == current[0] and legacy[1] == current[1] and json.loads(legacy[2]) == json.loads(current[2])
+
+    legacy_s = _time_it(lambda: _legacy_call(payload, schema), iterations)
+    current_s = _time_it(lambda: _current_call(store, payload), iterations)
+    return {
+        "iterations": iterations,
+        "payload_chars": len(current[2]),
+        "legacy_us_per_call": round(legacy_s / iterations * 1e6, 1),
+        "current_us_per_call": round(current_s / iterations * 1e6, 1),
+        "speedup": round(legacy_s / max(current_s, 1e-9), 2),
+        "identical_output": identical,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    report = run_benchmark(iterations=args.iterations)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if not report["identical_output"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Loop Detection Benchmark (mechanism-graph cycle enumeration)
+
+Compares, on synthetic mechanism-like graphs (random sparse digraph, average out-degree 2,
+10% parallel edges with a second relation type, ~30% negative polarity):
+
+- legacy: the pre-cycle_engine `_find_cycles_dfs` (per-node restart, list-based dedup),
+  asked for `2 * k` cycles as `detect_loops` used to do
+- current: `shortest_edge_cycles` (SCC + length-bounded Johnson-style search, iterative deepening) for the
+  `k` shortest cycles, plus raw streaming throughput of `iter_edge_cycles`
+
+No DB required.
+
+Usage:
+    python -m scripts.benchmark_loop_detection [--sizes 1000 10000 50000] [--k 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Any
+
+from apps.api.core.world_model.cycle_engine import (
+    iter_edge_cycles,
+    shortest_edge_cycles,
+    strongly_connected_components,
+    successor_map,
+)
+from apps.api.core.world_model.loop_reasoner import GraphEdge
+
+
+def synthetic_graph(n_edges: int, seed: int = 7) -> list[GraphEdge]:
+    rng = random.Random(seed)
+    n_nodes = max(4, n_edges // 2)
+    edges: list[GraphEdge] = []
+    seen: set[tuple[int, int]] = set()
+    while len(edges) < n_edges:
+        u, v = rng.randrange(n_nodes), rng.randrange(n_nodes)
+        if u == v or (u, v) in seen:
+            continue
+        seen.add((u, v))
+        pol = -1 if rng.random() < 0.3 else 1
+        edges.append(GraphEdge(f"e{len(edges):06d}", f"n{u:06d}", f"n{v:06d}", "ENABLES", pol, 0.6))
+        if rng.random() < 0.1 and len(edges) < n_edges:
+            edges.append(GraphEdge(f"e{len(edges):06d}", f"n{u:06d}", f"n{v:06d}", "REINFORCES", 1, 0.5))
+    return edges
+
+
+def _legacy_find_cycles_dfs(adj: dict[str, list[tuple[str, GraphEdge]]], max_cycles: int, max_cycle_length: int = 8):
+    """Verbatim copy of the pre-cycle_engine implementation (for comparison only)."""
+    cycles: list[list[GraphEdge]] = []
+    all_nodes = list(adj.keys())
+    for neighbors in adj.values():
+        for neighbor_id, _ in neighbors:
+            if neighbor_id not in all_nodes:
+                all_nodes.append(neighbor_id)
+    for start in sorted(all_nodes):
+        if len(cycles) >= max_cycles:
+            break
+        stack: list[tuple[str, list[GraphEdge]]] = [(start, [])]
+        visited_in_path: set[str] = set()
+        while stack and len(cycles) < max_cycles:
+            current, path = stack.pop()
+            if len(path) > max_cycle_length:
+                continue
+            if current == start and path:
+                edge_ids = tuple(sorted(e.id for e in path))
+                existing_ids = [tuple(sorted(e.id for e in c)) for c in cycles]
+                if edge_ids not in existing_ids:
+                    cycles.append(list(path))
+                continue
+            if current in visited_in_path and current != start:
+                continue
+            visited_in_path.add(current)
+            for neighbor_id, edge in adj.get(current, []):
+                new_path = path + [edge]
+                if neighbor_id == start and new_path:
+                    edge_ids = tuple(sorted(e.id for e in new_path))
+                    existing_ids = [tuple(sorted(e.id for e in c)) for c in cycles]
+                    if edge_ids not in existing_ids:
+                        cycles.append(list(new_path))
+                elif neighbor_id not in visited_in_path:
+                    stack.append((neighbor_id, new_path))
+            visited_in_path.discard(current)
+    return cycles
+
+
+def _is_elementary_cycle(cycle: list[GraphEdge]) -> bool:
+    nodes = [e.from_node for e in cycle]
+    closed = all(cycle[i].to_node == cycle[(i + 1) % len(cycle)].from_node for i in range(len(cycle)))
+    return closed and len(set(nodes)) == len(nodes)
+
+
+def bench_size(n_edges: int, k: int, legacy_max_edges: int, stream_cycles: int) -> dict[str, Any]:
+    edges = synthetic_graph(n_edges)
+    out: dict[str, Any] = {"edges": len(edges)}
+
+    t0 = time.perf_counter()
+    succ, _ = successor_map(edges)
+    sccs = [c for c in strongly_connected_components(succ) if len(c) > 1]
+    out["scc_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    out["largest_scc"] = max((len(c) for c in sccs), default=0)
+
+    t0 = time.perf_counter()
+    shortest = shortest_edge_cycles(edges, k=k, max_length=8)
+    out["current_k_shortest_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    out["current_lengths"] = [len(c) for c in shortest]
+    out["current_valid"] = all(_is_elementary_cycle(c) for c in shortest)
+
+    t0 = time.perf_counter()
+    streamed = sum(1 for _ in itertools.islice(iter_edge_cycles(edges, max_length=8), stream_cycles))
+    dt = time.perf_counter() - t0
+    out["stream_cycles"] = streamed
+    out["stream_cycles_per_s"] = int(streamed / max(dt, 1e-9))
+
+    if len(edges) <= legacy_max_edges:
+        adj: dict[str, list[tuple[str, GraphEdge]]] = defaultdict(list)
+        for e in edges:
+            adj[e.from_node].append((e.to_node, e))
+        t0 = time.perf_counter()
+        legacy = _legacy_find_cycles_dfs(adj, max_cycles=2 * k)[:k]
+        out["legacy_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        out["legacy_lengths"] = sorted(len(c) for c in legacy)
+        out["legacy_valid"] = all(_is_elementary_cycle(c) for c in legacy)
+    else:
+        out["legacy_ms"] = None
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--legacy-max-edges", type=int, default=50000)
+    parser.add_argument("--stream-cycles", type=int, default=10000)
+    args = parser.parse_args()
+    report = [bench_size(n, args.k, args.legacy_max_edges, args.stream_cycles) for n in args.sizes]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -93,7 +93,7 @@ async def main():
         provider = create_provider(cfg)
         
         # Directly call the provider to see raw response
-        from apps.api.llm.muhasibi_llm_client import _read_prompt, _json_schema_for_interpreter, _sanitize_for_json
+        from apps.api.llm.muhasibi_llm_client import _read_prompt, _json_schema_for_interpreter
         from pathlib import Path as P
         
         prompt_dir = P(__file__).parent.parent / "apps" / "api" / "llm" / "prompts"
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from apps.api.core import corpus_version
+from apps.api.core.answer_cache import AnswerCache, last_answer_cache_outcome
+from apps.api.core.contract_gate import _used_edges_from_middleware
+from apps.api.core.schemas import Citation, FinalResponse, Purpose
+from apps.api.graph.graph_snapshot import invalidate_graph_snapshot
+from apps.api.routes import ask
+from apps.api.routes.ask import AskRequest
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeSession:
+    """Serves the corpus-version query and an in-memory ask_run table."""
+
+    def __init__(self):
+        self.runs = 1
+        self.edges = 10
+        self.edges_at = "e1"
+        self.mechanism_edges = 4
+        self.ask_run: list[dict] = []
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "FROM ingestion_run" in sql:
+            return _Result([
+                SimpleNamespace(
+                    n=self.runs,
+                    last_at=f"t{self.runs}",
+                    edge_n=self.edges,
+                    edge_at=self.edges_at,
+                    edge_justification_span_n=3,
+                    edge_justification_span_at="s1",
+                    mechanism_edge_n=self.mechanism_edges,
+                    mechanism_edge_at="m1",
+                )
+            ])
+        if "INSERT INTO ask_run" in sql:
+            self.ask_run.append(dict(params))
+            return _Result([])
+        if "FROM ask_run" in sql:
+            rows = [r for r in self.ask_run if json.loads(r["debug_summary"]).get("answer_cache_key") == params["key"]]
+            return _Result([SimpleNamespace(final_response=json.loads(rows[-1]["final_response"]))] if rows else [])
+        return _Result([])
+
+    async def rollback(self):
+        return None
+
+
+@pytest.fixture
+async def pipeline(monkeypatch):
+    for name in ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_KEY", "AZURE_OPENAI_DEPLOYMENT_NAME"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("LLM_PROVIDER_TYPE", "azure_chat")
+    monkeypatch.setenv("CORPUS_VERSION_CHECK_SECONDS", "0")
+    monkeypatch.setenv("ANSWER_CACHE", "true")
+    monkeypatch.setenv("ANSWER_CACHE_PG", "false")
+    monkeypatch.setattr(ask, "_answer_cache", AnswerCache(8, clone=ask._clone_ask_result))
+    corpus_version.reset_corpus_version_cache()
+
+    template = FinalResponse(
+        listen_summary_ar="سؤال عن الإيمان",
+        purpose=Purpose(ultimate_goal_ar="تعريف الإيمان", constraints_ar=[]),
+        path_plan_ar=["تعريف"],
+        answer_ar="الإيمان تصديق بالقلب وعمل بالجوارح.",
+        citations=[Citation(chunk_id="CH_0001", source_anchor="p1")],
+        entities=[],
+        difficulty="easy",
+        not_found=False,
+        confidence="high",
+    )
+    runs: list[str] = []
+
+    async def fake_run(*, session, request, with_trace, event_sink=None):
+        runs.append(request.question)
+        return template.model_copy(deep=True), [{"state": "LISTEN", "elapsed_s": 0.0, "mode": "answer", "language": "ar"}] if with_trace else [], None
+
+    monkeypatch.setattr(ask, "_run_ask_pipeline", fake_run)
+    yield runs
+    corpus_version.reset_corpus_version_cache()
+
+
+@pytest.mark.asyncio
+async def test_repeat_question_is_served_from_cache_until_corpus_changes(pipeline):
+    session = _FakeSession()
+    req = AskRequest(question="ما هو الإيمان؟")
+    first, _, _ = await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    assert last_answer_cache_outcome().status == "miss"
+    second, _, _ = await ask._execute_ask_request(
+        session=session, request=AskRequest(question="مَا هُوَ الإِيمَانُ؟"), with_trace=False
+    )
+    assert last_answer_cache_outcome().hit and last_answer_cache_outcome().tier == "memory"
+    assert pipeline == ["ما هو الإيمان؟"] and second == first and second is not first
+
+    # Trace flag and mode are part of the key.
+    await ask._execute_ask_request(session=session, request=req, with_trace=True)
+    await ask._execute_ask_request(session=session, request=AskRequest(question=req.question, mode="debate"), with_trace=False)
+    assert len(pipeline) == 3
+
+    # Mining in this process, new or updated (mechanism) edges, or a new ingestion run all invalidate.
+    invalidate_graph_snapshot("test_miner")
+    await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    session.edges += 1
+    await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    session.edges_at = "e2"
+    await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    session.mechanism_edges += 1
+    await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    session.runs += 1
+    await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    assert len(pipeline) == 8 and last_answer_cache_outcome().status == "miss"
+
+
+@pytest.mark.asyncio
+async def test_llm_runs_and_unversioned_sessions_bypass_the_cache(pipeline, monkeypatch):
+    req = AskRequest(question="ما هو الإيمان؟")
+    await ask._execute_ask_request(session=object(), request=req, with_trace=False)
+    await ask._execute_ask_request(session=object(), request=req, with_trace=False)
+    assert len(pipeline) == 2 and last_answer_cache_outcome().status == "bypass"
+
+    monkeypatch.setenv("LLM_PROVIDER_TYPE", "mock")
+    session = _FakeSession()
+    for _ in range(2):
+        await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    assert len(pipeline) == 4
+    # The baseline engine never uses the LLM, so it stays cacheable.
+    for _ in range(2):
+        await ask._execute_ask_request(session=session, request=AskRequest(question=req.question, engine="baseline"), with_trace=False)
+    assert len(pipeline) == 5
+
+
+@pytest.mark.asyncio
+async def test_postgres_tier_reuses_ask_run_rows_across_processes(pipeline, monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_PG", "true")
+    session = _FakeSession()
+    req = AskRequest(question="ما هو الإيمان؟")
+    final, _, _ = await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    assert len(session.ask_run) == 1
+    assert json.loads(session.ask_run[0]["debug_summary"])["answer_cache_key"] == last_answer_cache_outcome().key
+
+    # A fresh worker (empty memory tier, its own process-local bump counts) finds the stored row.
+    monkeypatch.setattr(ask, "_answer_cache", AnswerCache(8, clone=ask._clone_ask_result))
+    corpus_version.bump_edge_version("other_worker")
+    again, trace, middleware = await ask._execute_ask_request(session=session, request=req, with_trace=False)
+    assert again == final and trace == [] and middleware is None
+    assert last_answer_cache_outcome().tier == "postgres" and len(pipeline) == 1
+    assert ask.get_answer_cache_stats()["pg_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_keeps_a_middleware_snapshot_not_the_live_run(pipeline, monkeypatch):
+    used_edges = [{"edge_id": "E1", "from_node": "a", "to_node": "b", "relation_type": "ENABLES"}]
+    live_ctx = SimpleNamespace(
+        normalized_question="ما هو الايمان",
+        detected_entities=[{"type": "pillar", "id": "P001"}],
+        mode="answer",
+        intent={"intent_type": "definition"},
+        seed_floor_packets_count=2,
+        evidence_packets=[{"chunk_id": "CH_0001", "text_ar": "..."}],
+    )
+    live = SimpleNamespace(_last_ctx=live_ctx, _last_used_edges=used_edges, retriever=SimpleNamespace(_session=object()))
+
+    async def fake_run(*, session, request, with_trace, event_sink=None):
+        pipeline.append(request.question)
+        return template, [], live
+
+    template = FinalResponse(
+        listen_summary_ar="س", purpose=Purpose(ultimate_goal_ar="غ", constraints_ar=[]), path_plan_ar=[],
+        answer_ar="ج", citations=[Citation(chunk_id="CH_0001", source_anchor="p1")], entities=[],
+        difficulty="easy", not_found=False, confidence="high",
+    )
+    monkeypatch.setattr(ask, "_run_ask_pipeline", fake_run)
+    session = _FakeSession()
+    req = AskRequest(question="ما هو الإيمان؟")
+    _, _, first = await ask._execute_ask_request(session=session, request=req, with_trace=True)
+    assert first is live  # the request that ran gets its own middleware
+
+    _, _, cached = await ask._execute_ask_request(session=session, request=req, with_trace=True)
+    assert last_answer_cache_outcome().hit and len(pipeline) == 1
+    assert cached is not live and not hasattr(cached, "retriever")
+    assert cached._last_used_edges == used_edges and cached._last_used_edges is not used_edges
+    assert cached._last_ctx.intent == {"intent_type": "definition"} and cached._last_ctx.seed_floor_packets_count == 2
+    assert not hasattr(cached._last_ctx, "evidence_packets") and not hasattr(cached._last_ctx, "account_issues")
+    assert [e.edge_id for e in _used_edges_from_middleware(cached)] == ["E1"]
+
+
+def test_lru_is_bounded():
+    cache: AnswerCache[int] = AnswerCache(2)
+    for i in range(3):
+        cache.put((i,), i)
+    assert cache.get((0,)) is None and cache.get((2,)) == 2
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ask_route_reports_cache_hits_in_header(pipeline, monkeypatch):
+    session = _FakeSession()
+
+    @asynccontextmanager
+    async def fake_get_session():
+        yield session
+
+    monkeypatch.setattr(ask, "get_session", fake_get_session)
+    statuses = []
+    for _ in range(2):
+        response = Response()
+        await ask.ask_question(AskRequest(question="ما هو الإيمان؟"), response)
+        statuses.append(response.headers["X-Answer-Cache"])
+    assert statuses == ["miss", "hit"]
+    traced = await ask.ask_question_with_trace(AskRequest(question="ما هو الإيمان؟"), Response())
+    assert traced.cache_hit is False
+    traced = await ask.ask_question_with_trace(AskRequest(question="ما هو الإيمان؟"), Response())
+    assert traced.cache_hit is True and [t.state for t in traced.trace] == ["LISTEN"]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from apps.api.core.muhasibi_state_machine import create_middleware
+from apps.api.core.single_flight import SingleFlight
+from apps.api.routes import ask
+from apps.api.routes.ask import AskRequest
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result_and_errors():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)), flight.do("other", work))
+    assert results == [42] * 6 and calls == 2
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4}
+
+    async def boom() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("db down")
+
+    outcomes = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(o, ValueError) for o in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_follower_takes_over_when_leader_is_cancelled():
+    flight: SingleFlight[str] = SingleFlight()
+    runs = 0
+
+    async def work() -> str:
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    assert await follower == "done"
+    assert leader.cancelled() and runs == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_asks_share_one_pipeline_run(monkeypatch):
+    template = await create_middleware().process("ما هو الإيمان؟", language="ar", mode="answer")
+    runs: list[str] = []
+
+    async def fake_run(*, session, request, with_trace, event_sink=None):
+        runs.append(request.question)
+        await asyncio.sleep(0.05)
+        return template.model_copy(deep=True), [{"state": "LISTEN"}], None
+
+    monkeypatch.setattr(ask, "_run_ask_pipeline", fake_run)
+    questions = ["ما هو الإيمان؟", "مَا هُوَ الإِيمَانُ؟", "ما  هو الإيمان؟"]
+    results = await asyncio.gather(
+        *(ask._execute_ask_request(session=object(), request=AskRequest(question=q), with_trace=True) for q in questions),
+        ask._execute_ask_request(session=object(), request=AskRequest(question=questions[0], mode="debate"), with_trace=True),
+    )
+    assert len(runs) == 2
+    finals = [r[0] for r in results[:3]]
+    assert all(f == template for f in finals)
+    assert len({id(f) for f in finals}) == 3
+    results[0][1].append({"state": "X"})
+    assert results[1][1] == [{"state": "LISTEN"}]
+
+    # Streaming callers always run their own pipeline.
+    await asyncio.gather(
+        *(
+            ask._execute_ask_request(
+                session=object(), request=AskRequest(question=questions[0]), with_trace=False, event_sink=lambda *a: None
+            )
+            for _ in range(2)
+        )
+    )
+    assert len(runs) == 4
+
+    monkeypatch.setenv("ASK_COALESCE", "false")
+    await asyncio.gather(
+        *(ask._execute_ask_request(session=object(), request=AskRequest(question=questions[0]), with_trace=False) for _ in range(2))
+    )
+    assert len(runs) == 6
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import threading
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apps.api.core.muhasibi_state_machine import create_middleware
+from apps.api.llm.gpt5_client_azure import AzureChatProvider, LLMRequest, MockProvider, ProviderConfig, ProviderType
+from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
+from apps.api.llm.streaming import AnswerFieldExtractor, stream_complete
+from apps.api.routes import ask_stream
+from apps.api.routes.ask import AskRequest
+
+
+def _parse_sse(frames: list[str]) -> list[tuple[str, dict]]:
+    out = []
+    for frame in frames:
+        event, data = frame.strip().split("\n", 1)
+        out.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return out
+
+
+def test_answer_field_extractor_decodes_split_escapes():
+    doc = json.dumps(
+        {"confidence": "high", "answer_ar": 'الصبر "حبس" النفس\nعلى الطاعة ✨ 😀 \\ ﷺ', "citations": []},
+        ensure_ascii=True,
+    )
+    for size in (1, 2, 3, 7, len(doc)):
+        ex = AnswerFieldExtractor("answer_ar")
+        text = "".join(ex.feed(doc[i : i + size]) for i in range(0, len(doc), size))
+        assert text == json.loads(doc)["answer_ar"], size
+        assert ex.done
+
+
+def _sse_stub(
+    chunks: list[str], requests_seen: list[dict] | None = None, reject_stream_options: bool = False
+) -> ThreadingHTTPServer:
+    requests_seen = [] if requests_seen is None else requests_seen
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            sent = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            requests_seen.append(sent)
+            if reject_stream_options and "stream_options" in sent:
+                body = json.dumps({"error": {"message": "Unrecognized request argument supplied: stream_options"}})
+                self.send_response(400)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body.encode("utf-8"))
+                return
+            lines = []
+            for i, c in enumerate(chunks + [None]):
+                payload = {
+                    "id": "c",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": "stub-model",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {} if c is None else {"content": c},
+                            "finish_reason": "stop" if c is None else None,
+                        }
+                    ],
+                }
+                lines.append(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n")
+            if (sent.get("stream_options") or {}).get("include_usage"):
+                usage = {"prompt_tokens": 120, "completion_tokens": 9, "total_tokens": 129}
+                payload = {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "stub-model",
+                           "choices": [], "usage": usage}
+                lines.append(f"data: {json.dumps(payload)}\n\n")
+            lines.append("data: [DONE]\n\n")
+            body = "".join(lines).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.mark.asyncio
+async def test_azure_chat_provider_streams_deltas_from_stub_server():
+    doc = json.dumps({"answer_ar": "الإيمان تصديق", "not_found": False}, ensure_ascii=False)
+    chunks = [doc[i : i + 5] for i in range(0, len(doc), 5)]
+    sent: list[dict] = []
+    server = _sse_stub(chunks, sent)
+    try:
+        provider = AzureChatProvider(
+            ProviderConfig(
+                provider_type=ProviderType.AZURE_CHAT,
+                endpoint=f"http://127.0.0.1:{server.server_address[1]}",
+                api_key="k",
+                api_version="2024-10-21",
+                deployment_name="gpt-stub",
+                timeout=10,
+            )
+        )
+        deltas: list[str] = []
+        resp = await stream_complete(
+            provider, LLMRequest(system_prompt="s", user_message="u", response_format={"name": "x"}), deltas.append
+        )
+        assert resp.error is None
+        assert deltas == chunks
+        assert resp.parsed_json == {"answer_ar": "الإيمان تصديق", "not_found": False}
+        assert resp.finish_reason == "stop" and resp.model == "stub-model"
+        # Usage arrives in the final (choice-less) chunk when requested.
+        assert sent[0]["stream_options"] == {"include_usage": True}
+        assert resp.usage == {"prompt_tokens": 120, "completion_tokens": 9, "total_tokens": 129}
+    finally:
+        server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_azure_chat_stream_retries_without_stream_options_when_rejected():
+    sent: list[dict] = []
+    server = _sse_stub(["مرحبا"], sent, reject_stream_options=True)
+    try:
+        provider = AzureChatProvider(
+            ProviderConfig(
+                provider_type=ProviderType.AZURE_CHAT,
+                endpoint=f"http://127.0.0.1:{server.server_address[1]}",
+                api_key="k",
+                api_version="2024-02-01",
+                deployment_name="gpt-stub",
+                timeout=10,
+            )
+        )
+        resp = await stream_complete(provider, LLMRequest(system_prompt="s", user_message="u"), lambda _: None)
+        assert resp.error is None and resp.content == "مرحبا"
+        assert resp.usage == {}
+        assert ["stream_options" in r for r in sent] == [True, False]
+    finally:
+        server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_middleware_emits_state_events_and_interpreter_tokens():
+    interp = {
+        "answer_ar": "الإيمان هو التصديق",
+        "citations": [],
+        "entities": [],
+        "not_found": False,
+        "confidence": "high",
+    }
+    client = MuhasibiLLMClient(MockProvider(default_response=json.dumps(interp, ensure_ascii=False)))
+    events: list[tuple[str, dict]] = []
+    client.stream_sink = lambda kind, payload: events.append((kind, payload))
+    await client.interpret("ما هو الإيمان؟", [], [])
+    assert events == [("draft_reset", {}), ("token", {"text": "الإيمان هو التصديق"})]
+
+    middleware = create_middleware()
+    states: list[str] = []
+    middleware.event_sink = lambda kind, payload: states.append(payload["state"])
+    await middleware.process("ما هو الإيمان؟", language="ar", mode="answer")
+    assert states[:2] == ["LISTEN", "PURPOSE"] and "RETRIEVE" in states
+
+
+@pytest.mark.asyncio
+async def test_stream_events_retract_draft_not_backed_by_final(monkeypatch):
+    refusal = await create_middleware().process("ما هو الإيمان؟", language="ar", mode="answer")
+    grounded = refusal.model_copy(update={"answer_ar": "الإيمان هو التصديق بالقلب", "not_found": False})
+
+    @asynccontextmanager
+    async def fake_session():
+        yield object()
+
+    async def run(final):
+        async def fake_execute(*, session, request, with_trace, event_sink):
+            event_sink("state", {"state": "LISTEN", "elapsed_s": 0.0})
+            event_sink("draft_reset", {})
+            event_sink("token", {"text": "الإيمان هو التصديق"})
+            return final, [], None
+
+        monkeypatch.setattr(ask_stream, "get_session", fake_session)
+        monkeypatch.setattr(ask_stream, "_execute_ask_request", fake_execute)
+        frames = [f async for f in ask_stream.stream_ask_events(AskRequest(question="ما هو الإيمان؟"), ui=False)]
+        return _parse_sse(frames)
+
+    events = await run(grounded)
+    assert [e for e, _ in events] == ["start", "state", "draft_reset", "token", "final"]
+    assert events[-1][1]["retracted"] is False
+    assert events[-1][1]["final_response"]["answer_ar"] == "الإيمان هو التصديق بالقلب"
+
+    events = await run(refusal)
+    assert events[-1][1]["retracted"] is True
+    assert events[-1][1]["final_response"]["not_found"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_error_ends_with_retracted_empty_final(monkeypatch):
+    @asynccontextmanager
+    async def fake_session():
+        yield object()
+
+    async def boom(**kwargs):
+        kwargs["event_sink"]("token", {"text": "مسودة"})
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(ask_stream, "get_session", fake_session)
+    monkeypatch.setattr(ask_stream, "_execute_ask_request", boom)
+    events = _parse_sse([f async for f in ask_stream.stream_ask_events(AskRequest(question="س"), ui=False)])
+    assert [e for e, _ in events] == ["start", "token", "error", "final"]
+    assert events[-1][1] == {"final_response": None, "retracted": True}
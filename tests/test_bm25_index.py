@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from apps.api.retrieve.bm25_index import Bm25Index, bm25_doc_text
+from apps.api.retrieve.vector_retriever_bm25 import _bm25_score, _tokens_for_bm25
+
+
+DOCS = [
+    ("CH_001", "pillar", "definition", "الصبر خلق عظيم يعين على الثبات", ["البقرة: 153"]),
+    ("CH_002", "core_value", "definition", "الصبر والشكر جناحا الإيمان والصبر مفتاح الفرج", []),
+    ("CH_003", "sub_value", "evidence", "قال تعالى إن الله مع الصابرين", ["البقرة: 153"]),
+    ("CH_004", "sub_value", "commentary", "المحاسبة طريق إلى الإصلاح والثبات", []),
+    ("CH_005", "pillar", "evidence", "الشكر يزيد النعم", ["إبراهيم: 7"]),
+]
+
+
+def _legacy_scores(docs, query, entity_types=None, chunk_types=None):
+    """Reference: the pre-index full-corpus scan."""
+    rows = [d for d in docs if (not entity_types or d[1] in entity_types) and (not chunk_types or d[2] in chunk_types)]
+    q_unique = set(_tokens_for_bm25(query))
+    toks = {d[0]: _tokens_for_bm25(bm25_doc_text(d[3], d[4])) for d in rows}
+    tf = {cid: Counter(t) for cid, t in toks.items()}
+    df = Counter(t for cid in tf for t in q_unique if tf[cid].get(t, 0) > 0)
+    n_docs = len(rows)
+    avg_len = sum(len(t) for t in toks.values()) / max(n_docs, 1)
+    scored = []
+    for d in rows:
+        score = 0.0
+        for t in q_unique:
+            score += _bm25_score(
+                tf=tf[d[0]].get(t, 0),
+                df=df.get(t, 0),
+                doc_len=len(toks[d[0]]),
+                avg_doc_len=avg_len,
+                n_docs=n_docs,
+            )
+        if score > 0.0:
+            scored.append((d[0], score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+
+def _build(docs) -> Bm25Index:
+    idx = Bm25Index()
+    for cid, et, ct, text_ar, refs in docs:
+        idx.upsert(chunk_id=cid, entity_type=et, chunk_type=ct, doc_text=bm25_doc_text(text_ar, refs))
+    return idx
+
+
+def test_bm25_index_scores_match_legacy_scan():
+    idx = _build(DOCS)
+    for query in ["الصبر", "الصبر والشكر", "البقرة: 153", "الثبات والمحاسبة"]:
+        got = idx.search(_tokens_for_bm25(query), top_k=10)
+        assert got == _legacy_scores(DOCS, query)
+
+
+def test_bm25_index_filters_use_filtered_corpus_stats():
+    idx = _build(DOCS)
+    query = "الصبر الشكر"
+    got = idx.search(_tokens_for_bm25(query), top_k=10, entity_types=["pillar"])
+    assert got == _legacy_scores(DOCS, query, entity_types=["pillar"])
+    got = idx.search(_tokens_for_bm25(query), top_k=10, chunk_types=["definition"])
+    assert got == _legacy_scores(DOCS, query, chunk_types=["definition"])
+
+
+def test_bm25_index_incremental_update_and_compaction():
+    """
+    Expected: replacing/removing docs gives the same result as a fresh build.
+    Edge: compaction renumbers slots without changing scores.
+    """
+    idx = _build(DOCS)
+    updated = list(DOCS)
+    updated[1] = ("CH_002", "core_value", "definition", "الشكر عبادة القلب", [])
+    idx.upsert(chunk_id="CH_002", entity_type="core_value", chunk_type="definition", doc_text="الشكر عبادة القلب")
+    idx.remove("CH_004")
+    del updated[3]
+
+    query = "الصبر الشكر الثبات"
+    before = idx.search(_tokens_for_bm25(query), top_k=10)
+    assert sorted(before) == sorted(_legacy_scores(updated, query))
+
+    idx.compact()
+    assert idx.n_docs == 4
+    assert idx.search(_tokens_for_bm25(query), top_k=10) == before
@@ -0,0 +1,116 @@
+"""Tests for elementary-cycle enumeration (cycle_engine).
+
+Tests:
+- Exact enumeration vs brute force (bounded and unbounded)
+- Parallel-edge expansion and length bounds
+- Canonical cycle keys
+- k-shortest selection used by detect_loops
+"""
+
+import random
+from collections import defaultdict
+
+from apps.api.core.world_model.cycle_engine import (
+    cycle_key,
+    cycles_through_edges,
+    iter_edge_cycles,
+    iter_node_cycles,
+    shortest_edge_cycles,
+    strongly_connected_components,
+)
+from apps.api.core.world_model.loop_reasoner import GraphEdge, _find_cycles_dfs
+
+
+def _brute_force(succ, max_length):
+    found = set()
+
+    def dfs(start, path):
+        for w in succ[path[-1]]:
+            if w == start:
+                if max_length is None or len(path) <= max_length:
+                    found.add(tuple(path))
+            elif w > start and w not in path and (max_length is None or len(path) < max_length):
+                dfs(start, path + [w])
+
+    for s in sorted(succ):
+        dfs(s, [s])
+    return found
+
+
+def _edge(eid, u, v, polarity=1):
+    return GraphEdge(eid, u, v, "ENABLES", polarity, 0.6)
+
+
+class TestNodeCycles:
+    def test_matches_brute_force_on_random_graphs(self):
+        rng = random.Random(11)
+        for _ in range(150):
+            n = rng.randint(2, 8)
+            p = rng.uniform(0.1, 0.6)
+            succ = {i: sorted({j for j in range(n) if rng.random() < p}) for i in range(n)}
+            for bound in (None, 1, 2, 3, 5):
+                got = [tuple(c) for c in iter_node_cycles(succ, max_length=bound)]
+                assert len(got) == len(set(got))
+                assert set(got) == _brute_force(succ, bound)
+
+    def test_complete_graph_cycle_count(self):
+        # K4 has 6 two-cycles, 8 three-cycles and 6 Hamiltonian cycles.
+        succ = {i: [j for j in range(4) if j != i] for i in range(4)}
+        lengths = sorted(len(c) for c in iter_node_cycles(succ))
+        assert lengths == [2] * 6 + [3] * 8 + [4] * 6
+        assert all(len(c) <= 3 for c in iter_node_cycles(succ, max_length=3))
+
+    def test_scc_decomposition(self):
+        succ = {"a": ["b"], "b": ["a", "c"], "c": ["d"], "d": ["c"], "e": []}
+        comps = sorted(sorted(c) for c in strongly_connected_components(succ))
+        assert comps == [["a", "b"], ["c", "d"], ["e"]]
+
+
+class TestEdgeCycles:
+    def test_parallel_edges_are_distinct_cycles(self):
+        edges = [_edge("e1", "a", "b"), _edge("e2", "a", "b", -1), _edge("e3", "b", "a")]
+        cycles = [sorted(e.id for e in c) for c in iter_edge_cycles(edges)]
+        assert sorted(cycles) == [["e1", "e3"], ["e2", "e3"]]
+
+    def test_self_loop_and_length_bound(self):
+        edges = [_edge("s", "x", "x")] + [_edge(f"r{i}", f"n{i}", f"n{(i + 1) % 5}") for i in range(5)]
+        assert [[e.id for e in c] for c in iter_edge_cycles(edges, max_length=4)] == [["s"]]
+        assert len(list(iter_edge_cycles(edges, max_length=5))) == 2
+
+    def test_cycle_key_is_rotation_invariant(self):
+        assert cycle_key(["e1", "e2", "e3"]) == cycle_key(["e3", "e1", "e2"])
+        assert cycle_key(["e1", "e2"]) != cycle_key(["e1", "e3"])
+
+    def test_shortest_cycles_prefer_short_loops(self):
+        # A long 6-cycle over low ids plus a 2-cycle over high ids.
+        edges = [_edge(f"a{i}", f"n{i}", f"n{(i + 1) % 6}") for i in range(6)]
+        edges += [_edge("z1", "y", "z"), _edge("z2", "z", "y")]
+        shortest = shortest_edge_cycles(edges, k=1)
+        assert [sorted(e.id for e in c) for c in shortest] == [["z1", "z2"]]
+        assert [len(c) for c in shortest_edge_cycles(edges, k=5)] == [2, 6]
+
+    def test_find_cycles_dfs_wrapper_yields_each_cycle_once(self):
+        edges = [_edge("ab", "a", "b"), _edge("ba", "b", "a"), _edge("bc", "b", "c"), _edge("ca", "c", "a")]
+        adj = defaultdict(list)
+        for e in edges:
+            adj[e.from_node].append((e.to_node, e))
+        cycles = _find_cycles_dfs(adj, max_cycles=10)
+        keys = [cycle_key(e.id for e in c) for c in cycles]
+        assert len(keys) == len(set(keys)) == 2
+        assert len(_find_cycles_dfs(adj, max_cycles=1)) == 1
+
+    def test_cycles_through_new_edges_are_exactly_the_new_cycles(self):
+        rng = random.Random(5)
+        for _ in range(60):
+            n = rng.randint(2, 7)
+            edges = [
+                _edge(f"e{j}", f"n{rng.randrange(n)}", f"n{rng.randrange(n)}", rng.choice([1, -1]))
+                for j in range(rng.randint(1, 16))
+            ]
+            split = rng.randint(0, len(edges) - 1)
+            old, new = edges[:split], edges[split:]
+            before = {cycle_key(e.id for e in c) for c in iter_edge_cycles(old, max_length=4)}
+            after = {cycle_key(e.id for e in c) for c in iter_edge_cycles(edges, max_length=4)}
+            got = [cycle_key(e.id for e in c) for c in cycles_through_edges(edges, new, max_length=4)]
+            assert len(got) == len(set(got))
+            assert set(got) == after - before
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from apps.api.core import database
+from apps.api.core.db_accounting import instrument_engine, track_db_queries
+from apps.api.core.muhasibi_state_machine import MuhasibiMiddleware, StateContext
+from apps.api.core.observability import create_observability_context, update_db_metrics
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    return engine
+
+
+def _query(engine, n: int = 1) -> None:
+    with engine.connect() as conn:
+        for _ in range(n):
+            conn.execute(text("SELECT 1"))
+
+
+def test_nested_trackers_count_statements_and_errors():
+    engine = _engine()
+    _query(engine)  # untracked
+    with track_db_queries() as request:
+        _query(engine, 2)
+        with track_db_queries() as state:
+            _query(engine, 3)
+            with pytest.raises(Exception):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT * FROM missing_table"))
+            _query(engine)
+    # The failed statement counts too (it still cost a round trip).
+    assert state.queries == 5 and request.queries == 7
+    assert request.time_s >= state.time_s > 0.0
+    assert state.as_dict()["db_queries"] == 5
+
+
+@pytest.mark.asyncio
+async def test_spawned_tasks_report_to_the_enclosing_tracker():
+    engine = _engine()
+
+    async def work() -> None:
+        await asyncio.sleep(0)
+        _query(engine, 2)
+
+    with track_db_queries() as a:
+        await asyncio.gather(work(), work())
+    with track_db_queries() as b:
+        await asyncio.create_task(work())
+    assert (a.queries, b.queries) == (4, 2)
+
+
+@pytest.mark.asyncio
+async def test_state_db_lands_in_state_context_trace_and_observability():
+    engine = _engine()
+
+    class _Middleware(MuhasibiMiddleware):
+        async def _state_listen(self, ctx):
+            _query(engine, 3)
+            return await super()._state_listen(ctx)
+
+    middleware = _Middleware()
+    _, trace = await middleware.process_with_trace("ما هو الإيمان؟", language="ar", mode="answer")
+    listen = next(t for t in trace if t["state"] == "LISTEN")
+    assert listen["db_queries"] == 3 and listen["db_time_ms"] >= 0.0
+    assert all(t.get("db_queries") == 0 for t in trace if t["state"] != "LISTEN")
+
+    ctx = StateContext(question="q")
+    ctx.state_db.update({"LISTEN": {"db_queries": 3, "db_time_ms": 1.5}, "RETRIEVE": {"db_queries": 7, "db_time_ms": 4.0}})
+    obs = create_observability_context(question="q")
+    update_db_metrics(obs, ctx.state_db)
+    assert obs.to_dict()["db_queries"] == 10 and obs.db_time_ms == 5.5
+    assert obs.db_by_stage["RETRIEVE"]["db_queries"] == 7
+
+
+def test_pool_and_statement_timeout_settings_from_env(monkeypatch):
+    url = "postgresql+asyncpg://u:p@h/db"
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "15000")
+    kwargs = database._engine_kwargs(url, use_null_pool=False)
+    assert kwargs["pool_size"] == 20 and kwargs["max_overflow"] == 5 and "pool_recycle" not in kwargs
+    assert kwargs["connect_args"] == {"server_settings": {"statement_timeout": "15000"}}
+
+    null_kwargs = database._engine_kwargs(url, use_null_pool=True)
+    assert "pool_size" not in null_kwargs and null_kwargs["connect_args"]["server_settings"]
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "0")
+    assert "connect_args" not in database._engine_kwargs(url, use_null_pool=False)
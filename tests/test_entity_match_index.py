@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from apps.api.retrieve.entity_match_index import AhoCorasick
+from apps.api.retrieve.entity_resolver import EntityResolver
+
+
+def _resolver(tmp_path: Path) -> EntityResolver:
+    aliases = tmp_path / "aliases.json"
+    aliases.write_text(
+        json.dumps([{"alias_ar": "التحمل", "entity_id": "SV001"}, {"alias_ar": "مجهول", "entity_id": "X999"}]),
+        encoding="utf-8",
+    )
+    r = EntityResolver()
+    r.load_entities(
+        pillars=[{"id": "P001", "name_ar": "الحياة الروحية"}, {"id": "P002", "name_ar": "الحياة العاطفية"}],
+        core_values=[{"id": "CV001", "name_ar": "الإيمان"}, {"id": "CV002", "name_ar": "التوازن العاطفي"}],
+        sub_values=[{"id": "SV001", "name_ar": "الصبر"}, {"id": "SV002", "name_ar": "ضبط النفس"}],
+        aliases_path=aliases,
+    )
+    return r
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    ac = AhoCorasick()
+    for i, p in enumerate(["he", "she", "his", "hers"]):
+        ac.add(p, i)
+    ac.build()
+    assert ac.find_all("ushers") == {0, 1, 3}
+    assert ac.find_all("xyz") == set()
+
+
+def test_compiled_resolve_matches_linear_scan(tmp_path):
+    """
+    Expected: compiled matcher returns exactly what the legacy scan returned
+    (same entities, match types, confidences and order).
+    """
+    r = _resolver(tmp_path)
+    queries = [
+        "ما هو الصبر؟",
+        "كيف أحقق التوازن العاطفي في الحياة الروحية",
+        "والصبر وضبط النفس",
+        "التحمل عند الشدائد",
+        "الحياه الروحيه والإيمان",
+        "سؤال لا علاقة له",
+    ]
+    gold = Path("eval/datasets/gold_qa_ar.jsonl")
+    if gold.exists():
+        queries += [json.loads(line)["question_ar"] for line in gold.read_text(encoding="utf-8").splitlines()[:50]]
+
+    for q in queries:
+        assert r.resolve(q) == r.resolve_linear(q), q
+
+
+def test_alias_for_unknown_entity_is_ignored(tmp_path):
+    r = _resolver(tmp_path)
+    assert all(e.entity_id != "X999" for e in r.resolve("مجهول"))
+    assert [(e.entity_id, e.match_type) for e in r.resolve("التحمل")] == [("SV001", "alias_exact")]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from apps.api.llm.evidence_packer import approx_tokens, citation_impact, pack_evidence
+from apps.api.llm.gpt5_client_azure import MockProvider
+from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
+
+
+def _packet(cid: str, text: str, entity_id: str = "") -> dict:
+    return {"chunk_id": cid, "entity_type": "core_value", "entity_id": entity_id, "chunk_type": "evidence", "text_ar": text}
+
+
+_FILLER = "وهذا كلام عام في تزكية النفس ومجاهدتها على الدوام. "
+
+
+def test_pack_ranks_by_score_and_entity_coverage_and_drops_duplicates():
+    packets = [
+        _packet("c1", "الصبر حبس النفس على الطاعة وعن المعصية."),
+        _packet("c2", "الصبر حبس النفس على الطاعة وعن المعصية ."),  # near-duplicate of c1
+        _packet("c3", "الشكر مقابلة النعمة بالطاعة.", entity_id="v-shukr"),
+        _packet("c4", "كلام لا علاقة له بالسؤال."),
+    ]
+    entities = [{"type": "core_value", "id": "v-shukr", "name_ar": "الشكر"}]
+    packed = pack_evidence(
+        question="ما الصبر والشكر؟",
+        evidence_packets=packets,
+        detected_entities=entities,
+        scores={"c1": 1.0, "c2": 0.9, "c3": 0.6, "c4": 0.7},
+        budget_tokens=10_000,
+    )
+    ids = [p["chunk_id"] for p in packed.evidence_packets]
+    # c3 (0.6) covers the detected entity and outranks c1 (1.0); c2 is a near-duplicate of c1.
+    assert ids == ["c3", "c1", "c4"]
+    assert packed.report.duplicates_dropped == 1
+    assert packed.report.dropped_chunk_ids == ["c2"]
+    assert packets[1]["chunk_id"] == "c2"  # caller list untouched
+
+
+def test_pack_trims_long_packets_to_relevant_sentence_spans():
+    text = _FILLER * 20 + "الإخلاص تصفية العمل من ملاحظة المخلوقين. " + _FILLER * 20
+    packet = _packet("c1", text)
+    packed = pack_evidence(
+        question="ما هو الإخلاص؟", evidence_packets=[packet], budget_tokens=10_000, max_packet_tokens=60
+    )
+    out = packed.evidence_packets[0]["text_ar"]
+    assert "الإخلاص تصفية العمل من ملاحظة المخلوقين." in out
+    assert len(out) < len(text)
+    assert approx_tokens(out) <= 60
+    assert packed.report.packets_trimmed == 1
+    assert packet["text_ar"] == text
+
+
+def test_pack_fits_budget_and_reports_citation_impact():
+    packets = [_packet(f"c{i}", f"النص رقم {i} " + _FILLER * 3) for i in range(10)]
+    edges = [{"edge_id": f"e{i}", "relation_type": "ENABLES", "justification_spans": []} for i in range(5)]
+    packed = pack_evidence(
+        question="سؤال", evidence_packets=packets, used_edges=edges, budget_tokens=400, max_packet_tokens=0
+    )
+    r = packed.report
+    assert r.tokens_after <= 400 < r.tokens_before
+    assert 0 < r.packets_kept < 10 and r.saved_tokens > 0
+    assert [p["chunk_id"] for p in packed.evidence_packets] == [f"c{i}" for i in range(r.packets_kept)]
+    assert r.edges_kept >= 1
+
+    impact = citation_impact([{"chunk_id": "c0"}, {"chunk_id": "c9"}, {"chunk_id": "zz"}, {}], r)
+    assert impact == {"cited": 3, "cited_kept": 1, "cited_dropped": 1, "cited_unknown": 1}
+
+
+@pytest.mark.asyncio
+async def test_interpret_sends_packed_evidence_and_records_report(monkeypatch):
+    monkeypatch.setenv("EVIDENCE_TOKEN_BUDGET", "300")
+    interp = {
+        "answer_ar": "جواب",
+        "citations": [{"chunk_id": "c0", "source_anchor": ""}],
+        "entities": [],
+        "not_found": False,
+        "confidence": "high",
+    }
+    provider = MockProvider(default_response=json.dumps(interp, ensure_ascii=False))
+    client = MuhasibiLLMClient(provider)
+    packets = [_packet(f"c{i}", f"النص رقم {i} " + _FILLER * 3) for i in range(10)]
+    result = await client.interpret("سؤال", packets, [])
+    assert result is not None and result.answer_ar == "جواب"
+
+    sent = json.loads(provider.requests[0].user_message)
+    assert 0 < len(sent["evidence_packets"]) < 10
+    stats = client.last_evidence_pack
+    assert stats["packets_in"] == 10 and stats["saved_tokens"] > 0
+    assert stats["citations"]["cited_kept"] == 1
+
+    monkeypatch.setenv("EVIDENCE_PACKING", "false")
+    await client.interpret("سؤال", packets, [])
+    assert len(json.loads(provider.requests[1].user_message)["evidence_packets"]) == 10
+    assert client.last_evidence_pack is None
@@ -0,0 +1,340 @@
+"""Tests for the shared, versioned mechanism-graph context.
+
+Tests:
+- Delta application (adjacency, span memo, versioning, derived artifacts)
+- Process-level loading and watermark drift detection
+- Lazy, memoized span loading
+- upsert_mechanism_edges staging deltas until commit
+- Consumers sharing one context
+"""
+
+from types import SimpleNamespace
+
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from apps.api.core import corpus_version
+from apps.api.core.world_model import graph_context
+from apps.api.core.world_model.graph_context import (
+    MechanismGraphContext,
+    get_mechanism_graph_context,
+)
+from apps.api.core.world_model.intervention_planner import build_planner_context
+from apps.api.core.world_model.loop_reasoner import GraphEdge, GraphNode, detect_loops
+from apps.api.graph.mechanism_miner_db import upsert_mechanism_edges
+from apps.api.graph.mechanism_miner_types import MinedMechanismEdge, MinedMechanismSpan
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeMechanismDb:
+    """Just enough of the mechanism tables for loading, fingerprints and upserts."""
+
+    def __init__(self):
+        self.nodes = {"n1": ("pillar", "P001", "روحية"), "n2": ("pillar", "P002", "عاطفية")}
+        self.edges = {"e1": ("n1", "n2", "ENABLES", 1, 0.6), "e2": ("n2", "n1", "INHIBITS", -1, 0.6)}
+        self.spans = [("e1", "CH_1", 0, 5, "نص")]
+        self.loops: dict[str, tuple[list[str], str]] = {}  # loop_key -> (edge_ids, loop_type)
+        self.loads = 0
+        self.span_queries: list[list[str]] = []
+        self.created = {"nodes": 1, "edges": 1, "spans": 1}  # stand-in for MAX(created_at)
+
+    def remine(self):
+        """Offline re-mine: same number of edges, new ids."""
+        self.edges = {f"x{k}": v for k, v in self.edges.items()}
+        self.spans = [(f"x{e}", *rest) for e, *rest in self.spans]
+        self.created["edges"] += 1
+        self.created["spans"] += 1
+
+    async def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        params = params or {}
+        if "COUNT(*) FROM mechanism_node" in sql:
+            return _Result([SimpleNamespace(
+                nodes=len(self.nodes), edges=len(self.edges), spans=len(self.spans),
+                nodes_at=self.created["nodes"], edges_at=self.created["edges"], spans_at=self.created["spans"],
+            )])
+        if sql.startswith("SELECT id::text AS id, ref_kind"):
+            self.loads += 1
+            return _Result([SimpleNamespace(id=k, ref_kind=v[0], ref_id=v[1], label_ar=v[2]) for k, v in sorted(self.nodes.items())])
+        if "FROM mechanism_edge e" in sql:
+            return _Result([
+                SimpleNamespace(id=k, from_node=v[0], to_node=v[1], relation_type=v[2], polarity=v[3], confidence=v[4])
+                for k, v in sorted(self.edges.items())
+            ])
+        if "FROM mechanism_edge_span" in sql:
+            self.span_queries.append(list(params["edge_ids"]))
+            return _Result([
+                SimpleNamespace(edge_id=e, chunk_id=c, span_start=a, span_end=b, quote=q)
+                for e, c, a, b, q in self.spans if e in params["edge_ids"]
+            ])
+        if "SELECT id::text AS id FROM mechanism_node" in sql:
+            found = [k for k, v in self.nodes.items() if (v[0], v[1]) == (params["ref_kind"], params["ref_id"])]
+            return _Result([SimpleNamespace(id=k) for k in found])
+        if "INSERT INTO mechanism_node" in sql:
+            node_id = f"n{len(self.nodes) + 1}"
+            self.created["nodes"] += 1
+            self.nodes[node_id] = (params["ref_kind"], params["ref_id"], params["label_ar"])
+            return _Result([SimpleNamespace(id=node_id)])
+        if "SELECT id::text AS id FROM mechanism_edge" in sql:
+            found = [
+                k for k, v in self.edges.items()
+                if (v[0], v[1], v[2]) == (params["from_node"], params["to_node"], params["relation_type"])
+            ]
+            return _Result([SimpleNamespace(id=k) for k in found])
+        if "INSERT INTO mechanism_edge " in sql:
+            edge_id = f"e{len(self.edges) + 1}"
+            self.created["edges"] += 1
+            self.edges[edge_id] = (params["from_node"], params["to_node"], params["relation_type"], params["polarity"], params["confidence"])
+            return _Result([SimpleNamespace(id=edge_id)])
+        if "INSERT INTO feedback_loop" in sql:
+            inserted = []
+            for key, eids, loop_type in zip(params["loop_keys"], params["edge_ids"], params["loop_types"]):
+                if key not in self.loops:
+                    self.loops[key] = (eids.split(","), loop_type)
+                    inserted.append(SimpleNamespace(loop_id=key))
+            return _Result(inserted)
+        if "INSERT INTO mechanism_edge_span" in sql:
+            self.created["spans"] += 1
+            self.spans.append((params["edge_id"], params["chunk_id"], params["span_start"], params["span_end"], params["quote"]))
+            return _Result([SimpleNamespace(id=f"s{len(self.spans)}")])
+        return _Result([])
+
+    async def rollback(self):
+        return None
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield self
+
+
+@pytest.fixture
+def fresh_context(monkeypatch):
+    monkeypatch.setenv("WORLD_MODEL_GRAPH_CONTEXT", "true")
+    monkeypatch.setenv("WORLD_MODEL_CONTEXT_CHECK_SECONDS", "0")
+    graph_context.reset_mechanism_graph_context()
+    yield
+    graph_context.reset_mechanism_graph_context()
+
+
+class TestDeltas:
+    @pytest.mark.asyncio
+    async def test_delta_updates_adjacency_span_memo_and_version(self):
+        ctx = MechanismGraphContext.from_graph(
+            {"a": GraphNode("a", "pillar", "P001", "أ")},
+            [],
+        )
+        builds = []
+        ctx.derived("edge_count", lambda c: builds.append(1) or len(c.edges))
+
+        edge = GraphEdge("ab", "a", "b", "ENABLES", 1, 0.5)
+        span = {"chunk_id": "c", "span_start": 0, "span_end": 3, "quote": "q"}
+        assert ctx.apply_delta(nodes=[GraphNode("b", "pillar", "P002", "ب")], edges=[edge])
+        assert ctx.apply_delta(spans=[("ab", span)])
+        assert ctx.version == 2 and ctx.fingerprint == (2, 1, 1) and ctx.rebaseline
+        assert ctx.outgoing_edges["a"] == [edge] and ctx.incoming_edges["b"] == [edge]
+        assert ctx.nodes_by_ref["pillar:P002"].id == "b"
+        # Spans land in the memo (no DB needed), never on the shared edge itself.
+        assert edge.spans == [] and await ctx.spans_for(None, ["ab"]) == {"ab": [span]}
+
+        # Replaying the same delta is a no-op.
+        assert not ctx.apply_delta(edges=[edge], spans=[("ab", dict(span))])
+        assert ctx.version == 2
+        assert ctx.derived("edge_count", lambda c: builds.append(1) or len(c.edges)) == 1
+        assert ctx.derived("edge_count", lambda c: builds.append(1) or len(c.edges)) == 1
+        assert len(builds) == 2
+
+
+class TestStagedDeltas:
+    """Deltas staged on a real Session: applied on the outermost COMMIT only."""
+
+    def _session(self):
+        session = Session(create_engine("sqlite://"))
+        session.begin()
+        session.execute(text("SELECT 1"))
+        return session
+
+    def _stage(self, session, edge_id):
+        applied = []
+        graph_context.stage_mechanism_delta(
+            SimpleNamespace(sync_session=session),
+            nodes=[GraphNode("n2", "pillar", "P002", "عاطفية")],
+            edges=[GraphEdge(edge_id, "n1", "n2", "ENABLES", 1, 0.6)],
+            on_applied=lambda: applied.append(edge_id),
+        )
+        return applied
+
+    @pytest.mark.asyncio
+    async def test_commit_applies_and_rollback_discards(self, fresh_context):
+        ctx = await get_mechanism_graph_context(_FakeMechanismDb())
+
+        session = self._session()
+        applied = self._stage(session, "e7")
+        with session.begin_nested():
+            session.execute(text("SELECT 1"))
+        assert "e7" not in ctx.edges_by_id  # savepoint release is not a commit
+        session.commit()
+        assert "e7" in ctx.edges_by_id and applied == ["e7"]
+
+        session = self._session()
+        applied = self._stage(session, "e8")
+        session.rollback()
+        session.begin()
+        session.commit()
+        assert "e8" not in ctx.edges_by_id and applied == []
+
+
+class TestSharedContext:
+    @pytest.mark.asyncio
+    async def test_loads_once_and_reloads_only_on_drift(self, fresh_context):
+        db = _FakeMechanismDb()
+        ctx = await get_mechanism_graph_context(db)
+        # Topology only: no span query at load time.
+        assert ctx.fingerprint == (2, 2, 1) and not ctx.edges_by_id["e1"].spans and db.span_queries == []
+        assert await get_mechanism_graph_context(db) is ctx and db.loads == 1
+
+        # Another process mined an edge: the watermark drifts -> full reload.
+        db.edges["e9"] = ("n1", "n1", "REINFORCES", 1, 0.6)
+        db.created["edges"] += 1
+        reloaded = await get_mechanism_graph_context(db)
+        assert reloaded is not ctx and db.loads == 2 and len(reloaded.edges) == 3
+        assert reloaded.version == ctx.version + 1
+
+    @pytest.mark.asyncio
+    async def test_remine_with_equal_row_counts_is_detected(self, fresh_context):
+        db = _FakeMechanismDb()
+        ctx = await get_mechanism_graph_context(db)
+        db.remine()
+        reloaded = await get_mechanism_graph_context(db)
+        assert reloaded is not ctx and reloaded.fingerprint == ctx.fingerprint
+        assert sorted(reloaded.edges_by_id) == ["xe1", "xe2"]
+
+    @pytest.mark.asyncio
+    async def test_spans_load_lazily_per_edge(self, fresh_context):
+        db = _FakeMechanismDb()
+        ctx = await get_mechanism_graph_context(db)
+        assert (await ctx.spans_for(db, ["e1"]))["e1"][0]["chunk_id"] == "CH_1"
+        assert await ctx.spans_for(db, ["e1", "e2"]) == {"e1": ctx._spans["e1"], "e2": []}
+        assert db.span_queries == [["e1"], ["e2"]]
+
+    @pytest.mark.asyncio
+    async def test_in_process_upserts_apply_as_deltas(self, fresh_context):
+        db = _FakeMechanismDb()
+        ctx = await get_mechanism_graph_context(db)
+        mined = [
+            MinedMechanismEdge(
+                from_ref_kind="pillar", from_ref_id="P002", to_ref_kind="pillar", to_ref_id="P003",
+                relation_type="ENABLES", polarity=1,
+                spans=(MinedMechanismSpan(chunk_id="CH_2", span_start=1, span_end=9, quote="شاهد"),),
+            ),
+        ]
+        bumps = corpus_version._edge_bumps
+        summary = await upsert_mechanism_edges(session=db, mined=mined)
+        assert summary == {"inserted_edges": 1, "inserted_spans": 1, "inserted_loops": 0}
+        # Answer caches keyed on the corpus version see the re-mine.
+        assert corpus_version._edge_bumps == bumps + 1
+
+        # No reload: the context was updated in place and adopts the moved watermark.
+        assert ctx.rebaseline
+        assert await get_mechanism_graph_context(db) is ctx and db.loads == 1
+        assert ctx.version == 1 and ctx.fingerprint == (3, 3, 2) and not ctx.rebaseline
+        new_edge = ctx.outgoing_edges["n2"][-1]
+        assert ctx.nodes_by_id[new_edge.to_node].ref_id == "P003" and new_edge.spans == []
+        assert (await ctx.spans_for(db, [new_edge.id]))[new_edge.id][0]["quote"] == "شاهد"
+        assert db.span_queries == []
+
+    @pytest.mark.asyncio
+    async def test_planner_and_loop_reasoner_share_the_context(self, fresh_context):
+        db = _FakeMechanismDb()
+        planner = await build_planner_context(db)
+        ctx = graph_context.get_loaded_mechanism_graph_context()
+        assert planner.incoming_edges is ctx.incoming_edges and planner.nodes_by_ref is ctx.nodes_by_ref
+
+        loops = await detect_loops(db)
+        assert [sorted(l.edge_ids) for l in loops] == [["e1", "e2"]]
+        assert loops[0].loop_type == "balancing" and loops[0].evidence_spans
+        assert db.loads == 1 and db.span_queries == [["e1", "e2"]]
+
+        # Spans of the selected cycles are memoized; shared edges stay span-less.
+        await detect_loops(db)
+        assert db.span_queries == [["e1", "e2"]] and not ctx.edges_by_id["e1"].spans
+
+    @pytest.mark.asyncio
+    async def test_weights_and_citations_stay_span_less(self, fresh_context):
+        from apps.api.core.world_model import simulator
+        from apps.api.core.world_model.intervention_planner import compute_intervention_plan
+
+        db = _FakeMechanismDb()
+        await detect_loops(db)  # fills the span memo for e1/e2
+        ctx = graph_context.get_loaded_mechanism_graph_context()
+        compiled = simulator._compiled_for(ctx)
+        # Same weights as before the shared context (edges loaded without spans).
+        assert compiled.weights.tolist() == [
+            simulator.compute_edge_weight(GraphEdge(e.id, e.from_node, e.to_node, e.relation_type, e.polarity, e.confidence))
+            for e in (ctx.edges_by_id[eid] for eid in compiled.edge_ids)
+        ]
+        plan = await compute_intervention_plan(db, "", [{"entity_type": "pillar", "entity_id": "P002"}], [])
+        assert all(step.mechanism_citations == [] for step in plan.steps)
+
+
+class TestIncrementalLoops:
+    @pytest.mark.asyncio
+    async def test_new_edge_indexes_only_the_loops_it_closes(self, fresh_context):
+        from apps.api.core.world_model.cycle_engine import cycle_key
+
+        db = _FakeMechanismDb()
+        ctx = await get_mechanism_graph_context(db)
+
+        def mined(src, dst, relation, polarity):
+            return MinedMechanismEdge(
+                from_ref_kind="pillar", from_ref_id=src, to_ref_kind="pillar", to_ref_id=dst,
+                relation_type=relation, polarity=polarity,
+                spans=(MinedMechanismSpan(chunk_id="CH_3", span_start=0, span_end=4, quote="دليل"),),
+            )
+
+        # P002 -> P003 closes nothing; P003 -> P001 closes P001 -> P002 -> P003 -> P001.
+        first = await upsert_mechanism_edges(session=db, mined=[mined("P002", "P003", "ENABLES", 1)])
+        second = await upsert_mechanism_edges(session=db, mined=[mined("P003", "P001", "INHIBITS", -1)])
+        assert first["inserted_loops"] == 0 and second["inserted_loops"] == 1
+
+        ((key, (edge_ids, loop_type)),) = db.loops.items()
+        assert key == cycle_key(edge_ids) and sorted(edge_ids) == ["e1", "e3", "e4"]
+        assert loop_type == "balancing"
+
+        # Re-running the miner is idempotent; the pre-existing e1/e2 loop was never re-mined.
+        again = await upsert_mechanism_edges(session=db, mined=[mined("P003", "P001", "INHIBITS", -1)])
+        assert again == {"inserted_edges": 0, "inserted_spans": 1, "inserted_loops": 0}
+        assert len(db.loops) == 1 and db.loads == 1 and len(ctx.edges) == 4
+
+    @pytest.mark.asyncio
+    async def test_without_loaded_context_the_topology_is_read_in_session(self, fresh_context, monkeypatch):
+        monkeypatch.setenv("WORLD_MODEL_INCREMENTAL_LOOPS", "true")
+        db = _FakeMechanismDb()
+        bumps = corpus_version._edge_bumps
+        summary = await upsert_mechanism_edges(
+            session=db,
+            mined=[
+                MinedMechanismEdge(
+                    from_ref_kind="pillar", from_ref_id="P002", to_ref_kind="pillar", to_ref_id="P001",
+                    relation_type="REINFORCES", polarity=1,
+                    spans=(MinedMechanismSpan(chunk_id="CH_4", span_start=0, span_end=4, quote="دليل"),),
+                ),
+            ],
+        )
+        # New e3 (n2 -> n1) closes a loop with e1 only (e2 is a parallel n2 -> n1 edge).
+        assert summary["inserted_loops"] == 1
+        assert [sorted(v[0]) for v in db.loops.values()] == [["e1", "e3"]]
+        assert graph_context.get_loaded_mechanism_graph_context() is None
+        assert corpus_version._edge_bumps == bumps + 1
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.retrieve import graph_retriever as gr
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+# (edge_id, from, to, rel_type, status)
+_EDGES = [
+    ("e1", ("pillar", "P1"), ("core_value", "CV1"), "CONTAINS", "approved"),
+    ("e2", ("core_value", "CV1"), ("sub_value", "SV1"), "CONTAINS", "approved"),
+    ("e3", ("sub_value", "SV2"), ("core_value", "CV1"), "SHARES_REF", "approved"),
+    ("e4", ("sub_value", "SV1"), ("sub_value", "SV3"), "SAME_NAME", "approved"),
+    ("e5", ("core_value", "CV1"), ("sub_value", "SV9"), "CONTAINS", "candidate"),
+    ("e6", ("sub_value", "SV1"), ("pillar", "P1"), "SCHOLAR_LINK", "approved"),
+]
+
+
+def _row(edge, direction, ord_=None):
+    eid, src, dst, rel, _ = edge
+    other = dst if direction == "outgoing" else src
+    return SimpleNamespace(
+        ord=ord_,
+        direction=direction,
+        edge_id=eid,
+        rel_type=rel,
+        relation_type=None,
+        neighbor_type=other[0],
+        neighbor_id=other[1],
+        created_method="test",
+        score=None,
+        strength_score=None,
+    )
+
+
+class _FakeSession:
+    """Serves per-node neighbor queries, batched frontier queries and span lookups."""
+
+    def __init__(self):
+        self.queries = 0
+
+    @staticmethod
+    def _ok(edge, params):
+        if "status" in params and edge[4] != params["status"]:
+            return False
+        return "rel_types" not in params or edge[3] in params["rel_types"]
+
+    async def execute(self, stmt, params=None):
+        self.queries += 1
+        sql = str(stmt)
+        params = params or {}
+        if "edge_justification_span" in sql:
+            return _Result([SimpleNamespace(edge_id="e2", chunk_id="C1", span_start=0, span_end=3, quote="نص")])
+        if "frontier_types" in sql:
+            frontier = list(zip(params["frontier_types"], params["frontier_ids"]))
+            rows = []
+            for i, node in enumerate(frontier, start=1):
+                rows += [_row(e, "outgoing", i) for e in _EDGES if e[1] == node and self._ok(e, params)]
+                rows += [_row(e, "incoming", i) for e in _EDGES if e[2] == node and self._ok(e, params)]
+            return _Result(rows)
+        node = (params["entity_type"], params["entity_id"])
+        if "e.from_type = :entity_type" in sql:
+            return _Result([_row(e, "outgoing") for e in _EDGES if e[1] == node and self._ok(e, params)])
+        return _Result([_row(e, "incoming") for e in _EDGES if e[2] == node and self._ok(e, params)])
+
+
+def _shape(entities):
+    return [
+        (n["neighbor_type"], n["neighbor_id"], n["edge_id"], n["direction"], n["depth"], len(n["justification_spans"]))
+        for n in entities
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rel_types", [None, ["CONTAINS", "SHARES_REF"]])
+async def test_batched_expansion_matches_per_node_bfs(monkeypatch, rel_types):
+    """
+    Expected: batched BFS returns the same neighbors, depths and spans as the per-node BFS.
+    Edge: candidate edges and filtered rel types are excluded in both modes.
+    """
+    monkeypatch.setenv("GRAPH_SNAPSHOT", "off")
+    legacy_session = _FakeSession()
+    monkeypatch.setenv("GRAPH_EXPAND_BATCHED", "false")
+    legacy = await gr.expand_graph(legacy_session, "pillar", "P1", depth=3, relationship_types=rel_types)
+
+    batched_session = _FakeSession()
+    monkeypatch.setenv("GRAPH_EXPAND_BATCHED", "true")
+    batched = await gr.expand_graph(batched_session, "pillar", "P1", depth=3, relationship_types=rel_types)
+
+    assert _shape(batched) == _shape(legacy)
+    assert ("sub_value", "SV9") not in {(n["neighbor_type"], n["neighbor_id"]) for n in batched}
+    # One query per level (3) + one span query, vs 2-3 per visited node.
+    assert batched_session.queries <= 4
+    assert batched_session.queries < legacy_session.queries
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.graph import graph_snapshot as gs
+from apps.api.graph.impact import _impact_from_snapshot
+
+
+def _edge(eid, src, dst, rel, relation=None, has_evidence=False):
+    return SimpleNamespace(
+        edge_id=eid,
+        from_type=src[0],
+        from_id=src[1],
+        to_type=dst[0],
+        to_id=dst[1],
+        rel_type=rel,
+        relation_type=relation,
+        created_method="test",
+        score=None,
+        strength_score=None,
+        has_evidence=has_evidence,
+    )
+
+
+ROWS = [
+    _edge("e01", ("pillar", "P1"), ("core_value", "CV1"), "CONTAINS"),
+    _edge("e02", ("core_value", "CV1"), ("sub_value", "SV1"), "CONTAINS"),
+    _edge("e03", ("sub_value", "SV1"), ("ref", "quran:1"), "MENTIONS_REF"),
+    _edge("e04", ("sub_value", "SV1"), ("ref", "quran:2"), "MENTIONS_REF"),
+    _edge("e05", ("sub_value", "SV2"), ("ref", "quran:1"), "MENTIONS_REF"),
+    _edge("e06", ("sub_value", "SV3"), ("ref", "quran:1"), "MENTIONS_REF"),
+    _edge("e07", ("sub_value", "SV3"), ("ref", "quran:2"), "MENTIONS_REF"),
+    _edge("e08", ("pillar", "P1"), ("pillar", "P2"), "SCHOLAR_LINK", "ENABLES", has_evidence=False),
+    _edge("e09", ("pillar", "P2"), ("pillar", "P3"), "SCHOLAR_LINK", "ENABLES", has_evidence=True),
+    _edge("e10", ("sub_value", "SV2"), ("sub_value", "SV1"), "SAME_NAME"),
+]
+
+
+def test_csr_adjacency_lists_outgoing_before_incoming():
+    snap = gs.GraphSnapshot(ROWS)
+    assert snap.n_edges == len(ROWS)
+    sv1 = snap.node("sub_value", "SV1")
+    got = [(snap.edge_ids[e], out) for _, e, out in snap.incident(sv1)]
+    assert got == [("e03", True), ("e04", True), ("e02", False), ("e10", False)]
+    rel = snap.rel_filter(["MENTIONS_REF"])
+    assert [snap.edge_ids[e] for _, e, _ in snap.incident(sv1, rel)] == ["e03", "e04"]
+    assert snap.rel_filter(["UNKNOWN"]) == frozenset()
+
+
+def test_expand_and_shortest_path_respect_grounding():
+    """
+    Expected: BFS depth tags and first-visit semantics; ungrounded semantic edges are
+    skipped by path search when require_grounded_semantic=True.
+    """
+    snap = gs.GraphSnapshot(ROWS)
+    out = snap.expand(("pillar", "P1"), depth=2, relationship_types=["CONTAINS"])
+    assert [(n["neighbor_id"], n["depth"], n["direction"]) for n in out] == [
+        ("CV1", 1, "outgoing"),
+        ("SV1", 2, "outgoing"),
+    ]
+
+    assert snap.shortest_path(("pillar", "P1"), ("pillar", "P3"), max_depth=4) is None
+    path = snap.shortest_path(("pillar", "P1"), ("pillar", "P3"), max_depth=4, require_grounded_semantic=False)
+    assert [k for k, _ in path] == [("pillar", "P1"), ("pillar", "P2"), ("pillar", "P3")]
+    assert [snap.edge_ids[e] for _, e in path if e is not None] == ["e08", "e09"]
+
+    path = snap.shortest_path(("sub_value", "SV2"), ("sub_value", "SV3"), max_depth=2, rel_types=["MENTIONS_REF"])
+    assert [k for k, _ in path] == [("sub_value", "SV2"), ("ref", "quran:1"), ("sub_value", "SV3")]
+
+
+def test_impact_from_snapshot_ranks_shared_refs():
+    snap = gs.GraphSnapshot(ROWS)
+    data = _impact_from_snapshot(snap, "sub_value", "SV1", max_depth=2, top_k=10)
+    ids = [i["entity_id"] for i in data["items"]]
+    assert ids == ["SV2", "SV3"]  # SV2: 1 shared ref + SAME_NAME bonus; SV3: 2 shared refs
+    sv3 = data["items"][1]
+    assert sv3["shared_ref_nodes"] == ["quran:1", "quran:2"]
+    assert "graph_distance=2" in sv3["reasons"]
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _FakeSession:
+    def __init__(self):
+        self.rows = list(ROWS)
+        self.loads = 0
+
+    async def execute(self, stmt, params=None):
+        if "n_spans" in str(stmt):
+            return _Result([SimpleNamespace(n_edges=len(self.rows), max_updated=None, n_spans=1)])
+        self.loads += 1
+        return _Result(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reloads_only_when_watermark_changes(monkeypatch):
+    monkeypatch.setenv("GRAPH_SNAPSHOT_CHECK_SECONDS", "300")
+    gs.reset_graph_snapshot()
+    session = _FakeSession()
+    try:
+        s1 = await gs.get_graph_snapshot(session)
+        assert await gs.get_graph_snapshot(session) is s1
+
+        # Invalidation forces a watermark check; unchanged watermark keeps the snapshot.
+        gs.invalidate_graph_snapshot("test")
+        assert await gs.get_graph_snapshot(session) is s1
+        assert session.loads == 1
+
+        session.rows.append(_edge("e11", ("pillar", "P3"), ("pillar", "P4"), "CONTAINS"))
+        gs.invalidate_graph_snapshot("test")
+        s2 = await gs.get_graph_snapshot(session)
+        assert s2 is not s1 and s2.version == s1.version + 1
+        assert s2.n_edges == len(ROWS) + 1
+        assert gs.get_graph_snapshot_stats()["edges"] == len(ROWS) + 1
+    finally:
+        gs.reset_graph_snapshot()
@@ -33,18 +33,21 @@ async def test_hybrid_retriever_infers_entities_from_vector_results(monkeypatch)
         assert entity_id == "SV_X"
         return [{"neighbor_type": "sub_value", "neighbor_id": "SV_Y", "depth": 1}]
 
-    async def fake_get_chunks_with_refs(session, et, eid, limit=20):
+    async def fake_get_chunks_with_refs_bulk(session, requests):
         return [
-            {
-                "chunk_id": "CH_2",
-                "entity_type": et.value,
-                "entity_id": eid,
-                "chunk_type": "definition",
-                "text_ar": "نص",
-                "source_doc_id": "DOC",
-                "source_anchor": "b",
-                "refs": [],
-            }
+            [
+                {
+                    "chunk_id": "CH_2",
+                    "entity_type": et.value,
+                    "entity_id": eid,
+                    "chunk_type": "definition",
+                    "text_ar": "نص",
+                    "source_doc_id": "DOC",
+                    "source_anchor": "b",
+                    "refs": [],
+                }
+            ]
+            for et, eid, _limit in requests
         ]
 
     retriever = HybridRetriever(enable_vector=True, enable_graph=True)
@@ -55,7 +58,9 @@ async def test_hybrid_retriever_infers_entities_from_vector_results(monkeypatch)
 
     monkeypatch.setattr(HybridRetriever, "_expand_via_refs", no_ref_expand)
     monkeypatch.setattr("apps.api.retrieve.hybrid_retriever.expand_graph", fake_expand_graph)
-    monkeypatch.setattr("apps.api.retrieve.hybrid_retriever.get_chunks_with_refs", fake_get_chunks_with_refs)
+    monkeypatch.setattr(
+        "apps.api.retrieve.hybrid_retriever.get_chunks_with_refs_bulk", fake_get_chunks_with_refs_bulk
+    )
 
     res = await retriever.retrieve(
         session=None,  # mocked away
@@ -0,0 +1,286 @@
+"""Tests for the leverage/risk index and batch intervention planning.
+
+Tests:
+- Upstream trace and risk sets vs a full edge scan
+- Dense (eager) vs sparse (lazy) leverage scores
+- Rebuild per graph version
+- Async build: dense pass off the event loop, sparse above EAGER_MAX_NODES
+- Batch planning vs single-goal planning
+- Batch route (pillar expansion, validation)
+"""
+
+import random
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from apps.api.core.world_model import intervention_planner, leverage_index
+from apps.api.core.world_model.graph_context import MechanismGraphContext
+from apps.api.core.world_model.intervention_planner import (
+    InterventionGoal,
+    compute_intervention_plan,
+    compute_intervention_plans_batch,
+    intervention_plan_to_dict,
+)
+from apps.api.core.world_model.leverage_index import (
+    build_leverage_index,
+    get_leverage_index,
+    get_leverage_index_async,
+)
+from apps.api.core.world_model.loop_reasoner import GraphEdge, GraphNode
+from apps.api.routes import world_model as world_model_routes
+
+_RELATIONS = [("ENABLES", 1), ("REINFORCES", 1), ("CONDITIONAL_ON", 1), ("INHIBITS", -1), ("TENSION_WITH", -1)]
+
+
+def _random_context(seed: int, n_nodes: int = 12, n_edges: int = 30) -> MechanismGraphContext:
+    rng = random.Random(seed)
+    kinds = ["pillar", "core_value", "sub_value"]
+    nodes = {
+        f"n{i}": GraphNode(f"n{i}", kinds[i % 3], f"R{i:03d}", f"قيمة {i}")
+        for i in range(n_nodes)
+    }
+    edges = []
+    for j in range(n_edges):
+        rel, pol = rng.choice(_RELATIONS)
+        spans = [{"chunk_id": f"CH_{j}", "span_start": 0, "span_end": 5, "quote": f"نص {j}"}] if rng.random() < 0.7 else []
+        edges.append(GraphEdge(
+            f"e{j}", f"n{rng.randrange(n_nodes)}", f"n{rng.randrange(n_nodes)}", rel, pol,
+            round(rng.uniform(0.3, 0.9), 2), spans,
+        ))
+    return MechanismGraphContext.from_graph(nodes, edges)
+
+
+def _scan_risks(ctx, target_ids):
+    """Reference: the planner's original full-edge risk scan."""
+    risks = []
+    for edge in ctx.edges:
+        if edge.polarity >= 0 or edge.relation_type not in ("INHIBITS", "TENSION_WITH"):
+            continue
+        if edge.from_node in target_ids or edge.to_node in target_ids:
+            from_node, to_node = ctx.nodes_by_id[edge.from_node], ctx.nodes_by_id[edge.to_node]
+            pillar = to_node.ref_id if to_node.ref_kind == "pillar" else (
+                from_node.ref_id if from_node.ref_kind == "pillar" else ""
+            )
+            risks.append({
+                "risk_ar": f"{edge.relation_type}: {from_node.label_ar} → {to_node.label_ar}",
+                "affected_pillar": pillar,
+                "evidence": edge.spans[:2] if edge.spans else [],
+            })
+    return risks
+
+
+class TestLeverageIndex:
+    def test_risks_match_full_edge_scan(self):
+        for seed in range(30):
+            ctx = _random_context(seed)
+            index = build_leverage_index(ctx)
+            rng = random.Random(seed)
+            for _ in range(5):
+                targets = set(rng.sample(list(ctx.nodes_by_id), rng.randint(1, 4)))
+                assert index.risks_for(targets) == _scan_risks(ctx, targets)
+
+    def test_upstream_is_backward_bfs(self):
+        a, b, c, d = (GraphNode(x, "sub_value", x.upper(), x) for x in "abcd")
+        edges = [
+            GraphEdge("ab", "a", "b", "ENABLES", 1, 0.5),
+            GraphEdge("bc", "b", "c", "ENABLES", 1, 0.5),
+            GraphEdge("dc", "d", "c", "INHIBITS", -1, 0.5),
+            GraphEdge("ca", "c", "a", "ENABLES", 1, 0.5),
+        ]
+        ctx = MechanismGraphContext.from_graph({n.id: n for n in (a, b, c, d)}, edges)
+        upstream = build_leverage_index(ctx).upstream("c").leverage
+        assert [(n.id, e.id, depth) for n, e, depth in upstream] == [("b", "bc", 1), ("d", "dc", 1), ("a", "ab", 2)]
+
+    def test_chain_scores_and_ranking(self):
+        nodes = {x: GraphNode(x, "sub_value", x.upper(), x) for x in "abc"}
+        edges = [
+            GraphEdge("ab", "a", "b", "ENABLES", 1, 0.5),
+            GraphEdge("bc", "b", "c", "INHIBITS", -1, 0.8),
+        ]
+        index = build_leverage_index(MechanismGraphContext.from_graph(nodes, edges))
+        scores = index.upstream("c").scores
+        # b: -0.8 at depth 1; a: 0.5 * -0.8 decayed once.
+        assert scores["b"] == pytest.approx(-0.8)
+        assert scores["a"] == pytest.approx(0.5 * -0.8 * index.decay)
+        assert [item["ref_id"] for item in index.top_leverage("c", k=1)] == ["B"]
+
+    def test_dense_scores_match_sparse_scores(self):
+        for seed in range(20):
+            ctx = _random_context(seed)
+            eager = build_leverage_index(ctx, eager=True)
+            lazy = build_leverage_index(ctx, eager=False)
+            assert eager.scores is not None and lazy.scores is None
+            for goal_id in ctx.nodes_by_id:
+                dense, sparse = eager.upstream(goal_id), lazy.upstream(goal_id)
+                assert dense.leverage == sparse.leverage
+                for node_id, value in dense.scores.items():
+                    assert value == pytest.approx(sparse.scores.get(node_id, 0.0), abs=1e-5)
+
+    def test_index_is_rebuilt_per_version(self):
+        ctx = _random_context(1)
+        first = get_leverage_index(ctx)
+        assert get_leverage_index(ctx) is first
+        ctx.apply_delta(edges=[GraphEdge("new", "n0", "n1", "TENSION_WITH", -1, 0.7)])
+        second = get_leverage_index(ctx)
+        assert second is not first and second.version == ctx.version
+        assert second.risks_for({"n0"}) == _scan_risks(ctx, {"n0"})
+
+    @pytest.mark.asyncio
+    async def test_async_index_builds_dense_scores_in_a_thread(self, monkeypatch):
+        calls = []
+        to_thread = leverage_index.asyncio.to_thread
+
+        async def recording_to_thread(fn, *args):
+            calls.append(fn.__name__)
+            return await to_thread(fn, *args)
+
+        monkeypatch.setattr(leverage_index.asyncio, "to_thread", recording_to_thread)
+        ctx = _random_context(5)
+        index = await get_leverage_index_async(ctx)
+        assert calls == ["_walk_scores"] and index.scores is not None
+        assert await get_leverage_index_async(ctx) is index and calls == ["_walk_scores"]
+        eager = build_leverage_index(ctx, eager=True)
+        for goal_id in ctx.nodes_by_id:
+            assert index.upstream(goal_id) == eager.upstream(goal_id)
+
+        ctx.apply_delta(edges=[GraphEdge("new", "n0", "n1", "ENABLES", 1, 0.7)])
+        assert (await get_leverage_index_async(ctx)).version == ctx.version and len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_async_index_rebuilds_when_a_delta_lands_during_the_pass(self, monkeypatch):
+        ctx = _random_context(7)
+        to_thread = leverage_index.asyncio.to_thread
+        deltas = [GraphNode("n99", "sub_value", "R099", "قيمة 99")]
+
+        async def racing_to_thread(fn, *args):
+            result = await to_thread(fn, *args)
+            if deltas:
+                node = deltas.pop()
+                ctx.apply_delta(nodes=[node], edges=[GraphEdge("e99", node.id, "n1", "ENABLES", 1, 0.6)])
+            return result
+
+        monkeypatch.setattr(leverage_index.asyncio, "to_thread", racing_to_thread)
+        built_for = ctx.version
+        index = await get_leverage_index_async(ctx)
+        assert ctx.version == built_for + 1
+        assert index.version == ctx.version and index.scores is not None
+        assert "n99" in index.positions
+        assert index.upstream("n1") == build_leverage_index(ctx, eager=True).upstream("n1")
+
+    def test_stale_dense_index_falls_back_to_sparse_for_new_nodes(self):
+        ctx = _random_context(8)
+        index = build_leverage_index(ctx, eager=True)
+        built_for = index.version
+        node = GraphNode("n99", "sub_value", "R099", "قيمة 99")
+        ctx.apply_delta(nodes=[node], edges=[GraphEdge("e99", "n99", "n1", "ENABLES", 1, 0.6)])
+        assert index.version == built_for != ctx.version
+        lazy = build_leverage_index(ctx, eager=False)
+        assert index.upstream("n1") == lazy.upstream("n1")
+        assert index.upstream("n99") == lazy.upstream("n99")
+
+    @pytest.mark.asyncio
+    async def test_async_index_stays_sparse_above_threshold(self, monkeypatch):
+        monkeypatch.setattr(leverage_index, "EAGER_MAX_NODES", 5)
+        ctx = _random_context(6)
+        index = await get_leverage_index_async(ctx)
+        assert index.scores is None
+        lazy = build_leverage_index(ctx, eager=False)
+        assert index.upstream("n3") == lazy.upstream("n3")
+
+
+class TestBatchPlanning:
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_goal_plans(self, monkeypatch):
+        ctx = _random_context(4)
+
+        async def fake_context(session):
+            return ctx
+
+        monkeypatch.setattr(intervention_planner, "get_mechanism_graph_context", fake_context)
+        goals = [InterventionGoal(ref_kind=n.ref_kind, ref_id=n.ref_id) for n in ctx.nodes_by_id.values()]
+        version, results = await compute_intervention_plans_batch(None, goals, loops=[], max_steps=5)
+
+        assert version == ctx.version
+        assert [r.goal_node.id for r in results] == list(ctx.nodes_by_id)
+        for result in results:
+            node = result.goal_node
+            single = await compute_intervention_plan(
+                None, node.label_ar, [{"entity_type": node.ref_kind, "entity_id": node.ref_id}], [], max_steps=5
+            )
+            assert intervention_plan_to_dict(result.plan) == intervention_plan_to_dict(single)
+            assert len(result.leverage) <= 5
+
+    @pytest.mark.asyncio
+    async def test_unknown_and_text_goals(self, monkeypatch):
+        ctx = _random_context(2)
+
+        async def fake_context(session):
+            return ctx
+
+        monkeypatch.setattr(intervention_planner, "get_mechanism_graph_context", fake_context)
+        goals = [
+            InterventionGoal(ref_kind="sub_value", ref_id="MISSING"),
+            InterventionGoal(goal_ar="قيمة 7"),
+            InterventionGoal(),
+        ]
+        _, results = await compute_intervention_plans_batch(None, goals)
+        assert results[0].goal_node is None and results[0].plan.steps == []
+        assert results[1].goal_node is ctx.nodes_by_id["n7"]
+        assert results[2].goal_node is None and results[2].leverage == []
+
+
+class _FakeSubValueDb:
+    def __init__(self, sub_value_ids):
+        self.sub_value_ids = sub_value_ids
+        self.params = []
+
+    async def execute(self, stmt, params=None):
+        self.params.append(params)
+        rows = [SimpleNamespace(id=i) for i in self.sub_value_ids]
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+class TestBatchRoute:
+    def _patch(self, monkeypatch, ctx, db):
+        @asynccontextmanager
+        async def fake_session():
+            yield db
+
+        async def fake_context(session):
+            return ctx
+
+        async def fake_loops(session):
+            return []
+
+        monkeypatch.setattr(world_model_routes, "get_session", fake_session)
+        monkeypatch.setattr(world_model_routes, "get_cached_loops", fake_loops)
+        monkeypatch.setattr(intervention_planner, "get_mechanism_graph_context", fake_context)
+
+    @pytest.mark.asyncio
+    async def test_pillar_expands_to_sub_values(self, monkeypatch):
+        ctx = _random_context(3)
+        db = _FakeSubValueDb(["R002", "R005"])
+        self._patch(monkeypatch, ctx, db)
+
+        req = world_model_routes.BatchInterventionRequest(
+            goals=[world_model_routes.InterventionGoalIn(ref_kind="pillar", ref_id="R000")],
+            pillar_id="P001",
+            top_leverage=3,
+        )
+        resp = await world_model_routes.interventions_batch(req)
+
+        assert db.params == [{"pid": "P001"}]
+        assert [p.goal_ref for p in resp.plans] == ["pillar:R000", "sub_value:R002", "sub_value:R005"]
+        assert all(p.found for p in resp.plans)
+        assert all(len(p.leverage) <= 3 for p in resp.plans)
+        assert resp.graph_version == ctx.version
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_is_rejected(self, monkeypatch):
+        self._patch(monkeypatch, _random_context(3), _FakeSubValueDb([]))
+        with pytest.raises(HTTPException) as exc:
+            await world_model_routes.interventions_batch(world_model_routes.BatchInterventionRequest())
+        assert exc.value.status_code == 400
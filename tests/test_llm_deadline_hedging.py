@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from apps.api.core.muhasibi_state_machine import create_middleware
+from apps.api.llm.deadline import effective_timeout, remaining_s, use_deadline
+from apps.api.llm.fake_latency_provider import FakeLatencyProvider
+from apps.api.llm.gpt5_client_azure import (
+    AzureChatProvider,
+    LLMRequest,
+    LLMResponse,
+    MockProvider,
+    ProviderConfig,
+    ProviderType,
+)
+from apps.api.llm.hedging import HedgedProvider
+from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
+from apps.api.llm.token_params import reset_token_params, token_param_for
+
+_JSON = {"ok": True}
+_REQ = LLMRequest(system_prompt="s", user_message="u", response_format={"name": "x"})
+
+
+def test_nested_deadlines_only_tighten():
+    assert remaining_s() is None and effective_timeout(30) == 30
+    with use_deadline(10.0):
+        with use_deadline(60.0):
+            assert 8.5 < remaining_s() <= 10.0
+            assert 7.5 < effective_timeout(30) <= 9.0
+        with use_deadline(2.0):
+            assert effective_timeout(30) <= 1.0
+    assert remaining_s() is None
+
+
+class _FakeCompletions:
+    def __init__(self, reject_param: bool = True, sleep_s: float = 0.0):
+        self.reject_param = reject_param
+        self.sleep_s = sleep_s
+        self.calls: list[str] = []
+
+    async def create(self, **params):
+        name = "max_completion_tokens" if "max_completion_tokens" in params else "max_tokens"
+        self.calls.append(name)
+        if self.reject_param and name == "max_completion_tokens":
+            raise TypeError("create() got an unexpected keyword argument 'max_completion_tokens'")
+        await asyncio.sleep(self.sleep_s)
+        message = type("M", (), {"content": json.dumps(_JSON)})()
+        choice = type("C", (), {"message": message, "finish_reason": "stop"})()
+        return type("R", (), {"choices": [choice], "model": "fake", "usage": None})()
+
+
+def _chat_provider(completions: _FakeCompletions, deployment: str = "dep-a") -> AzureChatProvider:
+    provider = AzureChatProvider(
+        ProviderConfig(
+            provider_type=ProviderType.AZURE_CHAT,
+            endpoint="https://example.invalid",
+            api_key="k",
+            api_version="2024-10-21",
+            deployment_name=deployment,
+        )
+    )
+    provider._client = type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_token_param_fallback_is_paid_once_per_deployment():
+    reset_token_params()
+    completions = _FakeCompletions(reject_param=True)
+    provider = _chat_provider(completions)
+    for _ in range(3):
+        resp = await provider.complete(_REQ)
+        assert resp.error is None and resp.parsed_json == _JSON
+    assert completions.calls == ["max_completion_tokens", "max_tokens", "max_tokens", "max_tokens"]
+    assert token_param_for(provider.config) == "max_tokens"
+
+    other = _FakeCompletions(reject_param=False)
+    await _chat_provider(other, deployment="dep-b").complete(_REQ)
+    assert other.calls == ["max_completion_tokens"]
+    reset_token_params()
+
+
+@pytest.mark.asyncio
+async def test_provider_timeout_is_clamped_to_request_deadline():
+    reset_token_params()
+    provider = _chat_provider(_FakeCompletions(reject_param=False, sleep_s=30.0))
+    t0 = time.perf_counter()
+    with use_deadline(1.5):
+        resp = await provider.complete(_REQ)
+    assert resp.finish_reason == "timeout" and time.perf_counter() - t0 < 1.0
+
+    with use_deadline(0.5):
+        resp = await FakeLatencyProvider(10.0).complete(_REQ)
+    assert resp.finish_reason == "timeout" and "deadline" in (resp.error or "")
+
+
+@pytest.mark.asyncio
+async def test_execute_state_propagates_state_deadline_to_provider():
+    seen: list[float] = []
+
+    class _Probe(MockProvider):
+        async def complete(self, request: LLMRequest) -> LLMResponse:
+            seen.append(remaining_s())
+            return await super().complete(request)
+
+    middleware = create_middleware(llm_client=MuhasibiLLMClient(_Probe()))
+    await middleware.process("ما هو الإيمان؟", language="ar", mode="answer")
+    assert seen and all(r is not None for r in seen)
+    # LISTEN (15s) and PURPOSE (90s) calls see their state timeouts, not the 180s provider default.
+    assert 10.0 < seen[0] <= 15.0
+    assert any(80.0 < r <= 90.0 for r in seen)
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_after_delay_and_takes_first_valid_json():
+    primary = FakeLatencyProvider(2.0, default_json=_JSON, deployment_name="primary")
+    alternate = FakeLatencyProvider(0.01, default_json={"ok": "alt"}, deployment_name="alt")
+    hedged = HedgedProvider(primary, alternate, initial_delay_s=0.05)
+    t0 = time.perf_counter()
+    resp = await hedged.complete(_REQ)
+    assert resp.parsed_json == {"ok": "alt"} and time.perf_counter() - t0 < 1.0
+    await asyncio.sleep(0)
+    assert primary.cancelled == 1
+    assert hedged.stats()["hedges_fired"] == 1 and hedged.stats()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast_or_deadline_too_short():
+    primary = FakeLatencyProvider(0.0, default_json=_JSON)
+    alternate = FakeLatencyProvider(0.0, default_json={"ok": "alt"})
+    hedged = HedgedProvider(primary, alternate, initial_delay_s=0.2)
+    assert (await hedged.complete(_REQ)).parsed_json == _JSON
+
+    slow = HedgedProvider(FakeLatencyProvider(0.3, default_json=_JSON), alternate, initial_delay_s=0.05)
+    with use_deadline(0.01):  # less time left than the hedge delay
+        resp = await slow.complete(_REQ)
+    assert resp.finish_reason == "timeout"
+    assert alternate.calls == 0 and hedged.hedges_fired == 0 and slow.hedges_fired == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_primary_triggers_hedge_and_delay_tracks_p90():
+    primary = FakeLatencyProvider(0.0, default_response="not json", default_json=None)
+    alternate = FakeLatencyProvider(0.0, default_json={"ok": "alt"})
+    hedged = HedgedProvider(primary, alternate, initial_delay_s=5.0)
+    assert (await hedged.complete(_REQ)).parsed_json == {"ok": "alt"}
+
+    hedged = HedgedProvider(FakeLatencyProvider(0.0), alternate, initial_delay_s=5.0, min_samples=10)
+    for i in range(1, 11):
+        hedged.latencies.add(i / 100.0)
+    assert hedged.hedge_delay_s() == pytest.approx(0.09)
+
+
+class _Raising(FakeLatencyProvider):
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        await FakeLatencyProvider.complete(self, request)
+        raise RuntimeError(f"{self.config.deployment_name} failed")
+
+
+@pytest.mark.asyncio
+async def test_failed_call_counts_as_invalid_and_other_call_still_wins():
+    # Backup raises first; the slower primary still returns valid JSON.
+    primary = FakeLatencyProvider(0.2, default_json=_JSON)
+    hedged = HedgedProvider(primary, _Raising(0.0, deployment_name="alt"), initial_delay_s=0.05)
+    assert (await hedged.complete(_REQ)).parsed_json == _JSON
+    assert primary.cancelled == 0 and hedged.hedge_wins == 0
+
+    # Primary raises before the delay: the hedge fires right away and wins.
+    alternate = FakeLatencyProvider(0.0, default_json={"ok": "alt"})
+    hedged = HedgedProvider(_Raising(0.0), alternate, initial_delay_s=5.0)
+    assert (await hedged.complete(_REQ)).parsed_json == {"ok": "alt"} and hedged.hedge_wins == 1
+
+    # Primary raises, backup answers invalidly: the invalid response is returned, not raised.
+    invalid = FakeLatencyProvider(0.0, default_response="not json", default_json=None)
+    resp = await HedgedProvider(_Raising(0.0), invalid, initial_delay_s=0.01).complete(_REQ)
+    assert resp.content == "not json"
+
+
+@pytest.mark.asyncio
+async def test_both_calls_failing_raises_the_primary_error():
+    hedged = HedgedProvider(_Raising(0.0, deployment_name="main"), _Raising(0.0), initial_delay_s=0.01)
+    with pytest.raises(RuntimeError, match="main failed"):
+        await hedged.complete(_REQ)
+
+
+@pytest.mark.asyncio
+async def test_registry_hedges_to_alternate_deployment():
+    from apps.api.llm.provider_registry import ProviderRegistry
+
+    registry = ProviderRegistry(max_concurrency=1, hedge_deployment="gpt-backup")
+    cfg = ProviderConfig(
+        provider_type=ProviderType.AZURE_CHAT,
+        endpoint="https://example.invalid",
+        api_key="k",
+        api_version="2024-10-21",
+        deployment_name="gpt-main",
+    )
+    provider = registry.get(cfg)
+    assert isinstance(provider, HedgedProvider) and registry.get(cfg) is provider
+    assert provider.alternate.config.deployment_name == "gpt-backup"
+    stats = registry.stats()
+    assert set(stats) == {"gpt-main", "gpt-backup"} and stats["gpt-main"]["hedge"]["alternate"] == "gpt-backup"
+    await registry.aclose()
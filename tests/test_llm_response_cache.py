@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import pytest
+
+from apps.api.llm import response_cache as rc
+from apps.api.llm.gpt5_client_azure import LLMRequest, LLMResponse, MockProvider
+from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
+from apps.api.llm.response_cache import CachingProvider, LLMResponseCache
+
+
+class _CountingProvider(MockProvider):
+    def __init__(self, default_json=None, error=None):
+        super().__init__(default_json=default_json)
+        self.error = error
+
+    async def complete(self, request):
+        resp = await super().complete(request)
+        if self.error:
+            return LLMResponse(content="", error=self.error)
+        return resp
+
+
+_PURPOSE_JSON = {
+    "purpose": {"ultimate_goal_ar": "فهم الصبر", "constraints_ar": ["evidence_only"]},
+    "path_plan_ar": ["تعريف"],
+    "difficulty": "easy",
+}
+
+
+@pytest.mark.asyncio
+async def test_purpose_path_is_served_from_cache_for_near_duplicate_questions():
+    """
+    Expected: a question differing only in diacritics/whitespace reuses the cached completion.
+    """
+    inner = _CountingProvider(default_json=_PURPOSE_JSON)
+    cache = LLMResponseCache(max_entries=8, ttl_s=60)
+    client = MuhasibiLLMClient(CachingProvider(inner, cache, namespace="gpt-test"))
+
+    first = await client.purpose_path("ما هو الصبر؟")
+    second = await client.purpose_path("مَا هُوَ   الصَّبْرُ؟")
+
+    assert first == second
+    assert len(inner.requests) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_only_opted_in_successful_requests_are_cached():
+    inner = _CountingProvider()
+    cache = LLMResponseCache(max_entries=8, ttl_s=60)
+    provider = CachingProvider(inner, cache, namespace="d")
+
+    plain = LLMRequest(system_prompt="s", user_message="u")
+    await provider.complete(plain)
+    await provider.complete(plain)
+    assert len(inner.requests) == 2
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 0
+
+    inner.error = "boom"
+    req = LLMRequest(system_prompt="s", user_message="u", cache=True)
+    assert (await provider.complete(req)).error == "boom"
+    inner.error = None
+    await provider.complete(req)
+    await provider.complete(req)
+    assert len(inner.requests) == 4
+    assert cache.stats()["stores"] == 1
+
+    # Different deployment / prompt / schema never share entries.
+    keys = {
+        rc.cache_key("d", req),
+        rc.cache_key("other", req),
+        rc.cache_key("d", LLMRequest(system_prompt="s2", user_message="u", cache=True)),
+        rc.cache_key("d", LLMRequest(system_prompt="s", user_message="u", response_format={"name": "x"}, cache=True)),
+    }
+    assert len(keys) == 4
+
+
+class _TruncatingProvider(MockProvider):
+    """Structured replies cut off at max_tokens: text present, JSON unparseable."""
+
+    def __init__(self, finish_reason="length"):
+        super().__init__()
+        self.finish_reason = finish_reason
+
+    async def complete(self, request):
+        self.requests.append(request)
+        return LLMResponse(content='{"purpose": {"ultimate_goal_ar": "فهم', finish_reason=self.finish_reason)
+
+
+@pytest.mark.asyncio
+async def test_unparsed_or_truncated_structured_replies_are_not_cached():
+    cache = LLMResponseCache(max_entries=8, ttl_s=60)
+    req = LLMRequest(system_prompt="s", user_message="u", response_format={"name": "x"}, cache=True)
+    for finish_reason in ("length", "stop"):
+        inner = _TruncatingProvider(finish_reason)
+        provider = CachingProvider(inner, cache, namespace="d")
+        for _ in range(3):
+            assert (await provider.complete(req)).parsed_json is None
+        assert len(inner.requests) == 3
+    assert cache.stats()["stores"] == 0
+
+    # Truncated free text is not pinned either.
+    inner = _TruncatingProvider("length")
+    provider = CachingProvider(inner, cache, namespace="d")
+    plain = LLMRequest(system_prompt="s", user_message="u", cache=True)
+    await provider.complete(plain)
+    await provider.complete(plain)
+    assert len(inner.requests) == 2 and cache.stats()["stores"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_payload_is_copied():
+    inner = _CountingProvider(default_json={"rewrites_ar": ["تعريف الصبر"]})
+    client = MuhasibiLLMClient(CachingProvider(inner, LLMResponseCache(), namespace="d"))
+    first = await client.query_rewrite_ar("ما هو الصبر؟", [], [])
+    first["rewrites_ar"].append("mutated")
+    second = await client.query_rewrite_ar("ما هو الصبر؟", [], [])
+    assert second["rewrites_ar"] == ["تعريف الصبر"]
+    assert len(inner.requests) == 1
+
+
+def test_ttl_and_lru_eviction(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, "time", lambda: now[0])
+    cache = LLMResponseCache(max_entries=2, ttl_s=10)
+    for k in ("a", "b"):
+        cache.put(k, LLMResponse(content=k))
+    assert cache.get("a").content == "a"  # refreshes "a"
+    cache.put("c", LLMResponse(content="c"))
+    assert cache.get("b") is None and cache.stats()["evictions"] == 1
+
+    now[0] += 11
+    assert cache.get("a") is None and cache.get("c") is None
+
+
+def test_sqlite_tier_survives_new_cache_instance(tmp_path, monkeypatch):
+    db = str(tmp_path / "llm_cache.sqlite")
+    cache = LLMResponseCache(max_entries=4, ttl_s=60, sqlite_path=db)
+    cache.put("k", LLMResponse(content="{}", parsed_json={"x": ["ي"]}, model="m", usage={"total_tokens": 3}))
+
+    reopened = LLMResponseCache(max_entries=4, ttl_s=60, sqlite_path=db)
+    got = reopened.get("k")
+    assert got.parsed_json == {"x": ["ي"]} and got.usage == {"total_tokens": 3}
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("k") is not None and reopened.stats()["disk_hits"] == 1
+
+    monkeypatch.setattr(rc.time, "time", lambda: 10**12)
+    assert LLMResponseCache(sqlite_path=db).get("k") is None
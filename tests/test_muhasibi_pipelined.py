@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from apps.api.core.muhasibi_state_machine import create_middleware
+from apps.api.llm.gpt5_client_azure import MockProvider
+from apps.api.llm.muhasibi_llm_client import MuhasibiLLMClient
+from apps.api.retrieve.hybrid_retriever import HybridRetriever, RetrievalInputs
+
+_PURPOSE_JSON = {
+    "purpose": {"ultimate_goal_ar": "فهم الإيمان", "constraints_ar": ["الاستناد إلى النص"]},
+    "path_plan_ar": ["تعريف", "أدلة"],
+    "difficulty": "easy",
+}
+
+
+class _SlowProvider(MockProvider):
+    """Deterministic provider with latency; answers purpose_path with a fixed plan."""
+
+    def __init__(self, events: list[str]):
+        super().__init__()
+        self.events = events
+
+    async def complete(self, request):
+        name = (request.response_format or {}).get("name", "text")
+        self.events.append(f"llm_start:{name}")
+        await asyncio.sleep(0.02)
+        self.events.append(f"llm_end:{name}")
+        resp = await super().complete(request)
+        if name == "purpose_path":
+            resp.parsed_json = _PURPOSE_JSON
+        return resp
+
+
+def _middleware(events: list[str], pipelined: bool):
+    retriever = HybridRetriever(enable_vector=False, enable_graph=False)
+    retriever._session = object()
+
+    async def fake_retrieve(session, inputs: RetrievalInputs):
+        events.append("retrieve_start")
+        await asyncio.sleep(0.01)
+        events.append("retrieve_end")
+        return type(
+            "R",
+            (),
+            {
+                "evidence_packets": [
+                    {
+                        "chunk_id": f"CH_{i}",
+                        "entity_type": "core_value",
+                        "entity_id": "CV001",
+                        "chunk_type": "definition" if i == 0 else "evidence",
+                        "text_ar": "الإيمان هو التصديق والعمل",
+                        "source_doc_id": "DOC",
+                        "source_anchor": f"a{i}",
+                        "refs": [],
+                    }
+                    for i in range(3)
+                ],
+                "has_definition": True,
+                "has_evidence": True,
+            },
+        )()
+
+    retriever.retrieve = fake_retrieve
+    return create_middleware(
+        retriever=retriever, llm_client=MuhasibiLLMClient(_SlowProvider(events)), pipelined=pipelined
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipelined_mode_overlaps_purpose_and_retrieve_with_identical_output():
+    """
+    Expected: RETRIEVE starts while the purpose_path call is in flight, yet the final
+    response is byte-identical to sequential mode and the trace keeps state order.
+    """
+    seq_events: list[str] = []
+    seq_final, seq_trace = await _middleware(seq_events, pipelined=False).process_with_trace(
+        "ما هو الإيمان؟", language="ar", mode="answer"
+    )
+    pipe_events: list[str] = []
+    pipe_final, pipe_trace = await _middleware(pipe_events, pipelined=True).process_with_trace(
+        "ما هو الإيمان؟", language="ar", mode="answer"
+    )
+
+    assert seq_events.index("retrieve_start") > seq_events.index("llm_end:purpose_path")
+    assert pipe_events.index("retrieve_start") < pipe_events.index("llm_end:purpose_path")
+
+    assert pipe_final.model_dump_json() == seq_final.model_dump_json()
+    assert [t["state"] for t in pipe_trace] == [t["state"] for t in seq_trace]
+    assert [t["state"] for t in pipe_trace][:3] == ["LISTEN", "PURPOSE", "RETRIEVE"]
+
+
+@pytest.mark.asyncio
+async def test_pipelined_mode_without_llm_runs_path_state(monkeypatch):
+    monkeypatch.setenv("MUHASIBI_PIPELINED", "true")
+    middleware = create_middleware()
+    assert middleware.pipelined is True
+    final, trace = await middleware.process_with_trace("ما هو الإيمان؟", language="ar", mode="answer")
+    states = [t["state"] for t in trace]
+    assert states[:4] == ["LISTEN", "PURPOSE", "PATH", "RETRIEVE"]
+    seq_final = await create_middleware(pipelined=False).process("ما هو الإيمان؟", language="ar", mode="answer")
+    assert final.model_dump_json() == seq_final.model_dump_json()
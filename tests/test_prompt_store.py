@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from uuid import UUID
+
+import pytest
+
+from apps.api.llm.json_codec import dumps
+from apps.api.llm.muhasibi_llm_client import _json_schema_for_interpreter, _json_schema_for_purpose_path
+from apps.api.llm.prompt_store import PROMPTS_DIR, PromptStore
+
+
+def test_prompt_store_loads_and_hashes_every_prompt_once():
+    store = PromptStore()
+    n = store.load()
+    names = sorted(p.name for p in PROMPTS_DIR.glob("*.md"))
+    assert n == len(names) and list(store.hashes()) == names
+    text = (PROMPTS_DIR / "interpreter.md").read_text(encoding="utf-8")
+    assert store.hashes()["interpreter.md"] == hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    reads = store.disk_reads
+    for _ in range(5):
+        assert store.text("interpreter.md") == text
+    assert store.disk_reads == reads
+
+
+def test_prompt_store_reads_unknown_prompt_lazily(tmp_path):
+    (tmp_path / "a.md").write_text("أ", encoding="utf-8")
+    store = PromptStore(tmp_path)
+    assert store.text("a.md") == "أ" and store.disk_reads == 1
+    assert store.text("a.md") == "أ" and store.disk_reads == 1
+
+
+def test_schemas_are_shared_frozen_and_serializable():
+    schema = _json_schema_for_interpreter()
+    assert schema is _json_schema_for_interpreter()
+    assert copy.deepcopy(schema) is schema
+    with pytest.raises(TypeError):
+        schema["name"] = "x"
+    with pytest.raises(TypeError):
+        schema["schema"]["required"].append("x")
+    plain = json.loads(json.dumps(schema))
+    assert plain == schema and json.loads(dumps(schema)) == plain
+    assert _json_schema_for_purpose_path()["schema"]["required"] == ["purpose", "path_plan_ar", "difficulty"]
+
+
+class _Color(Enum):
+    RED = "red"
+
+
+@dataclass
+class _Row:
+    a: int
+
+
+class _Obj:
+    def __init__(self):
+        self.x = UUID(int=1)
+
+
+def test_dumps_handles_sanitizer_types_in_one_pass():
+    uid = UUID(int=7)
+    payload = {
+        "id": uid,
+        "text": "الصبر",
+        "nested": [{"u": uid, "e": _Color.RED, "row": _Row(1), "obj": _Obj()}],
+        "when": datetime(2025, 1, 2, tzinfo=timezone.utc),
+        1: "non-str key",
+    }
+    out = dumps(payload)
+    assert "الصبر" in out and "\\u" not in out
+    data = json.loads(out)
+    assert data["id"] == str(uid)
+    assert data["nested"][0] == {"u": str(uid), "e": "red", "row": {"a": 1}, "obj": {"x": str(UUID(int=1))}}
+    assert data["when"].startswith("2025-01-02T00:00:00")
+    assert data["1"] == "non-str key"
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apps.api.llm.gpt5_client_azure import LLMRequest, MockProvider, ProviderConfig, ProviderType
+from apps.api.llm.provider_registry import ProviderRegistry
+
+
+class _StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.paths: list[str] = []
+        self.client_ports: set[int] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+def _stub_server(state: _StubState) -> ThreadingHTTPServer:
+    """Minimal Azure chat-completions endpoint speaking HTTP/1.1 keep-alive."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            with state.lock:
+                state.paths.append(self.path)
+                state.client_ports.add(self.client_address[1])
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            time.sleep(0.05)
+            with state.lock:
+                state.in_flight -= 1
+            body = json.dumps(
+                {
+                    "id": "cmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "stub-model",
+                    "choices": [
+                        {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "مرحبا"}}
+                    ],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _config(port: int, deployment: str = "gpt-stub") -> ProviderConfig:
+    return ProviderConfig(
+        provider_type=ProviderType.AZURE_CHAT,
+        endpoint=f"http://127.0.0.1:{port}",
+        api_key="test-key",
+        api_version="2024-10-21",
+        deployment_name=deployment,
+        timeout=10,
+    )
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_pooled_provider_and_limits_concurrency():
+    """
+    Expected: one provider per deployment; sequential calls reuse one keep-alive connection;
+    concurrent calls never exceed the per-deployment limit; shutdown closes the pool.
+    """
+    state = _StubState()
+    server = _stub_server(state)
+    try:
+        registry = ProviderRegistry(max_concurrency=2, max_connections=4)
+        cfg = _config(server.server_address[1])
+        provider = registry.get(cfg)
+        assert registry.get(_config(server.server_address[1])) is provider
+        assert registry.get(_config(server.server_address[1], deployment="other")) is not provider
+
+        req = LLMRequest(system_prompt="s", user_message="u")
+        for _ in range(3):
+            resp = await provider.complete(req)
+            assert resp.error is None and resp.content == "مرحبا"
+        assert len(state.client_ports) == 1
+        assert state.paths[0].startswith("/openai/deployments/gpt-stub/chat/completions")
+
+        results = await asyncio.gather(*(provider.complete(req) for _ in range(6)))
+        assert all(r.content == "مرحبا" for r in results)
+        assert state.max_in_flight == 2
+        assert provider.stats()["completed"] == 9
+
+        await registry.aclose()
+        assert provider.http_client.is_closed
+        assert registry.stats() == {}
+    finally:
+        server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_mock_provider_has_no_http_pool():
+    registry = ProviderRegistry(max_concurrency=1)
+    cfg = ProviderConfig(
+        provider_type=ProviderType.MOCK, endpoint="", api_key="", api_version="", deployment_name=""
+    )
+    provider = registry.get(cfg)
+    assert isinstance(provider.inner, MockProvider)
+    assert provider.http_client is None
+    resp = await provider.complete(LLMRequest(system_prompt="s", user_message="u"))
+    assert resp.content == "Mock response"
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_registry_wraps_pooled_provider_with_response_cache():
+    from apps.api.llm.response_cache import CachingProvider, LLMResponseCache
+
+    registry = ProviderRegistry(max_concurrency=1, response_cache=LLMResponseCache())
+    cfg = ProviderConfig(
+        provider_type=ProviderType.MOCK, endpoint="", api_key="", api_version="", deployment_name="gpt-x"
+    )
+    provider = registry.get(cfg)
+    assert isinstance(provider, CachingProvider) and registry.get(cfg) is provider
+    req = LLMRequest(system_prompt="s", user_message="u", cache=True)
+    await provider.complete(req)
+    await provider.complete(req)
+    assert registry.stats()["gpt-x"]["completed"] == 1
+    await registry.aclose()
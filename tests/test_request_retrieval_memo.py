@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.core.muhasibi_state_machine import StateContext
+from apps.api.core.muhasibi_trace import summarize_state
+from apps.api.graph.explain import _spans_for_edges
+from apps.api.retrieve.graph_retriever import get_entity_neighbors
+from apps.api.retrieve.request_memo import RequestRetrievalMemo, current_retrieval_memo, use_retrieval_memo
+from apps.api.retrieve.sql_retriever import get_chunks_with_refs_bulk
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def _chunk(cid: str, eid: str):
+    return SimpleNamespace(
+        chunk_id=cid,
+        entity_type="sub_value",
+        entity_id=eid,
+        chunk_type="definition",
+        text_ar=f"نص {cid}",
+        source_doc_id="DOC",
+        source_anchor=cid,
+    )
+
+
+class _FakeSession:
+    """Chunk/ref bulk queries, outgoing/incoming edge queries and span lookups."""
+
+    def __init__(self):
+        self.chunks = {("sub_value", "SV1"): [_chunk("C1", "SV1"), _chunk("C2", "SV1"), _chunk("C3", "SV1")]}
+        self.queries: list[str] = []
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "FROM chunk_ref" in sql:
+            self.queries.append("refs")
+            return _Result([SimpleNamespace(chunk_id="C1", ref_type="quran", ref="البقرة:1")])
+        if "FROM chunk c" in sql:
+            self.queries.append("chunks")
+            rows = []
+            for et, eid, lim in zip(params["entity_types"], params["entity_ids"], params["limits"]):
+                rows.extend(self.chunks.get((et, eid), [])[:lim])
+            return _Result(rows)
+        if "edge_justification_span" in sql:
+            self.queries.append("spans")
+            rows = [
+                SimpleNamespace(edge_id=eid, chunk_id="C1", span_start=0, span_end=4, quote="نص")
+                for eid in params["eids"]
+                if eid == "E1"
+            ]
+            return _Result(rows)
+        self.queries.append("edges")
+        if "e.from_type = :entity_type" in sql:
+            return _Result(
+                [
+                    SimpleNamespace(
+                        edge_id="E1",
+                        rel_type="SCHOLAR_LINK",
+                        relation_type="ENABLES",
+                        neighbor_type="sub_value",
+                        neighbor_id="SV2",
+                        created_method="llm",
+                        score=None,
+                        strength_score=None,
+                    )
+                ]
+            )
+        return _Result([])
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_memoized_per_request_and_copied():
+    """
+    Expected: a repeated entity lookup inside one request costs no queries.
+    Edge: a larger limit refetches; mutating a returned packet does not leak into the memo.
+    """
+    session = _FakeSession()
+    memo = RequestRetrievalMemo()
+    with use_retrieval_memo(memo):
+        (first,) = await get_chunks_with_refs_bulk(session, [("sub_value", "SV1", 2)])
+        first[0]["depth"] = 2
+        first[0]["refs"].append({"type": "x", "ref": "y"})
+        (second,) = await get_chunks_with_refs_bulk(session, [("sub_value", "SV1", 1)])
+        assert session.queries == ["chunks", "refs"]
+        assert [p["chunk_id"] for p in second] == ["C1"]
+        assert "depth" not in second[0]
+        assert second[0]["refs"] == [{"type": "quran", "ref": "البقرة:1"}]
+
+        (wider,) = await get_chunks_with_refs_bulk(session, [("sub_value", "SV1", 5)])
+        assert [p["chunk_id"] for p in wider] == ["C1", "C2", "C3"]
+        # Entity exhausted (3 < 5): any limit is now served from the memo.
+        await get_chunks_with_refs_bulk(session, [("sub_value", "SV1", 50)])
+
+    assert session.queries == ["chunks", "refs", "chunks", "refs"]
+    assert memo.stats()["chunks"] == {"hits": 2, "misses": 2}
+    assert current_retrieval_memo() is None
+
+    # Outside a request scope nothing is cached.
+    await get_chunks_with_refs_bulk(session, [("sub_value", "SV1", 1)])
+    assert len(session.queries) == 6
+
+
+@pytest.mark.asyncio
+async def test_neighbors_and_spans_are_shared_across_callers():
+    session = _FakeSession()
+    memo = RequestRetrievalMemo()
+    with use_retrieval_memo(memo):
+        a = await get_entity_neighbors(session, "sub_value", "SV1")
+        a[0]["tag"] = True
+        b = await get_entity_neighbors(session, "sub_value", "SV1")
+        spans = await _spans_for_edges(session, ["E1"])
+
+    assert session.queries == ["edges", "edges", "spans"]
+    assert b == [{k: v for k, v in a[0].items() if k != "tag"}]
+    assert b[0]["justification_spans"][0]["quote"] == "نص"
+    assert spans["E1"] == b[0]["justification_spans"]
+    assert memo.stats() == {
+        "chunks": {"hits": 0, "misses": 0},
+        "neighbors": {"hits": 1, "misses": 1},
+        "spans": {"hits": 1, "misses": 1},
+    }
+
+
+def test_trace_exposes_memo_counters():
+    ctx = StateContext(question="ما هو الصبر؟")
+    ctx.retrieval_memo.counters["chunks"]["hits"] = 3
+    snap = summarize_state("RETRIEVE", ctx)
+    assert snap["retrieval_memo"]["chunks"] == {"hits": 3, "misses": 0}
+    assert StateContext(question="x").retrieval_memo is not ctx.retrieval_memo
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from apps.api.retrieve.reranker import CrossEncoderReranker, NullReranker, RerankerScoreCache
+
+
+class _FakeCrossEncoder(CrossEncoderReranker):
+    """Scores = passage length / 100; records forward-pass batches (no torch)."""
+
+    def __init__(self, cache: RerankerScoreCache):
+        super().__init__(model_path="fake-model", cache=cache)
+        self.batches: list[list[str]] = []
+
+    def _infer_batch(self, query: str, doc_texts: list[str]) -> list[float]:
+        self.batches.append(list(doc_texts))
+        return [len(d) / 100.0 for d in doc_texts]
+
+
+def test_score_batch_minibatches_and_preserves_order():
+    rr = _FakeCrossEncoder(RerankerScoreCache(max_entries=100))
+    texts = ["aaaa", "a", "", "aaa", "aa"]
+    scores = rr.score_batch("سؤال", texts, doc_ids=["c1", "c2", "c3", "c4", "c5"], batch_size=2)
+    assert scores == [0.04, 0.01, 0.0, 0.03, 0.02]
+    # Empty passage skipped; misses sorted by length into padded mini-batches of 2.
+    assert rr.batches == [["a", "aa"], ["aaa", "aaaa"]]
+
+
+def test_score_cache_skips_inference_for_repeated_queries():
+    """
+    Expected: a repeated question (modulo whitespace) hits the cache for every chunk.
+    Edge: changed chunk text for the same chunk_id is re-scored.
+    """
+    cache = RerankerScoreCache(max_entries=100)
+    rr = _FakeCrossEncoder(cache)
+    rr.score_batch("ما هو الصبر", ["نص أ", "نص ب"], doc_ids=["c1", "c2"])
+    assert len(rr.batches) == 1
+
+    again = rr.score_batch("  ما   هو الصبر ", ["نص أ", "نص ب"], doc_ids=["c1", "c2"])
+    assert len(rr.batches) == 1
+    assert again == [len("نص أ") / 100.0, len("نص ب") / 100.0]
+    assert cache.stats()["hits"] == 2
+
+    rr.score_batch("ما هو الصبر", ["نص أ معدل", "نص ب"], doc_ids=["c1", "c2"])
+    assert rr.batches[-1] == ["نص أ معدل"]
+
+
+def test_score_cache_is_lru_bounded():
+    cache = RerankerScoreCache(max_entries=2)
+    for i in range(3):
+        cache.put(("m", "q", f"c{i}", "h"), float(i))
+    assert cache.get(("m", "q", "c0", "h")) is None
+    assert cache.get(("m", "q", "c2", "h")) == 2.0
+    assert cache.stats()["entries"] == 2
+
+
+def test_null_reranker_batch():
+    assert NullReranker().score_batch("q", ["a", "b"]) == [0.0, 0.0]
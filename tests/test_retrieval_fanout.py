@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from apps.api.retrieve.hybrid_retriever import HybridRetriever, RetrievalInputs
+from apps.api.retrieve.retrieval_fanout import run_branches
+
+
+class _Session:
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _factory(opened: list[str]):
+    @asynccontextmanager
+    async def _open():
+        s = _Session(f"pooled{len(opened)}")
+        opened.append(s.name)
+        yield s
+
+    return _open
+
+
+@pytest.mark.asyncio
+async def test_run_branches_is_concurrent_and_ordered():
+    """
+    Expected: wall time ~ slowest branch; results in branch order; extra branches get own sessions.
+    """
+    opened: list[str] = []
+
+    def _branch(delay: float):
+        async def fn(session):
+            await asyncio.sleep(delay)
+            return (session.name, delay)
+
+        return fn
+
+    timings: dict[str, float] = {}
+    t0 = time.perf_counter()
+    out = await run_branches(
+        _Session("caller"),
+        [("slow", _branch(0.12)), ("fast", _branch(0.01)), ("mid", _branch(0.06))],
+        parallel=True,
+        timings=timings,
+        session_factory=_factory(opened),
+    )
+    elapsed = time.perf_counter() - t0
+    assert out == [("caller", 0.12), ("pooled0", 0.01), ("pooled1", 0.06)]
+    assert len(opened) == 2
+    assert elapsed < 0.12 + 0.06
+    assert set(timings) == {"slow", "fast", "mid"}
+
+
+@pytest.mark.asyncio
+async def test_parallel_and_sequential_retrieval_merge_identically(monkeypatch):
+    class DummyVector:
+        async def search(self, session, query, top_k=10, entity_types=None, chunk_types=None):
+            await asyncio.sleep(0.01)
+            return [
+                {
+                    "chunk_id": "V1",
+                    "entity_type": "sub_value",
+                    "entity_id": "SV_V",
+                    "chunk_type": "evidence",
+                    "text_ar": "نص",
+                    "source_doc_id": "DOC",
+                    "source_anchor": "v",
+                    "refs": [{"type": "quran", "ref": "البقرة:2"}],
+                }
+            ]
+
+    async def fake_expand_graph(session, entity_type, entity_id, depth=2, relationship_types=None):
+        await asyncio.sleep(0.01)
+        return [{"neighbor_type": "sub_value", "neighbor_id": f"N_{entity_id}", "depth": 1}]
+
+    async def fake_bulk(session, requests):
+        return [
+            [
+                {
+                    "chunk_id": f"C_{eid}",
+                    "entity_type": getattr(et, "value", et),
+                    "entity_id": eid,
+                    "chunk_type": "definition",
+                    "text_ar": "نص",
+                    "source_doc_id": "DOC",
+                    "source_anchor": eid,
+                    "refs": [],
+                }
+            ]
+            for et, eid, _ in requests
+        ]
+
+    monkeypatch.setattr("apps.api.retrieve.hybrid_retriever.expand_graph", fake_expand_graph)
+    monkeypatch.setattr("apps.api.retrieve.hybrid_retriever.get_chunks_with_refs_bulk", fake_bulk)
+
+    inputs = RetrievalInputs(
+        query="الصبر",
+        resolved_entities=[{"type": "sub_value", "id": "SV1"}, {"type": "core_value", "id": "CV1"}],
+        top_k=5,
+    )
+    results = []
+    for parallel in (False, True):
+        r = HybridRetriever(parallel=parallel, session_factory=_factory([]), reranker=None)
+        r.vector_retriever = DummyVector()
+        results.append(await r.retrieve(_Session("caller"), inputs, reranker_override=False))
+
+    seq, par = results
+    assert [p["chunk_id"] for p in seq.evidence_packets] == [p["chunk_id"] for p in par.evidence_packets]
+    assert seq.ranked_chunks == par.ranked_chunks
+    assert (seq.retrieval_mode, par.retrieval_mode) == ("sequential", "parallel")
+    assert {"entity_graph", "vector", "ref_expansion", "merge", "total"} <= set(par.source_timings_ms)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parallel", [False, True])
+async def test_retrieve_many_shares_query_independent_branches(monkeypatch, parallel):
+    """
+    Expected: entity/graph chunks are fetched once for N rewrite queries; results keep input order.
+    """
+    calls = {"expand": 0, "bulk": 0}
+
+    class QueryVector:
+        async def search(self, session, query, top_k=10, entity_types=None, chunk_types=None):
+            await asyncio.sleep(0.01)
+            return [
+                {
+                    "chunk_id": f"V_{query}",
+                    "entity_type": "sub_value",
+                    "entity_id": "SV1",
+                    "chunk_type": "evidence",
+                    "text_ar": query,
+                    "source_doc_id": "DOC",
+                    "source_anchor": query,
+                    "refs": [],
+                }
+            ]
+
+    async def fake_expand_graph(session, entity_type, entity_id, depth=2, relationship_types=None):
+        calls["expand"] += 1
+        await asyncio.sleep(0.01)
+        return []
+
+    async def fake_bulk(session, requests):
+        calls["bulk"] += 1
+        return [[{"chunk_id": f"C_{eid}", "entity_type": "sub_value", "entity_id": eid, "chunk_type": "definition",
+                  "text_ar": "نص", "source_doc_id": "DOC", "source_anchor": eid, "refs": []}]
+                for _, eid, _ in requests]
+
+    monkeypatch.setattr("apps.api.retrieve.hybrid_retriever.expand_graph", fake_expand_graph)
+    monkeypatch.setattr("apps.api.retrieve.hybrid_retriever.get_chunks_with_refs_bulk", fake_bulk)
+
+    r = HybridRetriever(parallel=parallel, session_factory=_factory([]), reranker=None)
+    r.vector_retriever = QueryVector()
+    ents = [{"type": "sub_value", "id": "SV1"}]
+    merges = await r.retrieve_many(
+        _Session("caller"),
+        [RetrievalInputs(query=q, resolved_entities=ents) for q in ("q1", "q2", "q3")],
+        reranker_override=False,
+    )
+
+    assert calls == {"expand": 1, "bulk": 1}
+    assert [[p["chunk_id"] for p in m.evidence_packets if p["chunk_id"].startswith("V_")] for m in merges] == [
+        ["V_q1"],
+        ["V_q2"],
+        ["V_q3"],
+    ]
+    # Shared packets are copied per call.
+    assert merges[0].evidence_packets[0] is not merges[1].evidence_packets[0]
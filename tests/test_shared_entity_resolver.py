@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.core import corpus_version
+from apps.api.retrieve import entity_resolver as er
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeSession:
+    """Minimal async session: serves entity tables + ingestion_run version."""
+
+    def __init__(self):
+        self.runs = 1
+        self.entity_selects = 0
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "FROM ingestion_run" in sql:
+            return _Result([SimpleNamespace(n=self.runs, last_at=f"t{self.runs}")])
+        self.entity_selects += 1
+        if "FROM pillar" in sql:
+            return _Result([SimpleNamespace(id="P001", name_ar="الحياة الروحية")])
+        if "FROM core_value" in sql:
+            return _Result([SimpleNamespace(id="CV001", name_ar="الإيمان")])
+        if "FROM sub_value" in sql:
+            return _Result([SimpleNamespace(id="SV001", name_ar="الصبر")])
+        return _Result([])
+
+    async def rollback(self):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared(monkeypatch):
+    monkeypatch.setenv("CORPUS_VERSION_CHECK_SECONDS", "0")
+    er.reset_shared_resolver()
+    corpus_version.reset_corpus_version_cache()
+    yield
+    er.reset_shared_resolver()
+    corpus_version.reset_corpus_version_cache()
+
+
+@pytest.mark.asyncio
+async def test_shared_resolver_is_reused_until_corpus_version_changes():
+    """
+    Expected: the entity index is built once and reused across requests.
+    Edge: a new completed ingestion run triggers exactly one rebuild.
+    """
+    session = _FakeSession()
+    r1 = await er.get_shared_resolver(session)
+    r2 = await er.get_shared_resolver(session)
+    assert r1 is r2
+    assert session.entity_selects == 3
+    assert any(r.entity_id == "SV001" for r in r1.resolve("ما هو الصبر؟"))
+
+    session.runs = 2
+    r3 = await er.get_shared_resolver(session)
+    assert r3 is not r1
+    assert session.entity_selects == 6
+
+    stats = er.get_resolver_index_stats()
+    assert stats["rebuilds"] == 2
+    assert stats["patterns"] > 0
+    assert stats["last_rebuild_memory_bytes"] > 0
+
+
+@pytest.mark.asyncio
+async def test_local_bump_forces_reload():
+    session = _FakeSession()
+    r1 = await er.get_shared_resolver(session)
+    corpus_version.bump_corpus_version("test")
+    r2 = await er.get_shared_resolver(session)
+    assert r1 is not r2
@@ -299,3 +299,104 @@ class TestNegativePropagation:
             if step.get("node") == "n2":
                 assert step.get("delta", 0) < 0
                 break
+
+
+def _reference_propagate(nodes, edges, changed, magnitude, max_steps):
+    """Scalar dict-walking propagation (the pre-vectorization algorithm)."""
+    from apps.api.core.world_model.simulator import DEFAULT_NODE_VALUE
+
+    state = {n: DEFAULT_NODE_VALUE for n in nodes}
+    state[changed] = min(1.0, max(0.0, state[changed] + magnitude))
+    outgoing = {}
+    for e in edges:
+        outgoing.setdefault(e.from_node, []).append(e)
+    frontier, steps = {changed}, []
+    for step in range(1, max_steps + 1):
+        deltas, nxt = {}, set()
+        for src in sorted(frontier, key=list(nodes).index):
+            for e in outgoing.get(src, []):
+                if e.to_node not in nodes:
+                    continue
+                d = state[src] * compute_edge_weight(e) * DAMPING_FACTOR
+                if abs(d) < MIN_DELTA_THRESHOLD:
+                    continue
+                deltas[e.to_node] = deltas.get(e.to_node, 0.0) + d
+                steps.append((step, e.to_node, round(d, 4), round(state[e.to_node] + d, 4), e.id))
+                nxt.add(e.to_node)
+        for t, d in deltas.items():
+            state[t] = min(1.0, max(0.0, state[t] + d))
+        if not nxt:
+            break
+        frontier = nxt
+    final = {n: round(v, 4) for n, v in state.items() if abs(v - DEFAULT_NODE_VALUE) > MIN_DELTA_THRESHOLD}
+    return steps, final
+
+
+def _random_graph(rng, n_nodes, n_edges):
+    nodes = {
+        f"n{i}": GraphNode(id=f"n{i}", ref_kind="pillar", ref_id=f"P{i:03d}", label_ar=f"عقدة{i}")
+        for i in range(n_nodes)
+    }
+    edges = [
+        GraphEdge(
+            id=f"e{j}",
+            from_node=f"n{rng.randrange(n_nodes)}",
+            to_node=rng.choice([f"n{rng.randrange(n_nodes)}", "missing"]) if j % 17 == 0 else f"n{rng.randrange(n_nodes)}",
+            relation_type="INHIBITS" if rng.random() < 0.3 else "ENABLES",
+            polarity=-1 if rng.random() < 0.3 else 1,
+            confidence=rng.uniform(0.2, 1.0),
+            spans=[{"chunk_id": f"c{k}", "quote": "q"} for k in range(rng.randrange(0, 4))],
+        )
+        for j in range(n_edges)
+    ]
+    return nodes, edges
+
+
+class TestVectorizedPropagation:
+    """The compiled/batched engine reproduces the scalar propagation."""
+
+    def test_matches_scalar_reference_on_random_graphs(self):
+        import random
+
+        rng = random.Random(3)
+        for _ in range(40):
+            nodes, edges = _random_graph(rng, rng.randint(2, 12), rng.randint(1, 40))
+            changed = rng.choice(list(nodes))
+            magnitude = rng.choice([-0.3, 0.1, 0.2, 0.6])
+            result = propagate_change(nodes, edges, changed, magnitude, max_steps=5)
+            steps, final = _reference_propagate(nodes, edges, changed, magnitude, 5)
+            got = [(s["step"], s["node"], s["delta"], s["new_value"], s["via_edge"]) for s in result.propagation_steps]
+            assert got == steps
+            assert result.final_state == final
+
+    @pytest.mark.asyncio
+    async def test_what_if_runs_all_pillars_in_one_batch(self, monkeypatch):
+        import random
+
+        from apps.api.core.world_model import propagation_engine, simulator
+        from apps.api.core.world_model.graph_context import MechanismGraphContext
+
+        nodes, edges = _random_graph(random.Random(5), 8, 30)
+        graph_ctx = MechanismGraphContext.from_graph(nodes, edges)
+
+        async def fake_context(session):
+            return graph_ctx
+
+        calls = []
+        real_run = propagation_engine.run_propagation
+
+        def counting_run(graph, seeds, **kwargs):
+            calls.append(list(seeds))
+            return real_run(graph, seeds, **kwargs)
+
+        monkeypatch.setattr(simulator, "get_mechanism_graph_context", fake_context)
+        monkeypatch.setattr(simulator, "run_propagation", counting_run)
+        changes = {"P001": 0.2, "P404": 0.5, "P003": -0.2}
+        out = await simulator.simulate_what_if(None, "سيناريو", changes, max_steps=4)
+
+        assert len(calls) == 1 and len(calls[0]) == 2
+        assert [r["pillar_id"] for r in out["results"]] == ["P001", "P003"]
+        for r in out["results"]:
+            single = propagate_change(nodes, edges, f"n{int(r['pillar_id'][1:])}", r["change_magnitude"], max_steps=4)
+            assert r["propagation_steps"] == single.propagation_steps
+            assert r["final_state"] == single.final_state
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.core.schemas import EntityType
+from apps.api.retrieve.sql_retriever import get_chunks_with_refs, get_chunks_with_refs_bulk
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def _chunk(cid: str, et: str, eid: str):
+    return SimpleNamespace(
+        chunk_id=cid,
+        entity_type=et,
+        entity_id=eid,
+        chunk_type="definition",
+        text_ar=f"نص {cid}",
+        source_doc_id="DOC",
+        source_anchor=cid,
+    )
+
+
+class _FakeSession:
+    """Emulates the two bulk queries (ranked chunks per key, refs by chunk_id)."""
+
+    def __init__(self):
+        self.chunks = {
+            ("sub_value", "SV1"): [_chunk("C1", "sub_value", "SV1"), _chunk("C2", "sub_value", "SV1")],
+            ("pillar", "P1"): [_chunk("C3", "pillar", "P1")],
+        }
+        self.refs = {"C1": [("quran", "البقرة:1")], "C3": [("hadith", "مسلم:1")]}
+        self.queries = 0
+
+    async def execute(self, stmt, params=None):
+        self.queries += 1
+        sql = str(stmt)
+        if "FROM chunk_ref" in sql:
+            rows = [
+                SimpleNamespace(chunk_id=cid, ref_type=t, ref=r)
+                for cid in params["chunk_ids"]
+                for t, r in self.refs.get(cid, [])
+            ]
+            return _Result(rows)
+        rows = []
+        for et, eid, lim in zip(params["entity_types"], params["entity_ids"], params["limits"]):
+            rows.extend(self.chunks.get((et, eid), [])[:lim])
+        return _Result(rows)
+
+
+@pytest.mark.asyncio
+async def test_bulk_fetch_uses_two_queries_and_preserves_request_order():
+    """
+    Expected: N entity requests cost 2 queries; results align with requests and honor limits.
+    Edge: duplicate keys get independent packet dicts.
+    """
+    session = _FakeSession()
+    out = await get_chunks_with_refs_bulk(
+        session,
+        [
+            (EntityType.PILLAR, "P1", 10),
+            (EntityType.SUB_VALUE, "SV1", 1),
+            ("sub_value", "SV1", 5),
+            (EntityType.CORE_VALUE, "MISSING", 5),
+        ],
+    )
+    assert session.queries == 2
+    assert [[p["chunk_id"] for p in ps] for ps in out] == [["C3"], ["C1"], ["C1", "C2"], []]
+    assert out[1][0]["refs"] == [{"type": "quran", "ref": "البقرة:1"}]
+    assert out[2][1]["refs"] == []
+
+    out[1][0]["depth"] = 3
+    assert "depth" not in out[2][0]
+
+
+@pytest.mark.asyncio
+async def test_single_entity_wrapper_matches_bulk():
+    session = _FakeSession()
+    single = await get_chunks_with_refs(session, EntityType.SUB_VALUE, "SV1", limit=20)
+    (bulk,) = await get_chunks_with_refs_bulk(session, [(EntityType.SUB_VALUE, "SV1", 20)])
+    assert single == bulk
+    assert await get_chunks_with_refs_bulk(session, []) == []